@@ -1,5 +1,7 @@
 import os
 import json
+import base64
+import binascii
 import uuid
 import sqlite3
 import hashlib
@@ -7,17 +9,42 @@ import hmac
 import secrets
 import time
 import asyncio
-from typing import Dict, List, Optional, Sequence, Tuple, Union
+import functools
+import pickle
+import re
+import urllib.parse
+import zlib
+from bisect import bisect_left
+from collections import OrderedDict, deque
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple, Union
 from contextlib import contextmanager
+from dataclasses import dataclass, field
 import logging
 import boto3
-from threading import Lock, Thread
+from botocore.exceptions import ClientError
+from threading import Event, Lock, Thread, get_ident, local
 from datetime import datetime, timedelta, timezone
 
+try:
+    import fcntl
+except ImportError:  # Windows, which runs a single worker
+    fcntl = None
+
+from db_replication import LEGACY_DB_KEY, LocalObjectStore, ReplicaNotFound, WalReplicator
+
 # Bump when the persisted playable snapshot shape changes, so stale rows are
 # regenerated instead of loaded.
 WORLD_SNAPSHOT_VERSION = 1
 
+# Large JSON columns (definitions and the per-language snapshot prose) are
+# stored as a BLOB: one marker byte, then the zlib-compressed JSON text. JSON
+# text never starts with the marker, so small values stored as plain text and
+# rows written before compression read back unchanged.
+COMPRESSED_JSON_MARKER = b"\x01"
+COMPRESSED_JSON_MIN_BYTES = int(os.getenv("DB_COMPRESS_JSON_MIN_BYTES", "512"))
+
 VALID_WORLD_VISIBILITIES = {"private", "unlisted", "public"}
 VALID_WORLD_MODERATION_STATUSES = {
     "not_requested",
@@ -29,33 +56,1081 @@ VALID_WORLD_MODERATION_STATUSES = {
 }
 
 
+def encode_json_column(value) -> Union[str, bytes]:
+    text = json.dumps(value)
+    if len(text) < COMPRESSED_JSON_MIN_BYTES:
+        return text
+    return COMPRESSED_JSON_MARKER + zlib.compress(text.encode("utf-8"), 6)
+
+
+def decode_json_column(raw: Union[str, bytes, None]):
+    """Parse a JSON column written by either format. Returns None for NULL."""
+    if raw is None:
+        return None
+    if isinstance(raw, bytes):
+        if raw[:1] == COMPRESSED_JSON_MARKER:
+            raw = zlib.decompress(raw[1:])
+        return json.loads(raw)
+    return json.loads(raw)
+
+
+@dataclass(frozen=True)
+class SchemaCapabilities:
+    """Which tables and columns a database file actually has.
+
+    Old databases are still opened and migrated in place, so a few queries
+    select a placeholder for a column that may not exist yet. Reading that
+    layout once, instead of with PRAGMA calls on every request, also lets the
+    SQL built for it be reused: `sql()` memoizes the text per query shape for
+    the lifetime of this snapshot.
+    """
+    tables: Dict[str, FrozenSet[str]]
+    _sql_cache: Dict = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def read(cls, conn) -> "SchemaCapabilities":
+        # Attached files included: queries name tables without a schema, and
+        # SQLite looks in main first, as this does.
+        tables = {}
+        for _, schema, _ in conn.execute("PRAGMA database_list").fetchall():
+            if schema == "temp":
+                continue
+            for (name,) in conn.execute(
+                f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'"
+            ).fetchall():
+                if name not in tables:
+                    tables[name] = frozenset(
+                        row[1] for row in conn.execute(
+                            f'PRAGMA {schema}.table_info("{name}")'
+                        ).fetchall()
+                    )
+        return cls(tables)
+
+    def has_table(self, table: str) -> bool:
+        return table in self.tables
+
+    def has_column(self, table: str, column: str) -> bool:
+        return column in self.tables.get(table, ())
+
+    def sql(self, key, build: Callable[[], str]) -> str:
+        text = self._sql_cache.get(key)
+        if text is None:
+            text = self._sql_cache.setdefault(key, build())
+        return text
+
+
+class WorldCache:
+    """In-process LRU of decoded World rows, bounded by a byte budget.
+
+    Keys are `(generator_id, language, version)`: `(id, None, None)` for the
+    generator row, `(id, None, snapshot_version)` for the playable snapshot,
+    `(id, language, translation_version)` for a translation and
+    `(id, language, ("bundle", snapshot_version, translation_version))` for a
+    `load_world_bundle` result. Entries are kept
+    pickled, so each hit hands the caller its own copy to mutate, and the
+    pickle length is what counts against the budget.
+
+    Writers invalidate every key of a World after their transaction commits.
+    A fill that raced a write is dropped rather than cached: the generation
+    counter it read before going to SQLite no longer matches.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self._lock = Lock()
+        self._entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._keys_by_world: Dict[str, set] = {}
+        self._size = 0
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def read_through(self, key: Tuple, load: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+        """Return the cached value for `key`, or `load()` it and cache it."""
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                generation = self._generation
+        if blob is not None:
+            return pickle.loads(blob)
+
+        value = load()
+        if value is not None and self.max_bytes:
+            self._store(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), generation)
+        return value
+
+    def _store(self, key: Tuple, blob: bytes, generation: int) -> None:
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = blob
+            self._size += len(blob)
+            self._keys_by_world.setdefault(key[0], set()).add(key)
+            while self._size > self.max_bytes:
+                old_key, old_blob = self._entries.popitem(last=False)
+                self._size -= len(old_blob)
+                self._forget_key(old_key)
+                self.evictions += 1
+
+    def _forget_key(self, key: Tuple) -> None:
+        keys = self._keys_by_world.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_world[key[0]]
+
+    def invalidate(self, generator_ids) -> None:
+        with self._lock:
+            self._generation += 1
+            for generator_id in generator_ids:
+                for key in self._keys_by_world.pop(generator_id, ()):
+                    self._size -= len(self._entries.pop(key))
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_world.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class WriteBehindQueue:
+    """Defers writes nobody waits on and applies them in batches.
+
+    `submit` only appends to a list. A background thread hands everything
+    queued to `apply_batch` every `interval` seconds, or sooner once
+    `max_batch` items are waiting, so many small writes share one
+    transaction and one turn on the writer lock. `close` stops the thread and
+    applies what is left. With `interval` at 0 every item is applied as it is
+    submitted.
+
+    A batch that fails because the database is locked is queued again for the
+    next pass. Any other failure is logged and the batch is dropped, so one
+    bad item cannot block everything behind it.
+    """
+
+    def __init__(self, name: str, apply_batch: Callable[[List], None],
+                 interval: float, max_batch: int):
+        self.name = name
+        self.apply_batch = apply_batch
+        self.interval = interval
+        self.max_batch = max(1, max_batch)
+        self._pending: List = []
+        self._lock = Lock()
+        # Held for a whole pass, so batches are applied in submission order.
+        self._flush_lock = Lock()
+        self._wake = Event()
+        self._thread: Optional[Thread] = None
+        self._closed = False
+        self.batches = 0
+        self.items = 0
+        self.failures = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def submit(self, item) -> None:
+        with self._lock:
+            deferred = self.interval > 0 and not self._closed
+            if deferred:
+                self._pending.append(item)
+                full = len(self._pending) >= self.max_batch
+                if self._thread is None:
+                    self._thread = Thread(
+                        target=self._run, name=f"write-behind-{self.name}", daemon=True
+                    )
+                    self._thread.start()
+        if not deferred:
+            self._apply([item])
+        elif full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Apply everything queued so far. Returns how many items were applied."""
+        applied = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._pending[:self.max_batch]
+                    del self._pending[:self.max_batch]
+                if not batch:
+                    return applied
+                if not self._apply(batch):
+                    return applied
+                applied += len(batch)
+
+    def _apply(self, batch: List) -> bool:
+        started = time.perf_counter()
+        try:
+            self.apply_batch(batch)
+        except sqlite3.OperationalError as e:
+            self.failures += 1
+            if "locked" not in str(e) and "busy" not in str(e):
+                logging.exception(f"Write-behind {self.name} batch of {len(batch)} dropped")
+                return True
+            logging.warning(f"Write-behind {self.name} batch of {len(batch)} deferred: {e}")
+            with self._lock:
+                self._pending[:0] = batch
+            return False
+        except Exception:
+            self.failures += 1
+            logging.exception(f"Write-behind {self.name} batch of {len(batch)} dropped")
+            return True
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.batches += 1
+        self.items += len(batch)
+        self.last_batch_size = len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            thread, self._thread = self._thread, None
+        self._wake.set()
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "batches": self.batches,
+            "items": self.items,
+            "failures": self.failures,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "avg_flush_ms": round(self.total_flush_ms / self.batches, 3) if self.batches else 0,
+        }
+
+
+class _JobConnection:
+    """What one job sees of the writer connection while it runs in a group.
+
+    The group already holds the transaction, so the job's own transaction
+    control is mapped onto its savepoint: BEGIN does nothing, `commit()`
+    keeps everything so far, and `rollback()` drops what came after the last
+    `commit()`. Work left uncommitted when the job returns is dropped, as it
+    would be when a pooled connection is handed back.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, savepoint: str, stale_worlds: set):
+        self.connection = connection
+        self.savepoint = savepoint
+        self.stale_worlds = stale_worlds
+        connection.execute(f"SAVEPOINT {savepoint}")
+
+    def execute(self, sql, *args):
+        if sql.lstrip()[:5].upper() == "BEGIN":
+            return self.connection.cursor()
+        return self.connection.execute(sql, *args)
+
+    def commit(self):
+        self.connection.execute(f"RELEASE {self.savepoint}")
+        self.connection.execute(f"SAVEPOINT {self.savepoint}")
+
+    def rollback(self):
+        self.connection.execute(f"ROLLBACK TO {self.savepoint}")
+
+    def finish(self):
+        if not self.connection.in_transaction:
+            # A failure SQLite answers by aborting the whole transaction;
+            # the group reports it.
+            return
+        self.rollback()
+        self.connection.execute(f"RELEASE {self.savepoint}")
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+
+class WriterQueue:
+    """The single path every DatabaseManager write takes.
+
+    Writes are queued as closures, and one thread at a time drains the queue
+    as the writer. Whoever finds no writer running becomes it, so an
+    uncontended write runs on its own thread without a handoff; while it
+    runs, other callers queue up and wait on a future. The writer takes what
+    has queued, up to `max_group` jobs, and runs them in one transaction, each
+    in its own savepoint: a job that raises rolls back alone, and the group
+    shares a single COMMIT, one fsync and one replication notify. Futures
+    resolve once that commit has landed.
+
+    Nothing else in the process writes concurrently, so writes never collide
+    on the SQLite lock; a lock error can only come from another process
+    holding it past the busy timeout. Each database file has its own queue,
+    named by `database`.
+    """
+
+    def __init__(self, manager: "DatabaseManager", max_group: int = 64, database: str = "worlds"):
+        self._manager = manager
+        self.database = database
+        self.max_group = max(1, max_group)
+        self._jobs: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._writer = Lock()
+        self._stats_lock = Lock()
+        self._local = local()
+        self._savepoints = 0
+        self.groups = 0
+        self.jobs = 0
+        self.failed_groups = 0
+        self.max_depth = 0
+        self.max_group_size = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_commit_ms = 0.0
+        self.max_commit_ms = 0.0
+
+    def on_writer_thread(self) -> bool:
+        return getattr(self._local, "connection", None) is not None
+
+    def run(self, operation, *args):
+        """Queue a write and return its result once its group has committed."""
+        if self.on_writer_thread():
+            # A write issued from inside another: it joins the running group.
+            return self._run_job(self._local.connection, self._local.stale_worlds,
+                                 operation, args)
+
+        future = Future()
+        self._jobs.put((operation, args, future, time.perf_counter()))
+        depth = self._jobs.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        while not future.done():
+            if self._writer.acquire(blocking=False):
+                try:
+                    self._drain()
+                finally:
+                    self._writer.release()
+                # A job queued between the last empty check and the release
+                # found the writer taken; go round so it is not stranded.
+                continue
+            try:
+                return future.result(timeout=0.05)
+            except TimeoutError:
+                continue
+        return future.result()
+
+    def _drain(self):
+        while True:
+            group = []
+            while len(group) < self.max_group:
+                try:
+                    group.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+            if not group:
+                return
+            self._run_group(group)
+
+    def _run_group(self, group):
+        started = time.perf_counter()
+        outcomes = []
+        try:
+            with self._manager.get_connection(database=self.database) as conn:
+                conn.connection.execute("BEGIN IMMEDIATE")
+                self._local.connection = conn.connection
+                self._local.stale_worlds = conn.stale_worlds
+                try:
+                    for operation, args, future, _ in group:
+                        try:
+                            outcomes.append((future, self._run_job(
+                                conn.connection, conn.stale_worlds, operation, args
+                            ), None))
+                        except sqlite3.DatabaseError as e:
+                            if not conn.connection.in_transaction:
+                                raise
+                            outcomes.append((future, None, e))
+                        except Exception as e:
+                            outcomes.append((future, None, e))
+                finally:
+                    self._local.connection = None
+                    self._local.stale_worlds = None
+                committing = time.perf_counter()
+                conn.commit()
+        except BaseException as e:
+            # The transaction as a whole did not commit; nothing in it landed.
+            with self._stats_lock:
+                self.failed_groups += 1
+            for _, _, future, _ in group:
+                future.set_exception(e)
+            return
+
+        finished = time.perf_counter()
+        with self._stats_lock:
+            self.groups += 1
+            self.jobs += len(group)
+            self.max_group_size = max(self.max_group_size, len(group))
+            for _, _, _, enqueued in group:
+                wait_ms = (started - enqueued) * 1000
+                self.total_wait_ms += wait_ms
+                self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            commit_ms = (finished - committing) * 1000
+            self.total_commit_ms += commit_ms
+            self.max_commit_ms = max(self.max_commit_ms, commit_ms)
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _run_job(self, connection, stale_worlds, operation, args):
+        self._savepoints += 1
+        job_conn = _JobConnection(connection, f"job_{self._savepoints}", stale_worlds)
+        try:
+            return operation(job_conn, *args)
+        finally:
+            job_conn.finish()
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            jobs = self.jobs
+            return {
+                "depth": self._jobs.qsize(),
+                "max_depth": self.max_depth,
+                "groups": self.groups,
+                "jobs": jobs,
+                "failed_groups": self.failed_groups,
+                "avg_group_size": round(jobs / self.groups, 2) if self.groups else 0,
+                "max_group_size": self.max_group_size,
+                "avg_wait_ms": round(self.total_wait_ms / jobs, 3) if jobs else 0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "avg_commit_ms": round(self.total_commit_ms / self.groups, 3) if self.groups else 0,
+                "max_commit_ms": round(self.max_commit_ms, 3),
+            }
+
+
+class _OperationStats:
+    """Running totals for one DatabaseManager method; see QueryStats."""
+
+    __slots__ = ("calls", "errors", "busy", "total_ms", "max_ms", "wait_ms", "max_wait_ms", "histogram")
+
+    def __init__(self, buckets: int):
+        self.calls = self.errors = self.busy = 0
+        self.total_ms = self.max_ms = self.wait_ms = self.max_wait_ms = 0.0
+        self.histogram = [0] * buckets
+
+    def copy(self) -> "_OperationStats":
+        copied = _OperationStats(0)
+        for name in self.__slots__:
+            setattr(copied, name, getattr(self, name))
+        copied.histogram = list(self.histogram)
+        return copied
+
+
+class _QueryTiming:
+    """One DatabaseManager call in flight; see QueryStats."""
+
+    __slots__ = ("stats", "operation", "name", "called", "started", "finished", "statements")
+
+    def __init__(self, stats: "QueryStats", operation):
+        self.stats = stats
+        self.operation = operation
+        self.name = QueryStats.operation_name(operation)
+        self.called = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self.statements = []
+
+    def run(self, conn, *args):
+        """Run the operation, noting when it got its connection and its SQL."""
+        local_state = self.stats._local
+        outer = getattr(local_state, "statements", None)
+        local_state.statements = self.statements
+        self.started = time.perf_counter()
+        try:
+            return self.operation(conn, *args)
+        finally:
+            self.finished = time.perf_counter()
+            local_state.statements = outer
+
+
+class QueryStats:
+    """Where DatabaseManager spends its time, per public method.
+
+    Every call through `DatabaseManager._execute` is recorded under the name
+    of the method it serves: call and error counts, a latency histogram, and
+    how much of the latency was spent waiting for a connection (a pooled
+    reader, or the writer queue) rather than running SQL. A call slower than
+    `slow_ms` is logged with the statements it ran and their query plans,
+    and kept in a short list of recent slow calls.
+
+    Statements are captured by the connections' trace callback, only on the
+    thread running a recorded call, and logged with string literals masked.
+    """
+
+    BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+    MAX_STATEMENTS = 20
+    # Savepoints and transaction boundaries the writer issues around jobs.
+    UNLOGGED_STATEMENTS = ("SAVEPOINT", "RELEASE", "BEGIN", "COMMIT", "ROLLBACK")
+    _STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+    def __init__(self, slow_ms: float, explain: Callable[[str], List[str]], slow_log_size: int = 50):
+        self.slow_ms = slow_ms
+        self._explain = explain
+        self._lock = Lock()
+        self._local = local()
+        self._operations: Dict[str, _OperationStats] = {}
+        self._slow = deque(maxlen=slow_log_size)
+
+    _names: Dict[str, str] = {}
+
+    @classmethod
+    def operation_name(cls, operation) -> str:
+        # "DatabaseManager.get_generator.<locals>._get" -> "get_generator"
+        qualname = getattr(operation, "__qualname__", None) or repr(operation)
+        name = cls._names.get(qualname)
+        if name is None:
+            name = cls._names[qualname] = qualname.split(".<locals>", 1)[0].rsplit(".", 1)[-1]
+        return name
+
+    def begin(self, operation) -> _QueryTiming:
+        return _QueryTiming(self, operation)
+
+    def trace(self, sql: str) -> None:
+        """sqlite3 trace callback for every pooled connection."""
+        statements = getattr(self._local, "statements", None)
+        if statements is not None and len(statements) < self.MAX_STATEMENTS:
+            statements.append(sql)
+
+    def finish(self, timing: _QueryTiming, error: Optional[BaseException] = None) -> None:
+        finished = time.perf_counter()
+        total_ms = (finished - timing.called) * 1000
+        started = timing.started if timing.started is not None else finished
+        wait_ms = (started - timing.called) * 1000
+        with self._lock:
+            entry = self._operations.get(timing.name)
+            if entry is None:
+                entry = self._operations[timing.name] = _OperationStats(len(self.BUCKETS_MS) + 1)
+            entry.calls += 1
+            entry.total_ms += total_ms
+            entry.wait_ms += wait_ms
+            if total_ms > entry.max_ms:
+                entry.max_ms = total_ms
+            if wait_ms > entry.max_wait_ms:
+                entry.max_wait_ms = wait_ms
+            entry.histogram[bisect_left(self.BUCKETS_MS, total_ms)] += 1
+            if error is not None:
+                entry.errors += 1
+                if isinstance(error, sqlite3.OperationalError) and (
+                    "locked" in str(error) or "busy" in str(error)
+                ):
+                    entry.busy += 1
+
+        if self.slow_ms and total_ms >= self.slow_ms:
+            self._log_slow(timing, total_ms, wait_ms)
+
+    def _log_slow(self, timing: _QueryTiming, total_ms: float, wait_ms: float) -> None:
+        statements = {}
+        for sql in timing.statements:
+            if sql.lstrip().upper().startswith(self.UNLOGGED_STATEMENTS):
+                continue
+            masked = self._STRING_LITERAL.sub("?", " ".join(sql.split()))
+            if masked in statements:
+                statements[masked]["count"] += 1
+                continue
+            try:
+                plan = self._explain(sql)
+            except sqlite3.Error:
+                plan = []
+            statements[masked] = {"sql": masked, "count": 1, "plan": plan}
+
+        entry = {
+            "name": timing.name,
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "ms": round(total_ms, 3),
+            "wait_ms": round(wait_ms, 3),
+            "statements": list(statements.values()),
+        }
+        with self._lock:
+            self._slow.append(entry)
+        lines = [
+            f"Slow database call {timing.name}: {total_ms:.1f} ms "
+            f"({wait_ms:.1f} ms waiting for a connection)"
+        ]
+        for statement in entry["statements"]:
+            repeat = f" (x{statement['count']})" if statement["count"] > 1 else ""
+            lines.append(f"  {statement['sql']}{repeat}")
+            lines.extend(f"    {step}" for step in statement["plan"])
+        logging.warning("\n".join(lines))
+
+    def _percentile(self, histogram: List[int], calls: int, fraction: float) -> Optional[float]:
+        # Upper bound of the bucket holding the percentile; None past the last.
+        target = calls * fraction
+        seen = 0
+        for bound, count in zip(self.BUCKETS_MS, histogram):
+            seen += count
+            if seen >= target:
+                return bound
+        return None
+
+    def snapshot(self) -> Dict:
+        """Per-method totals, slowest in aggregate first, and recent slow calls."""
+        with self._lock:
+            operations = {name: entry.copy() for name, entry in self._operations.items()}
+            slow = list(self._slow)
+
+        rows = []
+        for name, entry in operations.items():
+            calls = entry.calls
+            rows.append({
+                "name": name,
+                "calls": calls,
+                "errors": entry.errors,
+                "busy": entry.busy,
+                "total_ms": round(entry.total_ms, 3),
+                "avg_ms": round(entry.total_ms / calls, 3),
+                "max_ms": round(entry.max_ms, 3),
+                "p50_ms": self._percentile(entry.histogram, calls, 0.5),
+                "p95_ms": self._percentile(entry.histogram, calls, 0.95),
+                "p99_ms": self._percentile(entry.histogram, calls, 0.99),
+                "avg_wait_ms": round(entry.wait_ms / calls, 3),
+                "max_wait_ms": round(entry.max_wait_ms, 3),
+                "histogram": entry.histogram,
+            })
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return {
+            "slow_ms": self.slow_ms,
+            "buckets_ms": list(self.BUCKETS_MS),
+            "operations": rows,
+            "slow": slow,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._operations.clear()
+            self._slow.clear()
+
+
+class ConnectionPool:
+    """Long-lived SQLite connections for one database file.
+
+    There is one writer connection, handed to a single caller at a time, and
+    a small set of reader connections opened with `query_only`. In WAL mode
+    the readers see the last committed state without waiting for a writer,
+    and every connection keeps its statement and page caches between calls.
+
+    A connection is returned rolled back to autocommit, so a caller that
+    raised mid-transaction leaves nothing behind for the next one.
+
+    The pool pins the inode it opened. If the file is deleted or replaced
+    underneath it, as a restore does, `is_stale` reports it and the owner
+    opens a fresh pool rather than writing into an unlinked file.
+
+    `attach` names another database file, as (schema, path), that every
+    connection attaches read-only, so queries can join across the two while
+    BEGIN IMMEDIATE still locks only this pool's file. `connect_joined` opens
+    a connection that may write both.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            timeout: float,
+            read_pool_size: int = 4,
+            synchronous: str = "NORMAL",
+            cache_size_kib: int = 16384,
+            mmap_size: int = 128 * 1024 * 1024,
+            autocheckpoint: int = 1000,
+            trace: Optional[Callable[[str], None]] = None,
+            attach: Optional[Tuple[str, str]] = None,
+    ):
+        self.path = path
+        self.timeout = timeout
+        self.read_pool_size = max(0, read_pool_size)
+        self.synchronous = synchronous
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self.autocheckpoint = autocheckpoint
+        self.trace = trace
+        self.attach = attach
+        self.closed = False
+
+        self._lock = Lock()
+        self._writer_lock = Lock()
+        self._writer_owner = None
+        self._readers = []
+        self._reader_count = 0
+        self._overflow = set()
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._writer = self._connect()
+        # Takes effect on a new, empty file (or at the next VACUUM), letting
+        # DatabaseManager.run_maintenance shrink it without a full rewrite.
+        self._writer.execute("PRAGMA main.auto_vacuum = INCREMENTAL")
+        journal_mode = self._writer.execute("PRAGMA main.journal_mode = WAL").fetchone()[0]
+        if str(journal_mode).lower() != "wal":
+            logging.warning(f"SQLite WAL mode unavailable, using {journal_mode} journal")
+        self._identity = self._file_identity()
+
+    def _connect(self, readonly: bool = False, joined: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False, uri=True)
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA cache_size = {-abs(int(self.cache_size_kib))}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA wal_autocheckpoint = {int(self.autocheckpoint)}")
+        if self.attach is not None:
+            schema, path = self.attach
+            uri = "file:" + urllib.parse.quote(os.path.abspath(path))
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (uri if joined else uri + "?mode=ro",))
+            conn.execute(f"PRAGMA {schema}.synchronous = {self.synchronous}")
+        if readonly:
+            conn.execute("PRAGMA query_only = ON")
+        if self.trace is not None:
+            conn.set_trace_callback(self.trace)
+        return conn
+
+    def connect_joined(self) -> sqlite3.Connection:
+        """A new connection that can write the attached file too; the caller closes it.
+
+        Nothing stops it writing alongside the pool's writer, so callers hold
+        the writers of both files while they use it.
+        """
+        return self._connect(joined=True)
+
+    def _file_identity(self):
+        # The attached file too: a restore replaces both.
+        paths = (self.path,) if self.attach is None else (self.path, self.attach[1])
+        identity = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return None
+            identity.append((stat.st_dev, stat.st_ino))
+        return tuple(identity)
+
+    def is_stale(self) -> bool:
+        return self.closed or self._file_identity() != self._identity
+
+    @staticmethod
+    def _reset(conn: sqlite3.Connection) -> bool:
+        """Return a connection to a clean autocommit state, or False if unusable."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire_writer(self) -> sqlite3.Connection:
+        if self._writer_owner == get_ident():
+            # Re-entered from inside a write on this thread. Waiting for the
+            # pooled writer would deadlock, so this call gets its own short-
+            # lived connection, exactly as it would have before pooling.
+            return self._connect()
+
+        if not self._writer_lock.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError("database is locked")
+        self._writer_owner = get_ident()
+        return self._writer
+
+    def holds_writer(self) -> bool:
+        """Whether the calling thread has the writer checked out."""
+        return self._writer_owner == get_ident()
+
+    def release_writer(self, conn: sqlite3.Connection) -> None:
+        if conn is not self._writer:
+            conn.close()
+            return
+
+        healthy = self._reset(conn)
+        try:
+            if not healthy and not self.closed:
+                conn.close()
+                self._writer = self._connect()
+            elif self.closed:
+                conn.close()
+        finally:
+            self._writer_owner = None
+            self._writer_lock.release()
+
+    def acquire_reader(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._readers:
+                return self._readers.pop()
+            if self._reader_count < self.read_pool_size:
+                self._reader_count += 1
+                pooled = True
+            else:
+                pooled = False
+
+        try:
+            conn = self._connect(readonly=True)
+        except Exception:
+            if pooled:
+                with self._lock:
+                    self._reader_count -= 1
+            raise
+        if not pooled:
+            # Over the pool size: serve the call, then close this one.
+            with self._lock:
+                self._overflow.add(conn)
+        return conn
+
+    def release_reader(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            overflow = conn in self._overflow
+            self._overflow.discard(conn)
+        if overflow:
+            conn.close()
+            return
+
+        healthy = self._reset(conn)
+        with self._lock:
+            if healthy and not self.closed:
+                self._readers.append(conn)
+                return
+            self._reader_count -= 1
+        conn.close()
+
+    def checkpoint(self, mode: str = "TRUNCATE") -> None:
+        """Fold the WAL back into the main file, e.g. before copying it."""
+        conn = self.acquire_writer()
+        try:
+            self.wal_checkpoint(conn, mode)
+        finally:
+            self.release_writer(conn)
+
+    @staticmethod
+    def wal_checkpoint(conn: sqlite3.Connection, mode: str = "TRUNCATE") -> Tuple[int, int, int]:
+        """Checkpoint the main file's WAL on `conn`; returns (busy, log, checkpointed)."""
+        # With the file attached elsewhere, a connection that has not read
+        # since another one wrote (a joined connection) reports busy to a
+        # TRUNCATE; a read first brings its view of the WAL up to date.
+        conn.execute("SELECT 1 FROM main.sqlite_master LIMIT 1").fetchall()
+        return tuple(conn.execute(f"PRAGMA main.wal_checkpoint({mode})").fetchone())
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+
+        # A writer that is checked out is closed by release_writer instead.
+        if self._writer_lock.acquire(blocking=False):
+            try:
+                self._writer.close()
+            finally:
+                self._writer_lock.release()
+
+
 class DatabaseManager:
+    # Numbered schema steps: a database's PRAGMA user_version is the count
+    # applied. Databases from before versioning start at 0 with whatever
+    # tables they had, so every step must be safe on any older layout.
+    # Append only; never renumber.
+    MIGRATIONS = (
+        "_migration_1_worlds",
+        "_migration_2_accounts",
+        "_migration_3_credits",
+        "_migration_4_world_activity",
+        "_migration_5_world_summaries",
+        "_migration_6_world_search",
+        "_migration_7_hot_query_indexes",
+        "_migration_8_retention_indexes",
+        "_migration_9_accounts_file",
+        "_migration_10_game_sessions",
+        "_migration_11_session_directory",
+        "_migration_12_forge_jobs",
+    )
+    # The steps that only write the accounts file. WAL commits are not atomic
+    # across files, so these also record themselves in the accounts file's
+    # own user_version, and one the World file counts but the accounts file
+    # lost is run again. Each must be safe to repeat.
+    ACCOUNT_MIGRATIONS = (
+        "_migration_10_game_sessions",
+        "_migration_11_session_directory",
+        "_migration_12_forge_jobs",
+    )
+    # Kept in a file of their own (accounts_db_path) with its own writer, so
+    # a credit spend, a completion or a sign-in never queues behind a large
+    # World write. Everything else stays in db_path.
+    ACCOUNT_TABLES = (
+        "users",
+        "auth_identities",
+        "mobile_auth_sessions",
+        "credit_ledger",
+        "credit_balances",
+        "store_purchases",
+        "world_metrics",
+        "world_play_sessions",
+        "world_player_completions",
+        "world_art_reroll_attempts",
+        "game_sessions",
+        "session_directory",
+        "session_workers",
+        "task_leases",
+        "rate_limit_attempts",
+        "forge_jobs",
+    )
+    # Row rewrites too slow to hold startup for, run in this order by
+    # run_backfills once a migration has scheduled them.
+    BACKFILLS = {
+        "generator_ownership_shape": "_backfill_generator_ownership_shape",
+        "world_summaries": "_backfill_world_summaries",
+        "world_search": "_backfill_world_search",
+    }
+    # One FTS5 index per tokenizer, each holding the languages it suits:
+    # English is stemmed, and Chinese, Japanese and Korean, which do not
+    # separate words with spaces, are matched on trigrams.
+    WORLD_SEARCH_TABLES = {
+        "world_search_en": "porter unicode61 remove_diacritics 2",
+        "world_search_cjk": "trigram",
+        "world_search": "unicode61 remove_diacritics 2",
+    }
+    WORLD_SEARCH_CJK_LANGUAGES = frozenset({"ja", "zh", "ko"})
+    WORLD_SEARCH_CANDIDATES = 2000
+    # Rows only worth keeping for a while, pruned by run_maintenance: table ->
+    # (prune method, env var, default days). 0 days keeps rows forever.
+    RETENTION_POLICIES = {
+        "world_play_sessions": (
+            "_prune_world_play_sessions", "DB_RETAIN_PLAY_SESSIONS_DAYS", 90,
+        ),
+        "mobile_auth_sessions": (
+            "_prune_mobile_auth_sessions", "DB_RETAIN_MOBILE_SESSIONS_DAYS", 30,
+        ),
+        "world_art_reroll_attempts": (
+            "_prune_world_art_reroll_attempts", "DB_RETAIN_ART_REROLLS_DAYS", 30,
+        ),
+        "world_moderation_reviews": (
+            "_prune_world_moderation_reviews", "DB_RETAIN_MODERATION_REVIEWS_DAYS", 365,
+        ),
+        "game_sessions": (
+            "_prune_game_sessions", "DB_RETAIN_GAME_SESSIONS_DAYS", 1,
+        ),
+        "session_directory": (
+            "_prune_session_directory", "DB_RETAIN_SESSION_DIRECTORY_DAYS", 1,
+        ),
+        "rate_limit_attempts": (
+            "_prune_rate_limit_attempts", "DB_RETAIN_RATE_LIMIT_ATTEMPTS_DAYS", 1,
+        ),
+        "forge_jobs": (
+            "_prune_forge_jobs", "DB_RETAIN_FORGE_JOBS_DAYS", 7,
+        ),
+    }
+
     class ConnectionWrapper:
         def __init__(self, connection, on_commit):
             self.connection = connection
             self.on_commit = on_commit
+            # Worlds this transaction changed, dropped from the world cache
+            # once it commits.
+            self.stale_worlds = set()
 
         def commit(self):
             self.connection.commit()
             # Schedule upload instead of blocking
-            self.on_commit()
+            self.on_commit(self.stale_worlds)
+            self.stale_worlds = set()
 
         def __getattr__(self, name):
             return getattr(self.connection, name)
 
-    def __init__(self, upload_frequency_minutes: int = 5):
+    def __init__(self):
         self.db_path = os.path.join("_data", "rllm_game_data.db")
-        self.timeout = 20.0
-        self.max_retries = 3
-        self.retry_delay = 0.1
-
-        # Upload batching configuration
-        self.upload_frequency_minutes = upload_frequency_minutes
-        self.last_upload_time = None
-        self.pending_upload = False
-        self.upload_lock = Lock()
-        self.background_upload_thread = None
-        self.shutdown_flag = False
+        # Unset, the accounts file sits beside db_path and follows it.
+        self._accounts_db_path = None
+        self.timeout = int(os.getenv("DB_BUSY_TIMEOUT_MS", "20000")) / 1000
+        # Time spent per DatabaseManager method; see QueryStats.
+        self.query_stats = QueryStats(
+            float(os.getenv("DB_SLOW_QUERY_MS", "250")),
+            explain=self._explain_query_plan,
+        )
+        # Every write goes through one of these, one writer per file at a
+        # time; see WriterQueue.
+        write_group_max = int(os.getenv("DB_WRITE_GROUP_MAX", "64"))
+        self.writes = WriterQueue(self, max_group=write_group_max)
+        self.account_writes = WriterQueue(self, max_group=write_group_max, database="accounts")
+
+        # Pooled connections, opened lazily so db_path can still be pointed
+        # elsewhere after construction.
+        self.read_pool_size = int(os.getenv("DB_READ_POOL_SIZE", "4"))
+        self.synchronous = os.getenv("DB_SYNCHRONOUS", "NORMAL").strip().upper()
+        if self.synchronous not in {"OFF", "NORMAL", "FULL", "EXTRA"}:
+            raise ValueError("DB_SYNCHRONOUS must be one of: OFF, NORMAL, FULL, EXTRA")
+        self.cache_size_kib = int(os.getenv("DB_CACHE_SIZE_KIB", "16384"))
+        self.mmap_size = int(os.getenv("DB_MMAP_SIZE_BYTES", str(128 * 1024 * 1024)))
+        self._pool = None
+        self._accounts_pool = None
+        self._pool_lock = Lock()
+        # Read once per database file, and again after init_db migrates it.
+        self._schema = None
+        # Decoded generator, translation and snapshot rows; see WorldCache.
+        self.world_cache = WorldCache(
+            int(os.getenv("DB_WORLD_CACHE_BYTES", str(64 * 1024 * 1024)))
+        )
+        # Play starts only feed counters, so they are batched rather than
+        # taking the writer lock once per WebSocket connect.
+        self.play_starts = WriteBehindQueue(
+            "play-starts",
+            self._record_play_starts,
+            interval=int(os.getenv("DB_WRITE_BEHIND_MS", "250")) / 1000,
+            max_batch=int(os.getenv("DB_WRITE_BEHIND_MAX_BATCH", "500")),
+        )
+        # Migrations schedule backfills; init_db starts them in the background.
+        self.backfill_batch_size = int(os.getenv("DB_BACKFILL_BATCH", "500"))
+        self.backfill_pause = int(os.getenv("DB_BACKFILL_PAUSE_MS", "20")) / 1000
+        self._backfill_lock = Lock()
+        self._backfill_stop = Event()
+        self._backfill_thread = None
+        # Retention and compaction; see run_maintenance.
+        self.retention_days = {
+            table: int(os.getenv(env_var, str(default)))
+            for table, (_, env_var, default) in self.RETENTION_POLICIES.items()
+        }
+        self.maintenance_batch_size = int(os.getenv("DB_MAINTENANCE_BATCH", "500"))
+        self.maintenance_pause = int(os.getenv("DB_MAINTENANCE_PAUSE_MS", "50")) / 1000
+        self._maintenance_lock = Lock()
+        self._maintenance_stop = Event()
+        # Server worker processes sharing these files (uvicorn's own
+        # setting). The first to start is the primary and holds this lock
+        # file until shutdown; see init_db.
+        self.worker_count = max(1, int(os.getenv("WEB_CONCURRENCY") or "1"))
+        self._primary_lock = None
 
         # Check if storage is configured
         required_vars = [
@@ -64,394 +1139,812 @@ class DatabaseManager:
             'DO_SPACES_SECRET_KEY',
             'DO_STORAGE_CONTAINER'
         ]
-        self.storage_enabled = all(os.getenv(var) for var in required_vars)
+        local_replica_dir = os.getenv("DB_REPLICA_LOCAL_DIR")
+        self.storage_enabled = all(os.getenv(var) for var in required_vars) or bool(local_replica_dir)
 
         if self.storage_enabled:
-            self.s3 = boto3.client('s3',
-                endpoint_url=os.getenv('DO_STORAGE_SERVER'),
-                aws_access_key_id=os.getenv('DO_SPACES_ACCESS_KEY'),
-                aws_secret_access_key=os.getenv('DO_SPACES_SECRET_KEY')
+            if local_replica_dir:
+                # A directory standing in for the bucket, for development.
+                self.s3 = LocalObjectStore(local_replica_dir)
+                self.bucket = "local"
+            else:
+                self.s3 = boto3.client('s3',
+                    endpoint_url=os.getenv('DO_STORAGE_SERVER'),
+                    aws_access_key_id=os.getenv('DO_SPACES_ACCESS_KEY'),
+                    aws_secret_access_key=os.getenv('DO_SPACES_SECRET_KEY')
+                )
+                self.bucket = os.getenv('DO_STORAGE_CONTAINER')
+            # Started by init_db, once the local files have been restored.
+            prefix = os.getenv("DB_REPLICA_PREFIX", "replica")
+            replica_options = dict(
+                sync_interval=float(os.getenv("DB_REPLICA_SYNC_SECONDS", "1")),
+                snapshot_interval=timedelta(hours=float(os.getenv("DB_REPLICA_SNAPSHOT_HOURS", "6"))),
+                checkpoint_bytes=int(os.getenv("DB_REPLICA_CHECKPOINT_BYTES", str(4 * 1024 * 1024))),
+                retain_generations=int(os.getenv("DB_REPLICA_RETAIN_GENERATIONS", "2")),
+                snapshot_pages_per_step=int(os.getenv("DB_SNAPSHOT_PAGES_PER_STEP", "1024")),
             )
-            self.bucket = os.getenv('DO_STORAGE_CONTAINER')
-            logging.info(f"Storage backend enabled - upload frequency: {upload_frequency_minutes} minutes")
-
-            # Start background upload thread
-            self._start_background_upload_thread()
+            self.replicator = WalReplicator(self, self.s3, self.bucket, prefix=prefix, **replica_options)
+            self.accounts_replicator = WalReplicator(
+                self, self.s3, self.bucket, prefix=f"{prefix}/accounts", database="accounts",
+                **replica_options,
+            )
+            logging.info("Storage backend enabled - replicating the WAL continuously")
         else:
             self.s3 = None
             self.bucket = None
+            self.replicator = None
+            self.accounts_replicator = None
             logging.info("Storage backend disabled - using local storage only")
 
-    def _start_background_upload_thread(self):
-        """Start the background thread for periodic uploads"""
-        if self.background_upload_thread is None or not self.background_upload_thread.is_alive():
-            self.background_upload_thread = Thread(target=self._background_upload_worker, daemon=True)
-            self.background_upload_thread.start()
-            logging.info("Background upload thread started")
-
-    def _background_upload_worker(self):
-        """Background worker that handles periodic uploads"""
-        while not self.shutdown_flag:
-            try:
-                time.sleep(30)  # Check every 30 seconds
-
-                with self.upload_lock:
-                    if not self.pending_upload:
-                        continue
-
-                    # Check if enough time has passed since last upload
-                    now = datetime.now()
-                    if (self.last_upload_time is None or
-                        now - self.last_upload_time >= timedelta(minutes=self.upload_frequency_minutes)):
-
-                        self._upload_db_to_storage_sync()
-                        self.pending_upload = False
-                        self.last_upload_time = now
-                        logging.info("Background upload completed")
+        # Awaitable counterpart for code running on the event loop.
+        self.aio = AsyncDatabaseManager(
+            self,
+            max_workers=int(os.getenv("DB_EXECUTOR_WORKERS", "4")),
+        )
 
-            except Exception as e:
-                logging.error(f"Error in background upload worker: {e}")
+    @property
+    def accounts_db_path(self) -> str:
+        """The file holding ACCOUNT_TABLES: by default db_path with `-accounts` added."""
+        if self._accounts_db_path:
+            return self._accounts_db_path
+        root, extension = os.path.splitext(self.db_path)
+        return f"{root}-accounts{extension}"
 
-    def _schedule_upload(self):
-        """Schedule an upload to happen in the background"""
-        if not self.storage_enabled:
-            return
+    @accounts_db_path.setter
+    def accounts_db_path(self, path: Optional[str]) -> None:
+        self._accounts_db_path = path
 
-        with self.upload_lock:
-            self.pending_upload = True
+    def database_path(self, database: str = "worlds") -> str:
+        return self.accounts_db_path if database == "accounts" else self.db_path
 
-        # Ensure background thread is running
-        if self.background_upload_thread is None or not self.background_upload_thread.is_alive():
-            self._start_background_upload_thread()
+    def _replicators(self) -> List[WalReplicator]:
+        return [r for r in (self.replicator, self.accounts_replicator) if r is not None]
 
-    def _upload_db_to_storage_sync(self):
-        """Synchronous version of upload for background thread"""
-        if not self.storage_enabled:
-            return
-
-        try:
-            self.s3.upload_file(
-                Filename=self.db_path,
-                Bucket=self.bucket,
-                Key='rllm_game_data.db'
-            )
-            logging.info("Uploaded DB to storage (background)")
-        except Exception as e:
-            logging.error(f"Failed to upload DB to storage (background): {e}")
+    def _note_commit(self, stale_worlds=()):
+        if stale_worlds:
+            self.world_cache.invalidate(stale_worlds)
+        for replicator in self._replicators():
+            replicator.notify()
 
     def force_upload_now(self):
-        """Force an immediate upload (for shutdown or critical operations)"""
-        if not self.storage_enabled:
-            return
-
-        with self.upload_lock:
-            self._upload_db_to_storage_sync()
-            self.pending_upload = False
-            self.last_upload_time = datetime.now()
-            logging.info("Forced immediate upload completed")
+        """Ship every committed transaction to storage before returning."""
+        for replicator in self._replicators():
+            if replicator.started:
+                replicator.sync()
 
     def shutdown(self):
         """Gracefully shutdown the database manager"""
-        self.shutdown_flag = True
-
-        # Force final upload if there are pending changes
-        if self.pending_upload:
-            logging.info("Performing final upload before shutdown...")
-            self.force_upload_now()
+        # A backfill batch in flight finishes; the rest resumes on next start.
+        self._backfill_stop.set()
+        if self._backfill_thread is not None:
+            self._backfill_thread.join()
+        # Likewise a maintenance batch; waits for it rather than closing under it.
+        self._maintenance_stop.set()
+        with self._maintenance_lock:
+            pass
+        # Before the final replication pass, so queued writes are shipped.
+        self.play_starts.close()
+        for replicator in self._replicators():
+            if replicator.stop():
+                try:
+                    # Publishes a first snapshot too, if none was taken yet.
+                    replicator.sync()
+                except Exception as e:
+                    logging.error(f"Final WAL replication pass failed: {e}")
+
+        self.aio.shutdown()
+        # With replication on, closing the pool ships the last WAL frames.
+        self._close_pool()
+        self._release_primary()
+
+    def restore_db_from_storage(self):
+        """Rebuild the local databases from their replicas, if storage is enabled.
+
+        Falls back to the single-file copy written before WAL replication,
+        so the first start after upgrading still finds its data. An accounts
+        file with no replica yet is left as it is: before the split its
+        tables were in the World file, and migration 9 moves them out of
+        whatever was restored. Returns whether replication is safe to start.
+        """
+        if not self.storage_enabled:
+            return False
 
-        # Wait for background thread to finish
-        if self.background_upload_thread and self.background_upload_thread.is_alive():
-            self.background_upload_thread.join(timeout=10)
-            logging.info("Background upload thread stopped")
+        # Open connections and the local WAL belong to the file being
+        # replaced, and must not be replayed over the restored copy.
+        self._close_pool()
+        try:
+            restored = self.replicator.restore(self.db_path)
+            try:
+                accounts_restored = self.accounts_replicator.restore(self.accounts_db_path)
+            except ReplicaNotFound:
+                accounts_restored = None
+        except ReplicaNotFound:
+            restored = None
+            accounts_restored = None
+        except Exception as e:
+            logging.error(f"Could not restore DB from storage, not replicating: {e}")
+            return False
 
-    def download_db_from_storage(self):
-        """Downloads DB from DO Spaces if storage is enabled"""
-        if not self.storage_enabled:
-            return
+        self._remove_wal_files()
+        if accounts_restored is not None:
+            self.accounts_replicator.adopt(accounts_restored)
+        if restored is not None:
+            self.replicator.adopt(restored)
+            return True
 
         try:
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
             self.s3.download_file(
                 Bucket=self.bucket,
-                Key='rllm_game_data.db',
+                Key=LEGACY_DB_KEY,
                 Filename=self.db_path
             )
-            logging.info("Downloaded DB from storage")
+            logging.info("Downloaded legacy DB copy from storage")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in {"NoSuchKey", "404", "NotFound"}:
+                logging.error(f"Could not download DB from storage, not replicating: {e}")
+                return False
+            logging.info("No DB in storage yet; replicating from a fresh database")
         except Exception as e:
-            logging.warning(f"Could not download DB from storage: {e}")
-
-    def upload_db_to_storage(self):
-        """Uploads DB to DO Spaces if storage is enabled"""
-        if not self.storage_enabled:
-            return
+            logging.error(f"Could not download DB from storage, not replicating: {e}")
+            return False
+        return True
+
+    @property
+    def is_primary(self) -> bool:
+        """Whether this process restores, replicates and backfills the files."""
+        return self._primary_lock is not None
+
+    def _claim_primary(self) -> bool:
+        if self._primary_lock is None:
+            handle = open(f"{self.db_path}.primary.lock", "a")
+            if fcntl is not None:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    handle.close()
+                    return False
+            self._primary_lock = handle
+        return True
+
+    def _release_primary(self):
+        if self._primary_lock is not None:
+            # Closing the file drops the lock.
+            self._primary_lock.close()
+            self._primary_lock = None
 
-        try:
-            self.s3.upload_file(
-                Filename=self.db_path,
-                Bucket=self.bucket,
-                Key='rllm_game_data.db'
-            )
-            logging.info("Uploaded DB to storage")
-        except Exception as e:
-            logging.error(f"Failed to upload DB to storage: {e}")
+    @contextmanager
+    def _startup_lock(self):
+        """Workers started together restore and migrate one at a time."""
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with open(f"{self.db_path}.startup.lock", "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            yield
 
     def init_db(self):
-        """Initialize database and load from remote storage if available"""
-        self.download_db_from_storage()
-        with self.get_connection() as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS generators (
-                    id TEXT PRIMARY KEY,
-                    theme_desc TEXT,
-                    theme_desc_better TEXT,
-                    language TEXT,
-                    player_defs TEXT,
-                    item_defs TEXT,
-                    enemy_defs TEXT,
-                    celltype_defs TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    owner_id TEXT NULL,
-                    visibility TEXT NOT NULL DEFAULT 'unlisted'
-                        CHECK (visibility IN ('private', 'unlisted', 'public')),
-                    moderation_status TEXT NOT NULL DEFAULT 'not_requested'
-                        CHECK (moderation_status IN (
-                            'not_requested',
-                            'pending',
-                            'approved',
-                            'rejected',
-                            'needs_human_review',
-                            'error'
-                        )),
-                    moderation_reason TEXT NULL,
-                    moderation_model TEXT NULL,
-                    moderation_confidence REAL NULL,
-                    moderation_categories TEXT NULL,
-                    public_requested_at TIMESTAMP NULL,
-                    public_review_after TIMESTAMP NULL,
-                    public_reviewed_at TIMESTAMP NULL,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS generator_worlds (
-                    generator_id TEXT PRIMARY KEY,
-                    snapshot_version INTEGER NOT NULL DEFAULT 1,
-                    language TEXT,
-                    map_csv TEXT,
-                    entity_placements TEXT,
-                    tile_info TEXT,
-                    regions TEXT,
-                    visual_manifest TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE
+        """Initialize database and load from remote storage if available
+
+        Of several worker processes on the same files, only the first to
+        start (the primary) restores them from storage, replicates them and
+        runs backfills; the others wait for it to finish starting, then
+        open the files it left.
+        """
+        with self._startup_lock():
+            self._claim_primary()
+            self._init_db()
+        # Migrations may rewrite generator rows without marking them.
+        self.world_cache.clear()
+        self._maintenance_stop.clear()
+        if self.is_primary:
+            self.start_backfills()
+
+    def _init_db(self):
+        if self.is_primary and self.replicator is not None and not self.replicator.started:
+            if self.restore_db_from_storage():
+                # Commits from the other workers do not notify this one.
+                for replicator in self._replicators():
+                    replicator.watch_external_writes = self.worker_count > 1
+                # Before any schema writes, so those are shipped as well.
+                self.replicator.start()
+                self.accounts_replicator.start()
+        # The World file's user_version counts the steps for both files; the
+        # accounts file's counts those of ACCOUNT_MIGRATIONS it has committed.
+        with self._joined_connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            accounts_version = conn.execute("PRAGMA accounts.user_version").fetchone()[0]
+            if self._pending_migrations(version, accounts_version):
+                self._migrate(conn, version, accounts_version)
+            if version > len(self.MIGRATIONS):
+                logging.warning(
+                    f"Database schema version {version} is newer than this code "
+                    f"({len(self.MIGRATIONS)}); opening it anyway"
                 )
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS generator_translations (
-                    generator_id TEXT NOT NULL,
-                    language TEXT NOT NULL,
-                    theme_desc_better TEXT,
-                    player_defs TEXT,
-                    item_defs TEXT,
-                    enemy_defs TEXT,
-                    celltype_defs TEXT,
-                    translation_version INTEGER DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    PRIMARY KEY (generator_id, language),
-                    FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE
+            if not conn.execute(
+                "SELECT 1 FROM accounts.sqlite_master WHERE name = 'users'"
+            ).fetchone():
+                # Starting over with no accounts would lose them for good.
+                raise RuntimeError(
+                    f"{self.db_path} has moved its accounts out, but "
+                    f"{self.accounts_db_path} does not have them; restore both files together"
                 )
-            """)
-            self._ensure_column(
-                conn,
-                "generator_worlds",
-                "visual_manifest",
-                "TEXT",
+            self._schema = SchemaCapabilities.read(conn)
+
+    def _pending_migrations(self, version: int, accounts_version: int):
+        """The (number, name) steps still to apply to either file, in order."""
+        return [
+            (number, name)
+            for number, name in enumerate(self.MIGRATIONS, start=1)
+            if number > version
+            or (name in self.ACCOUNT_MIGRATIONS and number > accounts_version)
+        ]
+
+    def _migrate(self, conn, version: int, accounts_version: int):
+        """Apply the migrations either file is missing, each in its own transaction.
+
+        `PRAGMA user_version` is stored in the database header and moves in
+        the same transaction as the step it records, so a crash mid-way
+        resumes at the step that did not commit. An accounts step the World
+        file already counts is only run again, leaving its version alone.
+        """
+        started = time.perf_counter()
+        steps = self._pending_migrations(version, accounts_version)
+        for number, name in steps:
+            conn.execute("BEGIN IMMEDIATE")
+            getattr(self, name)(conn)
+            if name in self.ACCOUNT_MIGRATIONS:
+                conn.execute(f"PRAGMA accounts.user_version = {number}")
+            if number > version:
+                conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        logging.info(
+            f"Migrated database schema from version {version} to "
+            f"{max(version, len(self.MIGRATIONS))}, running {len(steps)} steps "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+
+    def _migration_1_worlds(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_backfills (
+                name TEXT PRIMARY KEY,
+                last_rowid INTEGER NOT NULL DEFAULT 0,
+                completed_at TIMESTAMP NULL
             )
-            self._ensure_column(
-                conn,
-                "generator_translations",
-                "translation_version",
-                "INTEGER DEFAULT 1"
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS generators (
+                id TEXT PRIMARY KEY,
+                theme_desc TEXT,
+                theme_desc_better TEXT,
+                language TEXT,
+                player_defs TEXT,
+                item_defs TEXT,
+                enemy_defs TEXT,
+                celltype_defs TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                owner_id TEXT NULL,
+                visibility TEXT NOT NULL DEFAULT 'unlisted'
+                    CHECK (visibility IN ('private', 'unlisted', 'public')),
+                moderation_status TEXT NOT NULL DEFAULT 'not_requested'
+                    CHECK (moderation_status IN (
+                        'not_requested',
+                        'pending',
+                        'approved',
+                        'rejected',
+                        'needs_human_review',
+                        'error'
+                    )),
+                moderation_reason TEXT NULL,
+                moderation_model TEXT NULL,
+                moderation_confidence REAL NULL,
+                moderation_categories TEXT NULL,
+                public_requested_at TIMESTAMP NULL,
+                public_review_after TIMESTAMP NULL,
+                public_reviewed_at TIMESTAMP NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-            self._ensure_column(conn, "generators", "owner_id", "TEXT NULL")
-            self._ensure_column(conn, "generators", "visibility", "TEXT NOT NULL DEFAULT 'unlisted'")
-            self._ensure_column(conn, "generators", "moderation_status", "TEXT NOT NULL DEFAULT 'not_requested'")
-            self._ensure_column(conn, "generators", "moderation_reason", "TEXT NULL")
-            self._ensure_column(conn, "generators", "moderation_model", "TEXT NULL")
-            self._ensure_column(conn, "generators", "moderation_confidence", "REAL NULL")
-            self._ensure_column(conn, "generators", "moderation_categories", "TEXT NULL")
-            self._ensure_column(conn, "generators", "public_requested_at", "TIMESTAMP NULL")
-            self._ensure_column(conn, "generators", "public_review_after", "TIMESTAMP NULL")
-            self._ensure_column(conn, "generators", "public_reviewed_at", "TIMESTAMP NULL")
-            self._ensure_column(conn, "generators", "updated_at", "TIMESTAMP")
-            # Databases predating area crossings have the snapshot but not this.
-            # Adding it nullable avoids invalidating every existing snapshot;
-            # a world without regions regenerates just its crossings.
-            self._ensure_column(conn, "generator_worlds", "regions", "TEXT NULL")
-            self._backfill_generator_ownership_shape(conn)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id TEXT PRIMARY KEY,
-                    username TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    password_reset_required INTEGER NOT NULL DEFAULT 0,
-                    password_reset_marked_at TIMESTAMP NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            self._ensure_column(conn, "users", "password_reset_required", "INTEGER NOT NULL DEFAULT 0")
-            self._ensure_column(conn, "users", "password_reset_marked_at", "TIMESTAMP NULL")
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS auth_identities (
-                    id TEXT PRIMARY KEY,
-                    user_id TEXT NOT NULL,
-                    issuer TEXT NOT NULL,
-                    subject TEXT NOT NULL,
-                    provider TEXT NOT NULL CHECK (provider IN ('apple', 'google')),
-                    email TEXT NULL,
-                    display_name TEXT NULL,
-                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    last_login_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE (issuer, subject),
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_auth_identities_user
-                ON auth_identities(user_id)
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS mobile_auth_sessions (
-                    id TEXT PRIMARY KEY,
-                    user_id TEXT NOT NULL,
-                    access_token_hash TEXT UNIQUE NOT NULL,
-                    refresh_token_hash TEXT UNIQUE NOT NULL,
-                    access_expires_at INTEGER NOT NULL,
-                    refresh_expires_at INTEGER NOT NULL,
-                    platform TEXT NULL,
-                    device_name TEXT NULL,
-                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    revoked_at TIMESTAMP NULL,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_mobile_auth_sessions_user
-                ON mobile_auth_sessions(user_id, refresh_expires_at)
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS credit_ledger (
-                    id TEXT PRIMARY KEY,
-                    operation_key TEXT NOT NULL,
-                    user_id TEXT NOT NULL,
-                    bucket TEXT NOT NULL CHECK (bucket IN ('promo', 'paid')),
-                    amount INTEGER NOT NULL CHECK (amount != 0),
-                    kind TEXT NOT NULL,
-                    reference_type TEXT NULL,
-                    reference_id TEXT NULL,
-                    metadata TEXT NULL,
-                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE (operation_key, bucket),
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_credit_ledger_user_created
-                ON credit_ledger(user_id, created_at)
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS store_purchases (
-                    id TEXT PRIMARY KEY,
-                    provider TEXT NOT NULL CHECK (provider IN ('apple', 'google')),
-                    external_transaction_id TEXT NOT NULL,
-                    user_id TEXT NOT NULL,
-                    product_id TEXT NOT NULL,
-                    credits INTEGER NOT NULL CHECK (credits > 0),
-                    environment TEXT NOT NULL,
-                    provider_metadata TEXT NULL,
-                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE (provider, external_transaction_id),
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_store_purchases_user_created
-                ON store_purchases(user_id, created_at)
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS world_metrics (
-                    generator_id TEXT PRIMARY KEY,
-                    play_count INTEGER NOT NULL DEFAULT 0,
-                    completion_count INTEGER NOT NULL DEFAULT 0,
-                    unique_completer_count INTEGER NOT NULL DEFAULT 0,
-                    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE
-                )
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS world_play_sessions (
-                    session_id TEXT PRIMARY KEY,
-                    generator_id TEXT NOT NULL,
-                    user_id TEXT NULL,
-                    started_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    completed_at TIMESTAMP NULL,
-                    FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
-                )
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_world_play_sessions_generator
-                ON world_play_sessions(generator_id, started_at)
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS world_player_completions (
-                    user_id TEXT NOT NULL,
-                    generator_id TEXT NOT NULL,
-                    first_session_id TEXT NOT NULL,
-                    qualifies_for_popularity INTEGER NOT NULL DEFAULT 1,
-                    completed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    PRIMARY KEY (user_id, generator_id),
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                    FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE
-                )
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS world_art_reroll_attempts (
-                    id TEXT PRIMARY KEY,
-                    generator_id TEXT NOT NULL,
-                    user_id TEXT NOT NULL,
-                    status TEXT NOT NULL CHECK (
-                        status IN ('reserved', 'succeeded', 'failed')
-                    ),
-                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    finished_at TIMESTAMP NULL,
-                    FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_world_art_rerolls_world_user
-                ON world_art_reroll_attempts(generator_id, user_id, status)
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS world_moderation_reviews (
-                    id TEXT PRIMARY KEY,
-                    generator_id TEXT NOT NULL,
-                    requested_by_owner_id TEXT NULL,
-                    model_name TEXT NOT NULL,
-                    decision TEXT NOT NULL,
-                    confidence REAL NULL,
-                    categories TEXT NULL,
-                    public_reason TEXT NULL,
-                    internal_notes TEXT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE
-                )
-            """)
-            conn.commit()
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS generator_worlds (
+                generator_id TEXT PRIMARY KEY,
+                snapshot_version INTEGER NOT NULL DEFAULT 1,
+                language TEXT,
+                map_csv TEXT,
+                entity_placements TEXT,
+                tile_info TEXT,
+                regions TEXT,
+                visual_manifest TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS generator_translations (
+                generator_id TEXT NOT NULL,
+                language TEXT NOT NULL,
+                theme_desc_better TEXT,
+                player_defs TEXT,
+                item_defs TEXT,
+                enemy_defs TEXT,
+                celltype_defs TEXT,
+                translation_version INTEGER DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (generator_id, language),
+                FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE
+            )
+        """)
+        self._ensure_column(
+            conn,
+            "generator_worlds",
+            "visual_manifest",
+            "TEXT",
+        )
+        self._ensure_column(
+            conn,
+            "generator_translations",
+            "translation_version",
+            "INTEGER DEFAULT 1"
+        )
+        self._ensure_column(conn, "generators", "owner_id", "TEXT NULL")
+        self._ensure_column(conn, "generators", "visibility", "TEXT NOT NULL DEFAULT 'unlisted'")
+        self._ensure_column(conn, "generators", "moderation_status", "TEXT NOT NULL DEFAULT 'not_requested'")
+        self._ensure_column(conn, "generators", "moderation_reason", "TEXT NULL")
+        self._ensure_column(conn, "generators", "moderation_model", "TEXT NULL")
+        self._ensure_column(conn, "generators", "moderation_confidence", "REAL NULL")
+        self._ensure_column(conn, "generators", "moderation_categories", "TEXT NULL")
+        self._ensure_column(conn, "generators", "public_requested_at", "TIMESTAMP NULL")
+        self._ensure_column(conn, "generators", "public_review_after", "TIMESTAMP NULL")
+        self._ensure_column(conn, "generators", "public_reviewed_at", "TIMESTAMP NULL")
+        self._ensure_column(conn, "generators", "updated_at", "TIMESTAMP")
+        # Databases predating area crossings have the snapshot but not this.
+        # Adding it nullable avoids invalidating every existing snapshot;
+        # a world without regions regenerates just its crossings.
+        self._ensure_column(conn, "generator_worlds", "regions", "TEXT NULL")
+        self._schedule_backfill(conn, "generator_ownership_shape")
+
+    def _migration_2_accounts(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id TEXT PRIMARY KEY,
+                username TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                password_reset_required INTEGER NOT NULL DEFAULT 0,
+                password_reset_marked_at TIMESTAMP NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self._ensure_column(conn, "users", "password_reset_required", "INTEGER NOT NULL DEFAULT 0")
+        self._ensure_column(conn, "users", "password_reset_marked_at", "TIMESTAMP NULL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS auth_identities (
+                id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                issuer TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                provider TEXT NOT NULL CHECK (provider IN ('apple', 'google')),
+                email TEXT NULL,
+                display_name TEXT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                last_login_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (issuer, subject),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_auth_identities_user
+            ON auth_identities(user_id)
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS mobile_auth_sessions (
+                id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                access_token_hash TEXT UNIQUE NOT NULL,
+                refresh_token_hash TEXT UNIQUE NOT NULL,
+                access_expires_at INTEGER NOT NULL,
+                refresh_expires_at INTEGER NOT NULL,
+                platform TEXT NULL,
+                device_name TEXT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                revoked_at TIMESTAMP NULL,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_mobile_auth_sessions_user
+            ON mobile_auth_sessions(user_id, refresh_expires_at)
+        """)
+
+    def _migration_3_credits(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS credit_ledger (
+                id TEXT PRIMARY KEY,
+                operation_key TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                bucket TEXT NOT NULL CHECK (bucket IN ('promo', 'paid')),
+                amount INTEGER NOT NULL CHECK (amount != 0),
+                kind TEXT NOT NULL,
+                reference_type TEXT NULL,
+                reference_id TEXT NULL,
+                metadata TEXT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (operation_key, bucket),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_credit_ledger_user_created
+            ON credit_ledger(user_id, created_at)
+        """)
+        # Running totals of credit_ledger per user, moved in the same
+        # transaction as each ledger entry. The ledger stays the source of
+        # truth; tools/reconcile_credit_balances.py checks the two agree.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS credit_balances (
+                user_id TEXT PRIMARY KEY,
+                promo INTEGER NOT NULL DEFAULT 0,
+                paid INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS store_purchases (
+                id TEXT PRIMARY KEY,
+                provider TEXT NOT NULL CHECK (provider IN ('apple', 'google')),
+                external_transaction_id TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                product_id TEXT NOT NULL,
+                credits INTEGER NOT NULL CHECK (credits > 0),
+                environment TEXT NOT NULL,
+                provider_metadata TEXT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (provider, external_transaction_id),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_store_purchases_user_created
+            ON store_purchases(user_id, created_at)
+        """)
+
+    def _migration_4_world_activity(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS world_metrics (
+                generator_id TEXT PRIMARY KEY,
+                play_count INTEGER NOT NULL DEFAULT 0,
+                completion_count INTEGER NOT NULL DEFAULT 0,
+                unique_completer_count INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS world_play_sessions (
+                session_id TEXT PRIMARY KEY,
+                generator_id TEXT NOT NULL,
+                user_id TEXT NULL,
+                started_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP NULL,
+                FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_world_play_sessions_generator
+            ON world_play_sessions(generator_id, started_at)
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS world_player_completions (
+                user_id TEXT NOT NULL,
+                generator_id TEXT NOT NULL,
+                first_session_id TEXT NOT NULL,
+                qualifies_for_popularity INTEGER NOT NULL DEFAULT 1,
+                completed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (user_id, generator_id),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+                FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS world_art_reroll_attempts (
+                id TEXT PRIMARY KEY,
+                generator_id TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                status TEXT NOT NULL CHECK (
+                    status IN ('reserved', 'succeeded', 'failed')
+                ),
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP NULL,
+                FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_world_art_rerolls_world_user
+            ON world_art_reroll_attempts(generator_id, user_id, status)
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS world_moderation_reviews (
+                id TEXT PRIMARY KEY,
+                generator_id TEXT NOT NULL,
+                requested_by_owner_id TEXT NULL,
+                model_name TEXT NOT NULL,
+                decision TEXT NOT NULL,
+                confidence REAL NULL,
+                categories TEXT NULL,
+                public_reason TEXT NULL,
+                internal_notes TEXT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE
+            )
+        """)
+
+    def _migration_5_world_summaries(self, conn):
+        # One narrow row per World holding exactly what the gallery shows,
+        # so listings never read or decode the definition blobs. Kept in
+        # step by _refresh_world_summary in every writer that changes them.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS world_summaries (
+                generator_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                theme TEXT NOT NULL DEFAULT '',
+                language TEXT NULL,
+                player_count INTEGER NOT NULL DEFAULT 0,
+                item_count INTEGER NOT NULL DEFAULT 0,
+                enemy_count INTEGER NOT NULL DEFAULT 0,
+                terrain_count INTEGER NOT NULL DEFAULT 0,
+                cover_url TEXT NULL,
+                owner_id TEXT NULL,
+                visibility TEXT NOT NULL,
+                moderation_status TEXT NOT NULL DEFAULT 'not_requested',
+                moderation_reason TEXT NULL,
+                moderation_model TEXT NULL,
+                moderation_confidence REAL NULL,
+                moderation_categories TEXT NULL,
+                public_requested_at TIMESTAMP NULL,
+                public_review_after TIMESTAMP NULL,
+                public_reviewed_at TIMESTAMP NULL,
+                created_at TIMESTAMP NULL,
+                updated_at TIMESTAMP NULL,
+                sort_key TEXT NOT NULL DEFAULT '',
+                FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_world_summaries_visibility_sort
+            ON world_summaries(visibility, sort_key, generator_id)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_world_summaries_owner_sort
+            ON world_summaries(owner_id, sort_key, generator_id)
+        """)
+        self._schedule_backfill(conn, "world_summaries")
+
+    def _migration_6_world_search(self, conn):
+        # FTS5 rowids follow doc_id, which unlike the implicit rowid of
+        # generators survives VACUUM.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS world_search_docs (
+                doc_id INTEGER PRIMARY KEY,
+                generator_id TEXT UNIQUE NOT NULL,
+                FOREIGN KEY (generator_id) REFERENCES generators(id) ON DELETE CASCADE
+            )
+        """)
+        for table, tokenizer in self.WORLD_SEARCH_TABLES.items():
+            create = f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(title, theme, tokenize = '{{}}')"
+            try:
+                conn.execute(create.format(tokenizer))
+            except sqlite3.OperationalError as e:
+                if "no such module" in str(e):
+                    logging.warning("This SQLite build has no FTS5; World search is disabled")
+                    return
+                # trigram arrived in SQLite 3.34.
+                conn.execute(create.format(self.WORLD_SEARCH_TABLES["world_search"]))
+        deletes = " ".join(
+            f"DELETE FROM {table} WHERE rowid = old.doc_id;" for table in self.WORLD_SEARCH_TABLES
+        )
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS world_search_docs_delete
+            AFTER DELETE ON world_search_docs
+            BEGIN {deletes} END
+        """)
+        self._schedule_backfill(conn, "world_search")
+
+    def _migration_7_hot_query_indexes(self, conn):
+        # tests/test_query_plans.py holds the queries these serve to them.
+        # The review queue: pending Worlds by when their review falls due.
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_generators_review_due
+            ON generators(moderation_status, public_review_after)
+        """)
+        # A creator's Worlds, counted by visibility without reading the rows.
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_generators_owner_visibility
+            ON generators(owner_id, visibility)
+        """)
+        # The admin user list's order and case-insensitive username lookups.
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_users_username_lower
+            ON users(LOWER(username))
+        """)
+        # Per-kind ledger checks such as the daily reward cap.
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_credit_ledger_user_kind_created
+            ON credit_ledger(user_id, kind, created_at)
+        """)
+
+    def _migration_8_retention_indexes(self, conn):
+        # What run_maintenance prunes by, so each batch seeks to old rows.
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_world_play_sessions_started
+            ON world_play_sessions(started_at)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_mobile_auth_sessions_refresh_expiry
+            ON mobile_auth_sessions(refresh_expires_at)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_mobile_auth_sessions_revoked
+            ON mobile_auth_sessions(revoked_at)
+            WHERE revoked_at IS NOT NULL
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_world_art_rerolls_status_created
+            ON world_art_reroll_attempts(status, created_at)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_world_moderation_reviews_world
+            ON world_moderation_reviews(generator_id, created_at)
+        """)
+
+    def _migration_9_accounts_file(self, conn):
+        # Runs on the joined connection, with the accounts file attached as
+        # `accounts`. WAL commits across two files are not atomic, so the
+        # copies commit first and the originals are dropped after: a crash in
+        # between leaves both, and this step, run again, finishes the move.
+        moving = [
+            table for table in self.ACCOUNT_TABLES
+            if conn.execute(
+                "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+        ]
+        for table in moving:
+            self._copy_table_to_accounts(conn, table)
+        conn.commit()
+        if self.accounts_replicator is not None and self.accounts_replicator.started:
+            # Published before the drop can reach the World replica.
+            self.accounts_replicator.snapshot()
+        conn.execute("BEGIN IMMEDIATE")
+        for table in moving:
+            conn.execute(f'DROP TABLE main."{table}"')
+
+    def _migration_10_game_sessions(self, conn):
+        # Runs had only ever lived in process memory. A row here is a run
+        # evicted while idle, or saved at shutdown, until it is resumed.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS accounts.game_sessions (
+                session_id TEXT PRIMARY KEY,
+                user_id TEXT NULL,
+                generator_id TEXT NULL,
+                state BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL,
+                hibernated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS accounts.idx_game_sessions_last_accessed
+            ON game_sessions(last_accessed)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS accounts.idx_game_sessions_user
+            ON game_sessions(user_id)
+        """)
+
+    def _migration_11_session_directory(self, conn):
+        # State shared by the server's worker processes: which one holds each
+        # live run, which are alive, who runs the singleton background jobs,
+        # and the rate limiters' attempts.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS accounts.session_directory (
+                session_id TEXT PRIMARY KEY,
+                worker_id TEXT NULL,
+                status TEXT NOT NULL,
+                user_id TEXT NULL,
+                generator_id TEXT NULL,
+                session TEXT NULL,
+                handoff_requested_at REAL NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS accounts.idx_session_directory_worker
+            ON session_directory(worker_id, handoff_requested_at)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS accounts.idx_session_directory_updated
+            ON session_directory(updated_at)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS accounts.idx_session_directory_user
+            ON session_directory(user_id)
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS accounts.session_workers (
+                worker_id TEXT PRIMARY KEY,
+                heartbeat_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS accounts.task_leases (
+                name TEXT PRIMARY KEY,
+                worker_id TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS accounts.rate_limit_attempts (
+                key TEXT NOT NULL,
+                attempted_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS accounts.idx_rate_limit_attempts_key
+            ON rate_limit_attempts(key, attempted_at)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS accounts.idx_rate_limit_attempts_time
+            ON rate_limit_attempts(attempted_at)
+        """)
+
+    def _migration_12_forge_jobs(self, conn):
+        # One row per World forge, run in the background apart from the
+        # WebSocket watching it: who holds it, how it ended, and the progress
+        # events so far, for a socket that attaches late to replay.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS accounts.forge_jobs (
+                session_id TEXT PRIMARY KEY,
+                worker_id TEXT NOT NULL,
+                user_id TEXT NULL,
+                status TEXT NOT NULL,
+                events TEXT NOT NULL DEFAULT '[]',
+                cancel_requested_at REAL NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS accounts.idx_forge_jobs_updated
+            ON forge_jobs(updated_at)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS accounts.idx_forge_jobs_user
+            ON forge_jobs(user_id)
+        """)
+
+    CREATE_STATEMENT = re.compile(r"^CREATE (UNIQUE )?(TABLE|INDEX) ", re.IGNORECASE)
+
+    def _copy_table_to_accounts(self, conn, table: str) -> None:
+        """Recreate `table` and its indexes in the accounts file, then copy its rows."""
+        statements = conn.execute("""
+            SELECT sql FROM main.sqlite_master
+            WHERE tbl_name = ? AND type IN ('table', 'index') AND sql IS NOT NULL
+            ORDER BY type = 'index'
+        """, (table,)).fetchall()
+        for (sql,) in statements:
+            conn.execute(self.CREATE_STATEMENT.sub(
+                lambda match: f"{match.group(0)}IF NOT EXISTS accounts.", sql, count=1
+            ))
+        columns = ", ".join(
+            f'"{row[1]}"' for row in conn.execute(f'PRAGMA main.table_info("{table}")')
+        )
+        conn.execute(
+            f'INSERT OR IGNORE INTO accounts."{table}" ({columns}) '
+            f'SELECT {columns} FROM main."{table}"'
+        )
 
     def _ensure_column(self, conn, table_name: str, column_name: str, column_definition: str):
         cur = conn.cursor()
@@ -460,39 +1953,134 @@ class DatabaseManager:
         if column_name not in columns:
             conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_definition}")
 
-    def _backfill_generator_ownership_shape(self, conn):
-        """Normalize newly added world ownership columns on existing databases."""
-        cur = conn.cursor()
-        cur.execute("PRAGMA table_info(generators)")
-        columns = {row[1] for row in cur.fetchall()}
+    def _schedule_backfill(self, conn, name: str, always: bool = False):
+        """Queue a backfill to run after startup, from the first row.
 
-        if "visibility" in columns:
-            conn.execute("""
-                UPDATE generators
-                SET visibility = 'unlisted'
-                WHERE visibility IS NULL
-                   OR visibility NOT IN ('private', 'unlisted', 'public')
-            """)
+        A migration on a database with no Worlds has nothing to backfill.
+        """
+        if not always and conn.execute("SELECT 1 FROM generators LIMIT 1").fetchone() is None:
+            return
+        conn.execute("""
+            INSERT INTO schema_backfills (name) VALUES (?)
+            ON CONFLICT(name) DO UPDATE SET last_rowid = 0, completed_at = NULL
+        """, (name,))
+
+    def start_backfills(self):
+        """Run pending backfills on a background thread, if any are left."""
+        thread = self._backfill_thread
+        if thread is not None and thread.is_alive():
+            return
+        self._backfill_stop.clear()
+        self._backfill_thread = Thread(
+            target=self._run_backfills_in_background, name="db-backfills", daemon=True
+        )
+        self._backfill_thread.start()
 
-        if "updated_at" in columns:
-            if "created_at" in columns:
-                conn.execute("""
-                    UPDATE generators
-                    SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)
-                    WHERE updated_at IS NULL
-                """)
-            else:
-                conn.execute("""
-                    UPDATE generators
-                    SET updated_at = CURRENT_TIMESTAMP
-                    WHERE updated_at IS NULL
-                """)
+    def _run_backfills_in_background(self):
+        try:
+            batches = self.run_backfills(stop=self._backfill_stop)
+        except Exception as e:
+            logging.error(f"Schema backfill failed, will resume on next start: {e}")
+            return
+        if batches:
+            logging.info(f"Schema backfills finished: {batches}")
 
-        if "moderation_status" in columns:
-            conn.execute("""
-                UPDATE generators
-                SET moderation_status = 'not_requested'
-                WHERE moderation_status IS NULL
+    def run_backfills(self, batch_size: Optional[int] = None, stop: Optional[Event] = None) -> Dict[str, int]:
+        """Run pending backfills to completion and return batches run per backfill.
+
+        Each batch is its own short write, and progress is saved with it, so
+        the server keeps serving writes in between and a restart resumes where
+        the last batch left off. Waits for a run already in progress.
+        """
+        batch_size = batch_size or self.backfill_batch_size
+        with self._backfill_lock:
+            with self.get_connection(readonly=True) as conn:
+                pending = {
+                    row[0]: row[1]
+                    for row in conn.execute(
+                        "SELECT name, last_rowid FROM schema_backfills WHERE completed_at IS NULL"
+                    ).fetchall()
+                }
+            batches = {}
+            for name, method in self.BACKFILLS.items():
+                after_rowid = pending.get(name)
+                while after_rowid is not None:
+                    if stop is not None and stop.is_set():
+                        return batches
+                    after_rowid = self._execute(self._run_backfill_batch, name, method,
+                                                after_rowid, batch_size)
+                    batches[name] = batches.get(name, 0) + 1
+                    if stop is not None and after_rowid is not None:
+                        stop.wait(self.backfill_pause)
+            return batches
+
+    def _run_backfill_batch(self, conn, name, method, after_rowid, batch_size):
+        conn.execute("BEGIN IMMEDIATE")
+        last_rowid = getattr(self, method)(conn, after_rowid, batch_size)
+        if last_rowid is None:
+            conn.execute(
+                "UPDATE schema_backfills SET completed_at = CURRENT_TIMESTAMP WHERE name = ?",
+                (name,),
+            )
+        else:
+            conn.execute(
+                "UPDATE schema_backfills SET last_rowid = ? WHERE name = ?",
+                (last_rowid, name),
+            )
+        conn.commit()
+        return last_rowid
+
+    @staticmethod
+    def _next_generator_batch(conn, after_rowid: int, batch_size: int) -> Optional[int]:
+        """The last rowid of the next `batch_size` generators, or None past the end."""
+        row = conn.execute("""
+            SELECT MAX(rowid) FROM (
+                SELECT rowid FROM generators WHERE rowid > ? ORDER BY rowid LIMIT ?
+            )
+        """, (after_rowid, batch_size)).fetchone()
+        return row[0]
+
+    def _backfill_generator_ownership_shape(self, conn, after_rowid: int, batch_size: int) -> Optional[int]:
+        """Normalize newly added world ownership columns on existing databases."""
+        last_rowid = self._next_generator_batch(conn, after_rowid, batch_size)
+        if last_rowid is None:
+            return None
+        batch = (after_rowid, last_rowid)
+        conn.stale_worlds.update(
+            row[0]
+            for row in conn.execute("""
+                SELECT id FROM generators
+                WHERE rowid > ? AND rowid <= ?
+                  AND (visibility IS NULL
+                       OR visibility NOT IN ('private', 'unlisted', 'public')
+                       OR updated_at IS NULL
+                       OR moderation_status IS NULL
+                       OR moderation_status NOT IN (
+                            'not_requested', 'pending', 'approved', 'rejected',
+                            'needs_human_review', 'error'
+                       ))
+            """, batch).fetchall()
+        )
+        conn.execute("""
+            UPDATE generators
+            SET visibility = 'unlisted'
+            WHERE rowid > ? AND rowid <= ?
+              AND (visibility IS NULL
+                   OR visibility NOT IN ('private', 'unlisted', 'public'))
+        """, batch)
+        # The oldest layouts have no created_at to fall back on.
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(generators)").fetchall()}
+        created_at = "created_at" if "created_at" in columns else "NULL"
+        conn.execute(f"""
+            UPDATE generators
+            SET updated_at = COALESCE({created_at}, CURRENT_TIMESTAMP)
+            WHERE rowid > ? AND rowid <= ? AND updated_at IS NULL
+        """, batch)
+        conn.execute("""
+            UPDATE generators
+            SET moderation_status = 'not_requested'
+            WHERE rowid > ? AND rowid <= ?
+              AND (moderation_status IS NULL
                    OR moderation_status NOT IN (
                         'not_requested',
                         'pending',
@@ -500,51 +2088,635 @@ class DatabaseManager:
                         'rejected',
                         'needs_human_review',
                         'error'
-                   )
+                   ))
+        """, batch)
+        return last_rowid
+
+    def _backfill_world_summaries(self, conn, after_rowid: int, batch_size: int) -> Optional[int]:
+        """Rebuild summaries missing or older than their World.
+
+        Covers databases created before the table existed, and rows written
+        by anything that bypassed the DatabaseManager writers.
+        """
+        last_rowid = self._next_generator_batch(conn, after_rowid, batch_size)
+        if last_rowid is None:
+            conn.execute("""
+                DELETE FROM world_summaries
+                WHERE generator_id NOT IN (SELECT id FROM generators)
+            """)
+            return None
+        stale_ids = [
+            row[0]
+            for row in conn.execute("""
+                SELECT g.id
+                FROM generators g
+                LEFT JOIN world_summaries s ON s.generator_id = g.id
+                WHERE g.rowid > ? AND g.rowid <= ?
+                  AND (s.generator_id IS NULL
+                       OR s.updated_at IS NOT g.updated_at)
+            """, (after_rowid, last_rowid)).fetchall()
+        ]
+        for generator_id in stale_ids:
+            self._refresh_world_summary(conn, generator_id)
+        return last_rowid
+
+    def _backfill_world_search(self, conn, after_rowid: int, batch_size: int) -> Optional[int]:
+        """Index Worlds saved before search existed."""
+        last_rowid = self._next_generator_batch(conn, after_rowid, batch_size)
+        if last_rowid is None:
+            conn.execute("""
+                DELETE FROM world_search_docs
+                WHERE generator_id NOT IN (SELECT id FROM generators)
             """)
+            return None
+        for row in conn.execute(
+            "SELECT id FROM generators WHERE rowid > ? AND rowid <= ?", (after_rowid, last_rowid)
+        ).fetchall():
+            self._refresh_world_search(conn, row[0])
+        return last_rowid
+
+    def rebuild_world_summaries(self) -> Dict[str, int]:
+        """Bring every World's gallery row and search index up to date, before
+        returning.
+
+        For rows inserted with plain SQL, which the writers never saw.
+        """
+        def _schedule(conn):
+            self._schedule_backfill(conn, "world_summaries", always=True)
+            if self._schema_capabilities(conn).has_table("world_search_docs"):
+                self._schedule_backfill(conn, "world_search", always=True)
+            conn.commit()
+
+        self._execute(_schedule)
+        return self.run_backfills()
+
+    def _refresh_world_summary(self, conn, generator_id: str) -> None:
+        """Rewrite one World's gallery row from its source rows.
+
+        Runs inside the caller's transaction, so the summary commits or rolls
+        back together with the change that made it stale. The World's cached
+        rows are dropped when that transaction commits.
+        """
+        conn.stale_worlds.add(generator_id)
+        row = conn.execute("""
+            SELECT g.theme_desc, g.theme_desc_better, g.language,
+                   g.player_defs, g.item_defs, g.enemy_defs, g.celltype_defs,
+                   g.owner_id, g.visibility, g.moderation_status,
+                   g.moderation_reason, g.moderation_model, g.moderation_confidence,
+                   g.moderation_categories, g.public_requested_at,
+                   g.public_review_after, g.public_reviewed_at,
+                   g.created_at, g.updated_at, w.visual_manifest
+            FROM generators g
+            LEFT JOIN generator_worlds w ON w.generator_id = g.id
+            WHERE g.id = ?
+        """, (generator_id,)).fetchone()
+        self._refresh_world_search(conn, generator_id)
+        if row is None:
+            conn.execute("DELETE FROM world_summaries WHERE generator_id = ?", (generator_id,))
+            return
+
+        conn.execute("""
+            INSERT OR REPLACE INTO world_summaries (
+                generator_id, title, theme, language,
+                player_count, item_count, enemy_count, terrain_count, cover_url,
+                owner_id, visibility, moderation_status, moderation_reason,
+                moderation_model, moderation_confidence, moderation_categories,
+                public_requested_at, public_review_after, public_reviewed_at,
+                created_at, updated_at, sort_key
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            generator_id,
+            self._world_title(generator_id, row[0], row[1]),
+            row[0] or "",
+            row[2],
+            self._json_list_size(row[3]),
+            self._json_list_size(row[4]),
+            self._json_list_size(row[5]),
+            self._json_mapping_size(row[6]),
+            self._cover_url_from_manifest(row[19]),
+            row[7],
+            row[8] or "unlisted",
+            row[9] or "not_requested",
+            row[10],
+            row[11],
+            row[12],
+            row[13],
+            row[14],
+            row[15],
+            row[16],
+            row[17],
+            row[18],
+            row[18] or row[17] or "",
+        ))
+
+    def _refresh_world_search(self, conn, generator_id: str) -> None:
+        """Rewrite one World's search rows from its source and translations.
+
+        Each index gets one row per World, holding the titles and themes of
+        every language it tokenizes. Visibility is not indexed: searches join
+        world_summaries, so they always see the current value.
+        """
+        if not self._schema_capabilities(conn).has_table("world_search_docs"):
+            return
+        row = conn.execute(
+            "SELECT theme_desc, theme_desc_better, language FROM generators WHERE id = ?",
+            (generator_id,),
+        ).fetchone()
+        if row is None:
+            # The delete trigger clears the index rows.
+            conn.execute("DELETE FROM world_search_docs WHERE generator_id = ?", (generator_id,))
+            return
+
+        texts = {table: ([], []) for table in self.WORLD_SEARCH_TABLES}
+
+        def add(language, title, theme):
+            titles, themes = texts[self._world_search_table(language)]
+            titles.append(title)
+            themes.append(theme)
+
+        add(row[2], self._world_title(generator_id, row[0], row[1]),
+            "\n".join(part for part in (row[0], row[1]) if part))
+        for language, theme_desc_better in conn.execute(
+            "SELECT language, theme_desc_better FROM generator_translations WHERE generator_id = ?",
+            (generator_id,),
+        ).fetchall():
+            add(language, self._world_title(generator_id, None, theme_desc_better),
+                theme_desc_better or "")
+
+        conn.execute(
+            "INSERT OR IGNORE INTO world_search_docs (generator_id) VALUES (?)", (generator_id,)
+        )
+        doc_id = conn.execute(
+            "SELECT doc_id FROM world_search_docs WHERE generator_id = ?", (generator_id,)
+        ).fetchone()[0]
+        for table, (titles, themes) in texts.items():
+            conn.execute(f"DELETE FROM {table} WHERE rowid = ?", (doc_id,))
+            if titles:
+                conn.execute(
+                    f"INSERT INTO {table} (rowid, title, theme) VALUES (?, ?, ?)",
+                    (doc_id, "\n".join(titles), "\n".join(themes)),
+                )
+
+    @classmethod
+    def _world_search_table(cls, language: Optional[str]) -> str:
+        code = (language or "").replace("_", "-").split("-")[0].lower()
+        if code == "en":
+            return "world_search_en"
+        if code in cls.WORLD_SEARCH_CJK_LANGUAGES:
+            return "world_search_cjk"
+        return "world_search"
+
+    @staticmethod
+    def _world_title(generator_id: str, theme_desc: Optional[str], theme_desc_better: Optional[str]) -> str:
+        theme_desc = theme_desc or ""
+        theme_desc_better = theme_desc_better or theme_desc
+        title_source = theme_desc_better.strip() or theme_desc.strip()
+        return title_source.splitlines()[0][:120] if title_source else generator_id
+
+    def run_maintenance(
+            self,
+            batch_size: Optional[int] = None,
+            stop: Optional[Event] = None,
+            vacuum: bool = True,
+            analyze: bool = True,
+    ) -> Dict:
+        """Prune expired rows, hand freed pages back, refresh planner stats.
+
+        Each table in RETENTION_POLICIES is pruned in batches of `batch_size`
+        rows, every batch its own short write with a pause after it, so the
+        server keeps serving writes throughout. Then `PRAGMA
+        incremental_vacuum` truncates the free pages off the file, a step at
+        a time, and `ANALYZE` samples the indexes. Setting `stop` (or calling
+        shutdown) ends the run after the batch in flight.
+
+        Returns rows pruned per table and the size of both database files
+        before and after, in total and under `databases`. A file only shrinks
+        if it was created with incremental auto-vacuum; an older one needs a
+        one-off `VACUUM` to switch over, and until then its free pages are
+        only reused, reported as `free_bytes`.
+        """
+        batch_size = batch_size or self.maintenance_batch_size
+        stop = stop or self._maintenance_stop
+        started = time.perf_counter()
+        databases = ("worlds", "accounts")
+        with self._maintenance_lock:
+            if stop.is_set():
+                return {}
+            before = {database: self._database_size(database) for database in databases}
+            pruned = {}
+            for table, (method, _, _) in self.RETENTION_POLICIES.items():
+                days = self.retention_days.get(table, 0)
+                if days <= 0:
+                    continue
+                database = "accounts" if table in self.ACCOUNT_TABLES else "worlds"
+                pruned[table] = 0
+                while not stop.is_set():
+                    deleted = self._execute(getattr(self, method), days, batch_size, database=database)
+                    pruned[table] += deleted
+                    if deleted < batch_size:
+                        break
+                    stop.wait(self.maintenance_pause)
+
+            vacuumed_pages = 0
+            for database in databases:
+                if not vacuum or self._database_size(database)["auto_vacuum"] != "incremental":
+                    continue
+                while not stop.is_set():
+                    freed = self._execute(self._incremental_vacuum_step, batch_size, database=database)
+                    vacuumed_pages += freed
+                    if freed < batch_size:
+                        break
+                    stop.wait(self.maintenance_pause)
+            for database in databases:
+                if analyze and not stop.is_set():
+                    self._execute(self._analyze, database=database)
+
+            after = {database: self._database_size(database) for database in databases}
+            bytes_before = sum(size["bytes"] for size in before.values())
+            bytes_after = sum(size["bytes"] for size in after.values())
+            modes = {size["auto_vacuum"] for size in after.values()}
+            report = {
+                "pruned": pruned,
+                "vacuumed_pages": vacuumed_pages,
+                "analyzed": analyze and not stop.is_set(),
+                "bytes_before": bytes_before,
+                "bytes_after": bytes_after,
+                "reclaimed_bytes": bytes_before - bytes_after,
+                "free_bytes": sum(size["free_bytes"] for size in after.values()),
+                "auto_vacuum": modes.pop() if len(modes) == 1 else "mixed",
+                "databases": {
+                    database: {
+                        "bytes_before": before[database]["bytes"],
+                        "bytes_after": after[database]["bytes"],
+                        "free_bytes": after[database]["free_bytes"],
+                        "auto_vacuum": after[database]["auto_vacuum"],
+                    }
+                    for database in databases
+                },
+                "seconds": round(time.perf_counter() - started, 3),
+            }
+        return report
+
+    def _database_size(self, database: str = "worlds") -> Dict:
+        with self.get_connection(readonly=True, database=database) as conn:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        return {
+            "bytes": page_size * page_count,
+            "free_bytes": page_size * free_pages,
+            "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}.get(auto_vacuum, str(auto_vacuum)),
+        }
+
+    @staticmethod
+    def _retention_cutoff(days: int) -> str:
+        return (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    def _prune_world_play_sessions(self, conn, days: int, batch_size: int) -> int:
+        # Each row only guards its run against being counted twice on a
+        # reconnect; world_metrics already holds the counts, and game
+        # sessions are long gone by the cutoff.
+        cur = conn.execute("""
+            DELETE FROM world_play_sessions
+            WHERE rowid IN (
+                SELECT rowid FROM world_play_sessions
+                WHERE started_at < ?
+                LIMIT ?
+            )
+        """, (self._retention_cutoff(days), batch_size))
+        conn.commit()
+        return cur.rowcount
+
+    def _prune_mobile_auth_sessions(self, conn, days: int, batch_size: int) -> int:
+        # Sessions that can no longer be used: refresh expired, or revoked.
+        expired_before = int(time.time()) - days * 86400
+        cur = conn.execute("""
+            DELETE FROM mobile_auth_sessions
+            WHERE rowid IN (
+                SELECT rowid FROM mobile_auth_sessions
+                WHERE refresh_expires_at < ?
+                UNION
+                SELECT rowid FROM mobile_auth_sessions
+                WHERE revoked_at < ?
+                LIMIT ?
+            )
+        """, (expired_before, self._retention_cutoff(days), batch_size))
+        conn.commit()
+        return cur.rowcount
+
+    def _prune_world_art_reroll_attempts(self, conn, days: int, batch_size: int) -> int:
+        # A succeeded attempt is what marks the free reroll as used, so it is
+        # kept; failed ones, and reservations long past going stale, are not.
+        cur = conn.execute("""
+            DELETE FROM world_art_reroll_attempts
+            WHERE rowid IN (
+                SELECT rowid FROM world_art_reroll_attempts
+                WHERE status IN ('failed', 'reserved') AND created_at < ?
+                LIMIT ?
+            )
+        """, (self._retention_cutoff(days), batch_size))
+        conn.commit()
+        return cur.rowcount
+
+    def _prune_world_moderation_reviews(self, conn, days: int, batch_size: int) -> int:
+        # The latest review of each World stays, however old: it is the
+        # record behind its current moderation status.
+        cur = conn.execute("""
+            DELETE FROM world_moderation_reviews
+            WHERE rowid IN (
+                SELECT r.rowid FROM world_moderation_reviews r
+                WHERE r.created_at < ?
+                  AND EXISTS (
+                      SELECT 1 FROM world_moderation_reviews newer
+                      WHERE newer.generator_id = r.generator_id
+                        AND (newer.created_at, newer.rowid) > (r.created_at, r.rowid)
+                  )
+                LIMIT ?
+            )
+        """, (self._retention_cutoff(days), batch_size))
+        conn.commit()
+        return cur.rowcount
+
+    def _prune_game_sessions(self, conn, days: int, batch_size: int) -> int:
+        # Runs nobody came back to; the server drops idle ones it still holds
+        # after a day as well.
+        cur = conn.execute("""
+            DELETE FROM game_sessions
+            WHERE rowid IN (
+                SELECT rowid FROM game_sessions
+                WHERE last_accessed < ?
+                LIMIT ?
+            )
+        """, (time.time() - days * 86400, batch_size))
+        conn.commit()
+        return cur.rowcount
+
+    def _prune_session_directory(self, conn, days: int, batch_size: int) -> int:
+        # Entries no worker touched in that long belong to runs long gone.
+        cur = conn.execute("""
+            DELETE FROM session_directory
+            WHERE rowid IN (
+                SELECT rowid FROM session_directory
+                WHERE updated_at < ?
+                LIMIT ?
+            )
+        """, (time.time() - days * 86400, batch_size))
+        conn.commit()
+        return cur.rowcount
+
+    def _prune_rate_limit_attempts(self, conn, days: int, batch_size: int) -> int:
+        # Far older than any limiter's window.
+        cur = conn.execute("""
+            DELETE FROM rate_limit_attempts
+            WHERE rowid IN (
+                SELECT rowid FROM rate_limit_attempts
+                WHERE attempted_at < ?
+                LIMIT ?
+            )
+        """, (time.time() - days * 86400, batch_size))
+        conn.commit()
+        return cur.rowcount
+
+    def _prune_forge_jobs(self, conn, days: int, batch_size: int) -> int:
+        # Only a socket reconnecting to a forge replays these; kept a while
+        # longer for looking into forges that failed.
+        cur = conn.execute("""
+            DELETE FROM forge_jobs
+            WHERE rowid IN (
+                SELECT rowid FROM forge_jobs
+                WHERE updated_at < ?
+                LIMIT ?
+            )
+        """, (time.time() - days * 86400, batch_size))
+        conn.commit()
+        return cur.rowcount
+
+    @staticmethod
+    def _incremental_vacuum_step(conn, pages: int) -> int:
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        freed = min(pages, free_pages)
+        # The pragma frees one page per step, and sqlite3 steps a statement
+        # without result columns only once, so each execute frees one page.
+        for _ in range(freed):
+            conn.execute("PRAGMA incremental_vacuum")
+        conn.commit()
+        return freed
+
+    @staticmethod
+    def _analyze(conn):
+        # Sample rather than read every index in full; plenty for the planner.
+        # Only this writer's own file: the other is attached read-only.
+        conn.execute("PRAGMA analysis_limit = 1000")
+        conn.execute("ANALYZE main")
+        conn.commit()
 
     def backup_db(self):
-        """Upload current DB to remote storage"""
-        try:
-            self.s3.upload_file(
-                self.db_path,
-                self.bucket,
-                'rllm_game_data.db'
+        """Start new replica generations, for both files, from fresh snapshots"""
+        for replicator in self._replicators():
+            try:
+                replicator.snapshot()
+                logging.info(f"Database {replicator.database} backed up to storage")
+            except Exception as e:
+                logging.error(f"Failed to backup database {replicator.database}: {str(e)}")
+
+    def _remove_wal_files(self, path: Optional[str] = None):
+        for suffix in ("-wal", "-shm"):
+            try:
+                os.remove((path or self.db_path) + suffix)
+            except FileNotFoundError:
+                pass
+
+    def _get_pool(self, database: str = "worlds") -> ConnectionPool:
+        pool, accounts_pool = self._get_pools()
+        return accounts_pool if database == "accounts" else pool
+
+    def _get_pools(self) -> Tuple[ConnectionPool, ConnectionPool]:
+        """The World file's pool and the accounts file's, each attaching the other."""
+        with self._pool_lock:
+            pools = (self._pool, self._accounts_pool)
+            paths = (self.db_path, self.accounts_db_path)
+            autocheckpoint = self._autocheckpoint()
+            if all(
+                pool is not None
+                and pool.path == path
+                and pool.timeout == self.timeout
+                and pool.autocheckpoint == autocheckpoint
+                and not pool.is_stale()
+                for pool, path in zip(pools, paths)
+            ):
+                return pools
+
+            for pool in pools:
+                if pool is not None:
+                    pool.close()
+            self._schema = None
+            # Cached rows belong to the file the old pool had open.
+            self.world_cache.clear()
+            for path in paths:
+                if not os.path.exists(path):
+                    # A WAL left behind by a deleted database would otherwise be
+                    # replayed into the new, empty file.
+                    self._remove_wal_files(path)
+                    # Created up front, since attaching read-only cannot.
+                    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                    open(path, "ab").close()
+            options = dict(
+                timeout=self.timeout,
+                read_pool_size=self.read_pool_size,
+                synchronous=self.synchronous,
+                cache_size_kib=self.cache_size_kib,
+                mmap_size=self.mmap_size,
+                autocheckpoint=autocheckpoint,
+                trace=self.query_stats.trace,
             )
-            logging.info("Database backed up to storage")
-        except Exception as e:
-            logging.error(f"Failed to backup database: {str(e)}")
+            self._pool = ConnectionPool(
+                self.db_path, attach=("accounts", self.accounts_db_path), **options
+            )
+            self._accounts_pool = ConnectionPool(
+                self.accounts_db_path, attach=("worlds", self.db_path), **options
+            )
+            return self._pool, self._accounts_pool
+
+    def _autocheckpoint(self) -> int:
+        # While replicating, only the replicator may checkpoint: a WAL reset
+        # it did not see would drop frames it has not shipped yet. That holds
+        # for the other workers' connections too.
+        if self.replicator is not None and (self.replicator.started or not self.is_primary):
+            return 0
+        return 1000
+
+    def _close_pool(self):
+        with self._pool_lock:
+            closing = (
+                (self._pool, self.replicator),
+                (self._accounts_pool, self.accounts_replicator),
+            )
+            self._pool = self._accounts_pool = None
+            self._schema = None
+        self.world_cache.clear()
+        for pool, replicator in closing:
+            if pool is None:
+                continue
+            if replicator is not None and not pool.is_stale():
+                try:
+                    replicator.handoff(pool)
+                    continue
+                except Exception as e:
+                    logging.error(f"Could not ship the WAL before closing the database: {e}")
+            pool.close()
+
+    def _schema_capabilities(self, conn) -> SchemaCapabilities:
+        schema = self._schema
+        if schema is None:
+            schema = SchemaCapabilities.read(conn)
+            self._schema = schema
+        return schema
+
+    def checkpoint(self):
+        """Fold each WAL into its database file before the files are copied."""
+        for database, replicator in (("worlds", self.replicator), ("accounts", self.accounts_replicator)):
+            if not os.path.exists(self.database_path(database)):
+                continue
+            if replicator is not None and replicator.started:
+                replicator.checkpoint()
+            else:
+                self._get_pool(database).checkpoint()
 
     @contextmanager
-    def get_connection(self):
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        conn = sqlite3.connect(self.db_path, timeout=self.timeout)
-        wrapped = self.ConnectionWrapper(conn, self._schedule_upload)
+    def get_connection(self, readonly: bool = False, database: str = "worlds"):
+        """Check out a pooled connection for the duration of the block.
+
+        Writes go through the single writer connection of `database`, the
+        World file or "accounts", which can read the other file but not
+        write it. `readonly=True` takes a reader instead, which does not wait
+        on a writer and cannot modify the database.
+        """
+        pool = self._get_pool(database)
+        if readonly:
+            conn = pool.acquire_reader()
+            release = pool.release_reader
+        else:
+            conn = pool.acquire_writer()
+            release = pool.release_writer
+        wrapped = self.ConnectionWrapper(conn, self._note_commit)
         try:
             yield wrapped
         finally:
-            conn.close()
+            release(conn)
 
-    def _execute_with_retry(self, operation, *args):
-        """
-        Execute a database operation with retry logic.
+    @contextmanager
+    def _joined_connection(self):
+        """A connection that writes both files, for the few changes spanning them.
+
+        Both pooled writers are held for the block, the World file's first,
+        so neither writer queue nor a replicator pass writes alongside it.
+        WAL commits are not atomic across files: the World file commits
+        first, so a crash in between loses the accounts side. Whatever runs
+        here must notice that and redo it, as the accounts file's own
+        user_version lets _migrate do.
         """
-        last_error = None
-        for attempt in range(self.max_retries):
+        pool, accounts_pool = self._get_pools()
+        writer = pool.acquire_writer()
+        try:
+            accounts_writer = accounts_pool.acquire_writer()
             try:
-                with self.get_connection() as conn:
-                    result = operation(conn, *args)
-                    return result
-            except sqlite3.OperationalError as e:
-                last_error = e
-                if "database is locked" in str(e):
-                    time.sleep(self.retry_delay * (attempt + 1))
-                    continue
-                raise e
-            except Exception as e:
-                raise e
+                conn = pool.connect_joined()
+                try:
+                    yield self.ConnectionWrapper(conn, self._note_commit)
+                finally:
+                    conn.close()
+            finally:
+                accounts_pool.release_writer(accounts_writer)
+        finally:
+            pool.release_writer(writer)
 
-        raise last_error if last_error else Exception("Max retries exceeded")
+    def _execute(self, operation, *args, readonly: bool = False, database: str = "worlds"):
+        """Run `operation(conn, *args)` and return its result.
+
+        `database` is the file it works on: "worlds" or "accounts", or
+        "joined" for a write spanning both. Reads run here on a pooled reader.
+        Writes are handed to that file's writer thread and wait for their
+        group to commit; with a single writer per file in the process there
+        is no lock to collide on, so nothing is retried. Either way the call
+        is timed into `query_stats`.
+        """
+        timing = self.query_stats.begin(operation)
+        try:
+            result = self._execute_timed(timing, args, readonly, database)
+        except BaseException as e:
+            self.query_stats.finish(timing, e)
+            raise
+        self.query_stats.finish(timing)
+        return result
+
+    def _execute_timed(self, timing, args, readonly: bool, database: str):
+        if readonly:
+            with self.get_connection(readonly=True, database=database) as conn:
+                return timing.run(conn, *args)
+        if database == "joined":
+            with self._joined_connection() as conn:
+                return timing.run(conn, *args)
+
+        writes, pool = (
+            (self.account_writes, self._accounts_pool) if database == "accounts"
+            else (self.writes, self._pool)
+        )
+        if not writes.on_writer_thread() and pool is not None and pool.holds_writer():
+            # Inside an explicit get_connection() block, which holds the
+            # writer: queueing would wait on this very thread.
+            with self.get_connection(database=database) as conn:
+                return timing.run(conn, *args)
+        return writes.run(timing.run, *args)
+
+    EXPLAINED_STATEMENTS = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+    def _explain_query_plan(self, sql: str) -> List[str]:
+        """EXPLAIN QUERY PLAN for a traced statement, for the slow-query log."""
+        if sql.lstrip().split(None, 1)[0].upper() not in self.EXPLAINED_STATEMENTS:
+            return []
+        with self.get_connection(readonly=True) as conn:
+            return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
 
     def generate_generator_id(
             self,
@@ -614,17 +2786,18 @@ class DatabaseManager:
                 theme_desc,
                 theme_desc_better,
                 language,
-                json.dumps(player_defs),
-                json.dumps(item_defs),
-                json.dumps(enemy_defs),
-                json.dumps(celltype_defs),
+                encode_json_column(player_defs),
+                encode_json_column(item_defs),
+                encode_json_column(enemy_defs),
+                encode_json_column(celltype_defs),
                 owner_id,
                 visibility
             ))
+            self._refresh_world_summary(conn, generator_id)
             conn.commit()
             return generator_id
 
-        generator_id = self._execute_with_retry(_save)
+        generator_id = self._execute(_save)
         # Upload is now scheduled automatically by the connection wrapper
         return generator_id
 
@@ -664,10 +2837,10 @@ class DatabaseManager:
             'theme_desc': row[0],
             'theme_desc_better': row[1],
             'language': row[2],
-            'player_defs': json.loads(row[3]),
-            'item_defs': json.loads(row[4]),
-            'enemy_defs': json.loads(row[5]),
-            'celltype_defs': json.loads(row[6]),
+            'player_defs': decode_json_column(row[3]),
+            'item_defs': decode_json_column(row[4]),
+            'enemy_defs': decode_json_column(row[5]),
+            'celltype_defs': decode_json_column(row[6]),
             'owner_id': row[7],
             'visibility': row[8],
             'moderation_status': row[9] or "not_requested",
@@ -705,7 +2878,10 @@ class DatabaseManager:
 
             return self._generator_from_row(result)
 
-        return self._execute_with_retry(_get, generator_id)
+        return self.world_cache.read_through(
+            (generator_id, None, None),
+            lambda: self._execute(_get, generator_id, readonly=True),
+        )
 
     def get_visible_generator(self, generator_id: str, requester_owner_id: Optional[str] = None) -> Optional[Dict]:
         """
@@ -744,13 +2920,13 @@ class DatabaseManager:
         values = []
         if player_defs is not None:
             assignments.append("player_defs = ?")
-            values.append(json.dumps(player_defs))
+            values.append(encode_json_column(player_defs))
         if enemy_defs is not None:
             assignments.append("enemy_defs = ?")
-            values.append(json.dumps(enemy_defs))
+            values.append(encode_json_column(enemy_defs))
         if celltype_defs is not None:
             assignments.append("celltype_defs = ?")
-            values.append(json.dumps(celltype_defs))
+            values.append(encode_json_column(celltype_defs))
 
         if not assignments:
             return
@@ -762,9 +2938,10 @@ class DatabaseManager:
                 "updated_at = CURRENT_TIMESTAMP WHERE id = ?",
                 (*values, generator_id),
             )
+            self._refresh_world_summary(conn, generator_id)
             conn.commit()
 
-        self._execute_with_retry(_update)
+        self._execute(_update)
 
     def get_generator_world(
             self,
@@ -788,25 +2965,32 @@ class DatabaseManager:
             result = cur.fetchone()
             if result is None:
                 return None
+            return self._snapshot_from_row(result)
 
-            tile_info = json.loads(result[3]) if result[3] else {}
-            return {
-                'language': result[0],
-                'map_csv': result[1],
-                'entity_placements': json.loads(result[2]) if result[2] else [],
-                # Keyed by language: generated prose is not reusable across
-                # languages, but the map and placements are.
-                'tile_info_by_language': tile_info if isinstance(tile_info, dict) else {},
-                'visual_manifest': json.loads(result[4]) if result[4] else None,
-                # Keyed by language, like tile_info: crossing lines are prose
-                # and are not reusable across languages. Absent on worlds saved
-                # before area crossings existed, and a bare list on the handful
-                # saved while this was briefly unkeyed - both fall back to
-                # regenerating rather than failing the snapshot.
-                'regions_by_language': DatabaseManager._as_language_map(result[5]),
-            }
+        return self.world_cache.read_through(
+            (generator_id, None, snapshot_version),
+            lambda: self._execute(_get, generator_id, snapshot_version, readonly=True),
+        )
 
-        return self._execute_with_retry(_get, generator_id, snapshot_version)
+    @staticmethod
+    def _snapshot_from_row(row) -> Dict:
+        """Decode (language, map_csv, entity_placements, tile_info, visual_manifest, regions)."""
+        tile_info = decode_json_column(row[3]) if row[3] else {}
+        return {
+            'language': row[0],
+            'map_csv': row[1],
+            'entity_placements': decode_json_column(row[2]) if row[2] else [],
+            # Keyed by language: generated prose is not reusable across
+            # languages, but the map and placements are.
+            'tile_info_by_language': tile_info if isinstance(tile_info, dict) else {},
+            'visual_manifest': json.loads(row[4]) if row[4] else None,
+            # Keyed by language, like tile_info: crossing lines are prose
+            # and are not reusable across languages. Absent on worlds saved
+            # before area crossings existed, and a bare list on the handful
+            # saved while this was briefly unkeyed - both fall back to
+            # regenerating rather than failing the snapshot.
+            'regions_by_language': DatabaseManager._as_language_map(row[5]),
+        }
 
     def save_generator_visual_manifest(
             self,
@@ -829,16 +3013,18 @@ class DatabaseManager:
                     visual_manifest = excluded.visual_manifest,
                     updated_at = CURRENT_TIMESTAMP
             """, (generator_id, snapshot_version, json.dumps(manifest)))
+            # The gallery cover lives in the manifest.
+            self._refresh_world_summary(conn, generator_id)
             conn.commit()
 
-        self._execute_with_retry(_save)
+        self._execute(_save)
 
     @staticmethod
     def _as_language_map(raw):
         """Read a language-keyed column, tolerating a pre-keying bare list."""
         if not raw:
             return {}
-        value = json.loads(raw)
+        value = decode_json_column(raw)
         return value if isinstance(value, dict) else {}
 
     def save_generator_world(
@@ -871,13 +3057,14 @@ class DatabaseManager:
                 snapshot_version,
                 language,
                 map_csv,
-                json.dumps(entity_placements),
-                json.dumps(tile_info_by_language),
-                json.dumps(regions_by_language or {})
+                encode_json_column(entity_placements),
+                encode_json_column(tile_info_by_language),
+                encode_json_column(regions_by_language or {})
             ))
+            conn.stale_worlds.add(generator_id)
             conn.commit()
 
-        self._execute_with_retry(_save)
+        self._execute(_save)
 
     def get_generator_translation(
             self,
@@ -901,13 +3088,104 @@ class DatabaseManager:
             return {
                 'language': language,
                 'theme_desc_better': result[0],
-                'player_defs': json.loads(result[1]),
-                'item_defs': json.loads(result[2]),
-                'enemy_defs': json.loads(result[3]),
-                'celltype_defs': json.loads(result[4])
+                'player_defs': decode_json_column(result[1]),
+                'item_defs': decode_json_column(result[2]),
+                'enemy_defs': decode_json_column(result[3]),
+                'celltype_defs': decode_json_column(result[4])
             }
 
-        return self._execute_with_retry(_get, generator_id, language, translation_version)
+        return self.world_cache.read_through(
+            (generator_id, language, translation_version),
+            lambda: self._execute(
+                _get, generator_id, language, translation_version, readonly=True
+            ),
+        )
+
+    def load_world_bundle(
+            self,
+            generator_id: str,
+            language: str,
+            snapshot_version: int = 1,
+            translation_version: int = 1,
+    ) -> Optional[Dict]:
+        """Everything starting a run on a World needs, from one query.
+
+        Replaces `get_generator`, `get_generator_translation` and
+        `get_generator_world` called in turn: the three rows are joined on one
+        connection, and each definition column is decoded once, from the
+        translation when there is one and from the generator otherwise.
+
+        Returns None for an unknown World, or:
+          definitions      generator fields with the cached translation for
+                           `language` merged over them, ready for
+                           GameDefinitionsManager.load_from_generator_data
+          source_language  the language the World was written in
+          translated       whether `definitions` carry that translation
+          snapshot         as returned by `get_generator_world`, or None
+        A World written in another language with no cached translation comes
+        back with its own definitions and `translated` False, for the caller
+        to translate.
+        """
+        def _load(conn, generator_id, language, snapshot_version, translation_version):
+            # Source definitions a translation replaces are not even read.
+            row = conn.execute("""
+                SELECT g.theme_desc, g.theme_desc_better, g.language,
+                       CASE WHEN t.generator_id IS NULL THEN g.player_defs END,
+                       CASE WHEN t.generator_id IS NULL THEN g.item_defs END,
+                       CASE WHEN t.generator_id IS NULL THEN g.enemy_defs END,
+                       CASE WHEN t.generator_id IS NULL THEN g.celltype_defs END,
+                       g.owner_id, g.visibility, g.moderation_status,
+                       g.moderation_reason, g.moderation_model, g.moderation_confidence,
+                       g.moderation_categories, g.public_requested_at,
+                       g.public_review_after, g.public_reviewed_at, g.updated_at,
+                       t.generator_id IS NOT NULL, t.theme_desc_better,
+                       t.player_defs, t.item_defs, t.enemy_defs, t.celltype_defs,
+                       w.generator_id IS NOT NULL, w.language, w.map_csv,
+                       w.entity_placements, w.tile_info, w.visual_manifest, w.regions
+                FROM generators g
+                LEFT JOIN generator_translations t
+                    ON t.generator_id = g.id
+                    AND t.language = :language
+                    AND t.translation_version = :translation_version
+                    AND COALESCE(g.language, :language) != :language
+                LEFT JOIN generator_worlds w
+                    ON w.generator_id = g.id AND w.snapshot_version = :snapshot_version
+                WHERE g.id = :generator_id
+            """, {
+                "generator_id": generator_id,
+                "language": language,
+                "snapshot_version": snapshot_version,
+                "translation_version": translation_version,
+            }).fetchone()
+            if row is None:
+                return None
+
+            definitions = self._generator_from_row(row[:18])
+            source_language = definitions['language'] or language
+            translated = bool(row[18])
+            if translated:
+                definitions.update({
+                    'language': language,
+                    'theme_desc_better': row[19],
+                    'player_defs': decode_json_column(row[20]),
+                    'item_defs': decode_json_column(row[21]),
+                    'enemy_defs': decode_json_column(row[22]),
+                    'celltype_defs': decode_json_column(row[23]),
+                })
+            return {
+                'definitions': definitions,
+                'source_language': source_language,
+                'translated': translated,
+                'snapshot': self._snapshot_from_row(row[25:]) if row[24] else None,
+            }
+
+        return self.world_cache.read_through(
+            (generator_id, language, ("bundle", snapshot_version, translation_version)),
+            lambda: self._execute(
+                _load, generator_id, language, snapshot_version, translation_version,
+                readonly=True,
+            ),
+        )
 
     def list_generator_translations(self, generator_id: str) -> List[Dict]:
         """Return every cached language view so shared art URLs can be updated."""
@@ -922,16 +3200,16 @@ class DatabaseManager:
                 {
                     "language": row[0],
                     "theme_desc_better": row[1],
-                    "player_defs": json.loads(row[2]),
-                    "item_defs": json.loads(row[3]),
-                    "enemy_defs": json.loads(row[4]),
-                    "celltype_defs": json.loads(row[5]),
+                    "player_defs": decode_json_column(row[2]),
+                    "item_defs": decode_json_column(row[3]),
+                    "enemy_defs": decode_json_column(row[4]),
+                    "celltype_defs": decode_json_column(row[5]),
                     "translation_version": int(row[6] or 1),
                 }
                 for row in rows
             ]
 
-        return self._execute_with_retry(_list, generator_id)
+        return self._execute(_list, generator_id, readonly=True)
 
     def save_generator_translation(
             self,
@@ -964,15 +3242,221 @@ class DatabaseManager:
                 generator_id,
                 language,
                 theme_desc_better,
-                json.dumps(player_defs),
-                json.dumps(item_defs),
-                json.dumps(enemy_defs),
-                json.dumps(celltype_defs),
+                encode_json_column(player_defs),
+                encode_json_column(item_defs),
+                encode_json_column(enemy_defs),
+                encode_json_column(celltype_defs),
                 translation_version
             ))
+            conn.stale_worlds.add(generator_id)
+            self._refresh_world_search(conn, generator_id)
             conn.commit()
 
-        self._execute_with_retry(_save)
+        self._execute(_save)
+
+    COMPRESSED_JSON_COLUMNS = {
+        "generators": ("player_defs", "item_defs", "enemy_defs", "celltype_defs"),
+        "generator_translations": ("player_defs", "item_defs", "enemy_defs", "celltype_defs"),
+        "generator_worlds": ("entity_placements", "tile_info", "regions"),
+    }
+
+    def compress_json_columns(self, batch_size: int = 200) -> Dict[str, int]:
+        """Compress large JSON columns still stored as plain text.
+
+        Rows are compressed on their next write anyway; this sweeps the ones
+        nobody writes to. Each batch is its own short transaction so the writer
+        is never held for long, and `updated_at` is left alone: the content did
+        not change, only its encoding. Returns per-table counts of rewritten
+        rows.
+        """
+        def _compress_batch(conn, table, columns, after_rowid):
+            conn.execute("BEGIN IMMEDIATE")
+            large = " OR ".join(
+                f"(typeof({column}) = 'text' AND length(CAST({column} AS BLOB)) >= ?)"
+                for column in columns
+            )
+            rows = conn.execute(
+                f"SELECT rowid, {', '.join(columns)} FROM {table} "
+                f"WHERE rowid > ? AND ({large}) ORDER BY rowid LIMIT ?",
+                (after_rowid, *[COMPRESSED_JSON_MIN_BYTES] * len(columns), batch_size),
+            ).fetchall()
+            for row in rows:
+                values = [
+                    encode_json_column(json.loads(raw)) if isinstance(raw, str) else raw
+                    for raw in row[1:]
+                ]
+                conn.execute(
+                    f"UPDATE {table} SET {', '.join(f'{c} = ?' for c in columns)} WHERE rowid = ?",
+                    (*values, row[0]),
+                )
+            conn.commit()
+            return [row[0] for row in rows]
+
+        counts = {}
+        for table, columns in self.COMPRESSED_JSON_COLUMNS.items():
+            counts[table] = 0
+            after_rowid = 0
+            while True:
+                rowids = self._execute(_compress_batch, table, columns, after_rowid)
+                counts[table] += len(rowids)
+                if len(rowids) < batch_size:
+                    break
+                after_rowid = rowids[-1]
+        return counts
+
+    # What export_worlds copies of each World: table -> its key columns, the
+    # first naming the World. A record holds the generators row, and the rows
+    # of the others under their table names.
+    WORLD_EXPORT_TABLES = {
+        "generators": ("id",),
+        "generator_translations": ("generator_id", "language"),
+        "generator_worlds": ("generator_id",),
+        "world_metrics": ("generator_id",),
+    }
+
+    def count_world_exports(
+            self,
+            visibilities: Optional[Sequence[str]] = None,
+            world_ids: Optional[Sequence[str]] = None,
+    ) -> int:
+        """How many Worlds export_worlds would yield for the same selection."""
+        def _count(conn):
+            where, params = self._world_export_where(visibilities, world_ids)
+            return conn.execute(f"SELECT COUNT(*) FROM generators WHERE {where}", params).fetchone()[0]
+
+        return self._execute(_count, readonly=True)
+
+    def export_worlds(
+            self,
+            visibilities: Optional[Sequence[str]] = None,
+            world_ids: Optional[Sequence[str]] = None,
+            after_id: str = "",
+            batch_size: int = 200,
+    ) -> Iterator[Dict]:
+        """Yield Worlds as JSON-ready records, in id order, a batch at a time.
+
+        Each record holds the World's generators row, its translations, its
+        playable snapshot and its metrics, as column-name dicts. Compressed
+        JSON columns are decoded, so the records are the same whatever the
+        source's storage format. Only `batch_size` Worlds are held at once,
+        and passing the last id seen as `after_id` resumes after it.
+        """
+        wanted = sorted(set(world_ids)) if world_ids is not None else None
+        while True:
+            records = self._execute(self._export_world_batch, visibilities, wanted,
+                                    after_id, batch_size, readonly=True)
+            yield from records
+            if len(records) < batch_size:
+                return
+            after_id = records[-1]["id"]
+
+    @staticmethod
+    def _world_export_where(visibilities, world_ids, after_id: str = ""):
+        where, params = ["id > ?"], [after_id]
+        if visibilities:
+            where.append(f"visibility IN ({', '.join('?' for _ in visibilities)})")
+            params.extend(visibilities)
+        if world_ids is not None:
+            where.append(f"id IN ({', '.join('?' for _ in world_ids)})")
+            params.extend(world_ids)
+        return " AND ".join(where), params
+
+    def _export_world_batch(self, conn, visibilities, wanted, after_id, batch_size):
+        if wanted is not None:
+            start = bisect_left(wanted, after_id)
+            if start < len(wanted) and wanted[start] == after_id:
+                start += 1
+            wanted = wanted[start:start + batch_size]
+            if not wanted:
+                return []
+        where, params = self._world_export_where(visibilities, wanted, after_id)
+        cur = conn.execute(
+            f"SELECT * FROM generators WHERE {where} ORDER BY id LIMIT ?",
+            (*params, batch_size),
+        )
+        records = {}
+        for row in self._export_rows("generators", cur):
+            records[row["id"]] = {"id": row["id"], "generators": row}
+        if not records:
+            return []
+
+        placeholders = ", ".join("?" for _ in records)
+        for table, key in self.WORLD_EXPORT_TABLES.items():
+            if table == "generators":
+                continue
+            cur = conn.execute(
+                f"SELECT * FROM {table} WHERE {key[0]} IN ({placeholders})", list(records)
+            )
+            for row in self._export_rows(table, cur):
+                record = records[row[key[0]]]
+                if len(key) > 1:
+                    record.setdefault(table, []).append(row)
+                else:
+                    record[table] = row
+        return list(records.values())
+
+    def _export_rows(self, table: str, cur) -> Iterator[Dict]:
+        columns = [column[0] for column in cur.description]
+        compressed = set(self.COMPRESSED_JSON_COLUMNS.get(table, ()))
+        for values in cur:
+            row = dict(zip(columns, values))
+            for column in compressed.intersection(row):
+                row[column] = decode_json_column(row[column])
+            yield row
+
+    def import_worlds(self, records: Sequence[Dict]) -> int:
+        """Upsert records from export_worlds in one transaction; returns the count.
+
+        Only columns this database has are written, so a record from a newer
+        or older schema still imports. An owner who has no account here is
+        dropped rather than pointing at a missing user. Summaries, search and
+        cached copies of each World are refreshed with it.
+        """
+        def _import(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            columns = {
+                table: {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                for table in self.WORLD_EXPORT_TABLES
+            }
+            for record in records:
+                world_id = record["id"]
+                generator = dict(record["generators"], id=world_id)
+                owner_id = generator.get("owner_id")
+                if owner_id and not conn.execute(
+                    "SELECT 1 FROM users WHERE id = ?", (owner_id,)
+                ).fetchone():
+                    generator["owner_id"] = None
+                self._upsert_export_row(conn, "generators", generator, columns["generators"])
+                for table in self.WORLD_EXPORT_TABLES:
+                    rows = record.get(table) if table != "generators" else None
+                    if isinstance(rows, dict):
+                        rows = [rows]
+                    for row in rows or ():
+                        row = dict(row, **{self.WORLD_EXPORT_TABLES[table][0]: world_id})
+                        self._upsert_export_row(conn, table, row, columns[table])
+                conn.stale_worlds.add(world_id)
+                self._refresh_world_summary(conn, world_id)
+            conn.commit()
+            return len(records)
+
+        return self._execute(_import, database="joined")
+
+    def _upsert_export_row(self, conn, table: str, row: Dict, table_columns) -> None:
+        key = self.WORLD_EXPORT_TABLES[table]
+        # Only names this table really has ever reach the SQL.
+        names = [name for name in row if name in table_columns]
+        compressed = set(self.COMPRESSED_JSON_COLUMNS.get(table, ()))
+        values = [
+            encode_json_column(row[name]) if name in compressed and row[name] is not None else row[name]
+            for name in names
+        ]
+        updates = ", ".join(f"{name} = excluded.{name}" for name in names if name not in key)
+        conn.execute(
+            f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)}) "
+            f"ON CONFLICT({', '.join(key)}) DO "
+            + (f"UPDATE SET {updates}" if updates else "NOTHING"),
+            values,
+        )
 
     def update_generator_visibility(self, generator_id: str, visibility: str) -> bool:
         """Update the visibility of a generator. Returns True if updated."""
@@ -985,10 +3469,11 @@ class DatabaseManager:
                 SET visibility = ?, updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
             """, (visibility, generator_id))
+            self._refresh_world_summary(conn, generator_id)
             conn.commit()
             return cur.rowcount > 0
 
-        return self._execute_with_retry(_update, generator_id, visibility)
+        return self._execute(_update, generator_id, visibility)
 
     def set_generator_non_public_visibility(self, generator_id: str, visibility: str) -> bool:
         """Set private/unlisted visibility and clear any pending public request."""
@@ -1012,10 +3497,11 @@ class DatabaseManager:
                     updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
             """, (visibility, generator_id))
+            self._refresh_world_summary(conn, generator_id)
             conn.commit()
             return cur.rowcount > 0
 
-        return self._execute_with_retry(_update, generator_id, visibility)
+        return self._execute(_update, generator_id, visibility)
 
     def request_public_visibility(
             self,
@@ -1061,6 +3547,8 @@ class DatabaseManager:
                 generator_id,
                 requested_by_owner_id,
             ))
+            if cur.rowcount:
+                self._refresh_world_summary(conn, generator_id)
             conn.commit()
             if cur.rowcount == 0:
                 return None
@@ -1083,7 +3571,7 @@ class DatabaseManager:
             world["id"] = generator_id
             return world
 
-        return self._execute_with_retry(
+        return self._execute(
             _request,
             generator_id,
             requested_by_owner_id,
@@ -1122,7 +3610,7 @@ class DatabaseManager:
                 reviews.append(world)
             return reviews
 
-        return self._execute_with_retry(_list, limit, now_text)
+        return self._execute(_list, limit, now_text, readonly=True)
 
     def count_pending_public_reviews(self) -> int:
         """Return the number of non-public Worlds waiting for public review."""
@@ -1136,7 +3624,7 @@ class DatabaseManager:
             """)
             return int(cur.fetchone()[0])
 
-        return self._execute_with_retry(_count)
+        return self._execute(_count, readonly=True)
 
     def record_public_review(
             self,
@@ -1238,10 +3726,12 @@ class DatabaseManager:
                     generator_id,
                 ))
 
+            if cur.rowcount:
+                self._refresh_world_summary(conn, generator_id)
             conn.commit()
             return cur.rowcount > 0
 
-        return self._execute_with_retry(_record)
+        return self._execute(_record)
 
     def record_public_review_error(
             self,
@@ -1273,153 +3763,78 @@ class DatabaseManager:
         In local_dev mode, public and unlisted worlds are returned for dev
         convenience. Otherwise, only public worlds are returned.
         """
-        limit = max(1, min(limit, 50))
+        return self.list_worlds_page(limit, local_dev=local_dev, owner_id=owner_id)["worlds"]
 
-        def _list(conn, limit, local_dev, owner_id):
-            cur = conn.cursor()
-            cur.execute("PRAGMA table_info(generators)")
-            columns = {row[1] for row in cur.fetchall()}
-            has_created_at = "created_at" in columns
-            has_updated_at = "updated_at" in columns
-            has_owner_id = "owner_id" in columns
-            has_visibility = "visibility" in columns
-            has_moderation_status = "moderation_status" in columns
-            has_moderation_reason = "moderation_reason" in columns
-            has_moderation_model = "moderation_model" in columns
-            has_moderation_confidence = "moderation_confidence" in columns
-            has_moderation_categories = "moderation_categories" in columns
-            has_public_requested_at = "public_requested_at" in columns
-            has_public_review_after = "public_review_after" in columns
-            has_public_reviewed_at = "public_reviewed_at" in columns
+    def list_worlds_page(
+            self,
+            limit: int = 20,
+            local_dev: bool = False,
+            owner_id: Optional[str] = None,
+            cursor: Optional[str] = None,
+    ) -> Dict:
+        """Return one page of `list_worlds` and the cursor for the page after it.
 
-            # Qualified with g., because generator_worlds carries columns of
-            # the same names and the join would otherwise be ambiguous.
-            created_at_select = "g.created_at" if has_created_at else "NULL AS created_at"
-            updated_at_select = "g.updated_at" if has_updated_at else "NULL AS updated_at"
-            if has_updated_at and has_created_at:
-                order_by = "COALESCE(g.updated_at, g.created_at) DESC"
-            elif has_updated_at:
-                order_by = "g.updated_at DESC"
-            elif has_created_at:
-                order_by = "g.created_at DESC"
-            else:
-                order_by = "g.rowid DESC"
+        Pages are keyed on the stored (sort_key, id) of the last row rather
+        than an offset, so every page is the same short index range scan. A
+        World edited while someone pages moves to the front of the feed, and
+        can be missed or seen twice by that reader, as with any keyset feed.
 
+        `next_cursor` is None on the last page. Raises ValueError for a cursor
+        this method did not issue.
+        """
+        limit = max(1, min(limit, 50))
+        after = self.decode_world_cursor(cursor) if cursor else None
+
+        def _list(conn, limit, local_dev, owner_id):
+            schema = self._schema_capabilities(conn)
             if owner_id is not None:
-                if not has_owner_id:
-                    return []
-                where_clause = "g.owner_id = ?"
+                if not schema.has_column("generators", "owner_id"):
+                    return {"worlds": [], "next_cursor": None}
+                scope = "owner"
                 params = (owner_id,)
-            elif local_dev or not has_visibility:
-                where_clause = "g.visibility != 'private'" if has_visibility else "1=1"
+            elif local_dev or not schema.has_column("generators", "visibility"):
+                scope = "listed"
                 params = ()
             else:
-                where_clause = "g.visibility = 'public'"
+                scope = "public"
                 params = ()
 
-            owner_id_select = "g.owner_id" if has_owner_id else "NULL AS owner_id"
-            visibility_select = "g.visibility" if "visibility" in columns else "'unlisted' AS visibility"
-            moderation_status_select = (
-                "g.moderation_status"
-                if has_moderation_status
-                else "'not_requested' AS moderation_status"
-            )
-            moderation_reason_select = (
-                "g.moderation_reason"
-                if has_moderation_reason
-                else "NULL AS moderation_reason"
-            )
-            moderation_model_select = (
-                "g.moderation_model"
-                if has_moderation_model
-                else "NULL AS moderation_model"
-            )
-            moderation_confidence_select = (
-                "g.moderation_confidence"
-                if has_moderation_confidence
-                else "NULL AS moderation_confidence"
-            )
-            moderation_categories_select = (
-                "g.moderation_categories"
-                if has_moderation_categories
-                else "'[]' AS moderation_categories"
-            )
-            public_requested_at_select = (
-                "g.public_requested_at"
-                if has_public_requested_at
-                else "NULL AS public_requested_at"
-            )
-            public_review_after_select = (
-                "g.public_review_after"
-                if has_public_review_after
-                else "NULL AS public_review_after"
-            )
-            public_reviewed_at_select = (
-                "g.public_reviewed_at"
-                if has_public_reviewed_at
-                else "NULL AS public_reviewed_at"
-            )
-
-            # Databases predating world snapshots have no generator_worlds
-            # table at all, so the join has to be conditional the same way every
-            # column check above is.
-            cur.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name='generator_worlds'"
-            )
-            has_worlds_table = cur.fetchone() is not None
-            if has_worlds_table:
-                manifest_select = "w.visual_manifest"
-                manifest_join = "LEFT JOIN generator_worlds w ON w.generator_id = g.id"
-            else:
-                manifest_select = "NULL AS visual_manifest"
-                manifest_join = ""
+            cur = conn.cursor()
+            if schema.has_table("world_summaries"):
+                keyset = after is not None
+                cur.execute(
+                    schema.sql(
+                        ("world_summaries", scope, keyset),
+                        lambda: self._world_summaries_sql(scope, keyset),
+                    ),
+                    params + (after or ()) + (limit + 1,),
+                )
+                rows = cur.fetchall()
+                next_cursor = None
+                if len(rows) > limit:
+                    rows = rows[:limit]
+                    next_cursor = self.encode_world_cursor(rows[-1][24], rows[-1][0])
+                return {
+                    "worlds": [self._world_from_summary_row(row) for row in rows],
+                    "next_cursor": next_cursor,
+                }
 
+            # Databases that have not been through init_db since summaries
+            # were introduced are listed from the source rows instead, as a
+            # single page.
+            if after is not None:
+                return {"worlds": [], "next_cursor": None}
             cur.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name='world_metrics'"
+                schema.sql(("list_worlds", scope), lambda: self._list_worlds_sql(schema, scope)),
+                params + (limit,),
             )
-            has_metrics_table = cur.fetchone() is not None
-            if has_metrics_table:
-                metrics_select = """
-                    COALESCE(m.play_count, 0),
-                    COALESCE(m.completion_count, 0),
-                    COALESCE(m.unique_completer_count, 0)
-                """
-                metrics_join = "LEFT JOIN world_metrics m ON m.generator_id = g.id"
-            else:
-                metrics_select = "0, 0, 0"
-                metrics_join = ""
-
-            # Left join so a World without art still lists; the gallery falls
-            # back to a text card for those.
-            cur.execute(f"""
-                SELECT g.id, g.theme_desc, g.theme_desc_better, g.language,
-                       g.player_defs, g.item_defs, g.enemy_defs, g.celltype_defs,
-                       {created_at_select}, {updated_at_select},
-                       {owner_id_select}, {visibility_select},
-                       {moderation_status_select}, {moderation_reason_select},
-                       {moderation_model_select}, {moderation_confidence_select},
-                       {moderation_categories_select}, {public_requested_at_select},
-                       {public_review_after_select}, {public_reviewed_at_select},
-                       {manifest_select}, {metrics_select}
-                FROM generators g
-                {manifest_join}
-                {metrics_join}
-                WHERE {where_clause}
-                ORDER BY {order_by}
-                LIMIT ?
-            """, params + (limit,))
 
             worlds = []
             for row in cur.fetchall():
-                theme_desc = row[1] or ""
-                theme_desc_better = row[2] or theme_desc
-                title_source = theme_desc_better.strip() or theme_desc.strip()
-                title = title_source.splitlines()[0][:120] if title_source else row[0]
-
                 worlds.append({
                     "id": row[0],
-                    "title": title,
-                    "theme": theme_desc,
+                    "title": self._world_title(row[0], row[1], row[2]),
+                    "theme": row[1] or "",
                     "language": row[3],
                     "player_count": self._json_list_size(row[4]),
                     "item_count": self._json_list_size(row[5]),
@@ -1443,9 +3858,286 @@ class DatabaseManager:
                     "unique_completer_count": int(row[23] or 0),
                 })
 
-            return worlds
+            return {"worlds": worlds, "next_cursor": None}
+
+        return self._execute(_list, limit, local_dev, owner_id, readonly=True)
+
+    @staticmethod
+    def encode_world_cursor(sort_key: str, generator_id: str) -> str:
+        raw = json.dumps([sort_key, generator_id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_world_cursor(cursor: str) -> Tuple[str, str]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            value = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        except (ValueError, UnicodeError, binascii.Error):
+            raise ValueError("Invalid world cursor")
+        if (
+            not isinstance(value, list)
+            or len(value) != 2
+            or not all(isinstance(part, str) for part in value)
+        ):
+            raise ValueError("Invalid world cursor")
+        return value[0], value[1]
+
+    def search_worlds_page(
+            self,
+            query: str,
+            limit: int = 20,
+            local_dev: bool = False,
+            owner_id: Optional[str] = None,
+            cursor: Optional[str] = None,
+    ) -> Dict:
+        """Return one page of Worlds matching `query`, best match first.
+
+        Titles and themes are searched in every language a World has been
+        saved or translated in, and the visibility rules are those of
+        `list_worlds_page`. Ranking considers the newest
+        WORLD_SEARCH_CANDIDATES matches of each index, which bounds the cost
+        of a query matching most Worlds. Pages are keyed on the (rank, id) of
+        the last row. Ranks shift slightly as Worlds are added, so a World can
+        move across a page boundary between requests.
+
+        `next_cursor` is None on the last page. Raises ValueError for a cursor
+        this method did not issue.
+        """
+        limit = max(1, min(limit, 50))
+        after = None
+        if cursor:
+            rank, generator_id = self.decode_world_cursor(cursor)
+            after = (float(rank), generator_id)
+        matches = {
+            table: self._world_search_match(query, trigram=(table == "world_search_cjk"))
+            for table in self.WORLD_SEARCH_TABLES
+        }
+        tables = tuple(table for table, match in matches.items() if match)
+
+        def _search(conn):
+            schema = self._schema_capabilities(conn)
+            if not tables or not schema.has_table("world_search_docs"):
+                return {"worlds": [], "next_cursor": None}
+            if owner_id is not None:
+                scope, params = "owner", (owner_id,)
+            elif local_dev:
+                scope, params = "listed", ()
+            else:
+                scope, params = "public", ()
+
+            keyset = after is not None
+            rows = conn.execute(
+                schema.sql(
+                    ("world_search", scope, tables, keyset),
+                    lambda: self._world_search_sql(scope, tables, keyset),
+                ),
+                tuple(matches[table] for table in tables) + params + (after or ()) + (limit + 1,),
+            ).fetchall()
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = self.encode_world_cursor(repr(rows[-1][24]), rows[-1][0])
+            return {
+                "worlds": [self._world_from_summary_row(row) for row in rows],
+                "next_cursor": next_cursor,
+            }
+
+        return self._execute(_search, readonly=True)
+
+    @staticmethod
+    def _world_search_match(query: str, trigram: bool = False) -> Optional[str]:
+        """Turn free text into an FTS5 query matching every word, or None.
+
+        Words are quoted, so nothing the user types is read as FTS5 syntax.
+        A last word of 3+ characters also matches as a prefix, for
+        search-as-you-type; shorter prefixes expand to too many words to be
+        worth it. Trigram indexes match substrings anyway, but only of 3+
+        characters.
+        """
+        terms = re.findall(r"\w+", query or "")[:8]
+        if trigram:
+            terms = [term for term in terms if len(term) >= 3]
+        if not terms:
+            return None
+        match = " ".join(f'"{term}"' for term in terms)
+        return match + "*" if not trigram and len(terms[-1]) >= 3 else match
+
+    @staticmethod
+    def _world_search_sql(scope: str, tables: Sequence[str], keyset: bool = False) -> str:
+        # Title matches weigh ten times theme matches. bm25 is lower-is-better.
+        # Only the newest matches of each index are ranked: FTS5 can stop
+        # early walking rowids newest first, so a word in most Worlds costs no
+        # more than a rare one, but matches past the window are not returned.
+        hits = " UNION ALL ".join(
+            f"SELECT * FROM (SELECT rowid AS doc_id, bm25({table}, 10.0, 1.0) AS rank "
+            f"FROM {table} WHERE {table} MATCH ? "
+            f"ORDER BY rowid DESC LIMIT {DatabaseManager.WORLD_SEARCH_CANDIDATES})"
+            for table in tables
+        )
+        where_clause = DatabaseManager._world_scope_where(scope)
+        if keyset:
+            where_clause += " AND (b.rank, s.generator_id) > (?, ?)"
+        return f"""
+            WITH best AS (
+                SELECT doc_id, MIN(rank) AS rank
+                FROM ({hits})
+                GROUP BY doc_id
+            )
+            SELECT {DatabaseManager._WORLD_SUMMARY_COLUMNS},
+                   b.rank
+            FROM best b
+            JOIN world_search_docs d ON d.doc_id = b.doc_id
+            JOIN world_summaries s ON s.generator_id = d.generator_id
+            LEFT JOIN world_metrics m ON m.generator_id = s.generator_id
+            WHERE {where_clause}
+            ORDER BY b.rank, s.generator_id
+            LIMIT ?
+        """
+
+    # What _world_from_summary_row reads, from world_summaries s joined to
+    # world_metrics m.
+    _WORLD_SUMMARY_COLUMNS = """
+                   s.generator_id, s.title, s.theme, s.language,
+                   s.player_count, s.item_count, s.enemy_count, s.terrain_count,
+                   s.created_at, s.updated_at, s.owner_id, s.visibility,
+                   s.moderation_status, s.moderation_reason, s.moderation_model,
+                   s.moderation_confidence, s.moderation_categories,
+                   s.public_requested_at, s.public_review_after, s.public_reviewed_at,
+                   s.cover_url,
+                   COALESCE(m.play_count, 0),
+                   COALESCE(m.completion_count, 0),
+                   COALESCE(m.unique_completer_count, 0)"""
+
+    @staticmethod
+    def _world_scope_where(scope: str) -> str:
+        if scope == "owner":
+            return "s.owner_id = ?"
+        if scope == "listed":
+            return "s.visibility IN ('public', 'unlisted')"
+        return "s.visibility = 'public'"
+
+    @staticmethod
+    def _world_summaries_sql(scope: str, keyset: bool = False) -> str:
+        where_clause = DatabaseManager._world_scope_where(scope)
+        if keyset:
+            where_clause += " AND (s.sort_key, s.generator_id) < (?, ?)"
+
+        return f"""
+            SELECT {DatabaseManager._WORLD_SUMMARY_COLUMNS},
+                   s.sort_key
+            FROM world_summaries s
+            LEFT JOIN world_metrics m ON m.generator_id = s.generator_id
+            WHERE {where_clause}
+            ORDER BY s.sort_key DESC, s.generator_id DESC
+            LIMIT ?
+        """
 
-        return self._execute_with_retry(_list, limit, local_dev, owner_id)
+    def _world_from_summary_row(self, row) -> Dict:
+        return {
+            "id": row[0],
+            "title": row[1],
+            "theme": row[2],
+            "language": row[3],
+            "player_count": row[4],
+            "item_count": row[5],
+            "enemy_count": row[6],
+            "terrain_count": row[7],
+            "created_at": row[8],
+            "updated_at": row[9],
+            "owner_id": row[10],
+            "visibility": row[11],
+            "moderation_status": row[12],
+            "moderation_reason": row[13],
+            "moderation_model": row[14],
+            "moderation_confidence": row[15],
+            "moderation_categories": self._json_list_value(row[16]),
+            "public_requested_at": row[17],
+            "public_review_after": row[18],
+            "public_reviewed_at": row[19],
+            "cover_url": row[20],
+            "play_count": int(row[21] or 0),
+            "completion_count": int(row[22] or 0),
+            "unique_completer_count": int(row[23] or 0),
+        }
+
+    @staticmethod
+    def _list_worlds_sql(schema: SchemaCapabilities, scope: str) -> str:
+        """Build the gallery query for this database's layout and listing scope."""
+        def generators_column(name: str, fallback: str) -> str:
+            # Qualified with g., because generator_worlds carries columns of
+            # the same names and the join would otherwise be ambiguous.
+            if schema.has_column("generators", name):
+                return f"g.{name}"
+            return f"{fallback} AS {name}"
+
+        has_created_at = schema.has_column("generators", "created_at")
+        has_updated_at = schema.has_column("generators", "updated_at")
+        if has_updated_at and has_created_at:
+            order_by = "COALESCE(g.updated_at, g.created_at) DESC"
+        elif has_updated_at:
+            order_by = "g.updated_at DESC"
+        elif has_created_at:
+            order_by = "g.created_at DESC"
+        else:
+            order_by = "g.rowid DESC"
+
+        if scope == "owner":
+            where_clause = "g.owner_id = ?"
+        elif scope == "listed":
+            where_clause = (
+                "g.visibility != 'private'"
+                if schema.has_column("generators", "visibility")
+                else "1=1"
+            )
+        else:
+            where_clause = "g.visibility = 'public'"
+
+        # Databases predating world snapshots have no generator_worlds table
+        # at all, so the join has to be conditional the same way every column
+        # is.
+        if schema.has_table("generator_worlds"):
+            manifest_select = "w.visual_manifest"
+            manifest_join = "LEFT JOIN generator_worlds w ON w.generator_id = g.id"
+        else:
+            manifest_select = "NULL AS visual_manifest"
+            manifest_join = ""
+
+        if schema.has_table("world_metrics"):
+            metrics_select = """
+                COALESCE(m.play_count, 0),
+                COALESCE(m.completion_count, 0),
+                COALESCE(m.unique_completer_count, 0)
+            """
+            metrics_join = "LEFT JOIN world_metrics m ON m.generator_id = g.id"
+        else:
+            metrics_select = "0, 0, 0"
+            metrics_join = ""
+
+        # Left join so a World without art still lists; the gallery falls
+        # back to a text card for those.
+        return f"""
+            SELECT g.id, g.theme_desc, g.theme_desc_better, g.language,
+                   g.player_defs, g.item_defs, g.enemy_defs, g.celltype_defs,
+                   {generators_column("created_at", "NULL")},
+                   {generators_column("updated_at", "NULL")},
+                   {generators_column("owner_id", "NULL")},
+                   {generators_column("visibility", "'unlisted'")},
+                   {generators_column("moderation_status", "'not_requested'")},
+                   {generators_column("moderation_reason", "NULL")},
+                   {generators_column("moderation_model", "NULL")},
+                   {generators_column("moderation_confidence", "NULL")},
+                   {generators_column("moderation_categories", "'[]'")},
+                   {generators_column("public_requested_at", "NULL")},
+                   {generators_column("public_review_after", "NULL")},
+                   {generators_column("public_reviewed_at", "NULL")},
+                   {manifest_select}, {metrics_select}
+            FROM generators g
+            {manifest_join}
+            {metrics_join}
+            WHERE {where_clause}
+            ORDER BY {order_by}
+            LIMIT ?
+        """
 
     @staticmethod
     def _cover_url_from_manifest(raw_manifest: Optional[str]) -> Optional[str]:
@@ -1471,10 +4163,9 @@ class DatabaseManager:
     def get_user_world_stats(self, owner_id: str) -> Dict:
         """Return lightweight dashboard stats for Worlds owned by a user."""
         def _stats(conn, owner_id):
+            schema = self._schema_capabilities(conn)
             cur = conn.cursor()
-            cur.execute("PRAGMA table_info(generators)")
-            columns = {row[1] for row in cur.fetchall()}
-            if "owner_id" not in columns:
+            if not schema.has_column("generators", "owner_id"):
                 return {
                     "total_worlds": 0,
                     "private_worlds": 0,
@@ -1487,12 +4178,19 @@ class DatabaseManager:
                     "creator_reward_credits": 0,
                 }
 
-            visibility_select = "visibility" if "visibility" in columns else "'unlisted' AS visibility"
-            cur.execute(f"""
-                SELECT {visibility_select}, player_defs, item_defs, enemy_defs, celltype_defs
-                FROM generators
-                WHERE owner_id = ?
-            """, (owner_id,))
+            def build_sql():
+                visibility_select = (
+                    "visibility"
+                    if schema.has_column("generators", "visibility")
+                    else "'unlisted' AS visibility"
+                )
+                return f"""
+                    SELECT {visibility_select}, player_defs, item_defs, enemy_defs, celltype_defs
+                    FROM generators
+                    WHERE owner_id = ?
+                """
+
+            cur.execute(schema.sql("user_world_stats", build_sql), (owner_id,))
 
             stats = {
                 "total_worlds": 0,
@@ -1522,12 +4220,7 @@ class DatabaseManager:
                     + self._json_mapping_size(row[4])
                 )
 
-            has_metrics = cur.execute("""
-                SELECT 1
-                FROM sqlite_master
-                WHERE type = 'table' AND name = 'world_metrics'
-            """).fetchone()
-            if has_metrics:
+            if schema.has_table("world_metrics"):
                 metrics = cur.execute("""
                     SELECT
                         COALESCE(SUM(m.play_count), 0),
@@ -1552,10 +4245,10 @@ class DatabaseManager:
 
             return stats
 
-        return self._execute_with_retry(_stats, owner_id)
+        return self._execute(_stats, owner_id, readonly=True)
 
     @staticmethod
-    def _credit_balance_from_connection(conn, user_id: str) -> Dict[str, int]:
+    def _credit_balance_from_ledger(conn, user_id: str) -> Dict[str, int]:
         row = conn.execute("""
             SELECT
                 COALESCE(SUM(CASE WHEN bucket = 'promo' THEN amount ELSE 0 END), 0),
@@ -1567,12 +4260,121 @@ class DatabaseManager:
         paid = int(row[1] or 0)
         return {"promo": promo, "paid": paid, "total": promo + paid}
 
+    @classmethod
+    def _credit_balance_from_connection(cls, conn, user_id: str) -> Dict[str, int]:
+        row = conn.execute(
+            "SELECT promo, paid FROM credit_balances WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        if row is None:
+            # Users with no entry since balances were materialized; their
+            # next ledger write creates the row.
+            return cls._credit_balance_from_ledger(conn, user_id)
+        promo = int(row[0])
+        paid = int(row[1])
+        return {"promo": promo, "paid": paid, "total": promo + paid}
+
+    @classmethod
+    def _apply_credit_balance_delta(cls, conn, user_id: str, bucket: str, amount: int) -> None:
+        """Move the materialized balance by a ledger entry just inserted."""
+        if bucket not in {"promo", "paid"}:
+            raise ValueError("Credit bucket must be 'promo' or 'paid'")
+        cur = conn.execute(f"""
+            UPDATE credit_balances
+            SET {bucket} = {bucket} + ?, updated_at = CURRENT_TIMESTAMP
+            WHERE user_id = ?
+        """, (amount, user_id))
+        if cur.rowcount == 0:
+            # No row yet: derive it from the ledger, which already holds
+            # this entry, rather than starting from zero.
+            balance = cls._credit_balance_from_ledger(conn, user_id)
+            conn.execute("""
+                INSERT INTO credit_balances (user_id, promo, paid)
+                VALUES (?, ?, ?)
+            """, (user_id, balance["promo"], balance["paid"]))
+
+    @staticmethod
+    def _credit_balance_drift(conn) -> Dict:
+        ledger = {
+            row[0]: (int(row[1] or 0), int(row[2] or 0))
+            for row in conn.execute("""
+                SELECT user_id,
+                       SUM(CASE WHEN bucket = 'promo' THEN amount ELSE 0 END),
+                       SUM(CASE WHEN bucket = 'paid' THEN amount ELSE 0 END)
+                FROM credit_ledger
+                GROUP BY user_id
+            """).fetchall()
+        }
+        stored = {
+            row[0]: (int(row[1]), int(row[2]))
+            for row in conn.execute(
+                "SELECT user_id, promo, paid FROM credit_balances"
+            ).fetchall()
+        }
+
+        drift = []
+        for user_id, (promo, paid) in sorted(stored.items()):
+            expected_promo, expected_paid = ledger.get(user_id, (0, 0))
+            if (promo, paid) != (expected_promo, expected_paid):
+                drift.append({
+                    "user_id": user_id,
+                    "stored": {"promo": promo, "paid": paid},
+                    "ledger": {"promo": expected_promo, "paid": expected_paid},
+                })
+
+        return {
+            "checked": len(stored),
+            "unmaterialized": len(set(ledger) - set(stored)),
+            "drift": drift,
+            "fixed": 0,
+        }
+
+    def reconcile_credit_balances(self, fix: bool = False) -> Dict:
+        """Compare every materialized balance with a fresh sum of the ledger.
+
+        Returns the users whose stored balance has drifted. The check reads
+        on a reader, so credit writes carry on meanwhile. With `fix` and
+        drift found, the writer compares again and rewrites the drifted rows
+        from the ledger in the same transaction.
+        """
+        def _report(conn):
+            # One read transaction, so both sides come from the same snapshot.
+            conn.execute("BEGIN")
+            try:
+                return self._credit_balance_drift(conn)
+            finally:
+                conn.rollback()
+
+        def _fix(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            report = self._credit_balance_drift(conn)
+            for entry in report["drift"]:
+                conn.execute("""
+                    UPDATE credit_balances
+                    SET promo = ?, paid = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE user_id = ?
+                """, (
+                    entry["ledger"]["promo"],
+                    entry["ledger"]["paid"],
+                    entry["user_id"],
+                ))
+            conn.commit()
+            report["fixed"] = len(report["drift"])
+            return report
+
+        report = self._execute(_report, readonly=True, database="accounts")
+        if fix and report["drift"]:
+            report = self._execute(_fix, database="accounts")
+        return report
+
     def get_credit_balance(self, user_id: str) -> Dict[str, int]:
-        return self._execute_with_retry(
+        return self._execute(
             lambda conn, target_user_id: self._credit_balance_from_connection(
                 conn, target_user_id
             ),
             user_id,
+            readonly=True,
+            database="accounts",
         )
 
     def record_verified_store_purchase(
@@ -1654,6 +4456,7 @@ class DatabaseManager:
                 str(uuid.uuid4()), operation_key, user_id, credits,
                 purchase_id, metadata_json,
             ))
+            self._apply_credit_balance_delta(conn, user_id, "paid", credits)
             balance = self._credit_balance_from_connection(conn, user_id)
             conn.commit()
             return {
@@ -1666,7 +4469,7 @@ class DatabaseManager:
                 "balance": balance,
             }
 
-        return self._execute_with_retry(_record)
+        return self._execute(_record, database="accounts")
 
     def grant_credits(
             self,
@@ -1704,12 +4507,13 @@ class DatabaseManager:
                     reference_type, reference_id,
                     json.dumps(metadata, sort_keys=True) if metadata else None,
                 ))
+                self._apply_credit_balance_delta(conn, user_id, bucket, amount)
 
             balance = self._credit_balance_from_connection(conn, user_id)
             conn.commit()
             return {"applied": applied, "amount": amount, "balance": balance}
 
-        return self._execute_with_retry(_grant)
+        return self._execute(_grant, database="accounts")
 
     def spend_credits(
             self,
@@ -1779,6 +4583,7 @@ class DatabaseManager:
                     -bucket_amount, kind, reference_type, reference_id,
                     metadata_json,
                 ))
+                self._apply_credit_balance_delta(conn, user_id, bucket, -bucket_amount)
 
             updated_balance = self._credit_balance_from_connection(conn, user_id)
             conn.commit()
@@ -1787,7 +4592,7 @@ class DatabaseManager:
                 "operation_key": operation_key, "balance": updated_balance,
             }
 
-        return self._execute_with_retry(_spend)
+        return self._execute(_spend, database="accounts")
 
     def refund_credit_spend(
             self,
@@ -1838,6 +4643,7 @@ class DatabaseManager:
                     str(uuid.uuid4()), refund_operation_key, user_id, bucket,
                     amount, kind, reference_type, reference_id,
                 ))
+                self._apply_credit_balance_delta(conn, user_id, bucket, amount)
 
             balance = self._credit_balance_from_connection(conn, user_id)
             conn.commit()
@@ -1846,7 +4652,7 @@ class DatabaseManager:
                 "operation_key": refund_operation_key, "balance": balance,
             }
 
-        return self._execute_with_retry(_refund)
+        return self._execute(_refund, database="accounts")
 
     @staticmethod
     def _world_metrics_from_connection(conn, generator_id: str) -> Dict[str, int]:
@@ -1868,9 +4674,11 @@ class DatabaseManager:
         }
 
     def get_world_metrics(self, generator_id: str) -> Dict[str, int]:
-        return self._execute_with_retry(
+        return self._execute(
             lambda conn, world_id: self._world_metrics_from_connection(conn, world_id),
             generator_id,
+            readonly=True,
+            database="accounts",
         )
 
     def record_world_play_start(
@@ -1901,7 +4709,451 @@ class DatabaseManager:
             conn.commit()
             return {"applied": applied, **metrics}
 
-        return self._execute_with_retry(_record)
+        return self._execute(_record, database="accounts")
+
+    def queue_world_play_start(
+            self,
+            session_id: str,
+            generator_id: str,
+            user_id: Optional[str],
+    ) -> None:
+        """Count a run without waiting for the write.
+
+        Applied with other queued starts a moment later, by the same rules as
+        `record_world_play_start`. Nothing credit-affecting is deferred: a
+        completion recorded first inserts the session itself, and the queued
+        start then finds it and counts nothing.
+        """
+        self.play_starts.submit((session_id, generator_id, user_id))
+
+    def _record_play_starts(self, starts: List[Tuple[str, str, Optional[str]]]) -> None:
+        def _record(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            plays = {}
+            for session_id, generator_id, user_id in starts:
+                cur = conn.execute("""
+                    INSERT OR IGNORE INTO world_play_sessions (
+                        session_id, generator_id, user_id
+                    ) VALUES (?, ?, ?)
+                """, (session_id, generator_id, user_id))
+                if cur.rowcount > 0:
+                    plays[generator_id] = plays.get(generator_id, 0) + 1
+            conn.executemany("""
+                INSERT INTO world_metrics (generator_id, play_count)
+                VALUES (?, ?)
+                ON CONFLICT(generator_id) DO UPDATE SET
+                    play_count = play_count + excluded.play_count,
+                    updated_at = CURRENT_TIMESTAMP
+            """, plays.items())
+            conn.commit()
+
+        self._execute(_record, database="accounts")
+
+    def hibernate_game_sessions(self, sessions: Sequence[Dict]) -> int:
+        """Save runs to resume later, replacing any saved copy; returns how many.
+
+        Each dict has session_id, user_id, generator_id, created_at and
+        last_accessed (Unix seconds), and state: whatever `Game.hibernate`
+        returned, stored as a JSON column. All are written in one transaction.
+        """
+        def _save(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("""
+                INSERT INTO game_sessions (
+                    session_id, user_id, generator_id, state, created_at, last_accessed
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    user_id = excluded.user_id,
+                    generator_id = excluded.generator_id,
+                    state = excluded.state,
+                    created_at = excluded.created_at,
+                    last_accessed = excluded.last_accessed,
+                    hibernated_at = CURRENT_TIMESTAMP
+            """, [
+                (
+                    session["session_id"],
+                    session.get("user_id"),
+                    session.get("generator_id"),
+                    encode_json_column(session["state"]),
+                    session["created_at"],
+                    session["last_accessed"],
+                )
+                for session in sessions
+            ])
+            conn.commit()
+            return len(sessions)
+
+        if not sessions:
+            return 0
+        return self._execute(_save, database="accounts")
+
+    def load_game_session(self, session_id: str) -> Optional[Dict]:
+        """A hibernated run, in the shape `hibernate_game_sessions` took, or None."""
+        def _load(conn):
+            row = conn.execute("""
+                SELECT session_id, user_id, generator_id, state, created_at, last_accessed
+                FROM game_sessions
+                WHERE session_id = ?
+            """, (session_id,)).fetchone()
+            if row is None:
+                return None
+            return {
+                "session_id": row[0],
+                "user_id": row[1],
+                "generator_id": row[2],
+                "state": decode_json_column(row[3]),
+                "created_at": row[4],
+                "last_accessed": row[5],
+            }
+
+        return self._execute(_load, readonly=True, database="accounts")
+
+    def delete_game_session(self, session_id: str) -> bool:
+        """Drop a hibernated run, once resumed or expired."""
+        def _delete(conn):
+            cur = conn.execute("DELETE FROM game_sessions WHERE session_id = ?", (session_id,))
+            conn.commit()
+            return cur.rowcount > 0
+
+        return self._execute(_delete, database="accounts")
+
+    # -- session directory --------------------------------------------------
+    #
+    # With several worker processes, each live run is held by one of them. A
+    # session_directory row names that worker (NULL when none holds it: the
+    # run is hibernated, or a new session is waiting for its first socket).
+    # A worker that needs a run held elsewhere flags the row, and the holder
+    # hibernates and releases it; see GameSessionManager.
+
+    def heartbeat_session_worker(self, worker_id: str) -> None:
+        """Note that `worker_id` is alive."""
+        def _beat(conn):
+            conn.execute("""
+                INSERT INTO session_workers (worker_id, heartbeat_at) VALUES (?, ?)
+                ON CONFLICT(worker_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at
+            """, (worker_id, time.time()))
+            conn.commit()
+
+        self._execute(_beat, database="accounts")
+
+    def remove_session_worker(self, worker_id: str) -> None:
+        """A worker leaving: drop it, the runs it still holds and its leases.
+
+        Runs it hibernated were released first, so what it still holds did
+        not survive it.
+        """
+        def _remove(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM session_directory WHERE worker_id = ?", (worker_id,))
+            conn.execute("DELETE FROM task_leases WHERE worker_id = ?", (worker_id,))
+            conn.execute("DELETE FROM session_workers WHERE worker_id = ?", (worker_id,))
+            conn.commit()
+
+        self._execute(_remove, database="accounts")
+
+    def publish_directory_session(
+            self,
+            session_id: str,
+            worker_id: Optional[str],
+            status: str,
+            user_id: Optional[str] = None,
+            generator_id: Optional[str] = None,
+            session: Optional[Dict] = None,
+    ) -> None:
+        """Record a session, held by `worker_id` or by none.
+
+        `session` holds what another worker needs to take it over, such as a
+        pending creation request; it is JSON-encoded.
+        """
+        def _publish(conn):
+            conn.execute("""
+                INSERT INTO session_directory (
+                    session_id, worker_id, status, user_id, generator_id, session, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    worker_id = excluded.worker_id,
+                    status = excluded.status,
+                    user_id = excluded.user_id,
+                    generator_id = excluded.generator_id,
+                    session = excluded.session,
+                    handoff_requested_at = NULL,
+                    updated_at = excluded.updated_at
+            """, (
+                session_id, worker_id, status, user_id, generator_id,
+                json.dumps(session) if session is not None else None, time.time(),
+            ))
+            conn.commit()
+
+        self._execute(_publish, database="accounts")
+
+    def get_directory_session(self, session_id: str) -> Optional[Dict]:
+        """A session's directory entry, with its worker's last heartbeat, or None."""
+        def _get(conn):
+            row = conn.execute("""
+                SELECT d.session_id, d.worker_id, d.status, d.user_id, d.generator_id,
+                       d.session, d.handoff_requested_at, d.updated_at, w.heartbeat_at
+                FROM session_directory d
+                LEFT JOIN session_workers w ON w.worker_id = d.worker_id
+                WHERE d.session_id = ?
+            """, (session_id,)).fetchone()
+            if row is None:
+                return None
+            return {
+                "session_id": row[0],
+                "worker_id": row[1],
+                "status": row[2],
+                "user_id": row[3],
+                "generator_id": row[4],
+                "session": json.loads(row[5]) if row[5] is not None else None,
+                "handoff_requested_at": row[6],
+                "updated_at": row[7],
+                "worker_heartbeat_at": row[8],
+            }
+
+        return self._execute(_get, readonly=True, database="accounts")
+
+    def claim_directory_session(
+            self,
+            session_id: str,
+            worker_id: str,
+            previous_worker_id: Optional[str],
+    ) -> bool:
+        """Take a session for `worker_id` if `previous_worker_id` still holds it."""
+        def _claim(conn):
+            cur = conn.execute("""
+                UPDATE session_directory
+                SET worker_id = ?, handoff_requested_at = NULL, updated_at = ?
+                WHERE session_id = ? AND worker_id IS ?
+            """, (worker_id, time.time(), session_id, previous_worker_id))
+            conn.commit()
+            return cur.rowcount > 0
+
+        return self._execute(_claim, database="accounts")
+
+    def request_session_handoff(self, session_id: str, worker_id: str) -> bool:
+        """Ask `worker_id` to give a session up; False if it no longer holds it."""
+        def _request(conn):
+            cur = conn.execute("""
+                UPDATE session_directory SET handoff_requested_at = ?
+                WHERE session_id = ? AND worker_id = ?
+            """, (time.time(), session_id, worker_id))
+            conn.commit()
+            return cur.rowcount > 0
+
+        return self._execute(_request, database="accounts")
+
+    def list_session_handoffs(self, worker_id: str, since: float) -> List[str]:
+        """Sessions `worker_id` holds that another worker asked for after `since`."""
+        def _list(conn):
+            return [row[0] for row in conn.execute("""
+                SELECT session_id FROM session_directory
+                WHERE worker_id = ? AND handoff_requested_at > ?
+            """, (worker_id, since))]
+
+        return self._execute(_list, readonly=True, database="accounts")
+
+    def release_directory_sessions(self, worker_id: str, session_ids: Sequence[str]) -> int:
+        """Let go of sessions `worker_id` holds, for any worker to claim."""
+        def _release(conn):
+            cur = conn.executemany("""
+                UPDATE session_directory
+                SET worker_id = NULL, handoff_requested_at = NULL, updated_at = ?
+                WHERE session_id = ? AND worker_id = ?
+            """, [(now, session_id, worker_id) for session_id in session_ids])
+            conn.commit()
+            return cur.rowcount
+
+        now = time.time()
+        if not session_ids:
+            return 0
+        return self._execute(_release, database="accounts")
+
+    def delete_directory_sessions(self, session_ids: Sequence[str]) -> int:
+        """Forget sessions that ended."""
+        def _delete(conn):
+            cur = conn.executemany(
+                "DELETE FROM session_directory WHERE session_id = ?",
+                [(session_id,) for session_id in session_ids],
+            )
+            conn.commit()
+            return cur.rowcount
+
+        if not session_ids:
+            return 0
+        return self._execute(_delete, database="accounts")
+
+    def acquire_task_lease(self, name: str, worker_id: str, ttl_seconds: float) -> bool:
+        """Hold the lease on a singleton job for `ttl_seconds`, unless another worker does.
+
+        The holder renews by acquiring again; a lease that ran out goes to
+        whichever worker asks next.
+        """
+        def _acquire(conn):
+            now = time.time()
+            cur = conn.execute("""
+                INSERT INTO task_leases (name, worker_id, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    worker_id = excluded.worker_id,
+                    expires_at = excluded.expires_at
+                WHERE task_leases.worker_id = excluded.worker_id OR task_leases.expires_at <= ?
+            """, (name, worker_id, now + ttl_seconds, now))
+            conn.commit()
+            return cur.rowcount > 0
+
+        return self._execute(_acquire, database="accounts")
+
+    # -- forge jobs -------------------------------------------------------------
+    #
+    # A World forge runs as a job under ForgeSupervisor (forge_jobs.py). Its
+    # row holds the progress events sent so far as a JSON array, appended to
+    # in place, so a socket on any worker can replay them and follow on.
+
+    def create_forge_job(self, session_id: str, worker_id: str, user_id: Optional[str]) -> None:
+        """Start the record of a forge held by `worker_id`, replacing any earlier one."""
+        def _create(conn):
+            now = time.time()
+            conn.execute("""
+                INSERT INTO forge_jobs (
+                    session_id, worker_id, user_id, status, events, created_at, updated_at
+                ) VALUES (?, ?, ?, 'running', '[]', ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    worker_id = excluded.worker_id,
+                    user_id = excluded.user_id,
+                    status = 'running',
+                    events = '[]',
+                    cancel_requested_at = NULL,
+                    created_at = excluded.created_at,
+                    updated_at = excluded.updated_at
+            """, (session_id, worker_id, user_id, now, now))
+            conn.commit()
+
+        self._execute(_create, database="accounts")
+
+    def append_forge_job_event(
+            self,
+            session_id: str,
+            event: Dict,
+            status: Optional[str] = None,
+    ) -> bool:
+        """Add a progress event, and end the job with `status` if given.
+
+        Returns whether someone asked for the forge to be cancelled.
+        """
+        def _append(conn):
+            row = conn.execute("""
+                UPDATE forge_jobs
+                SET events = json_insert(events, '$[#]', json(?)),
+                    status = COALESCE(?, status),
+                    updated_at = ?
+                WHERE session_id = ?
+                RETURNING cancel_requested_at
+            """, (json.dumps(event), status, time.time(), session_id)).fetchone()
+            conn.commit()
+            return row is not None and row[0] is not None
+
+        return self._execute(_append, database="accounts")
+
+    def finish_forge_job(self, session_id: str, status: str) -> None:
+        """End a forge whose last event is already recorded."""
+        def _finish(conn):
+            conn.execute(
+                "UPDATE forge_jobs SET status = ?, updated_at = ? WHERE session_id = ?",
+                (status, time.time(), session_id),
+            )
+            conn.commit()
+
+        self._execute(_finish, database="accounts")
+
+    def get_forge_job(self, session_id: str) -> Optional[Dict]:
+        """A forge's record, with its worker's last heartbeat, or None."""
+        def _get(conn):
+            row = conn.execute("""
+                SELECT j.session_id, j.worker_id, j.user_id, j.status, j.events,
+                       j.cancel_requested_at, j.created_at, j.updated_at, w.heartbeat_at
+                FROM forge_jobs j
+                LEFT JOIN session_workers w ON w.worker_id = j.worker_id
+                WHERE j.session_id = ?
+            """, (session_id,)).fetchone()
+            if row is None:
+                return None
+            return {
+                "session_id": row[0],
+                "worker_id": row[1],
+                "user_id": row[2],
+                "status": row[3],
+                "events": json.loads(row[4]),
+                "cancel_requested_at": row[5],
+                "created_at": row[6],
+                "updated_at": row[7],
+                "worker_heartbeat_at": row[8],
+            }
+
+        return self._execute(_get, readonly=True, database="accounts")
+
+    def request_forge_job_cancel(self, session_id: str) -> bool:
+        """Flag a running forge for its worker to cancel; False if none is running."""
+        def _request(conn):
+            cur = conn.execute("""
+                UPDATE forge_jobs SET cancel_requested_at = ?
+                WHERE session_id = ? AND status = 'running'
+            """, (time.time(), session_id))
+            conn.commit()
+            return cur.rowcount > 0
+
+        return self._execute(_request, database="accounts")
+
+    def record_rate_limit_attempt(
+            self,
+            key: str,
+            attempted_at: float,
+            since: float,
+            max_attempts: Optional[int] = None,
+    ) -> List[float]:
+        """Record an attempt under `key`, unless `max_attempts` since `since` already are.
+
+        Returns the times of the earlier attempts after `since`, oldest first;
+        this one was recorded if there are fewer than `max_attempts` of them.
+        The older ones are dropped. One write, so workers counting the same
+        key at once cannot all take its last attempt.
+        """
+        def _record(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM rate_limit_attempts WHERE key = ? AND attempted_at <= ?",
+                (key, since),
+            )
+            recent = [row[0] for row in conn.execute("""
+                SELECT attempted_at FROM rate_limit_attempts
+                WHERE key = ?
+                ORDER BY attempted_at
+            """, (key,))]
+            if max_attempts is None or len(recent) < max_attempts:
+                conn.execute(
+                    "INSERT INTO rate_limit_attempts (key, attempted_at) VALUES (?, ?)",
+                    (key, attempted_at),
+                )
+            conn.commit()
+            return recent
+
+        return self._execute(_record, database="accounts")
+
+    def list_rate_limit_attempts(self, key: str, since: float) -> List[float]:
+        """Times of the attempts under `key` after `since`, oldest first."""
+        def _list(conn):
+            return [row[0] for row in conn.execute("""
+                SELECT attempted_at FROM rate_limit_attempts
+                WHERE key = ? AND attempted_at > ?
+                ORDER BY attempted_at
+            """, (key, since))]
+
+        return self._execute(_list, readonly=True, database="accounts")
+
+    def clear_rate_limit_attempts(self, key: str) -> None:
+        def _clear(conn):
+            conn.execute("DELETE FROM rate_limit_attempts WHERE key = ?", (key,))
+            conn.commit()
+
+        self._execute(_clear, database="accounts")
 
     def record_world_completion(
             self,
@@ -2039,6 +5291,9 @@ class DatabaseManager:
                         }, sort_keys=True),
                     ))
                     if milestone_cur.rowcount > 0:
+                        self._apply_credit_balance_delta(
+                            conn, owner_id, "promo", milestone_credits
+                        )
                         creator_credits_granted += milestone_credits
                         creator_milestones_reached.append({
                             "players": milestone_players,
@@ -2055,7 +5310,8 @@ class DatabaseManager:
                     WHERE user_id = ?
                       AND kind = 'play_completion_reward'
                       AND amount > 0
-                      AND DATE(created_at) = DATE('now')
+                      AND created_at >= DATE('now')
+                      AND created_at < DATE('now', '+1 day')
                 """, (user_id,)).fetchone()[0] or 0)
 
             if (
@@ -2075,6 +5331,7 @@ class DatabaseManager:
                     str(uuid.uuid4()), operation_key, user_id,
                     reward_amount, generator_id,
                 ))
+                self._apply_credit_balance_delta(conn, user_id, "promo", reward_amount)
                 reward_granted = True
                 credits_granted = reward_amount
                 daily_reward_count += 1
@@ -2106,7 +5363,7 @@ class DatabaseManager:
                 **metrics,
             }
 
-        return self._execute_with_retry(_record)
+        return self._execute(_record, database="accounts")
 
     def reserve_free_world_art_reroll(
             self,
@@ -2146,7 +5403,7 @@ class DatabaseManager:
             conn.commit()
             return attempt_id
 
-        return self._execute_with_retry(_reserve)
+        return self._execute(_reserve, database="accounts")
 
     def finish_world_art_reroll(self, attempt_id: str, succeeded: bool) -> bool:
         def _finish(conn):
@@ -2158,7 +5415,7 @@ class DatabaseManager:
             conn.commit()
             return cur.rowcount > 0
 
-        return self._execute_with_retry(_finish)
+        return self._execute(_finish, database="accounts")
 
     def get_free_world_art_rerolls_remaining(
             self,
@@ -2175,40 +5432,23 @@ class DatabaseManager:
             """, (generator_id, user_id)).fetchone()
             return 0 if row else 1
 
-        return self._execute_with_retry(_remaining)
+        return self._execute(_remaining, readonly=True, database="accounts")
 
     def list_users_with_world_counts(self, limit: int = 100) -> List[Dict]:
         """Return registered users with admin-safe world count metadata."""
         limit = max(1, min(limit, 500))
 
         def _list(conn, limit):
+            schema = self._schema_capabilities(conn)
             cur = conn.cursor()
-            cur.execute("PRAGMA table_info(users)")
-            user_columns = {row[1] for row in cur.fetchall()}
-            reset_required_select = (
-                "COALESCE(u.password_reset_required, 0)"
-                if "password_reset_required" in user_columns
-                else "0"
-            )
-            reset_marked_at_select = (
-                "u.password_reset_marked_at"
-                if "password_reset_marked_at" in user_columns
-                else "NULL"
-            )
-            created_at_select = "u.created_at" if "created_at" in user_columns else "NULL"
-
-            cur.execute("PRAGMA table_info(generators)")
-            generator_columns = {row[1] for row in cur.fetchall()}
-            has_owner_id = "owner_id" in generator_columns
-
-            if not has_owner_id:
-                cur.execute(f"""
-                    SELECT u.id, u.username, {created_at_select},
-                           {reset_required_select}, {reset_marked_at_select}
-                    FROM users u
-                    ORDER BY LOWER(u.username) ASC
-                    LIMIT ?
-                """, (limit,))
+            if not schema.has_column("generators", "owner_id"):
+                cur.execute(
+                    schema.sql(
+                        ("users_with_world_counts", False),
+                        lambda: self._users_with_world_counts_sql(schema, False),
+                    ),
+                    (limit,),
+                )
                 return [
                     {
                         "id": row[0],
@@ -2226,34 +5466,13 @@ class DatabaseManager:
                     for row in cur.fetchall()
                 ]
 
-            visibility_expr = (
-                "COALESCE(g.visibility, 'unlisted')"
-                if "visibility" in generator_columns
-                else "'unlisted'"
+            cur.execute(
+                schema.sql(
+                    ("users_with_world_counts", True),
+                    lambda: self._users_with_world_counts_sql(schema, True),
+                ),
+                (limit,),
             )
-            cur.execute(f"""
-                SELECT u.id, u.username, {created_at_select},
-                       {reset_required_select}, {reset_marked_at_select},
-                       COUNT(g.id) AS total_worlds,
-                       SUM(CASE
-                           WHEN g.id IS NOT NULL AND {visibility_expr} = 'private' THEN 1
-                           ELSE 0
-                       END) AS private_worlds,
-                       SUM(CASE
-                           WHEN g.id IS NOT NULL AND {visibility_expr} = 'unlisted' THEN 1
-                           ELSE 0
-                       END) AS unlisted_worlds,
-                       SUM(CASE
-                           WHEN g.id IS NOT NULL AND {visibility_expr} = 'public' THEN 1
-                           ELSE 0
-                       END) AS public_worlds
-                FROM users u
-                LEFT JOIN generators g ON g.owner_id = u.id
-                GROUP BY u.id, u.username, {created_at_select},
-                         {reset_required_select}, {reset_marked_at_select}
-                ORDER BY LOWER(u.username) ASC
-                LIMIT ?
-            """, (limit,))
 
             return [
                 {
@@ -2272,20 +5491,68 @@ class DatabaseManager:
                 for row in cur.fetchall()
             ]
 
-        return self._execute_with_retry(_list, limit)
+        return self._execute(_list, limit, readonly=True)
+
+    @staticmethod
+    def _users_with_world_counts_sql(schema: SchemaCapabilities, with_worlds: bool) -> str:
+        """Build the admin user listing for this database's layout."""
+        reset_required_select = (
+            "COALESCE(u.password_reset_required, 0)"
+            if schema.has_column("users", "password_reset_required")
+            else "0"
+        )
+        reset_marked_at_select = (
+            "u.password_reset_marked_at"
+            if schema.has_column("users", "password_reset_marked_at")
+            else "NULL"
+        )
+        created_at_select = "u.created_at" if schema.has_column("users", "created_at") else "NULL"
+
+        if not with_worlds:
+            return f"""
+                SELECT u.id, u.username, {created_at_select},
+                       {reset_required_select}, {reset_marked_at_select}
+                FROM users u
+                ORDER BY LOWER(u.username) ASC
+                LIMIT ?
+            """
+
+        visibility_expr = (
+            "COALESCE(g.visibility, 'unlisted')"
+            if schema.has_column("generators", "visibility")
+            else "'unlisted'"
+        )
+
+        def world_count(visibility: Optional[str] = None) -> str:
+            matches = f" AND {visibility_expr} = '{visibility}'" if visibility else ""
+            return f"(SELECT COUNT(*) FROM generators g WHERE g.owner_id = u.id{matches})"
+
+        # Counted per listed user rather than grouped, so the users are read
+        # in index order and the scan stops at the limit.
+        return f"""
+            SELECT u.id, u.username, {created_at_select},
+                   {reset_required_select}, {reset_marked_at_select},
+                   {world_count()} AS total_worlds,
+                   {world_count("private")} AS private_worlds,
+                   {world_count("unlisted")} AS unlisted_worlds,
+                   {world_count("public")} AS public_worlds
+            FROM users u
+            ORDER BY LOWER(u.username) ASC
+            LIMIT ?
+        """
 
-    def _json_list_size(self, raw_value: str) -> int:
+    def _json_list_size(self, raw_value: Union[str, bytes, None]) -> int:
         try:
-            value = json.loads(raw_value or "[]")
+            value = decode_json_column(raw_value or "[]")
             return len(value) if isinstance(value, list) else 0
-        except json.JSONDecodeError:
+        except (ValueError, zlib.error):
             return 0
 
-    def _json_mapping_size(self, raw_value: str) -> int:
+    def _json_mapping_size(self, raw_value: Union[str, bytes, None]) -> int:
         try:
-            value = json.loads(raw_value or "{}")
+            value = decode_json_column(raw_value or "{}")
             return len(value) if isinstance(value, (dict, list)) else 0
-        except json.JSONDecodeError:
+        except (ValueError, zlib.error):
             return 0
 
     # User management helpers
@@ -2347,7 +5614,7 @@ class DatabaseManager:
             ))
             conn.commit()
 
-        self._execute_with_retry(_create)
+        self._execute(_create, database="accounts")
         return {
             "session_id": session_id,
             "access_token": access_token,
@@ -2378,7 +5645,7 @@ class DatabaseManager:
             """, (token_hash, current_time, current_time)).fetchone()
             return row[0] if row else None
 
-        return self._execute_with_retry(_get)
+        return self._execute(_get, readonly=True, database="accounts")
 
     def refresh_mobile_auth_session(
             self,
@@ -2437,7 +5704,7 @@ class DatabaseManager:
                 "refresh_expires_at": refresh_expires_at,
             }
 
-        return self._execute_with_retry(_refresh)
+        return self._execute(_refresh, database="accounts")
 
     def revoke_mobile_auth_session(self, access_token: str) -> bool:
         if not access_token:
@@ -2455,7 +5722,7 @@ class DatabaseManager:
             conn.commit()
             return cursor.rowcount > 0
 
-        return self._execute_with_retry(_revoke)
+        return self._execute(_revoke, database="accounts")
 
     def create_user(self, username: str, password: str) -> Optional[Dict]:
         user_id = str(uuid.uuid4())
@@ -2472,7 +5739,7 @@ class DatabaseManager:
             except sqlite3.IntegrityError:
                 return None
 
-        return self._execute_with_retry(_create)
+        return self._execute(_create, database="accounts")
 
     @staticmethod
     def _social_username_base(
@@ -2570,7 +5837,7 @@ class DatabaseManager:
             conn.commit()
             return {"id": user_id, "username": username}
 
-        return self._execute_with_retry(_resolve)
+        return self._execute(_resolve, database="accounts")
 
     def get_user_auth_identities(self, user_id: str) -> List[Dict]:
         def _get(conn):
@@ -2589,7 +5856,7 @@ class DatabaseManager:
                 for row in rows
             ]
 
-        return self._execute_with_retry(_get)
+        return self._execute(_get, readonly=True, database="accounts")
 
     def delete_user_account(self, user_id: str) -> Optional[Dict]:
         """Delete private account data and anonymize Worlds already public."""
@@ -2623,6 +5890,7 @@ class DatabaseManager:
             if private_world_ids:
                 placeholders = ", ".join("?" for _ in private_world_ids)
                 for table_name in (
+                        "world_summaries",
                         "generator_translations",
                         "generator_worlds",
                         "world_metrics",
@@ -2639,12 +5907,17 @@ class DatabaseManager:
                     f"DELETE FROM generators WHERE id IN ({placeholders})",
                     private_world_ids,
                 )
+                conn.stale_worlds.update(private_world_ids)
+                for world_id in private_world_ids:
+                    self._refresh_world_search(conn, world_id)
 
             conn.execute("""
                 UPDATE generators
                 SET owner_id = NULL, updated_at = CURRENT_TIMESTAMP
                 WHERE owner_id = ? AND visibility = 'public'
             """, (user_id,))
+            for world_id in public_world_ids:
+                self._refresh_world_summary(conn, world_id)
             conn.execute("""
                 UPDATE world_moderation_reviews
                 SET requested_by_owner_id = NULL
@@ -2663,8 +5936,12 @@ class DatabaseManager:
                 (user_id,),
             )
             conn.execute("DELETE FROM credit_ledger WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM credit_balances WHERE user_id = ?", (user_id,))
             conn.execute("DELETE FROM mobile_auth_sessions WHERE user_id = ?", (user_id,))
             conn.execute("DELETE FROM auth_identities WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM game_sessions WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM session_directory WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM forge_jobs WHERE user_id = ?", (user_id,))
 
             # Retain the minimum purchase record needed to stop a consumed
             # transaction from being claimed again, while severing its user
@@ -2684,7 +5961,7 @@ class DatabaseManager:
                 "anonymized_world_ids": public_world_ids,
             }
 
-        return self._execute_with_retry(_delete)
+        return self._execute(_delete, database="joined")
 
     def get_user_by_username(self, username: str) -> Optional[Dict]:
         def _get(conn):
@@ -2706,7 +5983,7 @@ class DatabaseManager:
                 "password_reset_marked_at": row[4],
             }
 
-        return self._execute_with_retry(_get)
+        return self._execute(_get, readonly=True, database="accounts")
 
     def get_user_by_id(self, user_id: str) -> Optional[Dict]:
         def _get(conn):
@@ -2726,7 +6003,7 @@ class DatabaseManager:
                 "password_reset_marked_at": row[3],
             }
 
-        return self._execute_with_retry(_get)
+        return self._execute(_get, readonly=True, database="accounts")
 
     def set_user_password_reset_required(self, user_id: str, required: bool) -> bool:
         def _set(conn, user_id, required):
@@ -2744,9 +6021,67 @@ class DatabaseManager:
             conn.commit()
             return cur.rowcount > 0
 
-        return self._execute_with_retry(_set, user_id, required)
+        return self._execute(_set, user_id, required, database="accounts")
+
+class AsyncDatabaseManager:
+    """Awaitable counterpart to DatabaseManager.
+
+    Every DatabaseManager method is available here as a coroutine, e.g.
+    `await db.aio.get_generator(world_id)`. Calls run on a small bounded
+    executor, so a slow query or a held write lock parks a worker thread rather
+    than the event loop and every WebSocket sharing it.
+
+    Methods are resolved on the wrapped manager at call time, so patching a
+    method on it is seen here too.
+    """
+
+    def __init__(
+            self,
+            manager: "DatabaseManager",
+            max_workers: int = 4,
+    ):
+        self._manager = manager
+        self.max_workers = max(1, max_workers)
+        self._executor = None
+        self._executor_lock = Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="db",
+                )
+            return self._executor
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking callable that uses the database off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(),
+            functools.partial(func, *args, **kwargs),
+        )
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        method = getattr(self._manager, name)
+        if not callable(method):
+            raise AttributeError(f"{name} is not a DatabaseManager method")
+
+        async def call(*args, **kwargs):
+            return await self.run(getattr(self._manager, name), *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    def shutdown(self):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
 
-# Create a global instance with configurable upload frequency
-# Can be overridden by setting UPLOAD_FREQUENCY_MINUTES environment variable
-upload_freq = int(os.getenv('UPLOAD_FREQUENCY_MINUTES', '5'))
-db = DatabaseManager(upload_frequency_minutes=upload_freq)
+# Create a global instance
+db = DatabaseManager()
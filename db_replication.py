@@ -0,0 +1,839 @@
+"""Continuous replication of the SQLite database to S3-compatible storage.
+
+Rather than re-uploading the whole database file, the replicator ships the
+WAL: every few seconds it copies the frames committed since its last pass
+and uploads them as one compressed segment. It is also the only thing that
+checkpoints, so every frame is shipped before SQLite folds it into the main
+file and starts the WAL over.
+
+A generation starts from a base snapshot of the database file. Each WAL
+file written after it is one "index", shipped in segments keyed by their
+byte offset:
+
+    <prefix>/latest.json
+    <prefix>/generations/<generation>/snapshot.db.gz
+    <prefix>/generations/<generation>/snapshot.json
+    <prefix>/generations/<generation>/wal/<index>-<offset>.wal.gz
+
+Snapshots are taken with SQLite's online backup API while writes continue.
+snapshot.json records their size, SHA-256 and copy time, and latest.json
+is a copy of the newest one.
+
+Restoring downloads the snapshot, rebuilds each index's WAL file from its
+segments and lets SQLite recover and checkpoint it, one index at a time. A new
+generation, with a fresh snapshot, is started periodically. It also starts
+whenever continuity is lost, for example when the WAL was reset by something
+other than the replicator. Older generations are pruned after the new one
+is published.
+
+The replicator only uses a small subset of the boto3 S3 client API, so
+`LocalObjectStore` can stand in for a bucket in tests and local development.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+WAL_HEADER_SIZE = 32
+WAL_FRAME_HEADER_SIZE = 24
+WAL_MAGIC = {0x377F0682, 0x377F0683}
+LEGACY_DB_KEY = "rllm_game_data.db"
+
+
+class ReplicaNotFound(Exception):
+    """The bucket holds no replica to restore from."""
+
+
+class _BackupRestarting(Exception):
+    pass
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_snapshot(path: str, manifest: Dict) -> None:
+    """Check a snapshot file against its manifest; raise ValueError if it differs.
+
+    `path` may be the compressed object as uploaded or the database it
+    decompresses to.
+    """
+    with open(path, "rb") as handle:
+        compressed = handle.read(2) == b"\x1f\x8b"
+    if compressed:
+        if os.path.getsize(path) != manifest["compressed_size"]:
+            raise ValueError("Snapshot size does not match its manifest")
+        if file_sha256(path) != manifest["compressed_sha256"]:
+            raise ValueError("Snapshot checksum does not match its manifest")
+        digest, size = hashlib.sha256(), 0
+        with gzip.open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        actual_sha256 = digest.hexdigest()
+    else:
+        size = os.path.getsize(path)
+        actual_sha256 = file_sha256(path)
+    if size != manifest["size"]:
+        raise ValueError("Snapshot database size does not match its manifest")
+    if actual_sha256 != manifest["sha256"]:
+        raise ValueError("Snapshot database checksum does not match its manifest")
+
+
+def _is_missing_key(error: ClientError) -> bool:
+    return error.response.get("Error", {}).get("Code") in {"NoSuchKey", "404", "NotFound"}
+
+
+def scan_wal(wal_file, start: int, salt: Optional[bytes] = None) -> Tuple[Optional[bytes], int]:
+    """Return the WAL header's salt and the offset just past its last commit.
+
+    Frames are scanned from `start`, which must be a frame boundary. The scan
+    stops at the first frame from an older WAL: after a reset, SQLite rewrites
+    the file from the top and leaves older frames beyond the new ones. Only the
+    header is trusted here. SQLite itself validates frame checksums when the
+    segments are replayed.
+    """
+    wal_file.seek(0)
+    header = wal_file.read(WAL_HEADER_SIZE)
+    if len(header) < WAL_HEADER_SIZE:
+        return None, 0
+    magic, _version, page_size = struct.unpack(">III", header[:12])
+    if magic not in WAL_MAGIC:
+        raise ValueError("Not a SQLite WAL file")
+    header_salt = header[16:24]
+    if salt is not None and salt != header_salt:
+        return header_salt, 0
+
+    frame_size = WAL_FRAME_HEADER_SIZE + page_size
+    size = os.fstat(wal_file.fileno()).st_size
+    offset = max(start, WAL_HEADER_SIZE)
+    committed = start
+    while offset + frame_size <= size:
+        wal_file.seek(offset)
+        frame_header = wal_file.read(WAL_FRAME_HEADER_SIZE)
+        if frame_header[8:16] != header_salt:
+            break
+        offset += frame_size
+        if struct.unpack(">I", frame_header[4:8])[0]:
+            committed = offset
+    return header_salt, committed
+
+
+class LocalObjectStore:
+    """A directory that answers the handful of S3 calls the replicator makes.
+
+    Buckets are subdirectories and keys are relative paths, so a replica
+    written here can be inspected with ordinary file tools.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, bucket: str, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, bucket, key))
+        if not path.startswith(os.path.abspath(os.path.join(self.root, bucket)) + os.sep):
+            raise ValueError(f"Key escapes the bucket: {key}")
+        return path
+
+    @staticmethod
+    def _missing(operation: str, key: str) -> ClientError:
+        return ClientError(
+            {"Error": {"Code": "NoSuchKey", "Message": f"No such key: {key}"}},
+            operation,
+        )
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **kwargs) -> Dict:
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as handle:
+            handle.write(Body)
+        os.replace(temp_path, path)
+        return {}
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> Dict:
+        try:
+            with open(self._path(Bucket, Key), "rb") as handle:
+                body = handle.read()
+        except FileNotFoundError:
+            raise self._missing("GetObject", Key) from None
+        return {"Body": _Body(body), "ContentLength": len(body)}
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str, **kwargs) -> None:
+        with open(Filename, "rb") as handle:
+            self.put_object(Bucket=Bucket, Key=Key, Body=handle.read())
+
+    def download_file(self, Bucket: str, Key: str, Filename: str, **kwargs) -> None:
+        try:
+            shutil.copyfile(self._path(Bucket, Key), Filename)
+        except FileNotFoundError:
+            raise self._missing("HeadObject", Key) from None
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", Delimiter: str = "", **kwargs) -> Dict:
+        bucket_root = os.path.join(self.root, Bucket)
+        keys = []
+        for directory, _subdirectories, files in os.walk(bucket_root):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                key = os.path.relpath(os.path.join(directory, name), bucket_root)
+                key = key.replace(os.sep, "/")
+                if key.startswith(Prefix):
+                    keys.append(key)
+        keys.sort()
+
+        contents = []
+        prefixes = set()
+        for key in keys:
+            rest = key[len(Prefix):]
+            if Delimiter and Delimiter in rest:
+                prefixes.add(Prefix + rest.split(Delimiter, 1)[0] + Delimiter)
+            else:
+                contents.append({"Key": key, "Size": os.path.getsize(self._path(Bucket, key))})
+        response = {"IsTruncated": False, "KeyCount": len(contents) + len(prefixes)}
+        if contents:
+            response["Contents"] = contents
+        if prefixes:
+            response["CommonPrefixes"] = [{"Prefix": prefix} for prefix in sorted(prefixes)]
+        return response
+
+    def delete_objects(self, Bucket: str, Delete: Dict, **kwargs) -> Dict:
+        bucket_root = os.path.abspath(os.path.join(self.root, Bucket))
+        for entry in Delete.get("Objects", []):
+            path = self._path(Bucket, entry["Key"])
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            # Keys have no directories in S3; drop the ones left empty.
+            directory = os.path.dirname(path)
+            while directory != bucket_root and not os.listdir(directory):
+                os.rmdir(directory)
+                directory = os.path.dirname(directory)
+        return {}
+
+
+class _Body:
+    def __init__(self, data: bytes):
+        self._data = data
+
+    def read(self) -> bytes:
+        return self._data
+
+
+class WalReplicator:
+    """Ship a DatabaseManager's WAL to object storage, and restore from it.
+
+    One replicator per database file, named by `database`, each under its
+    own prefix.
+    """
+
+    def __init__(
+            self,
+            manager,
+            client,
+            bucket: str,
+            prefix: str = "replica",
+            sync_interval: float = 1.0,
+            snapshot_interval: timedelta = timedelta(hours=6),
+            checkpoint_bytes: int = 4 * 1024 * 1024,
+            retain_generations: int = 2,
+            snapshot_pages_per_step: int = 1024,
+            snapshot_max_restarts: int = 3,
+            database: str = "worlds",
+    ):
+        self._manager = manager
+        self.database = database
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.sync_interval = sync_interval
+        self.snapshot_interval = snapshot_interval
+        self.checkpoint_bytes = checkpoint_bytes
+        self.retain_generations = max(1, retain_generations)
+        self.snapshot_pages_per_step = max(1, snapshot_pages_per_step)
+        self.snapshot_max_restarts = snapshot_max_restarts
+
+        # Position of the next byte to ship. `salt` identifies the WAL file
+        # that `offset` points into.
+        self.generation = None
+        self.index = 0
+        self.offset = 0
+        self.salt = None
+        self.snapshot_at = None
+
+        # Set for good once replication starts: from then on only the
+        # replicator may checkpoint, even after its loop has stopped.
+        self.started = False
+        # Set when other processes write to the database too: their commits
+        # do not call notify, so every pass looks for new frames.
+        self.watch_external_writes = False
+
+        self._lock = Lock()
+        self._dirty = Event()
+        self._stop = Event()
+        self._thread = None
+
+    # -- keys ---------------------------------------------------------------
+
+    def _key(self, *parts: str) -> str:
+        return "/".join(filter(None, (self.prefix, *parts)))
+
+    def _generation_key(self, generation: str, *parts: str) -> str:
+        return self._key("generations", generation, *parts)
+
+    def _segment_key(self, generation: str, index: int, offset: int) -> str:
+        return self._generation_key(generation, "wal", f"{index:08d}-{offset:016d}.wal.gz")
+
+    @staticmethod
+    def _parse_segment_key(key: str) -> Tuple[int, int]:
+        index, offset = key.rsplit("/", 1)[1].split(".", 1)[0].split("-")
+        return int(index), int(offset)
+
+    def _list_keys(self, prefix: str, delimiter: str = "") -> Tuple[List[str], List[str]]:
+        keys, prefixes = [], []
+        kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+        if delimiter:
+            kwargs["Delimiter"] = delimiter
+        while True:
+            response = self.client.list_objects_v2(**kwargs)
+            keys.extend(item["Key"] for item in response.get("Contents", []))
+            prefixes.extend(item["Prefix"] for item in response.get("CommonPrefixes", []))
+            if not response.get("IsTruncated"):
+                return keys, prefixes
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+    def _delete_keys(self, keys: List[str]) -> None:
+        for start in range(0, len(keys), 1000):
+            self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in keys[start:start + 1000]]},
+            )
+
+    def read_latest(self) -> Dict:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key("latest.json"))
+        except ClientError as error:
+            if _is_missing_key(error):
+                raise ReplicaNotFound("No replica generation has been published") from None
+            raise
+        return json.loads(response["Body"].read())
+
+    def read_manifest(self, generation: str) -> Dict:
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket, Key=self._generation_key(generation, "snapshot.json")
+            )
+        except ClientError as error:
+            if _is_missing_key(error):
+                return {"generation": generation}
+            raise
+        return json.loads(response["Body"].read())
+
+    # -- background loop ----------------------------------------------------
+
+    def notify(self) -> None:
+        """Note a commit, so the next pass has something to look for."""
+        self._dirty.set()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.started = True
+        self._stop.clear()
+        self._dirty.set()
+        self._thread = Thread(target=self._run, name="wal-replicator", daemon=True)
+        self._thread.start()
+        logging.info("WAL replication started")
+
+    def stop(self) -> bool:
+        """Stop the background loop; returns whether it was running."""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return False
+        thread.join(timeout=10)
+        return True
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        failures = 0
+        while not self._stop.wait(min(60.0, self.sync_interval * (2 ** failures))):
+            try:
+                if self._snapshot_due():
+                    self.snapshot()
+                elif self._dirty.is_set() or self.watch_external_writes:
+                    self._dirty.clear()
+                    self.sync()
+                failures = 0
+            except Exception as e:
+                self._dirty.set()
+                failures = min(failures + 1, 6)
+                logging.error(f"WAL replication failed: {e}")
+
+    def _snapshot_due(self) -> bool:
+        return (
+            self.generation is None
+            or self.snapshot_at is None
+            or datetime.now(timezone.utc) - self.snapshot_at >= self.snapshot_interval
+        )
+
+    # -- shipping -----------------------------------------------------------
+
+    def _read_pending_locked(self) -> Optional[Tuple[str, int, int, bytes]]:
+        """Copy the committed frames not yet shipped. The caller holds the writer.
+
+        Returns (generation, index, offset, data) and advances the position
+        past it, or None when there is nothing new. Raises LookupError when
+        the WAL no longer continues from the shipped position.
+        """
+        wal_path = self._manager.database_path(self.database) + "-wal"
+        try:
+            wal_file = open(wal_path, "rb")
+        except FileNotFoundError:
+            if self.offset:
+                raise LookupError("The WAL was removed before it was fully shipped") from None
+            return None
+
+        with wal_file:
+            salt, end = scan_wal(wal_file, self.offset, self.salt if self.offset else None)
+            if salt is None:
+                if self.offset:
+                    raise LookupError("The WAL was truncated before it was fully shipped")
+                return None
+            if self.offset and salt != self.salt:
+                raise LookupError("The WAL was reset before it was fully shipped")
+            if end <= self.offset:
+                return None
+            wal_file.seek(self.offset)
+            data = wal_file.read(end - self.offset)
+
+        pending = (self.generation, self.index, self.offset, data)
+        self.salt = salt
+        self.offset = end
+        return pending
+
+    def _upload_segment(self, pending) -> int:
+        generation, index, offset, data = pending
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._segment_key(generation, index, offset),
+            Body=gzip.compress(data),
+        )
+        return len(data)
+
+    def _advance_index_locked(self) -> None:
+        """Record that the WAL is about to start over, fully shipped."""
+        self.index += 1
+        self.offset = 0
+        self.salt = None
+
+    def _rewind(self, pending) -> None:
+        generation, index, offset, _data = pending
+        if generation == self.generation and index == self.index:
+            self.offset = offset
+        else:
+            # The WAL this belonged to is gone; only a new snapshot can cover it.
+            self.generation = None
+
+    def sync(self) -> int:
+        """Ship committed frames written since the last pass; returns bytes shipped."""
+        with self._lock:
+            if self.generation is None:
+                return self._snapshot_locked()
+
+            pool = self._manager._get_pool(self.database)
+            conn = pool.acquire_writer()
+            try:
+                try:
+                    pending = self._read_pending_locked()
+                except LookupError as e:
+                    logging.warning(f"{e}; starting a new replica generation")
+                    self.generation = None
+                    pending = None
+            finally:
+                pool.release_writer(conn)
+
+            if self.generation is None:
+                return self._snapshot_locked()
+            if pending is None:
+                return 0
+            try:
+                shipped = self._upload_segment(pending)
+            except Exception:
+                self._rewind(pending)
+                raise
+
+            if self.offset >= self.checkpoint_bytes:
+                self._checkpoint_locked()
+            return shipped
+
+    def _checkpoint_locked(self) -> bool:
+        """Ship the tail of the WAL, then reset it. False if readers kept it busy."""
+        pool = self._manager._get_pool(self.database)
+        conn = pool.acquire_writer()
+        try:
+            pending = self._read_pending_locked()
+            if pending is not None:
+                # Shipped while holding the writer, so nothing can append
+                # between the upload and the reset.
+                try:
+                    self._upload_segment(pending)
+                except Exception:
+                    self._rewind(pending)
+                    raise
+            busy = pool.wal_checkpoint(conn)[0]
+            if busy:
+                return False
+            self._advance_index_locked()
+            return True
+        finally:
+            pool.release_writer(conn)
+
+    def checkpoint(self) -> bool:
+        with self._lock:
+            if self.generation is None:
+                self._snapshot_locked()
+                return True
+            try:
+                return self._checkpoint_locked()
+            except LookupError as e:
+                logging.warning(f"{e}; starting a new replica generation")
+                self.generation = None
+                self._snapshot_locked()
+                return True
+
+    def handoff(self, pool) -> None:
+        """Ship the tail of the WAL and close `pool` before anything else writes.
+
+        Closing the last connection checkpoints and deletes the WAL, so the
+        final frames have to be read under the same writer hold as the close.
+        """
+        with self._lock:
+            pending = None
+            conn = pool.acquire_writer()
+            try:
+                if self.generation is not None:
+                    try:
+                        pending = self._read_pending_locked()
+                        self._advance_index_locked()
+                    except LookupError as e:
+                        logging.warning(f"{e}; the next pass starts a new replica generation")
+                        self.generation = None
+                pool.close()
+            finally:
+                pool.release_writer(conn)
+
+            if pending is not None:
+                try:
+                    self._upload_segment(pending)
+                except Exception as e:
+                    self.generation = None
+                    logging.error(f"Failed to ship the final WAL segment: {e}")
+
+    # -- snapshots ----------------------------------------------------------
+
+    def snapshot(self) -> int:
+        """Start a new generation from a fresh copy of the database file."""
+        with self._lock:
+            return self._snapshot_locked()
+
+    def _snapshot_locked(self) -> int:
+        db_path = self._manager.database_path(self.database)
+        directory = os.path.dirname(db_path) or "."
+        fd, copy_path = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+        os.close(fd)
+        try:
+            pool = self._manager._get_pool(self.database)
+            conn = pool.acquire_writer()
+            try:
+                if self.generation is not None:
+                    # The current generation stays restorable until the new
+                    # one is published, so it gets the tail of the WAL first.
+                    try:
+                        pending = self._read_pending_locked()
+                        if pending is not None:
+                            self._upload_segment(pending)
+                    except Exception as e:
+                        self.generation = None
+                        logging.warning(f"Could not ship the last segment of the previous generation: {e}")
+                busy = pool.wal_checkpoint(conn)[0]
+                if busy:
+                    raise sqlite3.OperationalError("database is locked")
+
+                now = datetime.now(timezone.utc)
+                generation = f"{now:%Y%m%dT%H%M%S%fZ}-{uuid.uuid4().hex[:8]}"
+                # Writes from here on go to the new generation's first WAL.
+                # They are held there until its snapshot is up, since only
+                # the replicator checkpoints.
+                self.generation = generation
+                self.index = 0
+                self.offset = 0
+                self.salt = None
+                self.snapshot_at = now
+            finally:
+                pool.release_writer(conn)
+
+            try:
+                # The copy runs while writers carry on. Whatever it picks up
+                # past the checkpoint is also in the WAL replayed over it.
+                manifest = self._backup(pool, copy_path)
+                manifest.update({"generation": generation, "created_at": now.isoformat()})
+                manifest.update(self._upload_snapshot(generation, copy_path))
+                body = json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+                self.client.put_object(
+                    Bucket=self.bucket,
+                    Key=self._generation_key(generation, "snapshot.json"),
+                    Body=body,
+                    ContentType="application/json",
+                )
+                self.client.put_object(
+                    Bucket=self.bucket,
+                    Key=self._key("latest.json"),
+                    Body=body,
+                    ContentType="application/json",
+                )
+            except Exception:
+                self.generation = None
+                raise
+        finally:
+            try:
+                os.remove(copy_path)
+            except FileNotFoundError:
+                pass
+
+        logging.info(
+            f"Published replica generation {generation}: {manifest['size']} bytes, "
+            f"{manifest['compressed_size']} compressed, copied in {manifest['duration_seconds']}s"
+        )
+        try:
+            self._prune_generations(generation)
+        except Exception as e:
+            logging.warning(f"Could not prune old replica generations: {e}")
+        return manifest["size"]
+
+    def _backup(self, pool, copy_path: str) -> Dict:
+        """Copy the database with the online backup API, a batch of pages at a time.
+
+        Each step holds a read transaction only for its own batch. If writes
+        keep restarting the copy, it falls back to a single step: in WAL mode
+        that one long read still does not block writers.
+        """
+        started = time.monotonic()
+        restarts = 0
+        remaining_seen = None
+
+        def progress(_status, remaining, _total):
+            nonlocal restarts, remaining_seen
+            if remaining_seen is not None and remaining > remaining_seen:
+                restarts += 1
+                if restarts > self.snapshot_max_restarts:
+                    raise _BackupRestarting()
+            remaining_seen = remaining
+
+        source = pool.acquire_reader()
+        try:
+            try:
+                target = sqlite3.connect(copy_path)
+                try:
+                    source.backup(target, pages=self.snapshot_pages_per_step, progress=progress)
+                finally:
+                    target.close()
+            except _BackupRestarting:
+                logging.info("Snapshot kept restarting under writes; copying in one step")
+                target = sqlite3.connect(copy_path)
+                try:
+                    source.backup(target, pages=-1)
+                finally:
+                    target.close()
+            page_size = source.execute("PRAGMA page_size").fetchone()[0]
+        finally:
+            pool.release_reader(source)
+
+        return {
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "page_size": page_size,
+            "page_count": os.path.getsize(copy_path) // page_size,
+            "restarts": restarts,
+            "sqlite_version": sqlite3.sqlite_version,
+        }
+
+    def _upload_snapshot(self, generation: str, copy_path: str) -> Dict:
+        compressed_path = copy_path + ".gz"
+        try:
+            digest = hashlib.sha256()
+            with open(copy_path, "rb") as source, gzip.open(compressed_path, "wb") as target:
+                for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                    digest.update(chunk)
+                    target.write(chunk)
+            self.client.upload_file(
+                Filename=compressed_path,
+                Bucket=self.bucket,
+                Key=self._generation_key(generation, "snapshot.db.gz"),
+            )
+            return {
+                "size": os.path.getsize(copy_path),
+                "sha256": digest.hexdigest(),
+                "compressed_size": os.path.getsize(compressed_path),
+                "compressed_sha256": file_sha256(compressed_path),
+            }
+        finally:
+            try:
+                os.remove(compressed_path)
+            except FileNotFoundError:
+                pass
+
+    def _prune_generations(self, current: str) -> None:
+        _keys, prefixes = self._list_keys(self._key("generations") + "/", delimiter="/")
+        generations = sorted(prefix.rstrip("/").rsplit("/", 1)[1] for prefix in prefixes)
+        keep = set(generations[-self.retain_generations:]) | {current}
+        for generation in generations:
+            if generation not in keep:
+                keys, _prefixes = self._list_keys(self._generation_key(generation) + "/")
+                self._delete_keys(keys)
+
+    # -- restore ------------------------------------------------------------
+
+    def restore(self, target_path: str, generation: Optional[str] = None) -> Dict:
+        """Rebuild the database at `target_path` from the latest replica.
+
+        The snapshot is checked against its manifest before anything is
+        replayed over it, and the target is replaced only once the rebuilt
+        copy passes `PRAGMA quick_check`. Raises ReplicaNotFound if nothing
+        was published.
+        """
+        latest = self.read_latest() if generation is None else self.read_manifest(generation)
+        generation = latest["generation"]
+        directory = os.path.dirname(target_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, work_path = tempfile.mkstemp(prefix=".restore-", dir=directory)
+        os.close(fd)
+
+        try:
+            compressed_path = work_path + ".gz"
+            try:
+                self.client.download_file(
+                    Bucket=self.bucket,
+                    Key=self._generation_key(generation, "snapshot.db.gz"),
+                    Filename=compressed_path,
+                )
+            except ClientError as error:
+                if _is_missing_key(error):
+                    raise ReplicaNotFound(f"Generation {generation} has no snapshot") from None
+                raise
+            if "sha256" in latest:
+                verify_snapshot(compressed_path, latest)
+            with gzip.open(compressed_path, "rb") as source, open(work_path, "wb") as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+            os.remove(compressed_path)
+
+            keys, _prefixes = self._list_keys(self._generation_key(generation, "wal") + "/")
+            segments = sorted((self._parse_segment_key(key), key) for key in keys)
+            applied, last_index, complete = self._replay(work_path, segments)
+
+            with sqlite3.connect(work_path) as conn:
+                result = conn.execute("PRAGMA quick_check").fetchone()[0]
+            conn.close()
+            if result != "ok":
+                raise sqlite3.DatabaseError(f"Restored database failed quick_check: {result}")
+
+            for suffix in ("-wal", "-shm"):
+                try:
+                    os.remove(target_path + suffix)
+                except FileNotFoundError:
+                    pass
+            os.replace(work_path, target_path)
+        finally:
+            for path in (work_path, work_path + ".gz", work_path + "-wal", work_path + "-shm"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+        logging.info(
+            f"Restored replica generation {generation}: {applied} of {len(segments)} WAL segments"
+        )
+        return {
+            "generation": generation,
+            "created_at": latest.get("created_at"),
+            "segments": applied,
+            "next_index": last_index + 1,
+            "complete": complete,
+        }
+
+    def _replay(self, work_path: str, segments) -> Tuple[int, int, bool]:
+        """Apply each index's WAL in order. Stops at the first gap."""
+        applied = 0
+        last_index = -1
+        wal_data = b""
+        index = None
+        complete = True
+
+        def apply(data: bytes) -> None:
+            if not data:
+                return
+            with open(work_path + "-wal", "wb") as handle:
+                handle.write(data)
+            try:
+                os.remove(work_path + "-shm")
+            except FileNotFoundError:
+                pass
+            conn = sqlite3.connect(work_path)
+            try:
+                conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            finally:
+                conn.close()
+
+        for (segment_index, offset), key in segments:
+            if segment_index != index:
+                apply(wal_data)
+                if index is not None:
+                    last_index = index
+                wal_data = b""
+                index = segment_index
+            if offset != len(wal_data):
+                logging.error(f"Replica segment {key} does not follow on from the last; stopping there")
+                complete = False
+                break
+            response = self.client.get_object(Bucket=self.bucket, Key=key)
+            wal_data += gzip.decompress(response["Body"].read())
+            applied += 1
+
+        apply(wal_data)
+        if index is not None and complete:
+            last_index = index
+        return applied, last_index, complete
+
+    def adopt(self, restored: Dict) -> None:
+        """Continue a generation that was just restored into the local file."""
+        with self._lock:
+            if not restored.get("complete"):
+                self.generation = None
+                return
+            self.generation = restored["generation"]
+            self.index = restored["next_index"]
+            self.offset = 0
+            self.salt = None
+            created_at = restored.get("created_at")
+            self.snapshot_at = datetime.fromisoformat(created_at) if created_at else None
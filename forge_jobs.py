@@ -0,0 +1,224 @@
+"""World forges as background jobs, apart from the WebSockets that watch them.
+
+A forge takes minutes of model and image calls. It used to run inside the
+session's WebSocket handler, so a client that dropped either left it paying
+for calls nobody was watching or lost the World. Here it is a job: started
+when the session is created, run under a ForgeSupervisor on the worker that
+holds the session, and recorded in the forge_jobs table as it goes. Any
+socket, on this worker or another, can attach, replay the progress so far and
+follow the rest. Abandoning the session cancels the job; the forge itself
+(``forge_world`` in ``main.py``) refunds what it was charged.
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from session_directory import WORKER_TIMEOUT_SECONDS
+
+
+# How often a socket following a forge held by another worker checks on it.
+FORGE_JOB_POLL_SECONDS = 0.5
+FORGE_JOB_OUTCOMES = ("succeeded", "failed", "cancelled")
+FORGE_FAILED_EVENT = {"type": "error", "message": "Failed to create game"}
+FORGE_CANCELLED_EVENT = {
+    "type": "error",
+    "code": "forge_cancelled",
+    "message": "World creation was cancelled.",
+}
+
+Emit = Callable[[Dict], Awaitable[None]]
+
+
+class ForgeJob:
+    """One forge running on this worker, and the events it has sent."""
+
+    def __init__(self, session_id: str, user_id: Optional[str]):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.status = "running"
+        self.events = []
+        self.task: Optional[asyncio.Task] = None
+        # Replaced on every event, so a follower waits for the next one.
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+
+class ForgeSupervisor:
+    """Runs this worker's forges and relays their progress.
+
+    `forge(emit)` does the work, sending each progress event through `emit`,
+    and returns whether the World is ready; when it is not, it has emitted an
+    error saying why. The supervisor records every event, ends the job
+    with its outcome, and turns an exception into a failure and a
+    cancellation into a cancelled job.
+    """
+
+    def __init__(self, get_database: Callable[[], object]):
+        # Looked up on each use, so the database can be swapped after import.
+        self.get_database = get_database
+        self.worker_id: Optional[str] = None
+        self.jobs: Dict[str, ForgeJob] = {}
+        # Set between start() and shutdown(), while the app's event loop
+        # outlives any one request.
+        self.running = False
+        self.outcomes = dict.fromkeys(FORGE_JOB_OUTCOMES, 0)
+
+    def start(self, worker_id: str) -> None:
+        self.worker_id = worker_id
+        self.running = True
+
+    async def shutdown(self) -> None:
+        """Cancel the forges still running; their Worlds would die with the process."""
+        self.running = False
+        tasks = [job.task for job in self.jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def has_job(self, session_id: str) -> bool:
+        """Whether a forge for `session_id` is running on this worker."""
+        return session_id in self.jobs
+
+    async def submit(
+            self,
+            session_id: str,
+            user_id: Optional[str],
+            forge: Callable[[Emit], Awaitable[bool]],
+    ) -> ForgeJob:
+        """Start forging `session_id` in the background, unless it already is.
+
+        The job is on record before this returns, so a socket reaching
+        another worker straight after finds it there.
+        """
+        job = self.jobs.get(session_id)
+        if job is not None:
+            return job
+        job = ForgeJob(session_id, user_id)
+        self.jobs[session_id] = job
+        try:
+            await self.get_database().aio.create_forge_job(
+                session_id, self.worker_id or "", user_id
+            )
+        except Exception:
+            # The forge still runs; only sockets on other workers miss it.
+            logging.exception("Could not record forge job %s", session_id)
+        job.task = asyncio.ensure_future(self._run(job, forge))
+        return job
+
+    async def _run(self, job: ForgeJob, forge: Callable[[Emit], Awaitable[bool]]) -> None:
+        async def emit(event: Dict) -> None:
+            await self._emit(job, event)
+
+        try:
+            ready = await forge(emit)
+        except asyncio.CancelledError:
+            await self._finish(job, "cancelled", FORGE_CANCELLED_EVENT)
+            raise
+        except Exception:
+            logging.exception("Forge job %s failed", job.session_id)
+            await self._finish(job, "failed", FORGE_FAILED_EVENT)
+        else:
+            await self._finish(job, "succeeded" if ready else "failed")
+        finally:
+            if self.jobs.get(job.session_id) is job:
+                del self.jobs[job.session_id]
+
+    async def _emit(self, job: ForgeJob, event: Dict, status: Optional[str] = None) -> None:
+        job.events.append(event)
+        job._notify()
+        try:
+            cancel_requested = await self.get_database().aio.append_forge_job_event(
+                job.session_id, event, status
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception("Could not record progress of forge job %s", job.session_id)
+            return
+        # Abandoned through another worker, which cannot reach this task.
+        if cancel_requested and status is None and job.task is not None:
+            job.task.cancel()
+
+    async def _finish(self, job: ForgeJob, status: str, event: Optional[Dict] = None) -> None:
+        self.outcomes[status] += 1
+        if event is not None:
+            # Recorded even as the job is being cancelled.
+            await asyncio.shield(self._emit(job, event, status))
+        else:
+            try:
+                await asyncio.shield(self.get_database().aio.finish_forge_job(job.session_id, status))
+            except Exception:
+                logging.exception("Could not record the end of forge job %s", job.session_id)
+        job.status = status
+        job._notify()
+
+    async def cancel(self, session_id: str) -> bool:
+        """Cancel a forge, here or, through its record, on another worker.
+
+        Returns whether there was one running. A local one has finished,
+        refunds and all, by the time this returns.
+        """
+        job = self.jobs.get(session_id)
+        if job is not None and job.task is not None:
+            job.task.cancel()
+            await asyncio.wait([job.task])
+            return True
+        return await self.get_database().aio.request_forge_job_cancel(session_id)
+
+    async def forging_elsewhere(self, session_id: str) -> bool:
+        """Whether another worker is forging `session_id` now."""
+        if self.has_job(session_id):
+            return False
+        record = await self.get_database().aio.get_forge_job(session_id)
+        return record is not None and record["status"] == "running"
+
+    @staticmethod
+    def _is_alive(record: Dict) -> bool:
+        heartbeat_at = record.get("worker_heartbeat_at")
+        return heartbeat_at is not None and time.time() - heartbeat_at < WORKER_TIMEOUT_SECONDS
+
+    async def follow(self, session_id: str) -> AsyncIterator[Dict]:
+        """Every event of a forge, those already sent first, until it ends.
+
+        A forge on this worker is followed in memory, one on another through
+        its record. One whose worker stopped reporting in has died with it,
+        and ends in a failure.
+        """
+        job = self.jobs.get(session_id)
+        if job is not None:
+            sent = 0
+            while True:
+                changed = job._changed
+                while sent < len(job.events):
+                    yield job.events[sent]
+                    sent += 1
+                if job.status != "running":
+                    return
+                await changed.wait()
+
+        sent = 0
+        while True:
+            record = await self.get_database().aio.get_forge_job(session_id)
+            if record is None:
+                return
+            for event in record["events"][sent:]:
+                yield event
+            sent = len(record["events"])
+            if record["status"] != "running":
+                return
+            if not self._is_alive(record):
+                yield FORGE_FAILED_EVENT
+                return
+            await asyncio.sleep(FORGE_JOB_POLL_SECONDS)
+
+    def stats(self) -> Dict:
+        return {
+            "running": len(self.jobs),
+            "outcomes": dict(self.outcomes),
+        }
@@ -1,7 +1,10 @@
 import json
 import random
+import sys
 import time
+import types
 import os
+from collections import deque
 from functools import wraps
 
 import logging
@@ -11,6 +14,7 @@ from typing import Dict, List, Optional, Union
 import concurrent.futures
 import asyncio
 import aiofiles
+from pydantic import BaseModel
 
 from gen_ai import GenAI, GenAIModel
 from models import GameState, Enemy, Item, Equipment
@@ -32,6 +36,43 @@ TEST_DUMMY_EQUIP_AND_ITEMS = False
 # Use random map (for testing)
 USE_RANDOM_MAP = False
 
+# Bumped when Game.hibernate changes shape; older saved runs are not resumed.
+SESSION_HIBERNATION_VERSION = 1
+
+# Code rather than data: shared by every run, so not part of any one's size.
+UNSIZED_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType)
+
+
+def deep_sizeof(value, seen: Optional[set] = None) -> int:
+    """Bytes held by `value` and everything reachable through its containers.
+
+    Objects already in `seen` are not counted again, so passing one set to
+    several calls counts what they share once. An estimate: it follows
+    dicts, sequences, sets, pydantic models and the `__dict__` of other
+    instances, but not `__slots__`, and counts only what `sys.getsizeof`
+    reports, so memory held inside C objects is missed.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    pending = [value]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            pending.extend(obj)
+        elif isinstance(obj, BaseModel):
+            pending.append(obj.__dict__)
+        elif hasattr(obj, '__dict__') and not isinstance(obj, UNSIZED_TYPES):
+            pending.append(vars(obj))
+    return total
+
+
 class Game:
     """Main game class that coordinates all game components."""
 
@@ -79,10 +120,16 @@ class Game:
         game = cls(seed, theme_desc, do_web_search, language, generator_id, owner_id, visibility)
 
         # Create the state manager
-        game.state_manager = await GameStateManager.create(
+        state_manager = await GameStateManager.create(
             seed, theme_desc, do_web_search, language, generator_id, owner_id, visibility,
             on_progress=on_progress
         )
+        return cls._assemble(game, state_manager)
+
+    @classmethod
+    def _assemble(cls, game, state_manager):
+        """Wire the handlers around a ready state manager."""
+        game.state_manager = state_manager
 
         # Create the combat manager (reuse existing one from state manager)
         combat_manager = CombatManager(game.state_manager.random, game.state_manager.definitions)
@@ -95,6 +142,68 @@ class Game:
 
         return game
 
+    def hibernate(self) -> dict:
+        """The run as plain JSON values, for `rehydrate` to resume later."""
+        return {
+            "version": SESSION_HIBERNATION_VERSION,
+            "game": {
+                "seed": self.seed,
+                "theme_desc": self.theme_desc,
+                "do_web_search": self.do_web_search,
+                "language": self.language,
+                "generator_id": self.generator_id,
+                "owner_id": self.owner_id,
+                "visibility": self.visibility,
+            },
+            "state_manager": self.state_manager.hibernate(),
+            "combat_manager": {
+                "enemy_sequence_cnt": self.player_action_handler.combat_manager.enemy_sequence_cnt,
+            },
+        }
+
+    @classmethod
+    def rehydrate(cls, data: dict) -> "Game":
+        """Rebuild a hibernated run. Raises ValueError for another version's."""
+        if data.get("version") != SESSION_HIBERNATION_VERSION:
+            raise ValueError(f"Unsupported hibernated session version: {data.get('version')}")
+        game = cls._assemble(
+            cls(**data["game"]),
+            GameStateManager.rehydrate(data["state_manager"]),
+        )
+        game.player_action_handler.combat_manager.enemy_sequence_cnt = (
+            data["combat_manager"]["enemy_sequence_cnt"]
+        )
+        return game
+
+    def memory_footprint(self) -> Dict[str, int]:
+        """Estimated bytes this run holds, by what holds them.
+
+        tile_info is the map prose, on the state and in the snapshot copies
+        kept for saving; `state` is the rest of the GameState. Anything
+        shared, such as a definition the state also points at, is counted
+        once, under the first part that reaches it.
+        """
+        manager = self.state_manager
+        state = getattr(manager, "state", None)
+        seen = set()
+        footprint = {
+            "tile_info": deep_sizeof([
+                getattr(state, "tile_info", None),
+                manager._generated_tile_info,
+                manager._snapshot_tile_info_by_language,
+            ], seen),
+            "definitions": deep_sizeof([
+                manager.definitions.player_defs,
+                manager.definitions.item_defs,
+                manager.definitions.enemy_defs,
+                manager.definitions.celltype_defs,
+            ], seen),
+            "state": deep_sizeof(state, seen),
+            "event_history": deep_sizeof(manager.event_history, seen),
+        }
+        footprint["total"] = sum(footprint.values())
+        return footprint
+
     def get_game_title(self):
         """Get the game title."""
         return self.state_manager.get_game_title()
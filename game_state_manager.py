@@ -42,6 +42,12 @@ MAX_REGIONS = 6
 WORLD_TRANSLATION_CACHE_VERSION = 5
 
 
+def _random_state(value) -> tuple:
+    """A `random.Random.getstate()` value back from its JSON lists."""
+    version, internal, gauss_next = value
+    return version, tuple(internal), gauss_next
+
+
 class GameStateManager:
     """Manages game state initialization, persistence, and message creation."""
 
@@ -95,6 +101,9 @@ class GameStateManager:
 
         # Awaited once per forge milestone when set; see report_progress.
         self.on_progress = None
+        # (snapshot,) from load_world_bundle until the first snapshot load;
+        # the tuple tells "no snapshot saved" apart from "not preloaded".
+        self._preloaded_snapshot = None
 
     @classmethod
     async def create(cls, seed: int, theme_desc: str, do_web_search: bool = False,
@@ -106,10 +115,12 @@ class GameStateManager:
         manager.on_progress = on_progress
 
         if generator_id:
-            generator_data = db.get_generator(generator_id)
-            if not generator_data:
+            bundle = await db.aio.load_world_bundle(
+                generator_id, language, WORLD_SNAPSHOT_VERSION, WORLD_TRANSLATION_CACHE_VERSION
+            )
+            if not bundle:
                 raise ValueError(f"Generator with ID {generator_id} not found")
-            await manager.load_generator_world(generator_id, generator_data, language)
+            await manager.load_generator_world(generator_id, bundle, language)
 
         # Set the theme description and language
         logger.info(
@@ -158,7 +169,7 @@ class GameStateManager:
                 owner_id=manager.owner_id,
                 visibility=manager.visibility or "unlisted",
             )
-            manager.generator_id = db.save_generator(
+            manager.generator_id = await db.aio.save_generator(
                 theme_desc=theme_desc,
                 theme_desc_better=manager.theme_desc_better,
                 language=manager.language,
@@ -233,7 +244,7 @@ class GameStateManager:
             # direction, and it is needed later for cover cards, remixes, and
             # any asset added after the forge, none of which could match the
             # World without it.
-            db.save_generator_visual_manifest(
+            await db.aio.save_generator_visual_manifest(
                 generator_id=self.generator_id,
                 manifest=manifest,
                 snapshot_version=WORLD_SNAPSHOT_VERSION,
@@ -266,7 +277,7 @@ class GameStateManager:
                 self.definitions.enemy_defs,
                 self.definitions.celltype_defs,
             )
-            db.update_generator_definitions(
+            await db.aio.update_generator_definitions(
                 generator_id=self.generator_id,
                 player_defs=self.definitions.player_defs,
                 enemy_defs=self.definitions.enemy_defs,
@@ -276,7 +287,7 @@ class GameStateManager:
             # Re-save the manifest carrying the cover, so the gallery can find
             # a World's card without probing the filesystem.
             if art.get("cover"):
-                db.save_generator_visual_manifest(
+                await db.aio.save_generator_visual_manifest(
                     generator_id=self.generator_id,
                     manifest={**manifest, "cover_url": art["cover"]},
                     snapshot_version=WORLD_SNAPSHOT_VERSION,
@@ -289,44 +300,43 @@ class GameStateManager:
         except Exception as exc:
             logger.error("World art generation failed for %s: %s", self.generator_id, exc)
 
-    async def load_generator_world(self, generator_id: str, generator_data: Dict, language: str):
+    async def load_generator_world(self, generator_id: str, bundle: Dict, language: str):
+        """Load definitions from a `db.load_world_bundle` result.
+
+        The bundle's snapshot is kept for `_load_world_snapshot`, so starting
+        the run does not read it again.
+        """
         logger.info(f"Loaded generator with ID: {generator_id}")
-        source_language = generator_data.get('language') or language
+        generator_data = bundle['definitions']
+        source_language = bundle['source_language']
         active_data = generator_data
 
-        if source_language != language:
-            translated_data = db.get_generator_translation(
-                generator_id,
-                language,
-                WORLD_TRANSLATION_CACHE_VERSION
+        if bundle['translated']:
+            logger.info(f"Loaded cached generator translation: {generator_id} ({language})")
+        elif source_language != language:
+            logger.info(f"Translating generator {generator_id} to language: {language}")
+            world_definition = {
+                "theme_desc_better": generator_data['theme_desc_better'],
+                "player_defs": generator_data['player_defs'],
+                "item_defs": generator_data['item_defs'],
+                "enemy_defs": generator_data['enemy_defs'],
+                "celltype_defs": generator_data['celltype_defs'],
+            }
+            translated_data = await self.gen_ai.translate_world_definition(
+                world_definition=world_definition,
+                source_language=source_language,
+                target_language=language,
+            )
+            await db.aio.save_generator_translation(
+                generator_id=generator_id,
+                language=language,
+                theme_desc_better=translated_data['theme_desc_better'],
+                player_defs=translated_data['player_defs'],
+                item_defs=translated_data['item_defs'],
+                enemy_defs=translated_data['enemy_defs'],
+                celltype_defs=translated_data['celltype_defs'],
+                translation_version=WORLD_TRANSLATION_CACHE_VERSION,
             )
-            if translated_data:
-                logger.info(f"Loaded cached generator translation: {generator_id} ({language})")
-            else:
-                logger.info(f"Translating generator {generator_id} to language: {language}")
-                world_definition = {
-                    "theme_desc_better": generator_data['theme_desc_better'],
-                    "player_defs": generator_data['player_defs'],
-                    "item_defs": generator_data['item_defs'],
-                    "enemy_defs": generator_data['enemy_defs'],
-                    "celltype_defs": generator_data['celltype_defs'],
-                }
-                translated_data = await self.gen_ai.translate_world_definition(
-                    world_definition=world_definition,
-                    source_language=source_language,
-                    target_language=language,
-                )
-                db.save_generator_translation(
-                    generator_id=generator_id,
-                    language=language,
-                    theme_desc_better=translated_data['theme_desc_better'],
-                    player_defs=translated_data['player_defs'],
-                    item_defs=translated_data['item_defs'],
-                    enemy_defs=translated_data['enemy_defs'],
-                    celltype_defs=translated_data['celltype_defs'],
-                    translation_version=WORLD_TRANSLATION_CACHE_VERSION,
-                )
-
             active_data = {
                 **generator_data,
                 **translated_data,
@@ -339,6 +349,7 @@ class GameStateManager:
         self.language = language
         self.generator_id = generator_id
         self.loaded_from_generator = True
+        self._preloaded_snapshot = (bundle.get('snapshot'),)
 
     def get_game_title(self):
         """Get the game title from the AI generator."""
@@ -1163,17 +1174,23 @@ class GameStateManager:
 
         return out_map
 
-    def _load_world_snapshot(self) -> Optional[Dict[str, Any]]:
+    async def _load_world_snapshot(self) -> Optional[Dict[str, Any]]:
         """Load the persisted playable snapshot for this world, when usable."""
         generator_id = getattr(self, "generator_id", None)
         if not generator_id:
             return None
 
-        try:
-            snapshot = db.get_generator_world(generator_id, WORLD_SNAPSHOT_VERSION)
-        except Exception as exc:
-            logger.error("Failed to load world snapshot: %s", exc)
-            return None
+        # Consumed once: a later reload (after a save) must see the database.
+        preloaded = getattr(self, "_preloaded_snapshot", None)
+        self._preloaded_snapshot = None
+        if preloaded is not None:
+            snapshot = preloaded[0]
+        else:
+            try:
+                snapshot = await db.aio.get_generator_world(generator_id, WORLD_SNAPSHOT_VERSION)
+            except Exception as exc:
+                logger.error("Failed to load world snapshot: %s", exc)
+                return None
 
         if not snapshot:
             return None
@@ -1195,7 +1212,7 @@ class GameStateManager:
             ) or [],
         }
 
-    def _save_world_snapshot(self) -> None:
+    async def _save_world_snapshot(self) -> None:
         """Persist the playable snapshot so replays skip map/placement generation."""
         generator_id = getattr(self, "generator_id", None)
         if not generator_id or not self.state or not self.state.cell_types:
@@ -1208,7 +1225,7 @@ class GameStateManager:
             tile_info_by_language[language] = generated_tile_info
 
         try:
-            db.save_generator_world(
+            await db.aio.save_generator_world(
                 generator_id=generator_id,
                 language=language,
                 map_csv=self._map_csv_from_cell_types(),
@@ -1590,7 +1607,7 @@ class GameStateManager:
 
         # Reuse the persisted playable snapshot when this world already has one,
         # so replays skip map, placement, and tile-info generation entirely.
-        snapshot = self._load_world_snapshot()
+        snapshot = await self._load_world_snapshot()
         if snapshot:
             logger.info("Reusing persisted world snapshot for generator %s", self.generator_id)
         else:
@@ -1653,7 +1670,7 @@ class GameStateManager:
 
         # Persist the snapshot whenever this run produced anything new, so the
         # next run of this world reuses it instead of calling the model again.
-        self._save_world_snapshot()
+        await self._save_world_snapshot()
 
         # Set initial position as explored
         x, y = self.state.player_pos
@@ -1675,6 +1692,112 @@ class GameStateManager:
         event_dict['timestamp'] = time.time()
         self.event_history.append(event_dict)
 
+    def hibernate(self) -> Dict[str, Any]:
+        """Everything a run has built up since `create`, as plain JSON values.
+
+        `rehydrate` rebuilds an equivalent manager from it, RNG position
+        included, so a resumed run rolls exactly what it would have.
+        """
+        state = getattr(self, "state", None)
+        current_enemy = getattr(state, "current_enemy", None)
+        return {
+            "random": self.random.getstate(),
+            "language": self.language,
+            "generator_id": self.generator_id,
+            "loaded_from_generator": self.loaded_from_generator,
+            "theme_desc": self.theme_desc,
+            "theme_desc_better": self.theme_desc_better,
+            "do_web_search": self.do_web_search,
+            "owner_id": self.owner_id,
+            "visibility": self.visibility,
+            "error_message": self.error_message,
+            "item_sequence_cnt": self.item_sequence_cnt,
+            "enemy_sequence_cnt": self.enemy_sequence_cnt,
+            "event_history": self.event_history,
+            "last_described_ct": self.last_described_ct,
+            "entity_placements": getattr(self, "entity_placements", None),
+            "generated_tile_info": self._generated_tile_info,
+            "snapshot_tile_info_by_language": self._snapshot_tile_info_by_language,
+            "snapshot_regions_by_language": self._snapshot_regions_by_language,
+            "state": state.model_dump(mode="json") if state is not None else None,
+            # Set on the Enemy by CombatManager, outside its fields.
+            "current_enemy_rewards": {
+                "xp": getattr(current_enemy, "_xp_reward", None),
+                "hp": getattr(current_enemy, "_hp_reward", None),
+            } if current_enemy is not None else None,
+            "definitions": {
+                "language": self.definitions.language,
+                "generator_id": self.definitions.generator_id,
+                "player_defs": self.definitions.player_defs,
+                "item_defs": self.definitions.item_defs,
+                "enemy_defs": self.definitions.enemy_defs,
+                "celltype_defs": self.definitions.celltype_defs,
+            },
+            "gen_ai": {
+                "random": self.gen_ai.random.getstate(),
+                "theme_desc": self.gen_ai.theme_desc,
+                "theme_desc_better": self.gen_ai.theme_desc_better,
+                "do_web_search": self.gen_ai.do_web_search,
+                "language": self.gen_ai.language,
+                "game_title": self.gen_ai.game_title,
+            },
+            "entity_manager": {
+                "enemy_sequence_cnt": self.entity_manager.enemy_sequence_cnt,
+                "item_sequence_cnt": self.entity_manager.item_sequence_cnt,
+                "entity_placements": getattr(self.entity_manager, "entity_placements", None),
+            },
+        }
+
+    @classmethod
+    def rehydrate(cls, data: Dict[str, Any]) -> "GameStateManager":
+        """Rebuild a manager from `hibernate`, without any model calls."""
+        manager = cls(
+            0, data["theme_desc"], data["do_web_search"], data["language"],
+            data["generator_id"], data["owner_id"], data["visibility"],
+        )
+        manager.random.setstate(_random_state(data["random"]))
+        for name in (
+                "loaded_from_generator", "theme_desc_better", "error_message",
+                "item_sequence_cnt", "enemy_sequence_cnt", "event_history",
+                "last_described_ct",
+        ):
+            setattr(manager, name, data[name])
+        if data["entity_placements"] is not None:
+            manager.entity_placements = data["entity_placements"]
+        manager._generated_tile_info = data["generated_tile_info"]
+        manager._snapshot_tile_info_by_language = data["snapshot_tile_info_by_language"]
+        manager._snapshot_regions_by_language = data["snapshot_regions_by_language"]
+
+        for name, value in data["definitions"].items():
+            setattr(manager.definitions, name, value)
+        gen_ai = dict(data["gen_ai"])
+        manager.gen_ai.random.setstate(_random_state(gen_ai.pop("random")))
+        for name, value in gen_ai.items():
+            setattr(manager.gen_ai, name, value)
+        for name, value in data["entity_manager"].items():
+            if value is not None:
+                setattr(manager.entity_manager, name, value)
+
+        if data["state"] is not None:
+            state = dict(data["state"])
+            # Filled in place during play, so never validated against their
+            # narrow declared types (an enemy's sprite URLs can be None).
+            unvalidated = {
+                name: state.pop(name)
+                for name in ("enemies", "defeated_enemies", "item_placements", "temporary_effects")
+                if name in state
+            }
+            manager.state = GameState.model_validate(state)
+            for name, value in unvalidated.items():
+                setattr(manager.state, name, value)
+            rewards = data["current_enemy_rewards"]
+            if manager.state.current_enemy is not None and rewards:
+                if rewards["xp"] is not None:
+                    manager.state.current_enemy._xp_reward = rewards["xp"]
+                if rewards["hp"] is not None:
+                    manager.state.current_enemy._hp_reward = rewards["hp"]
+        return manager
+
     async def create_message(self, description_raw: str, description: str = ""):
         """Create a message with game state."""
         # Check if state is initialized
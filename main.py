@@ -16,13 +16,15 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.cors import CORSMiddleware
 from starlette.websockets import WebSocketDisconnect
 from pydantic import BaseModel
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
 import time
 import os
 import math
 from dotenv import load_dotenv
 import uuid
+import heapq
+import itertools
 import zlib
 import base64
 import secrets
@@ -48,6 +50,12 @@ import aiofiles
 
 from starlette.middleware.sessions import SessionMiddleware
 from game import Game
+from forge_jobs import ForgeSupervisor
+from session_directory import (
+    LocalSessionDirectory,
+    WORKER_HEARTBEAT_SECONDS,
+    make_session_directory,
+)
 from db import WORLD_SNAPSHOT_VERSION, db
 from economy import (
     get_completion_reward_credits,
@@ -74,24 +82,178 @@ load_dotenv()
 # Game Session Management
 #==================================================================
 class GameSessionManager:
-    """Manages in-memory game sessions."""
+    """Manages game sessions.
+
+    Live sessions are held in memory. A run left idle with no client
+    connected is hibernated: written to the game_sessions table and dropped
+    from memory, then rehydrated by `resume_session` when its page or
+    WebSocket comes back. A graceful shutdown hibernates every run.
+
+    Sessions expire after a TTL that depends on their state (`ttls`): a heap
+    ordered by deadline lets `expire_sessions` look only at the sessions due.
+
+    Each run's memory is estimated (`memory_stats`), and `enforce_limits`
+    evicts idle runs, least recently used first, to keep each user under a
+    session cap and the process under a memory budget.
+
+    With several worker processes, `directory` records which one holds each
+    session. A worker asked for a run held elsewhere has the holder
+    hibernate it (`hand_off_requested`), then rehydrates it itself. A new
+    session is held by the worker forging its World; one whose forge has not
+    started waits in the directory, held by no worker, for whichever one
+    receives its WebSocket.
+    """
 
-    def __init__(self):
+    # Seconds a session lasts past its last access, by expiry_kind.
+    DEFAULT_TTLS = {
+        'creating': 15 * 60,
+        'error': 5 * 60,
+        'unconnected': 30 * 60,
+        'active': 24 * 3600,
+    }
+    # Session fields saved alongside the Game; the rest are rebuilt.
+    HIBERNATED_FIELDS = ('language', 'debug_seed', 'spectator_mode')
+    # How long a worker waits for another to hand a run over, and how often
+    # it looks meanwhile.
+    HANDOFF_WAIT_SECONDS = 5
+    HANDOFF_POLL_SECONDS = 0.1
+
+    def __init__(self, directory: Optional[LocalSessionDirectory] = None):
         self.sessions: Dict[str, dict] = {}  # Changed to store session data directly
-
-    def create_session(self, game_instance: Game) -> str:
+        self.directory = directory or LocalSessionDirectory()
+        # Rehydrations in flight, so two reconnects share one Game.
+        self._resuming: Dict[str, asyncio.Future] = {}
+        # Runs evicted, by the limit that evicted them or a handoff.
+        self.evictions = {'user_cap': 0, 'memory_budget': 0, 'handoff': 0}
+        # When enforce_limits last measured the runs, for memory_stats.
+        self.memory_measured_at: Optional[float] = None
+        self.ttls = dict(self.DEFAULT_TTLS)
+        # (deadline, tiebreak, session_id), earliest first. A session's
+        # deadline only moves later as it is used, so entries are not
+        # updated then: a popped entry is checked against the session and
+        # pushed back if it has been used since. 'expiry_at' on the session
+        # marks its current entry; any other is stale and dropped.
+        self._expiry_heap: List[tuple] = []
+        self._expiry_tiebreak = itertools.count()
+        self.expirations = dict.fromkeys(self.DEFAULT_TTLS, 0)
+
+    async def create_session(self, game_instance: Game) -> str:
         """Create a new game session and return session ID."""
         session_id = str(uuid.uuid4())
-        self.sessions[session_id] = {
+        self._add(session_id, {
             'created_at': time.time(),
             'last_accessed': time.time(),
             'game_instance': game_instance,
             'generator_id': game_instance.state_manager.generator_id if game_instance.state_manager else None,
             'status': 'ready'
-        }
+        })
+        await self.publish(session_id)
         logging.info(f"Created new game session: {session_id}")
         return session_id
 
+    async def add_pending_session(self, session_id: str, session_data: dict, held: bool = False) -> None:
+        """Add a session whose World is yet to be forged.
+
+        A session `held` is forged by this worker. Otherwise, with a shared
+        directory, no worker holds it: any may receive its WebSocket, and
+        takes the session from the directory to forge it then.
+        """
+        if held or not self.directory.shared:
+            self._add(session_id, session_data)
+            await self.publish(session_id)
+            return
+        await self.directory.publish(
+            session_id,
+            session_data['status'],
+            held=False,
+            user_id=session_data.get('requester_user_id'),
+            generator_id=session_data.get('generator_id'),
+            session={
+                **{field: session_data.get(field) for field in self.HIBERNATED_FIELDS},
+                'created_at': session_data['created_at'],
+                'creation_request': session_data['creation_request'].model_dump(mode='json'),
+            },
+        )
+
+    def _add(self, session_id: str, session_data: dict) -> None:
+        self.sessions[session_id] = session_data
+        self._schedule_expiry(session_id)
+
+    @staticmethod
+    def expiry_kind(session_data: dict) -> str:
+        """Which TTL applies: still creating, failed, ready but never played, or played."""
+        status = session_data.get('status', 'ready')
+        if status in ('creating', 'error'):
+            return status
+        return 'active' if session_data.get('connected_at') else 'unconnected'
+
+    def _deadline(self, session_data: dict) -> float:
+        return session_data['last_accessed'] + self.ttls[self.expiry_kind(session_data)]
+
+    def _schedule_expiry(self, session_id: str) -> None:
+        """(Re)schedule a session's expiry, if it now falls due sooner than scheduled."""
+        session_data = self.sessions.get(session_id)
+        if not isinstance(session_data, dict):
+            return
+        deadline = self._deadline(session_data)
+        if deadline < session_data.get('expiry_at', float('inf')):
+            session_data['expiry_at'] = deadline
+            heapq.heappush(self._expiry_heap, (deadline, next(self._expiry_tiebreak), session_id))
+
+    def next_expiry(self) -> Optional[float]:
+        """The earliest scheduled deadline, possibly for a session since used or gone."""
+        return self._expiry_heap[0][0] if self._expiry_heap else None
+
+    def expire_sessions(self, now: Optional[float] = None) -> List[str]:
+        """Remove the sessions past their TTL; returns their IDs.
+
+        Pops only entries already due, so the cost follows the sessions
+        expiring (and those used since they were scheduled), not the total.
+        A session with a client connected or a World forging is kept.
+        """
+        now = time.time() if now is None else now
+        expired = []
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            deadline, _, session_id = heapq.heappop(self._expiry_heap)
+            session_data = self.sessions.get(session_id)
+            if not isinstance(session_data, dict) or session_data.get('expiry_at') != deadline:
+                continue
+            in_use = session_data.get('forging') or (
+                isinstance(session_data.get('game_instance'), Game)
+                and session_data['game_instance'].get_connected_clients()
+            )
+            if in_use:
+                session_data['last_accessed'] = now
+            actual = self._deadline(session_data)
+            if actual > now:
+                session_data['expiry_at'] = actual
+                heapq.heappush(self._expiry_heap, (actual, next(self._expiry_tiebreak), session_id))
+                continue
+            kind = self.expiry_kind(session_data)
+            self.expirations[kind] += 1
+            del self.sessions[session_id]
+            expired.append(session_id)
+        if expired:
+            logging.info(f"Expired {len(expired)} game session(s)")
+        return expired
+
+    async def publish(self, session_id: str) -> None:
+        """Note a session's new state: its expiry, and in the directory that this worker holds it."""
+        self._schedule_expiry(session_id)
+        session_data = self.sessions.get(session_id)
+        if not self.directory.shared or not isinstance(session_data, dict):
+            return
+        try:
+            await self.directory.publish(
+                session_id,
+                session_data.get('status', 'ready'),
+                user_id=session_data.get('requester_user_id'),
+                generator_id=session_data.get('generator_id'),
+            )
+        except Exception:
+            # The run carries on here; other workers see the older entry.
+            logging.exception("Could not publish game session %s", session_id)
+
     def get_session(self, session_id: str) -> Optional[Game]:
         """Get a game session by ID."""
         if session_id in self.sessions:
@@ -106,26 +268,400 @@ class GameSessionManager:
                 return session_data
         return None
 
-    def remove_session(self, session_id: str):
-        """Remove a game session."""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            logging.info(f"Removed game session: {session_id}")
+    async def resume_session(self, session_id: str) -> Optional[dict]:
+        """Get a session's data, rehydrating it if it was hibernated."""
+        session_data = self.sessions.get(session_id)
+        if session_data is not None:
+            if isinstance(session_data, dict):
+                session_data['last_accessed'] = time.time()
+            return session_data
+
+        resuming = self._resuming.get(session_id)
+        if resuming is None:
+            resuming = asyncio.ensure_future(self._take_over(session_id))
+            self._resuming[session_id] = resuming
+            resuming.add_done_callback(lambda _: self._resuming.pop(session_id, None))
+        return await asyncio.shield(resuming)
+
+    async def has_session(self, session_id: str) -> bool:
+        """Whether a session exists, on this worker or another, without taking it over."""
+        session_data = self.sessions.get(session_id)
+        if session_data is not None:
+            if isinstance(session_data, dict):
+                session_data['last_accessed'] = time.time()
+            return True
+        if self.directory.shared and await self.directory.lookup(session_id) is not None:
+            return True
+        return await self.resume_session(session_id) is not None
+
+    async def _take_over(self, session_id: str) -> Optional[dict]:
+        """Bring a session not in memory here: from the directory, or hibernated."""
+        if not self.directory.shared:
+            return await self._rehydrate(session_id)
+
+        deadline = time.monotonic() + self.HANDOFF_WAIT_SECONDS
+        asked = None
+        while time.monotonic() < deadline:
+            entry = await self.directory.lookup(session_id)
+            if entry is None:
+                # Hibernated before there was a directory, or gone.
+                session_data = await self._rehydrate(session_id)
+                await self.publish(session_id)
+                return session_data
+            holder = entry['worker_id']
+            if holder is None or holder == self.directory.worker_id or not self.directory.is_alive(entry):
+                if await self.directory.claim(session_id, holder):
+                    return await self._adopt(session_id, entry)
+                continue
+            # Held by a live worker: ask it to hibernate the run, then wait
+            # for the entry to be released.
+            if asked != holder and await self.directory.request_handoff(session_id, holder):
+                asked = holder
+            await asyncio.sleep(self.HANDOFF_POLL_SECONDS)
+        logging.warning("Game session %s was not handed over in time", session_id)
+        return None
+
+    async def _adopt(self, session_id: str, entry: dict) -> Optional[dict]:
+        """Build a session just claimed from the directory."""
+        saved = entry['session']
+        if entry['worker_id'] is None and entry['status'] == 'creating' and saved:
+            # Its World was never started, so this worker forges it. One a
+            # worker died forging is not retried: its forge may be charged.
+            session_data = {
+                **{field: saved.get(field) for field in self.HIBERNATED_FIELDS},
+                'created_at': saved['created_at'],
+                'last_accessed': time.time(),
+                'game_instance': None,
+                'creation_request': GameCreationRequest.model_validate(saved['creation_request']),
+                'status': 'creating',
+                'generator_id': entry['generator_id'],
+                'requester_user_id': entry['user_id'],
+            }
+            self._add(session_id, session_data)
+            logging.info(f"Took over new game session: {session_id}")
+            return session_data
+
+        session_data = await self._rehydrate(session_id)
+        if session_data is None:
+            await self.directory.forget([session_id])
+        return session_data
+
+    async def _rehydrate(self, session_id: str) -> Optional[dict]:
+        try:
+            saved = await db.aio.load_game_session(session_id)
+        except Exception:
+            logging.exception("Could not load hibernated game session %s", session_id)
+            return None
+        if saved is None:
+            return None
+
+        game_instance = None
+        if time.time() - saved['last_accessed'] <= self.ttls['active']:
+            try:
+                game_instance = Game.rehydrate(saved['state']['game'])
+            except Exception:
+                logging.exception("Could not rehydrate game session %s", session_id)
+        # Resumed or unusable, the saved copy is done with: the live run is
+        # the only one from here, and is hibernated again if it goes idle.
+        try:
+            await db.aio.delete_game_session(session_id)
+        except Exception:
+            logging.exception("Could not delete hibernated game session %s", session_id)
+        if game_instance is None:
+            return None
+
+        session_data = {
+            **{
+                field: saved['state']['session'].get(field)
+                for field in self.HIBERNATED_FIELDS
+            },
+            'created_at': saved['created_at'],
+            'last_accessed': time.time(),
+            'game_instance': game_instance,
+            'generator_id': saved['generator_id'],
+            'requester_user_id': saved['user_id'],
+            'status': 'ready',
+            # Saved from play, so counted as played.
+            'connected_at': saved['last_accessed'],
+        }
+        self._add(session_id, session_data)
+        logging.info(f"Rehydrated game session: {session_id}")
+        return session_data
+
+    @staticmethod
+    def _can_hibernate(session_data) -> bool:
+        return (
+            isinstance(session_data, dict)
+            and session_data.get('status') == 'ready'
+            and isinstance(session_data.get('game_instance'), Game)
+        )
 
-    def cleanup_expired_sessions(self, max_age_hours: int = 24):
-        """Remove sessions older than max_age_hours."""
-        current_time = time.time()
-        expired_sessions = []
+    async def _hibernate(self, sessions: Dict[str, dict], evict: bool) -> int:
+        records = []
+        for session_id, session_data in sessions.items():
+            game_instance = session_data['game_instance']
+            try:
+                state = {
+                    'game': game_instance.hibernate(),
+                    'session': {field: session_data.get(field) for field in self.HIBERNATED_FIELDS},
+                }
+            except Exception:
+                logging.exception("Could not hibernate game session %s", session_id)
+                continue
+            records.append({
+                'session_id': session_id,
+                'user_id': session_data.get('requester_user_id') or game_instance.owner_id,
+                'generator_id': session_data.get('generator_id'),
+                'state': state,
+                'created_at': session_data['created_at'],
+                'last_accessed': session_data['last_accessed'],
+            })
+        if not records:
+            return 0
 
-        for session_id, session_data in self.sessions.items():
-            if current_time - session_data['last_accessed'] > max_age_hours * 3600:
-                expired_sessions.append(session_id)
+        await db.aio.hibernate_game_sessions(records)
+        released = [record['session_id'] for record in records]
+        if evict:
+            released = []
+            for record in records:
+                session_data = self.sessions.get(record['session_id'])
+                # Left live if it was resumed while being written.
+                if (
+                        session_data is not None
+                        and session_data['last_accessed'] == record['last_accessed']
+                        and not session_data['game_instance'].get_connected_clients()
+                ):
+                    del self.sessions[record['session_id']]
+                    released.append(record['session_id'])
+        await self.directory.release(released)
+        return len(records)
+
+    async def hibernate_idle_sessions(self, idle_seconds: float) -> int:
+        """Hibernate runs with no client connected for `idle_seconds`; returns how many."""
+        now = time.time()
+        idle = {
+            session_id: session_data
+            for session_id, session_data in self.sessions.items()
+            if self._can_hibernate(session_data)
+            and now - session_data['last_accessed'] >= idle_seconds
+            and not session_data['game_instance'].get_connected_clients()
+        }
+        return await self._hibernate(idle, evict=True)
+
+    async def hibernate_all(self) -> int:
+        """Save every run for the next process to resume; returns how many.
+
+        For shutdown: the runs are released to other workers but stay in
+        memory here.
+        """
+        return await self._hibernate(
+            {
+                session_id: session_data
+                for session_id, session_data in self.sessions.items()
+                if self._can_hibernate(session_data)
+            },
+            evict=False,
+        )
+
+    @staticmethod
+    def _measure(session_data) -> int:
+        """Estimated bytes of a session's run, re-measured after it is used.
 
-        for session_id in expired_sessions:
+        Walking a run is slow, so only the periodic sweep (enforce_limits)
+        calls this; anything else reads the figures it left on the session.
+        """
+        game_instance = session_data.get('game_instance')
+        if not isinstance(game_instance, Game):
+            return 0
+        # A connected run changes without touching last_accessed; it is
+        # re-measured once per sweep.
+        if (
+                'memory' not in session_data
+                or session_data['memory_measured_at'] < session_data['last_accessed']
+                or game_instance.get_connected_clients()
+        ):
+            try:
+                session_data['memory'] = game_instance.memory_footprint()
+            except Exception:
+                logging.exception("Could not measure a game session")
+                session_data['memory'] = {'total': 0}
+            session_data['memory_measured_at'] = time.time()
+        return session_data['memory']['total']
+
+    @staticmethod
+    def _can_evict(session_data) -> bool:
+        """No client connected and no World being forged."""
+        if not isinstance(session_data, dict) or session_data.get('status') == 'creating':
+            return False
+        game_instance = session_data.get('game_instance')
+        return not (isinstance(game_instance, Game) and game_instance.get_connected_clients())
+
+    def _least_recently_used(self, session_ids) -> List[str]:
+        """The evictable sessions among `session_ids`, oldest access first."""
+        return sorted(
+            (
+                session_id for session_id in session_ids
+                if self._can_evict(self.sessions.get(session_id))
+            ),
+            key=lambda session_id: self.sessions[session_id]['last_accessed'],
+        )
+
+    async def _evict(self, victims: Dict[str, dict], reason: str) -> int:
+        """Hibernate the runs that can be resumed and drop the rest."""
+        await self._hibernate(
+            {
+                session_id: session_data
+                for session_id, session_data in victims.items()
+                if self._can_hibernate(session_data)
+            },
+            evict=True,
+        )
+        dropped = []
+        for session_id, session_data in victims.items():
+            if (
+                    not self._can_hibernate(session_data)
+                    and self.sessions.get(session_id) is session_data
+                    and self._can_evict(session_data)
+            ):
+                del self.sessions[session_id]
+                dropped.append(session_id)
+        await self.directory.forget(dropped)
+        evicted = sum(1 for session_id in victims if session_id not in self.sessions)
+        self.evictions[reason] += evicted
+        return evicted
+
+    async def enforce_limits(self, memory_budget_bytes: int = 0, max_per_user: int = 0) -> int:
+        """Evict idle runs past the per-user cap, then past the memory budget.
+
+        Least recently used runs go first; a run with a client connected or
+        a World still forging is never evicted. 0 turns a limit off. Returns
+        how many runs were evicted.
+        """
+        evicted = 0
+        if max_per_user:
+            by_user: Dict[str, List[str]] = {}
+            for session_id, session_data in self.sessions.items():
+                user_id = session_data.get('requester_user_id') if isinstance(session_data, dict) else None
+                if user_id:
+                    by_user.setdefault(user_id, []).append(session_id)
+            victims = {}
+            for session_ids in by_user.values():
+                excess = len(session_ids) - max_per_user
+                if excess > 0:
+                    for session_id in self._least_recently_used(session_ids)[:excess]:
+                        victims[session_id] = self.sessions[session_id]
+            if victims:
+                evicted += await self._evict(victims, 'user_cap')
+
+        # Measured on every sweep, budget or not, for memory_stats to report.
+        sizes = {
+            session_id: self._measure(session_data)
+            for session_id, session_data in list(self.sessions.items())
+            if isinstance(session_data, dict)
+        }
+        self.memory_measured_at = time.time()
+        if memory_budget_bytes:
+            excess = sum(sizes.values()) - memory_budget_bytes
+            victims = {}
+            for session_id in self._least_recently_used(sizes):
+                if excess <= 0:
+                    break
+                victims[session_id] = self.sessions[session_id]
+                excess -= sizes[session_id]
+            if victims:
+                evicted += await self._evict(victims, 'memory_budget')
+        return evicted
+
+    async def hand_off_requested(self) -> int:
+        """Hibernate the runs other workers asked for, releasing them; returns how many.
+
+        A run with a client still connected here, or a World still forging,
+        is kept, and the request lapses.
+        """
+        requested = await self.directory.pending_handoffs()
+        # Held in name only, as after a failed save: nothing to hand over.
+        await self.directory.release([
+            session_id for session_id in requested
+            if session_id not in self.sessions and session_id not in self._resuming
+        ])
+        victims = {
+            session_id: self.sessions[session_id]
+            for session_id in requested
+            if self._can_evict(self.sessions.get(session_id))
+        }
+        return await self._evict(victims, 'handoff') if victims else 0
+
+    def memory_stats(self) -> dict:
+        """Session counts and estimated bytes, in total and by part of a run.
+
+        The bytes are those measured by the last enforce_limits sweep, at
+        `measured_at`; a run started since counts as 0 until the next one.
+        Nothing is measured here, as this serves an unauthenticated endpoint.
+        """
+        by_status: Dict[str, int] = {}
+        by_part = {'state': 0, 'event_history': 0, 'definitions': 0, 'tile_info': 0}
+        sizes = []
+        users = set()
+        for session_data in list(self.sessions.values()):
+            if not isinstance(session_data, dict):
+                continue
+            status = session_data.get('status', 'ready')
+            by_status[status] = by_status.get(status, 0) + 1
+            if session_data.get('requester_user_id'):
+                users.add(session_data['requester_user_id'])
+            sizes.append(session_data.get('memory', {}).get('total', 0))
+            for part, size in session_data.get('memory', {}).items():
+                if part in by_part:
+                    by_part[part] += size
+        return {
+            'sessions': len(sizes),
+            'by_status': by_status,
+            'users': len(users),
+            'estimated_bytes': sum(sizes),
+            'largest_session_bytes': max(sizes, default=0),
+            'average_session_bytes': sum(sizes) // len(sizes) if sizes else 0,
+            'by_part': by_part,
+            'measured_at': self.memory_measured_at,
+            'evictions': dict(self.evictions),
+        }
+
+    async def find_owner(self, session_id: str) -> Tuple[bool, Optional[str]]:
+        """Whether `session_id` is known to any worker, and who created it.
+
+        Looks at the run held here, then at its forge, its hibernated copy
+        and its directory entry, any of which may be all that is left of it.
+        """
+        session_data = self.sessions.get(session_id)
+        if isinstance(session_data, dict):
+            return True, session_data.get('requester_user_id')
+        forge_job = await db.aio.get_forge_job(session_id)
+        if forge_job is not None:
+            return True, forge_job['user_id']
+        saved = await db.aio.load_game_session(session_id)
+        if saved is not None:
+            return True, saved['user_id']
+        entry = await self.directory.lookup(session_id)
+        if entry is not None:
+            return True, entry['user_id']
+        return False, None
+
+    async def abandon(self, session_id: str) -> None:
+        """Drop a session for good: the run held here, or its hibernated copy."""
+        if session_id in self.sessions:
             self.remove_session(session_id)
+        else:
+            try:
+                await db.aio.delete_game_session(session_id)
+            except Exception:
+                logging.exception("Could not delete hibernated game session %s", session_id)
+        # Or a worker would take a pending one over and forge it after all.
+        await self.directory.forget([session_id])
 
-        if expired_sessions:
-            logging.info(f"Cleaned up {len(expired_sessions)} expired sessions")
+    def remove_session(self, session_id: str):
+        """Remove a game session."""
+        if session_id in self.sessions:
+            del self.sessions[session_id]
+            logging.info(f"Removed game session: {session_id}")
 
     def get_session_count(self) -> int:
         """Get the number of active sessions."""
@@ -133,6 +669,8 @@ class GameSessionManager:
 
 # Global session manager
 game_session_manager = GameSessionManager()
+# Runs World forges in the background; see forge_world.
+forge_supervisor = ForgeSupervisor(lambda: db)
 
 #==================================================================
 # Models
@@ -436,6 +974,22 @@ WORLD_PUBLIC_REVIEW_DEFAULT_DELAY_SECONDS = 0
 WORLD_PUBLIC_REVIEW_DEFAULT_POLL_SECONDS = 30
 WORLD_PUBLIC_REVIEW_DEFAULT_MAX_PER_POLL = 3
 WORLD_PUBLIC_REVIEW_DEFAULT_IMMEDIATE_MAX_PENDING = 10
+DB_MAINTENANCE_DEFAULT_HOURS = 6
+GAME_SESSION_HIBERNATE_DEFAULT_MINUTES = 15
+GAME_SESSION_MEMORY_BUDGET_DEFAULT_MB = 512
+GAME_SESSION_DEFAULT_MAX_PER_USER = 5
+GAME_SESSION_SWEEP_SECONDS = 30
+SESSION_HANDOFF_POLL_SECONDS = 0.25
+GAME_SESSION_EXPIRY_MAX_SLEEP_SECONDS = 60
+# The newest sessions a signed-out browser created, kept in its cookie.
+CREATED_GAME_SESSIONS_REMEMBERED = 10
+# Env var for each GameSessionManager.DEFAULT_TTLS kind, in minutes.
+GAME_SESSION_TTL_ENV_VARS = {
+    'creating': "GAME_SESSION_TTL_CREATING_MINUTES",
+    'error': "GAME_SESSION_TTL_ERROR_MINUTES",
+    'unconnected': "GAME_SESSION_TTL_UNCONNECTED_MINUTES",
+    'active': "GAME_SESSION_TTL_ACTIVE_MINUTES",
+}
 ACCOUNT_DELETE_RECENT_AUTH_SECONDS = 5 * 60
 ANALYTICS_HEAD_PLACEHOLDER = "{{ analytics_head | safe }}"
 FIREBASE_CONFIG_ENV_VARS = {
@@ -503,19 +1057,19 @@ class AuthRateLimiter:
             self.failures.pop(key, None)
         return recent
 
-    def is_limited(self, key: str) -> bool:
-        return len(self._recent_failures(key)) >= self.max_attempts
+    async def _attempts(self, key: str) -> List[float]:
+        return self._recent_failures(key)
 
-    def record_failure(self, key: str):
+    async def _record(self, key: str, max_attempts: Optional[int] = None) -> List[float]:
+        """Record an attempt unless `max_attempts` are already recent; the earlier ones."""
         recent = self._recent_failures(key)
-        recent.append(self.clock())
-        self.failures[key] = recent
-
-    def record_attempt(self, key: str):
-        self.record_failure(key)
+        earlier = list(recent)
+        if max_attempts is None or len(recent) < max_attempts:
+            recent.append(self.clock())
+            self.failures[key] = recent
+        return earlier
 
-    def retry_after_seconds(self, key: str) -> int:
-        recent = self._recent_failures(key)
+    def _retry_after(self, recent: List[float]) -> int:
         if not recent:
             return 0
 
@@ -523,10 +1077,46 @@ class AuthRateLimiter:
         remaining_seconds = self.window_seconds - (self.clock() - oldest_failure)
         return max(1, math.ceil(remaining_seconds))
 
-    def clear(self, key: str):
+    async def is_limited(self, key: str) -> bool:
+        return len(await self._attempts(key)) >= self.max_attempts
+
+    async def record_failure(self, key: str):
+        await self._record(key)
+
+    async def consume(self, key: str) -> int:
+        """Record an attempt under `key` unless it is limited.
+
+        Returns 0 when the attempt was recorded, or the seconds until the
+        next one is allowed.
+        """
+        recent = await self._record(key, self.max_attempts)
+        if len(recent) < self.max_attempts:
+            return 0
+        return self._retry_after(recent)
+
+    async def retry_after_seconds(self, key: str) -> int:
+        return self._retry_after(await self._attempts(key))
+
+    async def clear(self, key: str):
         self.failures.pop(key, None)
 
 
+class SharedRateLimiter(AuthRateLimiter):
+    """An AuthRateLimiter counting attempts in the database, for every worker process."""
+
+    async def _attempts(self, key: str) -> List[float]:
+        return await db.aio.list_rate_limit_attempts(key, self.clock() - self.window_seconds)
+
+    async def _record(self, key: str, max_attempts: Optional[int] = None) -> List[float]:
+        now = self.clock()
+        return await db.aio.record_rate_limit_attempt(
+            key, now, now - self.window_seconds, max_attempts
+        )
+
+    async def clear(self, key: str):
+        await db.aio.clear_rate_limit_attempts(key)
+
+
 def get_app_env() -> str:
     return (os.getenv("APP_ENV") or os.getenv("ENVIRONMENT") or "development").strip().lower()
 
@@ -568,6 +1158,17 @@ def get_env_int(name: str, default: int, minimum: int = 1) -> int:
     return value
 
 
+def get_web_concurrency() -> int:
+    """Worker processes uvicorn runs: its own WEB_CONCURRENCY setting."""
+    return get_env_int("WEB_CONCURRENCY", 1)
+
+
+def get_session_directory_name() -> str:
+    """Where sessions are looked up: in process, or in SQLite for several workers."""
+    default = "sqlite" if get_web_concurrency() > 1 else "local"
+    return (os.getenv("SESSION_DIRECTORY") or default).strip().lower()
+
+
 def get_mobile_auth_ttls() -> tuple:
     access_ttl = get_env_int(
         "MOBILE_ACCESS_TOKEN_TTL_SECONDS",
@@ -694,7 +1295,9 @@ def make_rate_limiter(
         default_max_attempts: int,
         default_window_seconds: int,
 ) -> AuthRateLimiter:
-    return AuthRateLimiter(
+    # Each worker process would otherwise allow the full limit.
+    limiter_class = SharedRateLimiter if get_web_concurrency() > 1 else AuthRateLimiter
+    return limiter_class(
         max_attempts=get_env_int(f"{env_prefix}_MAX_ATTEMPTS", default_max_attempts),
         window_seconds=get_env_int(f"{env_prefix}_WINDOW_SECONDS", default_window_seconds),
     )
@@ -711,7 +1314,7 @@ def rate_limit_response(message: str, retry_after_seconds: int) -> JSONResponse:
     return JSONResponse({"error": message}, status_code=429, headers=headers)
 
 
-def consume_rate_limit_attempt(
+async def consume_rate_limit_attempt(
         limiter: AuthRateLimiter,
         key: str,
         message: str,
@@ -719,10 +1322,9 @@ def consume_rate_limit_attempt(
     if not is_rate_limiting_enabled():
         return None
 
-    if limiter.is_limited(key):
-        return rate_limit_response(message, limiter.retry_after_seconds(key))
-
-    limiter.record_attempt(key)
+    retry_after_seconds = await limiter.consume(key)
+    if retry_after_seconds:
+        return rate_limit_response(message, retry_after_seconds)
     return None
 
 
@@ -926,6 +1528,51 @@ def is_public_review_queue_overwhelmed() -> bool:
 def is_world_public_review_worker_enabled() -> bool:
     return get_env_bool("WORLD_PUBLIC_REVIEW_WORKER_ENABLED", is_production_env())
 
+
+def get_db_maintenance_interval_seconds() -> int:
+    """Seconds between database maintenance passes; 0 turns them off."""
+    return get_env_int("DB_MAINTENANCE_HOURS", DB_MAINTENANCE_DEFAULT_HOURS, minimum=0) * 3600
+
+
+def get_game_session_hibernate_seconds() -> int:
+    """Idle seconds before a run with no client is hibernated; 0 keeps runs in memory."""
+    return get_env_int(
+        "GAME_SESSION_HIBERNATE_MINUTES", GAME_SESSION_HIBERNATE_DEFAULT_MINUTES, minimum=0
+    ) * 60
+
+
+def get_game_session_memory_budget_bytes() -> int:
+    """Estimated bytes this worker's runs may hold before idle ones are evicted; 0 is no budget.
+
+    The configured budget is for the whole server, split evenly between its
+    worker processes.
+    """
+    return get_env_int(
+        "GAME_SESSION_MEMORY_BUDGET_MB", GAME_SESSION_MEMORY_BUDGET_DEFAULT_MB, minimum=0
+    ) * 1024 * 1024 // get_web_concurrency()
+
+
+def get_game_session_ttls() -> Dict[str, int]:
+    """Seconds a session lasts past its last access, by GameSessionManager.expiry_kind."""
+    return {
+        kind: get_env_int(env_var, GameSessionManager.DEFAULT_TTLS[kind] // 60) * 60
+        for kind, env_var in GAME_SESSION_TTL_ENV_VARS.items()
+    }
+
+
+def get_game_session_max_per_user() -> int:
+    """Runs one signed-in user may hold in memory; 0 is no cap."""
+    return get_env_int("GAME_SESSION_MAX_PER_USER", GAME_SESSION_DEFAULT_MAX_PER_USER, minimum=0)
+
+
+def get_process_rss_bytes() -> Optional[int]:
+    """Resident memory of this process, where /proc reports it."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
 #==================================================================
 # FastAPI
 #==================================================================
@@ -937,19 +1584,39 @@ async def lifespan(app: FastAPI):
     validate_firebase_client_config()
     # Initialize database
     db.init_db()
+    directory = make_session_directory(get_session_directory_name(), db)
+    game_session_manager.directory = directory
+    await directory.start()
+    forge_supervisor.start(directory.worker_id)
 
-    # Start session cleanup task
-    async def cleanup_task():
+    game_session_manager.ttls = get_game_session_ttls()
+
+    # Expire sessions as they fall due, waking at the next deadline or a
+    # minute on, whichever is sooner. Each worker expires the sessions it holds.
+    async def expiry_task():
         while True:
-            await asyncio.sleep(3600)  # Run every hour
-            game_session_manager.cleanup_expired_sessions()
+            next_expiry = game_session_manager.next_expiry()
+            delay = GAME_SESSION_EXPIRY_MAX_SLEEP_SECONDS
+            if next_expiry is not None:
+                delay = min(delay, max(1, next_expiry - time.time()))
+            await asyncio.sleep(delay)
+            try:
+                await directory.forget(game_session_manager.expire_sessions())
+            except Exception as e:
+                logging.error(f"Error expiring game sessions: {e}")
 
-    cleanup_task_handle = asyncio.create_task(cleanup_task())
+    expiry_task_handle = asyncio.create_task(expiry_task())
     public_review_task_handle = None
 
     async def public_review_task():
         while True:
             try:
+                # One worker polls at a time; another takes over if it stops.
+                if not await directory.acquire_lease(
+                        "public_world_reviews", get_world_public_review_poll_seconds() * 2
+                ):
+                    await asyncio.sleep(get_world_public_review_poll_seconds())
+                    continue
                 processed_count = await process_due_public_world_reviews(
                     db,
                     limit=get_world_public_review_max_per_poll(),
@@ -964,13 +1631,91 @@ async def lifespan(app: FastAPI):
     if is_world_public_review_worker_enabled() and hasattr(db, "list_due_public_reviews"):
         public_review_task_handle = asyncio.create_task(public_review_task())
 
+    maintenance_task_handle = None
+
+    async def maintenance_task(interval_seconds):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                if not await directory.acquire_lease("db_maintenance", interval_seconds + 60):
+                    continue
+                # On its own thread: a pass is many short batches with pauses,
+                # and should not hold one of the db.aio workers throughout.
+                report = await asyncio.to_thread(db.run_maintenance)
+                if report:
+                    logging.info("Database maintenance: %s", report)
+            except Exception as e:
+                logging.error(f"Error in database maintenance: {e}")
+
+    maintenance_interval = get_db_maintenance_interval_seconds()
+    if maintenance_interval and hasattr(db, "run_maintenance"):
+        maintenance_task_handle = asyncio.create_task(maintenance_task(maintenance_interval))
+
+    async def session_sweep_task(idle_seconds):
+        while True:
+            await asyncio.sleep(min(GAME_SESSION_SWEEP_SECONDS, idle_seconds or GAME_SESSION_SWEEP_SECONDS))
+            try:
+                if idle_seconds:
+                    hibernated = await game_session_manager.hibernate_idle_sessions(idle_seconds)
+                    if hibernated:
+                        logging.info("Hibernated %s idle game session(s).", hibernated)
+                evicted = await game_session_manager.enforce_limits(
+                    memory_budget_bytes=get_game_session_memory_budget_bytes(),
+                    max_per_user=get_game_session_max_per_user(),
+                )
+                if evicted:
+                    logging.info("Evicted %s game session(s) over their limits.", evicted)
+            except Exception as e:
+                logging.error(f"Error sweeping game sessions: {e}")
+
+    session_sweep_task_handle = asyncio.create_task(
+        session_sweep_task(get_game_session_hibernate_seconds())
+    )
+    directory_task_handle = None
+
+    async def directory_task():
+        beat_at = time.monotonic()
+        while True:
+            await asyncio.sleep(SESSION_HANDOFF_POLL_SECONDS)
+            try:
+                if time.monotonic() - beat_at >= WORKER_HEARTBEAT_SECONDS:
+                    await directory.heartbeat()
+                    beat_at = time.monotonic()
+                await game_session_manager.hand_off_requested()
+            except Exception as e:
+                logging.error(f"Error handing off game sessions: {e}")
+
+    if directory.shared:
+        directory_task_handle = asyncio.create_task(directory_task())
+
     yield
 
     # Shutdown - ensure database uploads are completed
     logging.info("Shutting down database manager...")
-    cleanup_task_handle.cancel()
+    expiry_task_handle.cancel()
     if public_review_task_handle is not None:
         public_review_task_handle.cancel()
+    if maintenance_task_handle is not None:
+        maintenance_task_handle.cancel()
+    session_sweep_task_handle.cancel()
+    if directory_task_handle is not None:
+        directory_task_handle.cancel()
+    # A World half forged cannot be saved: its forge is cancelled, and refunded.
+    try:
+        await forge_supervisor.shutdown()
+    except Exception:
+        logging.exception("Could not cancel running forges")
+    # Runs in memory would be lost with the process; the next one resumes them.
+    try:
+        hibernated = await game_session_manager.hibernate_all()
+        if hibernated:
+            logging.info("Hibernated %s game session(s) for shutdown.", hibernated)
+    except Exception:
+        logging.exception("Could not hibernate game sessions for shutdown")
+    try:
+        await directory.stop()
+    except Exception:
+        logging.exception("Could not leave the session directory")
     db.shutdown()
 
 app = FastAPI(lifespan=lifespan)
@@ -1050,6 +1795,10 @@ async def get_database_health():
         "database": "sqlite",
         "storage_enabled": bool(getattr(db, "storage_enabled", False)),
         "latency_ms": round((time.perf_counter() - started_at) * 1000, 3),
+        "world_cache": db.world_cache.stats(),
+        "writer": db.writes.stats(),
+        "accounts_writer": db.account_writes.stats(),
+        "write_behind": {"play_starts": db.play_starts.stats()},
     })
 
 @app.get("/admin")
@@ -1142,7 +1891,7 @@ async def read_game(request: Request):
             # Check if user already has a session for this generator
             session_key = f"game_session_{generator_id}_{language}"
             existing_session_id = request.session.get(session_key)
-            if existing_session_id and game_session_manager.get_session(existing_session_id):
+            if existing_session_id and await game_session_manager.has_session(existing_session_id):
                 # Redirect to existing session
                 return RedirectResponse(url=f"/game/{existing_session_id}")
 
@@ -1156,7 +1905,7 @@ async def read_game(request: Request):
                     generator_id=generator_id
                 )
 
-                session_id = game_session_manager.create_session(game_instance)
+                session_id = await game_session_manager.create_session(game_instance)
                 request.session[session_key] = session_id
 
                 # Redirect to the new session
@@ -1177,8 +1926,8 @@ async def read_game(request: Request):
 @app.get("/game/{session_id}")
 async def read_game_session(session_id: str, request: Request):
     try:
-        # Validate session exists (check directly in sessions dict)
-        if session_id not in game_session_manager.sessions:
+        # Validate session exists, here, on another worker or hibernated
+        if not await game_session_manager.has_session(session_id):
             # Session not found, redirect to landing
             return RedirectResponse(url="/?error=session_not_found")
 
@@ -1199,7 +1948,7 @@ async def read_game_session(session_id: str, request: Request):
 @app.post("/api/create_game_session")
 async def create_game_session(creation_request: GameCreationRequest, req: Request):
     """Create a new game session and return session ID immediately"""
-    requester_user_id = get_request_user_id(req)
+    requester_user_id = await db.aio.run(get_request_user_id, req)
 
     if creation_request.debug_seed is not None and not is_debug_seed_allowed(req):
         return JSONResponse({
@@ -1212,7 +1961,7 @@ async def create_game_session(creation_request: GameCreationRequest, req: Reques
         }, status_code=400)
 
     if creation_request.generator_id:
-        generator_data = db.get_visible_generator(
+        generator_data = await db.aio.get_visible_generator(
             creation_request.generator_id,
             requester_owner_id=requester_user_id
         )
@@ -1231,7 +1980,7 @@ async def create_game_session(creation_request: GameCreationRequest, req: Reques
                     "error": LOGIN_REQUIRED_TO_CREATE_WORLD_MESSAGE
                 }, status_code=401)
 
-            credit_state = serialize_credit_state(requester_user_id)
+            credit_state = await db.aio.run(serialize_credit_state, requester_user_id)
             forge_cost = credit_state["forge_cost"]
             if credit_state["total"] < forge_cost:
                 return JSONResponse({
@@ -1249,7 +1998,7 @@ async def create_game_session(creation_request: GameCreationRequest, req: Reques
             requester_user_id or "anonymous",
             "create_world",
         )
-        rate_limited_response = consume_rate_limit_attempt(
+        rate_limited_response = await consume_rate_limit_attempt(
             world_creation_rate_limiter,
             rate_limit_key,
             WORLD_CREATION_RATE_LIMIT_MESSAGE,
@@ -1264,7 +2013,7 @@ async def create_game_session(creation_request: GameCreationRequest, req: Reques
     session_id = str(uuid.uuid4())
 
     # Store the session with initial state in the new format
-    game_session_manager.sessions[session_id] = {
+    session = {
         'created_at': time.time(),
         'last_accessed': time.time(),
         'game_instance': None,  # Will be set when game is created
@@ -1276,6 +2025,22 @@ async def create_game_session(creation_request: GameCreationRequest, req: Reques
         'spectator_mode': creation_request.spectator_mode,
         'requester_user_id': requester_user_id,
     }
+    # The forge starts now, whether or not a socket ever watches it. Without
+    # the app's lifespan (no event loop outlives this request) it starts when
+    # the session's WebSocket connects instead.
+    await game_session_manager.add_pending_session(
+        session_id, session, held=forge_supervisor.running
+    )
+    # Without an account, only this tells the creator apart when abandoning.
+    req.session["created_game_sessions"] = [
+        *req.session.get("created_game_sessions", []), session_id
+    ][-CREATED_GAME_SESSIONS_REMEMBERED:]
+    if forge_supervisor.running:
+        await forge_supervisor.submit(
+            session_id,
+            requester_user_id,
+            lambda emit: forge_world(session_id, session, requester_user_id, emit),
+        )
 
     logging.info(f"Created new game session: {session_id}")
 
@@ -1285,42 +2050,89 @@ async def create_game_session(creation_request: GameCreationRequest, req: Reques
     }
 
 @app.get("/api/worlds/recent")
-async def get_recent_worlds(request: Request, limit: int = 12):
+async def get_recent_worlds(request: Request, limit: int = 12, cursor: Optional[str] = None):
     """List reusable generated Worlds.
 
     Local/dev and opt-in library deployments see recent Worlds for convenience.
-    Other deployments see public Worlds only.
+    Other deployments see public Worlds only. Pass the returned `next_cursor`
+    back as `cursor` for the following page.
     """
     try:
         requester_user_id = get_request_user_id(request)
+        page = db.list_worlds_page(
+            limit,
+            local_dev=is_world_library_allowed(request),
+            cursor=cursor,
+        )
         worlds = [
             serialize_world_summary(world, requester_user_id)
-            for world in db.list_worlds(limit, local_dev=is_world_library_allowed(request))
+            for world in page["worlds"]
         ]
         return JSONResponse({
-            "worlds": worlds
+            "worlds": worlds,
+            "next_cursor": page["next_cursor"],
         })
+    except ValueError:
+        return JSONResponse({"error": "Invalid cursor"}, status_code=400)
     except Exception as e:
         logging.error(f"Error listing worlds: {e}")
         return JSONResponse({
             "error": "Failed to load worlds"
         }, status_code=500)
 
+@app.get("/api/worlds/search")
+async def search_worlds(request: Request, q: str = "", limit: int = 12, cursor: Optional[str] = None):
+    """Search World titles and themes, best match first.
+
+    Sees the same Worlds as /api/worlds/recent. Pass the returned
+    `next_cursor` back as `cursor` for the following page.
+    """
+    query = q.strip()[:200]
+    if not query:
+        return JSONResponse({"error": "Missing search query"}, status_code=400)
+    try:
+        requester_user_id = get_request_user_id(request)
+        page = db.search_worlds_page(
+            query,
+            limit,
+            local_dev=is_world_library_allowed(request),
+            cursor=cursor,
+        )
+        worlds = [
+            serialize_world_summary(world, requester_user_id)
+            for world in page["worlds"]
+        ]
+        return JSONResponse({
+            "worlds": worlds,
+            "next_cursor": page["next_cursor"],
+        })
+    except ValueError:
+        return JSONResponse({"error": "Invalid cursor"}, status_code=400)
+    except Exception as e:
+        logging.error(f"Error searching worlds: {e}")
+        return JSONResponse({
+            "error": "Failed to search worlds"
+        }, status_code=500)
+
 @app.get("/api/my/worlds")
-async def get_my_worlds(request: Request, limit: int = 20):
-    """List Worlds owned by the logged-in user."""
+async def get_my_worlds(request: Request, limit: int = 20, cursor: Optional[str] = None):
+    """List Worlds owned by the logged-in user, one cursor page at a time."""
     user_id = get_request_user_id(request)
     if not user_id:
         return JSONResponse({"error": "Not authenticated"}, status_code=401)
 
     try:
+        page = db.list_worlds_page(limit, owner_id=user_id, cursor=cursor)
         worlds = [
             serialize_world_summary(world, user_id)
-            for world in db.list_worlds(limit, owner_id=user_id)
+            for world in page["worlds"]
         ]
         return JSONResponse({
-            "worlds": worlds
+            "worlds": worlds,
+            "next_cursor": page["next_cursor"],
         })
+    except ValueError:
+        return JSONResponse({"error": "Invalid cursor"}, status_code=400)
     except Exception as e:
         logging.error(f"Error listing owned worlds: {e}")
         return JSONResponse({
@@ -1472,6 +2284,28 @@ async def get_admin_users(request: Request, limit: int = 100):
             "error": "Failed to load users"
         }, status_code=500)
 
+def admin_db_queries_snapshot() -> Dict:
+    snapshot = db.query_stats.snapshot()
+    snapshot["writer"] = db.writes.stats()
+    snapshot["accounts_writer"] = db.account_writes.stats()
+    return snapshot
+
+@app.get("/api/admin/db/queries")
+async def get_admin_db_queries(request: Request):
+    """Per-method database timings and recent slow calls for admins."""
+    require_admin_user(request)
+
+    return JSONResponse(admin_db_queries_snapshot())
+
+@app.post("/api/admin/db/queries/reset")
+async def reset_admin_db_queries(request: Request):
+    """Start a fresh measuring window, returning the timings of the one ending."""
+    require_admin_user(request)
+
+    snapshot = admin_db_queries_snapshot()
+    db.query_stats.reset()
+    return JSONResponse(snapshot)
+
 @app.patch("/api/admin/users/{user_id}/password-reset")
 async def set_admin_user_password_reset(
         request: AdminPasswordResetRequest,
@@ -1611,7 +2445,7 @@ async def create_game(request: CreateGameRequest, req: Request):
                 requester_user_id or "anonymous",
                 "create_world",
             )
-            rate_limited_response = consume_rate_limit_attempt(
+            rate_limited_response = await consume_rate_limit_attempt(
                 world_creation_rate_limiter,
                 rate_limit_key,
                 WORLD_CREATION_RATE_LIMIT_MESSAGE,
@@ -1681,12 +2515,12 @@ def legacy_password_auth_disabled_response() -> Optional[JSONResponse]:
     }, status_code=403)
 
 
-def create_signup_user(
+async def create_signup_user(
         signup_request: SignupRequest,
         req: Request,
 ) -> tuple:
     rate_limit_key = signup_rate_limiter.make_key(req, scope="signup")
-    rate_limited_response = consume_rate_limit_attempt(
+    rate_limited_response = await consume_rate_limit_attempt(
         signup_rate_limiter,
         rate_limit_key,
         SIGNUP_RATE_LIMIT_MESSAGE,
@@ -1720,7 +2554,7 @@ def create_signup_user(
     return user, None
 
 
-def authenticate_login_user(
+async def authenticate_login_user(
         login_request: LoginRequest,
         req: Request,
 ) -> tuple:
@@ -1729,10 +2563,10 @@ def authenticate_login_user(
         login_request.username,
         "login",
     )
-    if is_rate_limiting_enabled() and auth_rate_limiter.is_limited(rate_limit_key):
+    if is_rate_limiting_enabled() and await auth_rate_limiter.is_limited(rate_limit_key):
         return None, rate_limit_response(
             LOGIN_RATE_LIMIT_MESSAGE,
-            auth_rate_limiter.retry_after_seconds(rate_limit_key),
+            await auth_rate_limiter.retry_after_seconds(rate_limit_key),
         )
 
     user = db.get_user_by_username(login_request.username)
@@ -1741,13 +2575,13 @@ def authenticate_login_user(
             user["password_hash"],
     ):
         if is_rate_limiting_enabled():
-            auth_rate_limiter.record_failure(rate_limit_key)
+            await auth_rate_limiter.record_failure(rate_limit_key)
         return None, JSONResponse(
             {"error": "Invalid username or password"},
             status_code=401,
         )
 
-    auth_rate_limiter.clear(rate_limit_key)
+    await auth_rate_limiter.clear(rate_limit_key)
     return user, None
 
 
@@ -1779,7 +2613,7 @@ async def signup(request: SignupRequest, req: Request):
     if disabled_response is not None:
         return disabled_response
 
-    user, error_response = create_signup_user(request, req)
+    user, error_response = await create_signup_user(request, req)
     if error_response is not None:
         return error_response
 
@@ -1792,7 +2626,7 @@ async def login(request: LoginRequest, req: Request):
     if disabled_response is not None:
         return disabled_response
 
-    user, error_response = authenticate_login_user(request, req)
+    user, error_response = await authenticate_login_user(request, req)
     if error_response is not None:
         return error_response
 
@@ -1806,7 +2640,7 @@ async def mobile_signup(request: MobileSignupRequest, req: Request):
     if disabled_response is not None:
         return disabled_response
 
-    user, error_response = create_signup_user(request, req)
+    user, error_response = await create_signup_user(request, req)
     if error_response is not None:
         return error_response
     return issue_mobile_auth_response(user, request.platform, request.device_name)
@@ -1818,7 +2652,7 @@ async def mobile_login(request: MobileLoginRequest, req: Request):
     if disabled_response is not None:
         return disabled_response
 
-    user, error_response = authenticate_login_user(request, req)
+    user, error_response = await authenticate_login_user(request, req)
     if error_response is not None:
         return error_response
     return issue_mobile_auth_response(user, request.platform, request.device_name)
@@ -1834,7 +2668,7 @@ async def firebase_auth(request: FirebaseAuthRequest, req: Request):
         }, status_code=503)
 
     rate_limit_key = social_auth_rate_limiter.make_key(req, scope="firebase")
-    rate_limited_response = consume_rate_limit_attempt(
+    rate_limited_response = await consume_rate_limit_attempt(
         social_auth_rate_limiter,
         rate_limit_key,
         SOCIAL_AUTH_RATE_LIMIT_MESSAGE,
@@ -2114,172 +2948,232 @@ class TimeProfiler:
         logging.info(f"{self.name} took {self.elapsed:.2f} seconds")
 
 # WebSocket endpoint for the game - now works with sessions
-@app.websocket("/ws/game/{session_id}")
-async def websocket_endpoint(websocket: WebSocket, session_id: str):
-    await websocket.accept()
+async def forge_world(session_id: str, session: dict, user_id: Optional[str], emit) -> bool:
+    """Forge a pending session's World, sending each step through `emit`.
+
+    Runs as a ForgeSupervisor job, so it carries on whether or not a socket
+    is watching. Returns whether the World is ready. If not, the session is
+    marked as failed, `emit` has been sent the reason and any charge is
+    refunded; the same goes when it is cancelled, because the session was
+    abandoned or the server is stopping.
+    """
+    forge_charge_operation = None
 
-    try:
-        # Check if session exists
-        if session_id not in game_session_manager.sessions:
-            await websocket.send_json({
-                "type": "error",
-                "message": "Session not found"
-            })
-            return
+    async def refund():
+        if forge_charge_operation and user_id:
+            try:
+                await db.aio.refund_credit_spend(
+                    user_id=user_id,
+                    original_operation_key=forge_charge_operation,
+                    reference_type="game_session",
+                    reference_id=session_id,
+                )
+            except Exception:
+                logging.exception("Could not refund failed forge for session %s", session_id)
 
-        session = game_session_manager.sessions[session_id]
-        user_id = session.get("requester_user_id") or websocket.session.get("user_id")
-        spectator_mode = bool(session.get("spectator_mode"))
-        forge_charge_operation = None
+    async def fail(event) -> bool:
+        session['status'] = 'error'
+        await game_session_manager.publish(session_id)
+        await emit(event)
+        return False
 
-        # If game is not created yet, create it now
-        if session['status'] == 'creating':
-            await websocket.send_json({
-                "type": "status",
-                "message": "Creating game world...",
-                "status": "creating"
-            })
+    try:
+        await emit({
+            "type": "status",
+            "message": "Creating game world...",
+            "status": "creating"
+        })
 
-            try:
-                request = session['creation_request']
-                if request.debug_seed is not None:
-                    seed = request.debug_seed
-                elif request.spectator_mode and request.generator_id:
-                    # An Auto Review should make the same combat rolls every
-                    # time so visual comparisons between builds are meaningful.
-                    seed = zlib.crc32(
-                        f"{request.generator_id}:{request.language}:auto-review-v1".encode("utf-8")
-                    )
-                else:
-                    seed = int(time.time())
-
-                if request.generator_id:
-                    # Check if generator exists
-                    generator_data = db.get_visible_generator(
-                        request.generator_id,
-                        requester_owner_id=user_id
-                    )
-                    if not generator_data:
-                        await websocket.send_json({
-                            "type": "error",
-                            "message": "World not found"
-                        })
-                        return
-
-                    # Use generator data
-                    theme_desc = generator_data['theme_desc']
-                    language = request.language or generator_data['language']
-                    do_web_search = False  # Don't re-do web search for existing generators
-                else:
-                    if (
-                            (is_login_required_to_create_world() or is_world_credits_enabled())
-                            and not user_id
-                    ):
-                        await websocket.send_json({
-                            "type": "error",
-                            "message": LOGIN_REQUIRED_TO_CREATE_WORLD_MESSAGE
-                        })
-                        return
-
-                    # Use provided parameters
-                    theme_desc = request.theme if request.theme else "fantasy"
-                    language = request.language
-                    do_web_search = request.do_web_search
-
-                    if is_world_credits_enabled():
-                        forge_charge_operation = f"forge:{session_id}"
-                        charge = db.spend_credits(
-                            user_id=user_id,
-                            amount=get_world_forge_credit_cost(),
-                            kind="world_forge",
-                            operation_key=forge_charge_operation,
-                            reference_type="game_session",
-                            reference_id=session_id,
-                        )
-                        if not charge["spent"]:
-                            await websocket.send_json({
-                                "type": "error",
-                                "code": "insufficient_credits",
-                                "message": "You no longer have enough credits to forge this World.",
-                                "credits": charge["balance"],
-                            })
-                            return
-                        session["forge_charge_operation"] = forge_charge_operation
+        request = session['creation_request']
+        if request.debug_seed is not None:
+            seed = request.debug_seed
+        elif request.spectator_mode and request.generator_id:
+            # An Auto Review should make the same combat rolls every
+            # time so visual comparisons between builds are meaningful.
+            seed = zlib.crc32(
+                f"{request.generator_id}:{request.language}:auto-review-v1".encode("utf-8")
+            )
+        else:
+            seed = int(time.time())
 
-                await websocket.send_json({
-                    "type": "status",
-                    "message": "Generating game content...",
-                    "status": "creating"
+        if request.generator_id:
+            # Check if generator exists
+            generator_data = await db.aio.get_visible_generator(
+                request.generator_id,
+                requester_owner_id=user_id
+            )
+            if not generator_data:
+                return await fail({
+                    "type": "error",
+                    "message": "World not found"
                 })
 
-                # Determine ownership and visibility for newly generated worlds.
-                world_visibility = get_default_new_world_visibility()
+            # Use generator data
+            theme_desc = generator_data['theme_desc']
+            language = request.language or generator_data['language']
+            do_web_search = False  # Don't re-do web search for existing generators
+        else:
+            if (
+                    (is_login_required_to_create_world() or is_world_credits_enabled())
+                    and not user_id
+            ):
+                return await fail({
+                    "type": "error",
+                    "message": LOGIN_REQUIRED_TO_CREATE_WORLD_MESSAGE
+                })
 
-                async def send_forge_progress(event):
-                    await websocket.send_json({"type": "forge_progress", **event})
+            # Use provided parameters
+            theme_desc = request.theme if request.theme else "fantasy"
+            language = request.language
+            do_web_search = request.do_web_search
 
-                # Create new game instance with timeout
-                try:
-                    game_instance = await asyncio.wait_for(
-                        Game.create(
-                            seed=seed,
-                            theme_desc=theme_desc,
-                            language=language,
-                            do_web_search=do_web_search,
-                            generator_id=request.generator_id,
-                            owner_id=user_id,
-                            visibility=world_visibility,
-                            on_progress=send_forge_progress
-                        ),
-                        timeout=get_world_creation_timeout_seconds()
-                    )
-                except asyncio.TimeoutError:
-                    if forge_charge_operation and user_id:
-                        db.refund_credit_spend(
-                            user_id=user_id,
-                            original_operation_key=forge_charge_operation,
-                            reference_type="game_session",
-                            reference_id=session_id,
-                        )
-                    session['status'] = 'error'
-                    await websocket.send_json({
+            if is_world_credits_enabled():
+                forge_charge_operation = f"forge:{session_id}"
+                charge = await db.aio.spend_credits(
+                    user_id=user_id,
+                    amount=get_world_forge_credit_cost(),
+                    kind="world_forge",
+                    operation_key=forge_charge_operation,
+                    reference_type="game_session",
+                    reference_id=session_id,
+                )
+                if not charge["spent"]:
+                    return await fail({
                         "type": "error",
-                        "message": "Game creation is taking longer than expected. Please try again with a simpler theme or use an existing generator."
+                        "code": "insufficient_credits",
+                        "message": "You no longer have enough credits to forge this World.",
+                        "credits": charge["balance"],
                     })
-                    return
+                session["forge_charge_operation"] = forge_charge_operation
 
-                # Update session with created game
-                session['game_instance'] = game_instance
-                session['status'] = 'ready'
-                session['last_accessed'] = time.time()
-                if game_instance.state_manager:
-                    session['generator_id'] = game_instance.state_manager.generator_id
+        await emit({
+            "type": "status",
+            "message": "Generating game content...",
+            "status": "creating"
+        })
 
-                await websocket.send_json({
-                    "type": "status",
-                    "message": "Game ready!",
-                    "status": "ready"
-                })
+        # Determine ownership and visibility for newly generated worlds.
+        world_visibility = get_default_new_world_visibility()
 
-            except Exception:
-                logging.exception("Error creating game for session %s", session_id)
-                if forge_charge_operation and user_id:
-                    try:
-                        db.refund_credit_spend(
-                            user_id=user_id,
-                            original_operation_key=forge_charge_operation,
-                            reference_type="game_session",
-                            reference_id=session_id,
-                        )
-                    except Exception:
-                        logging.exception(
-                            "Could not refund failed forge for session %s", session_id
-                        )
-                session['status'] = 'error'
-                await websocket.send_json({
-                    "type": "error",
-                    "message": "Failed to create game"
-                })
+        async def report_forge_progress(event):
+            await emit({"type": "forge_progress", **event})
+
+        # Create new game instance with timeout
+        session['forging'] = True
+        try:
+            game_instance = await asyncio.wait_for(
+                Game.create(
+                    seed=seed,
+                    theme_desc=theme_desc,
+                    language=language,
+                    do_web_search=do_web_search,
+                    generator_id=request.generator_id,
+                    owner_id=user_id,
+                    visibility=world_visibility,
+                    on_progress=report_forge_progress
+                ),
+                timeout=get_world_creation_timeout_seconds()
+            )
+        except asyncio.TimeoutError:
+            await refund()
+            return await fail({
+                "type": "error",
+                "message": "Game creation is taking longer than expected. Please try again with a simpler theme or use an existing generator."
+            })
+        finally:
+            session.pop('forging', None)
+
+        # The map is built on first play and reports progress too, by then
+        # to the sockets playing rather than to this finished job.
+        async def report_build_progress(event):
+            for client in game_instance.get_connected_clients():
+                try:
+                    await client.send_json({"type": "forge_progress", **event})
+                except Exception as exc:
+                    logging.debug("Could not send build progress: %s", exc)
+
+        if game_instance.state_manager:
+            game_instance.state_manager.on_progress = report_build_progress
+
+        # Update session with created game
+        session['game_instance'] = game_instance
+        session['status'] = 'ready'
+        session['last_accessed'] = time.time()
+        if game_instance.state_manager:
+            session['generator_id'] = game_instance.state_manager.generator_id
+        await game_session_manager.publish(session_id)
+
+        await emit({
+            "type": "status",
+            "message": "Game ready!",
+            "status": "ready"
+        })
+        return True
+
+    except asyncio.CancelledError:
+        logging.info("Forge for session %s was cancelled", session_id)
+        await refund()
+        session['status'] = 'error'
+        await game_session_manager.publish(session_id)
+        raise
+    except Exception:
+        logging.exception("Error creating game for session %s", session_id)
+        await refund()
+        return await fail({
+            "type": "error",
+            "message": "Failed to create game"
+        })
+
+
+async def relay_forge(websocket: WebSocket, session_id: str) -> bool:
+    """Send a forge's progress, what was sent before first; False if it failed."""
+    ready = True
+    async for event in forge_supervisor.follow(session_id):
+        await websocket.send_json(event)
+        ready = event.get("type") != "error"
+    return ready
+
+
+@app.websocket("/ws/game/{session_id}")
+async def websocket_endpoint(websocket: WebSocket, session_id: str):
+    await websocket.accept()
+
+    try:
+        # A World still forging on another worker is followed there; its run
+        # is taken over once it is ready.
+        if (
+                session_id not in game_session_manager.sessions
+                and await forge_supervisor.forging_elsewhere(session_id)
+                and not await relay_forge(websocket, session_id)
+        ):
+            return
+
+        # Check if session exists, rehydrating a hibernated one
+        session = await game_session_manager.resume_session(session_id)
+        if session is None:
+            await websocket.send_json({
+                "type": "error",
+                "message": "Session not found"
+            })
+            return
+
+        user_id = session.get("requester_user_id") or websocket.session.get("user_id")
+        spectator_mode = bool(session.get("spectator_mode"))
+
+        # If the game is not created yet, forge it (unless that already
+        # started) and relay the progress, from the start, until it is ready.
+        # The first socket to connect sees the whole forge, even if it ended;
+        # a run started from an existing game was never forged.
+        if session['status'] in ('creating', 'error') or (
+                session.get('creation_request') and not session.get('connected_at')
+        ):
+            if session['status'] == 'creating':
+                await forge_supervisor.submit(
+                    session_id,
+                    user_id,
+                    lambda emit: forge_world(session_id, session, user_id, emit),
+                )
+            if not await relay_forge(websocket, session_id):
                 return
 
         # Get the game instance
@@ -2297,13 +3191,14 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         )
         if world_id and not spectator_mode:
             try:
-                db.record_world_play_start(session_id, world_id, user_id)
+                db.queue_world_play_start(session_id, world_id, user_id)
             except Exception:
                 logging.exception("Could not record play start for %s", session_id)
 
         # Handle the WebSocket connection with the game instance
         try:
             game_instance.add_client(websocket)
+            session.setdefault('connected_at', time.time())
 
             # Check for error message through state manager
             if game_instance.state_manager and game_instance.state_manager.error_message:
@@ -2351,7 +3246,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 is_won = bool(getattr(state, "game_won", False))
                 if not spectator_mode and not was_won and is_won and world_id:
                     try:
-                        completion = db.record_world_completion(
+                        completion = await db.aio.record_world_completion(
                             session_id=session_id,
                             generator_id=world_id,
                             user_id=user_id,
@@ -2393,6 +3288,9 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             except (WebSocketDisconnect, ConnectionResetError, RuntimeError):
                 logging.debug("Could not send error message - connection already closed")
         finally:
+            # Idle time, and the least-recently-used order, start when the
+            # player leaves, not when they connected.
+            session['last_accessed'] = time.time()
             if game_instance:
                 try:
                     game_instance.remove_client(websocket)
@@ -2485,7 +3383,7 @@ async def legacy_websocket_endpoint(websocket: WebSocket):
         forge_charge_operation = None
 
         # Create session for this game
-        session_id = game_session_manager.create_session(game_instance)
+        session_id = await game_session_manager.create_session(game_instance)
         logging.info(f"Created legacy session: {session_id}")
         world_id = (
             game_instance.state_manager.generator_id
@@ -2493,7 +3391,7 @@ async def legacy_websocket_endpoint(websocket: WebSocket):
         )
         if world_id:
             try:
-                db.record_world_play_start(session_id, world_id, user_id)
+                db.queue_world_play_start(session_id, world_id, user_id)
             except Exception:
                 logging.exception("Could not record legacy play start for %s", session_id)
 
@@ -2619,11 +3517,10 @@ async def legacy_websocket_endpoint(websocket: WebSocket):
 @app.get("/api/session/{session_id}/info")
 async def get_session_info(session_id: str):
     """Get information about a game session."""
-    if session_id not in game_session_manager.sessions:
+    session_data = await game_session_manager.resume_session(session_id)
+    if session_data is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    session_data = game_session_manager.sessions[session_id]
-
     # Handle both new and old session structures
     if isinstance(session_data, dict) and 'game_instance' in session_data:
         # New structure
@@ -2648,12 +3545,50 @@ async def get_session_info(session_id: str):
             "game_title": game_instance.get_game_title() if game_instance else None
         })
 
+@app.post("/api/session/{session_id}/abandon")
+async def abandon_game_session(session_id: str, req: Request):
+    """Give a session up for good, cancelling its World's forge if one is running.
+
+    A cancelled forge refunds what it was charged. Only the player who
+    created the session may abandon it: the account that did, or for a
+    session created signed out, the browser session that did.
+    """
+    found, owner_id = await game_session_manager.find_owner(session_id)
+    if not found:
+        return JSONResponse({"error": "Session not found"}, status_code=404)
+    if owner_id:
+        is_creator = owner_id == await db.aio.run(get_request_user_id, req)
+    else:
+        is_creator = session_id in req.session.get("created_game_sessions", [])
+    if not is_creator:
+        return JSONResponse({"error": "This session belongs to another player"}, status_code=403)
+
+    forge_cancelled = await forge_supervisor.cancel(session_id)
+    await game_session_manager.abandon(session_id)
+    logging.info(f"Abandoned game session: {session_id}")
+    return {
+        "session_id": session_id,
+        "status": "abandoned",
+        "forge_cancelled": forge_cancelled,
+    }
+
 # API endpoint to get server stats
 @app.get("/api/stats")
 async def get_server_stats():
     """Get server statistics."""
     return JSONResponse({
         "active_sessions": game_session_manager.get_session_count(),
+        "session_expiry": {
+            "expired": dict(game_session_manager.expirations),
+            "ttl_seconds": dict(game_session_manager.ttls),
+        },
+        "session_memory": {
+            **game_session_manager.memory_stats(),
+            "budget_bytes": get_game_session_memory_budget_bytes(),
+            "max_per_user": get_game_session_max_per_user(),
+            "process_rss_bytes": get_process_rss_bytes(),
+        },
+        "forge_jobs": forge_supervisor.stats(),
         "uptime": time.time() - app.state.start_time if hasattr(app.state, 'start_time') else 0
     })
 
@@ -3,6 +3,8 @@
 # Create a self-contained RogueLLM snapshot from the running Compose service.
 # The database is copied with SQLite's online backup API before immutable World
 # assets are archived, so every asset referenced by the database is included.
+# The accounts file (users, credits, sessions) is copied in the same read
+# transaction as the World file, so the two archives agree with each other.
 
 set -Eeuo pipefail
 
@@ -13,6 +15,7 @@ APP_DIR="${APP_DIR:-$(cd "$SCRIPT_DIR/.." && pwd)}"
 COMPOSE_FILE="${COMPOSE_FILE:-$APP_DIR/docker-compose.production.yml}"
 SERVICE_NAME="${SERVICE_NAME:-app}"
 DB_PATH="${DB_PATH:-/app/_data/rllm_game_data.db}"
+ACCOUNTS_DB_PATH="${ACCOUNTS_DB_PATH:-/app/_data/rllm_game_data-accounts.db}"
 ASSETS_PATH="${ASSETS_PATH:-/app/_data/assets}"
 BACKUP_ROOT="${BACKUP_ROOT:-$APP_DIR/backups/production}"
 BACKUP_PREFIX="${BACKUP_PREFIX:-roguellm-production}"
@@ -26,6 +29,7 @@ LOCK_FILE="$BACKUP_ROOT/backup.lock"
 WORK_DIR="$SNAPSHOTS_DIR/.incomplete-$TIMESTAMP-$$"
 FINAL_DIR="$SNAPSHOTS_DIR/$TIMESTAMP"
 CONTAINER_TMP="/tmp/$BACKUP_PREFIX-$TIMESTAMP-$$.sqlite"
+CONTAINER_ACCOUNTS_TMP="/tmp/$BACKUP_PREFIX-$TIMESTAMP-$$-accounts.sqlite"
 BACKUP_COMPLETED=false
 
 log() {
@@ -78,7 +82,7 @@ cleanup() {
     local exit_code=$?
 
     docker compose -f "$COMPOSE_FILE" exec -T "$SERVICE_NAME" \
-        rm -f "$CONTAINER_TMP" >/dev/null 2>&1 || true
+        rm -f "$CONTAINER_TMP" "$CONTAINER_ACCOUNTS_TMP" >/dev/null 2>&1 || true
 
     if [[ -d "$WORK_DIR" ]]; then
         rm -rf -- "$WORK_DIR"
@@ -162,13 +166,16 @@ container_id="$(docker compose -f "$COMPOSE_FILE" ps -q "$SERVICE_NAME")"
 
 read -r database_source_bytes asset_file_count asset_source_bytes < <(
     docker compose -f "$COMPOSE_FILE" exec -T "$SERVICE_NAME" \
-        python - "$DB_PATH" "$ASSETS_PATH" <<'PY'
+        python - "$DB_PATH" "$ASSETS_PATH" "$ACCOUNTS_DB_PATH" <<'PY'
 import os
 import sys
 
-database_path, assets_path = sys.argv[1:3]
+database_path, assets_path, accounts_path = sys.argv[1:4]
 if not os.path.isfile(database_path):
     raise SystemExit(f"Database not found: {database_path}")
+database_source_bytes = os.path.getsize(database_path)
+if os.path.isfile(accounts_path):
+    database_source_bytes += os.path.getsize(accounts_path)
 
 asset_file_count = 0
 asset_source_bytes = 0
@@ -184,7 +191,7 @@ if os.path.exists(assets_path):
             except FileNotFoundError:
                 pass
 
-print(os.path.getsize(database_path), asset_file_count, asset_source_bytes)
+print(database_source_bytes, asset_file_count, asset_source_bytes)
 PY
 )
 
@@ -202,42 +209,63 @@ mkdir "$WORK_DIR"
 
 database_backup_result="$({
     docker compose -f "$COMPOSE_FILE" exec -T "$SERVICE_NAME" \
-        python - "$DB_PATH" "$CONTAINER_TMP" <<'PY'
+        python - "$DB_PATH" "$CONTAINER_TMP" "$ACCOUNTS_DB_PATH" "$CONTAINER_ACCOUNTS_TMP" <<'PY'
 import json
 import os
 import sqlite3
 import sys
 import time
 
-source_path, destination_path = sys.argv[1:3]
+source_path, destination_path, accounts_path, accounts_destination_path = sys.argv[1:5]
 if not os.path.isfile(source_path):
     raise SystemExit(f"Database not found: {source_path}")
-if os.path.exists(destination_path):
-    os.remove(destination_path)
-
-started_at = time.time()
-source = sqlite3.connect(source_path)
-try:
-    destination = sqlite3.connect(destination_path)
+# Databases from before the accounts split keep everything in one file.
+has_accounts = os.path.isfile(accounts_path)
+copies = [("main", destination_path)]
+if has_accounts:
+    copies.append(("accounts", accounts_destination_path))
+for _, path in copies:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def copy(schema, path):
+    destination = sqlite3.connect(path)
     try:
-        source.backup(destination)
+        source.backup(destination, name=schema)
         integrity = destination.execute("PRAGMA integrity_check").fetchone()[0]
         if integrity != "ok":
-            raise SystemExit(f"Backup integrity check failed: {integrity}")
+            raise SystemExit(f"Backup integrity check failed for {schema}: {integrity}")
         table_count = destination.execute(
             "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'"
         ).fetchone()[0]
     finally:
         destination.close()
+    return {
+        "integrity": integrity,
+        "size_bytes": os.path.getsize(path),
+        "table_count": table_count,
+    }
+
+
+started_at = time.time()
+source = sqlite3.connect(source_path, isolation_level=None)
+try:
+    if has_accounts:
+        source.execute("ATTACH DATABASE ? AS accounts", (accounts_path,))
+    # One read transaction over both files: each copy sees the same moment.
+    source.execute("BEGIN")
+    for schema, _ in copies:
+        source.execute(f"SELECT COUNT(*) FROM {schema}.sqlite_master").fetchone()
+    results = {schema: copy(schema, path) for schema, path in copies}
+    source.execute("COMMIT")
 finally:
     source.close()
 
-print(json.dumps({
-    "elapsed_seconds": round(time.time() - started_at, 3),
-    "integrity": integrity,
-    "size_bytes": os.path.getsize(destination_path),
-    "table_count": table_count,
-}))
+result = {"elapsed_seconds": round(time.time() - started_at, 3), **results["main"]}
+if has_accounts:
+    result["accounts"] = results["accounts"]
+print(json.dumps(result))
 PY
 } | tr -d '\r')"
 
@@ -245,6 +273,15 @@ docker cp "$container_id:$CONTAINER_TMP" "$WORK_DIR/database.sqlite"
 gzip -9 "$WORK_DIR/database.sqlite"
 chmod 600 "$WORK_DIR/database.sqlite.gz"
 
+archives=(database.sqlite.gz)
+if python3 -c 'import json, sys; sys.exit("accounts" not in json.loads(sys.argv[1]))' \
+    "$database_backup_result"; then
+    docker cp "$container_id:$CONTAINER_ACCOUNTS_TMP" "$WORK_DIR/accounts.sqlite"
+    gzip -9 "$WORK_DIR/accounts.sqlite"
+    chmod 600 "$WORK_DIR/accounts.sqlite.gz"
+    archives+=(accounts.sqlite.gz)
+fi
+
 log "Archiving generated World assets"
 docker compose -f "$COMPOSE_FILE" exec -T "$SERVICE_NAME" \
     python - "$ASSETS_PATH" > "$WORK_DIR/assets.tar.gz" <<'PY'
@@ -267,10 +304,12 @@ with tarfile.open(fileobj=sys.stdout.buffer, mode="w|gz") as archive:
         archive.addfile(directory)
 PY
 
-[[ -s "$WORK_DIR/database.sqlite.gz" ]] || fail "Database archive is empty"
+for archive in "${archives[@]}"; do
+    [[ -s "$WORK_DIR/$archive" ]] || fail "Database archive is empty: $archive"
+done
 [[ -s "$WORK_DIR/assets.tar.gz" ]] || fail "Asset archive is empty"
 
-python3 - "$WORK_DIR/database.sqlite.gz" "$WORK_DIR/assets.tar.gz" <<'PY'
+python3 - "$WORK_DIR/assets.tar.gz" "${archives[@]/#/$WORK_DIR/}" <<'PY'
 import gzip
 import os
 import shutil
@@ -279,23 +318,27 @@ import sys
 import tarfile
 import tempfile
 
-database_archive, asset_archive = sys.argv[1:3]
-temporary = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False)
-try:
-    with gzip.open(database_archive, "rb") as source:
-        shutil.copyfileobj(source, temporary)
-    temporary.close()
-    connection = sqlite3.connect(temporary.name)
+asset_archive, database_archives = sys.argv[1], sys.argv[2:]
+for database_archive in database_archives:
+    temporary = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False)
     try:
-        integrity = connection.execute("PRAGMA integrity_check").fetchone()[0]
-        if integrity != "ok":
-            raise SystemExit(f"Archived backup integrity check failed: {integrity}")
-    finally:
-        connection.close()
-finally:
-    if not temporary.closed:
+        with gzip.open(database_archive, "rb") as source:
+            shutil.copyfileobj(source, temporary)
         temporary.close()
-    os.remove(temporary.name)
+        connection = sqlite3.connect(temporary.name)
+        try:
+            integrity = connection.execute("PRAGMA integrity_check").fetchone()[0]
+            if integrity != "ok":
+                raise SystemExit(
+                    f"Archived backup integrity check failed for "
+                    f"{os.path.basename(database_archive)}: {integrity}"
+                )
+        finally:
+            connection.close()
+    finally:
+        if not temporary.closed:
+            temporary.close()
+        os.remove(temporary.name)
 
 with tarfile.open(asset_archive, "r:gz") as archive:
     members = archive.getmembers()
@@ -310,6 +353,10 @@ with tarfile.open(asset_archive, "r:gz") as archive:
 PY
 
 database_archive_bytes="$(stat -c '%s' "$WORK_DIR/database.sqlite.gz")"
+accounts_archive_bytes=0
+if [[ -f "$WORK_DIR/accounts.sqlite.gz" ]]; then
+    accounts_archive_bytes="$(stat -c '%s' "$WORK_DIR/accounts.sqlite.gz")"
+fi
 asset_archive_bytes="$(stat -c '%s' "$WORK_DIR/assets.tar.gz")"
 
 python3 - \
@@ -319,9 +366,11 @@ python3 - \
     "$COMPOSE_FILE" \
     "$SERVICE_NAME" \
     "$DB_PATH" \
+    "$ACCOUNTS_DB_PATH" \
     "$ASSETS_PATH" \
     "$database_source_bytes" \
     "$database_archive_bytes" \
+    "$accounts_archive_bytes" \
     "$asset_file_count" \
     "$asset_source_bytes" \
     "$asset_archive_bytes" \
@@ -337,9 +386,11 @@ import sys
     compose_file,
     service,
     database_path,
+    accounts_database_path,
     assets_path,
     database_source_bytes,
     database_archive_bytes,
+    accounts_archive_bytes,
     asset_file_count,
     asset_source_bytes,
     asset_archive_bytes,
@@ -363,6 +414,9 @@ metadata = {
     "retention_days": int(retention_days),
     "database_backup": json.loads(database_backup_result),
 }
+if int(accounts_archive_bytes):
+    metadata["accounts_database_path"] = accounts_database_path
+    metadata["accounts_archive_bytes"] = int(accounts_archive_bytes)
 with open(metadata_path, "w", encoding="utf-8") as output:
     json.dump(metadata, output, indent=2, sort_keys=True)
     output.write("\n")
@@ -371,7 +425,7 @@ chmod 600 "$WORK_DIR/metadata.json"
 
 (
     cd "$WORK_DIR"
-    sha256sum database.sqlite.gz assets.tar.gz metadata.json > SHA256SUMS
+    sha256sum "${archives[@]}" assets.tar.gz metadata.json > SHA256SUMS
     sha256sum --check SHA256SUMS >/dev/null
 )
 
@@ -49,7 +49,14 @@ max_age_seconds=$(( MAX_AGE_HOURS * 60 * 60 ))
     sha256sum --check SHA256SUMS >/dev/null
 ) || fail "Snapshot checksum verification failed"
 
-python3 - "$snapshot_dir/database.sqlite.gz" "$snapshot_dir/assets.tar.gz" <<'PY' || \
+# Snapshots from before the accounts split have no accounts archive.
+database_archives=("$snapshot_dir/database.sqlite.gz")
+if [[ -e "$snapshot_dir/accounts.sqlite.gz" ]]; then
+    [[ -s "$snapshot_dir/accounts.sqlite.gz" ]] || fail "accounts.sqlite.gz is empty"
+    database_archives+=("$snapshot_dir/accounts.sqlite.gz")
+fi
+
+python3 - "$snapshot_dir/assets.tar.gz" "${database_archives[@]}" <<'PY' || \
     fail "Snapshot archive validation failed"
 import gzip
 import os
@@ -59,23 +66,27 @@ import sys
 import tarfile
 import tempfile
 
-database_archive, assets_archive = sys.argv[1:3]
-temporary = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False)
-try:
-    with gzip.open(database_archive, "rb") as source:
-        shutil.copyfileobj(source, temporary)
-    temporary.close()
-    connection = sqlite3.connect(temporary.name)
+assets_archive, database_archives = sys.argv[1], sys.argv[2:]
+for database_archive in database_archives:
+    temporary = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False)
     try:
-        integrity = connection.execute("PRAGMA integrity_check").fetchone()[0]
-        if integrity != "ok":
-            raise SystemExit(f"Database integrity check failed: {integrity}")
-    finally:
-        connection.close()
-finally:
-    if not temporary.closed:
+        with gzip.open(database_archive, "rb") as source:
+            shutil.copyfileobj(source, temporary)
         temporary.close()
-    os.remove(temporary.name)
+        connection = sqlite3.connect(temporary.name)
+        try:
+            integrity = connection.execute("PRAGMA integrity_check").fetchone()[0]
+            if integrity != "ok":
+                raise SystemExit(
+                    f"Database integrity check failed for "
+                    f"{os.path.basename(database_archive)}: {integrity}"
+                )
+        finally:
+            connection.close()
+    finally:
+        if not temporary.closed:
+            temporary.close()
+        os.remove(temporary.name)
 
 with tarfile.open(assets_archive, "r:gz") as archive:
     members = archive.getmembers()
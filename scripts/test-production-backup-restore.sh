@@ -65,6 +65,10 @@ mkdir "$RESTORE_DIR/_data"
 
 log "Restoring the database and generated assets into disposable files"
 gzip -dc "$snapshot_dir/database.sqlite.gz" > "$RESTORE_DIR/_data/rllm_game_data.db"
+# Snapshots from before the accounts split have no accounts archive.
+if [[ -f "$snapshot_dir/accounts.sqlite.gz" ]]; then
+    gzip -dc "$snapshot_dir/accounts.sqlite.gz" > "$RESTORE_DIR/_data/rllm_game_data-accounts.db"
+fi
 
 python3 - "$snapshot_dir/assets.tar.gz" "$RESTORE_DIR/_data" <<'PY'
 import os
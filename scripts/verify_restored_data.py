@@ -4,15 +4,21 @@
 from __future__ import annotations
 
 import argparse
+import gzip
+import hashlib
 import json
 import os
+import shutil
 import sqlite3
+import tempfile
+import zlib
 from pathlib import Path
 from typing import Any, Iterable
 from urllib.parse import unquote, urlsplit
 
 
 ASSET_URL_PREFIX = "/assets/worlds/"
+COMPRESSED_JSON_MARKER = b"\x01"
 JSON_COLUMNS = {
     "generators": ("player_defs", "item_defs", "enemy_defs", "celltype_defs"),
     "generator_worlds": ("visual_manifest",),
@@ -36,6 +42,13 @@ def iter_asset_urls(value: Any) -> Iterable[str]:
         yield value
 
 
+def load_json_column(raw_value: str | bytes) -> Any:
+    # Large columns are stored as a marker byte plus zlib-compressed JSON.
+    if isinstance(raw_value, bytes) and raw_value[:1] == COMPRESSED_JSON_MARKER:
+        raw_value = zlib.decompress(raw_value[1:])
+    return json.loads(raw_value)
+
+
 def available_columns(connection: sqlite3.Connection, table: str) -> set[str]:
     rows = connection.execute(f'PRAGMA table_info("{table}")').fetchall()
     return {str(row[1]) for row in rows}
@@ -66,8 +79,8 @@ def collect_asset_urls(connection: sqlite3.Connection) -> list[str]:
                 if not raw_value:
                     continue
                 try:
-                    value = json.loads(raw_value)
-                except (json.JSONDecodeError, TypeError) as error:
+                    value = load_json_column(raw_value)
+                except (json.JSONDecodeError, TypeError, zlib.error) as error:
                     raise ValueError(
                         f"Invalid JSON in {table}: {error}"
                     ) from error
@@ -140,7 +153,7 @@ def verify_data_directory(data_dir: Path) -> dict[str, int | str]:
         )
 
     asset_files = [path for path in assets_dir.rglob("*") if path.is_file()]
-    return {
+    result = {
         "asset_bytes": sum(path.stat().st_size for path in asset_files),
         "asset_file_count": len(asset_files),
         "asset_reference_count": len(asset_urls),
@@ -150,14 +163,108 @@ def verify_data_directory(data_dir: Path) -> dict[str, int | str]:
         "world_count": world_count,
     }
 
+    # Snapshots from before the accounts split have everything in one file.
+    accounts_path = data_dir / "rllm_game_data-accounts.db"
+    if accounts_path.is_file():
+        connection = sqlite3.connect(f"file:{accounts_path}?mode=ro", uri=True)
+        try:
+            accounts_integrity = str(connection.execute("PRAGMA integrity_check").fetchone()[0])
+            if accounts_integrity != "ok":
+                raise ValueError(
+                    f"Restored accounts database integrity check failed: {accounts_integrity}"
+                )
+            has_users = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'"
+            ).fetchone()
+            result["accounts_integrity"] = accounts_integrity
+            result["user_count"] = int(connection.execute(
+                "SELECT COUNT(*) FROM users"
+            ).fetchone()[0]) if has_users else 0
+        finally:
+            connection.close()
+    return result
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_snapshot_manifest(
+        manifest_path: Path,
+        snapshot_path: Path | None = None,
+) -> dict[str, int | str | float]:
+    """Check a replica snapshot against the manifest written beside it."""
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    missing_fields = {"size", "sha256"} - set(manifest)
+    if missing_fields:
+        raise ValueError(f"Snapshot manifest lacks {', '.join(sorted(missing_fields))}")
+    snapshot_path = snapshot_path or manifest_path.with_name("snapshot.db.gz")
+    if not snapshot_path.is_file():
+        raise ValueError(f"Snapshot is missing: {snapshot_path}")
+
+    with tempfile.TemporaryDirectory() as temporary:
+        database_path = snapshot_path
+        with snapshot_path.open("rb") as handle:
+            compressed = handle.read(2) == b"\x1f\x8b"
+        if compressed:
+            if (
+                snapshot_path.stat().st_size != manifest.get("compressed_size")
+                or file_sha256(snapshot_path) != manifest.get("compressed_sha256")
+            ):
+                raise ValueError("Compressed snapshot does not match its manifest")
+            database_path = Path(temporary) / "snapshot.db"
+            with gzip.open(snapshot_path, "rb") as source, database_path.open("wb") as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+
+        if database_path.stat().st_size != manifest["size"]:
+            raise ValueError("Snapshot database size does not match its manifest")
+        if file_sha256(database_path) != manifest["sha256"]:
+            raise ValueError("Snapshot database checksum does not match its manifest")
+
+        connection = sqlite3.connect(f"file:{database_path}?mode=ro", uri=True)
+        try:
+            integrity = str(connection.execute("PRAGMA integrity_check").fetchone()[0])
+        finally:
+            connection.close()
+        if integrity != "ok":
+            raise ValueError(f"Snapshot integrity check failed: {integrity}")
+
+    return {
+        "snapshot_duration_seconds": manifest.get("duration_seconds", 0),
+        "snapshot_generation": str(manifest.get("generation", "")),
+        "snapshot_integrity": integrity,
+        "snapshot_sha256": manifest["sha256"],
+        "snapshot_size": manifest["size"],
+    }
+
 
 def main() -> int:
     parser = argparse.ArgumentParser()
-    parser.add_argument("data_dir", type=Path)
+    parser.add_argument("data_dir", type=Path, nargs="?")
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        help="Replica snapshot.json to check its snapshot against.",
+    )
+    parser.add_argument(
+        "--snapshot",
+        type=Path,
+        help="Snapshot file, compressed or not. Defaults to snapshot.db.gz beside the manifest.",
+    )
     args = parser.parse_args()
+    if args.data_dir is None and args.manifest is None:
+        parser.error("a data directory or --manifest is required")
 
+    result: dict[str, int | str | float] = {}
     try:
-        result = verify_data_directory(args.data_dir)
+        if args.data_dir is not None:
+            result.update(verify_data_directory(args.data_dir))
+        if args.manifest is not None:
+            result.update(verify_snapshot_manifest(args.manifest, args.snapshot))
     except (OSError, sqlite3.DatabaseError, ValueError) as error:
         parser.exit(1, f"RESTORE_DATA_UNHEALTHY: {error}\n")
 
@@ -0,0 +1,169 @@
+"""Which worker process holds each live game session.
+
+A run lives in the memory of one worker. With a single worker the local
+directory has nothing to record: every session is in this process. With
+several (uvicorn --workers, or WEB_CONCURRENCY), the SQLite directory keeps a
+row per session in the accounts database naming the worker that holds it, so
+a request that lands on another worker can ask for the run to be handed over.
+The handover itself, through hibernation, is GameSessionManager's, in
+``main.py``.
+"""
+
+import os
+import socket
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence
+
+
+# How often a worker reports in, and how long one can go unheard before its
+# runs are taken to have died with it.
+WORKER_HEARTBEAT_SECONDS = 5
+WORKER_TIMEOUT_SECONDS = 30
+# A handoff request the holder has not acted on in this long has lapsed.
+HANDOFF_REQUEST_SECONDS = 5
+
+
+def make_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LocalSessionDirectory:
+    """A single worker: every session is in this process's memory."""
+
+    shared = False
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or make_worker_id()
+
+    async def start(self) -> None:
+        pass
+
+    async def heartbeat(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(
+            self,
+            session_id: str,
+            status: str,
+            held: bool = True,
+            user_id: Optional[str] = None,
+            generator_id: Optional[str] = None,
+            session: Optional[Dict] = None,
+    ) -> None:
+        """Record a session, held by this worker or, if not `held`, by none."""
+
+    async def lookup(self, session_id: str) -> Optional[Dict]:
+        return None
+
+    def is_alive(self, entry: Dict) -> bool:
+        """Whether the worker holding a looked-up session is still running."""
+        return True
+
+    async def claim(self, session_id: str, previous_worker_id: Optional[str]) -> bool:
+        return True
+
+    async def request_handoff(self, session_id: str, worker_id: str) -> bool:
+        return False
+
+    async def pending_handoffs(self) -> List[str]:
+        """Sessions this worker holds that another one asked for."""
+        return []
+
+    async def release(self, session_ids: Sequence[str]) -> None:
+        """Hibernated runs, for any worker to claim."""
+
+    async def forget(self, session_ids: Sequence[str]) -> None:
+        """Sessions that ended."""
+
+    async def acquire_lease(self, name: str, ttl_seconds: float) -> bool:
+        """Whether this worker should run the singleton job `name` now."""
+        return True
+
+
+class SQLiteSessionDirectory(LocalSessionDirectory):
+    """Several workers on one host, sharing the accounts database."""
+
+    shared = True
+
+    def __init__(self, database, worker_id: Optional[str] = None):
+        super().__init__(worker_id)
+        self.database = database
+
+    async def start(self) -> None:
+        await self.database.aio.heartbeat_session_worker(self.worker_id)
+
+    async def heartbeat(self) -> None:
+        await self.database.aio.heartbeat_session_worker(self.worker_id)
+
+    async def stop(self) -> None:
+        await self.database.aio.remove_session_worker(self.worker_id)
+
+    async def publish(
+            self,
+            session_id: str,
+            status: str,
+            held: bool = True,
+            user_id: Optional[str] = None,
+            generator_id: Optional[str] = None,
+            session: Optional[Dict] = None,
+    ) -> None:
+        await self.database.aio.publish_directory_session(
+            session_id,
+            self.worker_id if held else None,
+            status,
+            user_id=user_id,
+            generator_id=generator_id,
+            session=session,
+        )
+
+    async def lookup(self, session_id: str) -> Optional[Dict]:
+        return await self.database.aio.get_directory_session(session_id)
+
+    def is_alive(self, entry: Dict) -> bool:
+        heartbeat_at = entry.get("worker_heartbeat_at")
+        return heartbeat_at is not None and time.time() - heartbeat_at < WORKER_TIMEOUT_SECONDS
+
+    async def claim(self, session_id: str, previous_worker_id: Optional[str]) -> bool:
+        return await self.database.aio.claim_directory_session(
+            session_id, self.worker_id, previous_worker_id
+        )
+
+    async def request_handoff(self, session_id: str, worker_id: str) -> bool:
+        return await self.database.aio.request_session_handoff(session_id, worker_id)
+
+    async def pending_handoffs(self) -> List[str]:
+        return await self.database.aio.list_session_handoffs(
+            self.worker_id, time.time() - HANDOFF_REQUEST_SECONDS
+        )
+
+    async def release(self, session_ids: Sequence[str]) -> None:
+        if session_ids:
+            await self.database.aio.release_directory_sessions(self.worker_id, list(session_ids))
+
+    async def forget(self, session_ids: Sequence[str]) -> None:
+        if session_ids:
+            await self.database.aio.delete_directory_sessions(list(session_ids))
+
+    async def acquire_lease(self, name: str, ttl_seconds: float) -> bool:
+        return await self.database.aio.acquire_task_lease(name, self.worker_id, ttl_seconds)
+
+
+SESSION_DIRECTORIES = {
+    "local": LocalSessionDirectory,
+    "sqlite": SQLiteSessionDirectory,
+}
+
+
+def make_session_directory(name: str, database) -> LocalSessionDirectory:
+    """The directory backend called `name`, one of SESSION_DIRECTORIES."""
+    if name not in SESSION_DIRECTORIES:
+        raise ValueError(
+            f"Unknown session directory {name!r}; use one of: {', '.join(SESSION_DIRECTORIES)}"
+        )
+    if name == "local":
+        return LocalSessionDirectory()
+    return SESSION_DIRECTORIES[name](database)
@@ -571,6 +571,28 @@ const app = Vue.createApp({
                 }));
             }
         },
+        abandonForge() {
+            if (!window.confirm(this.$t('forge.cancelConfirm'))) {
+                return;
+            }
+
+            // The forge runs on the server whether or not this page is open;
+            // abandoning the session is what stops it, and refunds it.
+            const sessionId = window.RogueLLMRuntime.getGameSessionId();
+            const leave = () => {
+                window.location.href = this.homeUrl();
+            };
+            if (!sessionId) {
+                leave();
+                return;
+            }
+            fetch(`/api/session/${encodeURIComponent(sessionId)}/abandon`, {
+                method: 'POST',
+                credentials: 'include'
+            })
+                .catch(error => console.error('Failed to abandon session:', error))
+                .finally(leave);
+        },
         async shareGame() {
             if (!this.generatorId) return;
 
@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from db import DatabaseManager
+
+
+STORAGE_DISABLED = {
+    "DO_STORAGE_SERVER": "",
+    "DO_SPACES_ACCESS_KEY": "",
+    "DO_SPACES_SECRET_KEY": "",
+    "DO_STORAGE_CONTAINER": "",
+}
+
+
+def table_names(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+
+
+class AccountsDatabaseTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "game.db")
+        self.database = None
+
+    def tearDown(self):
+        if self.database is not None:
+            self.database.shutdown()
+        self.directory.cleanup()
+
+    def open_database(self):
+        with patch.dict(os.environ, STORAGE_DISABLED):
+            self.database = DatabaseManager()
+        self.database.db_path = self.path
+        self.database.init_db()
+        return self.database
+
+    def test_account_tables_live_in_their_own_file(self):
+        database = self.open_database()
+
+        self.assertEqual(database.accounts_db_path, os.path.join(self.directory.name, "game-accounts.db"))
+        worlds, accounts = table_names(self.path), table_names(database.accounts_db_path)
+        self.assertEqual(set(DatabaseManager.ACCOUNT_TABLES) - accounts, set())
+        self.assertEqual(set(DatabaseManager.ACCOUNT_TABLES) & worlds, set())
+        self.assertIn("generators", worlds)
+        self.assertNotIn("generators", accounts)
+
+    def test_account_writes_do_not_wait_for_the_world_writer(self):
+        database = self.open_database()
+        created = {}
+
+        with database.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT INTO generators (id, theme_desc) VALUES ('held', 'Held')")
+            writer = threading.Thread(
+                target=lambda: created.update(user=database.create_user("player", "Secret123!"))
+            )
+            writer.start()
+            writer.join(timeout=5)
+
+            self.assertFalse(writer.is_alive())
+            conn.commit()
+
+        self.assertEqual(database.get_user_by_id(created["user"]["id"])["username"], "player")
+
+    def test_reads_join_across_the_two_files(self):
+        database = self.open_database()
+        owner = database.create_user("owner", "Secret123!")
+        database.save_generator(
+            "A harbor", "Harbor", "en", [], [], [], {},
+            owner_id=owner["id"], visibility="public",
+        )
+
+        rows = {row["username"]: row for row in database.list_users_with_world_counts()}
+
+        self.assertEqual(rows["owner"]["stats"]["public_worlds"], 1)
+
+    def test_a_single_file_database_moves_its_accounts_out(self):
+        with patch.dict(os.environ, STORAGE_DISABLED):
+            legacy = DatabaseManager()
+        conn = sqlite3.connect(self.path)
+        for number, name in enumerate(DatabaseManager.MIGRATIONS[:8], start=1):
+            conn.execute("BEGIN IMMEDIATE")
+            getattr(legacy, name)(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        conn.execute("INSERT INTO users (id, username, password_hash) VALUES ('u1', 'veteran', 'x')")
+        conn.execute("""
+            INSERT INTO credit_ledger (id, operation_key, user_id, bucket, amount, kind)
+            VALUES ('l1', 'grant:veteran', 'u1', 'paid', 7, 'purchase')
+        """)
+        conn.commit()
+        conn.close()
+
+        database = self.open_database()
+
+        self.assertEqual(database.get_user_by_id("u1")["username"], "veteran")
+        self.assertEqual(database.get_credit_balance("u1")["total"], 7)
+        self.assertNotIn("users", table_names(self.path))
+        self.assertIn("credit_ledger", table_names(database.accounts_db_path))
+        with database.get_connection(readonly=True) as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], len(DatabaseManager.MIGRATIONS))
+
+    def test_a_world_file_without_its_accounts_file_refuses_to_start(self):
+        database = self.open_database()
+        database.create_user("player", "Secret123!")
+        database.shutdown()
+        self.database = None
+        os.remove(database.accounts_db_path)
+
+        with self.assertRaises(RuntimeError):
+            self.open_database()
+
+    def test_deleting_an_account_reaches_both_files(self):
+        database = self.open_database()
+        owner = database.create_user("owner", "Secret123!")
+        world_id = database.save_generator(
+            "A harbor", "Harbor", "en", [], [], [], {},
+            owner_id=owner["id"], visibility="private",
+        )
+        database.grant_credits(owner["id"], 5, "welcome_grant", "grant:welcome")
+
+        self.assertIsNotNone(database.delete_user_account(owner["id"]))
+
+        self.assertIsNone(database.get_user_by_id(owner["id"]))
+        self.assertIsNone(database.get_generator(world_id))
+        self.assertEqual(database.get_credit_balance(owner["id"])["total"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
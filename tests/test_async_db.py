@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from db import DatabaseManager
+
+
+class AsyncDatabaseTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with patch.dict(os.environ, {
+            "DO_STORAGE_SERVER": "",
+            "DO_SPACES_ACCESS_KEY": "",
+            "DO_SPACES_SECRET_KEY": "",
+            "DO_STORAGE_CONTAINER": "",
+        }):
+            self.database = DatabaseManager()
+        self.database.db_path = os.path.join(self.directory.name, "async.db")
+        self.database.init_db()
+        self.user = self.database.create_user("player", "Secret123!")
+
+    def tearDown(self):
+        self.database.shutdown()
+        self.directory.cleanup()
+
+    async def test_methods_are_awaitable_and_return_the_sync_result(self):
+        result = await self.database.aio.grant_credits(
+            self.user["id"], 30, "welcome_grant", f"welcome:{self.user['id']}"
+        )
+
+        self.assertTrue(result["applied"])
+        balance = await self.database.aio.get_credit_balance(self.user["id"])
+        self.assertEqual(balance, self.database.get_credit_balance(self.user["id"]))
+
+    async def test_held_write_lock_does_not_block_the_event_loop(self):
+        # Another process holds the lock for less than the busy timeout.
+        self.database.timeout = 2
+        blocker = sqlite3.connect(self.database.accounts_db_path)
+        blocker.execute("BEGIN IMMEDIATE")
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        async def release_later():
+            await asyncio.sleep(0.3)
+            blocker.rollback()
+
+        ticker = asyncio.create_task(tick())
+        releaser = asyncio.create_task(release_later())
+        try:
+            result = await self.database.aio.grant_credits(
+                self.user["id"], 5, "promo", "grant:locked"
+            )
+        finally:
+            ticker.cancel()
+            await releaser
+            blocker.close()
+
+        self.assertTrue(result["applied"])
+        self.assertGreater(ticks, 10)
+
+    async def test_a_lock_held_past_the_busy_timeout_surfaces_without_retries(self):
+        self.database.timeout = 0.01
+        blocker = sqlite3.connect(self.database.accounts_db_path)
+        blocker.execute("BEGIN IMMEDIATE")
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                await self.database.aio.grant_credits(
+                    self.user["id"], 5, "promo", "grant:never"
+                )
+        finally:
+            blocker.rollback()
+            blocker.close()
+
+        self.assertEqual(self.database.account_writes.stats()["failed_groups"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
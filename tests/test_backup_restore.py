@@ -1,10 +1,15 @@
 import json
+import os
 import sqlite3
 import subprocess
 import sys
 import tempfile
 import unittest
+import zlib
 from pathlib import Path
+from unittest.mock import patch
+
+from db import DatabaseManager
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -47,9 +52,9 @@ class RestoredDataVerificationTests(unittest.TestCase):
             connection.close()
         return data_dir
 
-    def run_verifier(self, data_dir: Path) -> subprocess.CompletedProcess[str]:
+    def run_verifier(self, *args) -> subprocess.CompletedProcess[str]:
         return subprocess.run(
-            [sys.executable, str(VERIFY_SCRIPT), str(data_dir)],
+            [sys.executable, str(VERIFY_SCRIPT), *map(str, args)],
             check=False,
             capture_output=True,
             text=True,
@@ -73,6 +78,32 @@ class RestoredDataVerificationTests(unittest.TestCase):
             self.assertIn('"asset_reference_count": 2', result.stdout)
             self.assertIn('"unique_asset_reference_count": 1', result.stdout)
 
+    def test_checks_the_accounts_file_beside_the_database(self):
+        with tempfile.TemporaryDirectory() as temporary:
+            data_dir = self.create_data_directory(
+                Path(temporary),
+                "/assets/worlds/world-1/hero.webp",
+            )
+            asset = data_dir / "assets" / "world-1" / "hero.webp"
+            asset.parent.mkdir()
+            asset.write_bytes(b"RIFF-test-WEBP")
+            connection = sqlite3.connect(data_dir / "rllm_game_data-accounts.db")
+            connection.execute("CREATE TABLE users (id TEXT PRIMARY KEY)")
+            connection.execute("INSERT INTO users VALUES ('player')")
+            connection.commit()
+            connection.close()
+
+            result = self.run_verifier(data_dir)
+
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertIn('"accounts_integrity": "ok"', result.stdout)
+            self.assertIn('"user_count": 1', result.stdout)
+
+            (data_dir / "rllm_game_data-accounts.db").write_bytes(b"not a database" * 100)
+            result = self.run_verifier(data_dir)
+
+            self.assertNotEqual(result.returncode, 0)
+
     def test_rejects_a_missing_referenced_asset(self):
         with tempfile.TemporaryDirectory() as temporary:
             data_dir = self.create_data_directory(
@@ -85,6 +116,30 @@ class RestoredDataVerificationTests(unittest.TestCase):
             self.assertNotEqual(result.returncode, 0)
             self.assertIn("missing 1 referenced assets", result.stderr)
 
+    def test_reads_asset_urls_from_compressed_json_columns(self):
+        with tempfile.TemporaryDirectory() as temporary:
+            data_dir = self.create_data_directory(
+                Path(temporary),
+                "/assets/worlds/world-1/hero.webp",
+            )
+            connection = sqlite3.connect(data_dir / "rllm_game_data.db")
+            connection.execute(
+                "UPDATE generators SET enemy_defs = ?",
+                (b"\x01" + zlib.compress(json.dumps(
+                    [{"sprite_url": "/assets/worlds/world-1/missing.webp"}]
+                ).encode()),),
+            )
+            connection.commit()
+            connection.close()
+            asset = data_dir / "assets" / "world-1" / "hero.webp"
+            asset.parent.mkdir()
+            asset.write_bytes(b"RIFF-test-WEBP")
+
+            result = self.run_verifier(data_dir)
+
+            self.assertNotEqual(result.returncode, 0)
+            self.assertIn("missing 1 referenced assets", result.stderr)
+
     def test_rejects_an_asset_url_that_escapes_the_assets_directory(self):
         with tempfile.TemporaryDirectory() as temporary:
             data_dir = self.create_data_directory(
@@ -98,5 +153,61 @@ class RestoredDataVerificationTests(unittest.TestCase):
             self.assertIn("Unsafe generated asset URL", result.stderr)
 
 
+class SnapshotManifestVerificationTests(unittest.TestCase):
+    def publish_snapshot(self, root: Path) -> Path:
+        with patch.dict(os.environ, {
+            "DO_STORAGE_SERVER": "",
+            "DO_SPACES_ACCESS_KEY": "",
+            "DO_SPACES_SECRET_KEY": "",
+            "DO_STORAGE_CONTAINER": "",
+            "DB_REPLICA_LOCAL_DIR": str(root / "bucket"),
+            "DB_REPLICA_SYNC_SECONDS": "3600",
+        }):
+            manager = DatabaseManager()
+        manager.db_path = str(root / "_data" / "rllm_game_data.db")
+        try:
+            manager.init_db()
+            manager.create_user("player", "Secret123!")
+            manager.backup_db()
+            generation = manager.replicator.generation
+        finally:
+            manager.shutdown()
+        return root / "bucket" / "local" / "replica" / "generations" / generation / "snapshot.json"
+
+    def run_verifier(self, *args) -> subprocess.CompletedProcess[str]:
+        return subprocess.run(
+            [sys.executable, str(VERIFY_SCRIPT), *map(str, args)],
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+
+    def test_accepts_a_snapshot_matching_its_manifest(self):
+        with tempfile.TemporaryDirectory() as temporary:
+            manifest_path = self.publish_snapshot(Path(temporary))
+            manifest = json.loads(manifest_path.read_text())
+
+            result = self.run_verifier("--manifest", manifest_path)
+
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertIn("RESTORE_DATA_HEALTHY", result.stdout)
+            self.assertIn(f'"snapshot_sha256": "{manifest["sha256"]}"', result.stdout)
+            self.assertGreater(manifest["size"], 0)
+            self.assertIn("duration_seconds", manifest)
+
+    def test_rejects_a_snapshot_that_differs_from_its_manifest(self):
+        with tempfile.TemporaryDirectory() as temporary:
+            manifest_path = self.publish_snapshot(Path(temporary))
+            snapshot_path = manifest_path.with_name("snapshot.db.gz")
+            data = bytearray(snapshot_path.read_bytes())
+            data[-12] ^= 0xFF
+            snapshot_path.write_bytes(bytes(data))
+
+            result = self.run_verifier("--manifest", manifest_path)
+
+            self.assertNotEqual(result.returncode, 0)
+            self.assertIn("does not match its manifest", result.stderr)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,5 @@
 import os
+import sqlite3
 import tempfile
 import unittest
 from unittest.mock import patch
@@ -132,6 +133,68 @@ class CreditAndPopularityTests(unittest.TestCase):
             "unique_completer_count": 1,
         })
 
+    def test_queued_play_starts_are_counted_in_one_batch(self):
+        harbor = self.make_world("Clockwork Harbor")
+        desert = self.make_world("Glass Desert")
+
+        self.database.queue_world_play_start("session-1", harbor, self.user["id"])
+        self.database.queue_world_play_start("session-1", harbor, self.user["id"])
+        self.database.queue_world_play_start("session-2", harbor, None)
+        self.database.queue_world_play_start("session-3", desert, None)
+        self.database.play_starts.flush()
+
+        self.assertEqual(self.database.get_world_metrics(harbor)["play_count"], 2)
+        self.assertEqual(self.database.get_world_metrics(desert)["play_count"], 1)
+        stats = self.database.play_starts.stats()
+        self.assertEqual(stats["batches"], 1)
+        self.assertEqual(stats["last_batch_size"], 4)
+        self.assertEqual(stats["pending"], 0)
+
+    def test_completion_before_its_queued_start_counts_one_play(self):
+        world_id = self.make_world("Clockwork Harbor")
+
+        self.database.queue_world_play_start("session-1", world_id, self.user["id"])
+        completion = self.database.record_world_completion(
+            "session-1", world_id, self.user["id"], reward_amount=1,
+            daily_reward_cap=5,
+        )
+        self.database.play_starts.flush()
+
+        self.assertTrue(completion["reward_granted"])
+        self.assertEqual(self.database.get_world_metrics(world_id), {
+            "play_count": 1,
+            "completion_count": 1,
+            "unique_completer_count": 1,
+        })
+
+    def test_shutdown_applies_queued_play_starts(self):
+        world_id = self.make_world("Clockwork Harbor")
+        self.database.queue_world_play_start("session-1", world_id, None)
+
+        self.database.shutdown()
+
+        self.assertEqual(self.database.get_world_metrics(world_id)["play_count"], 1)
+
+    def test_a_locked_batch_is_retried_on_the_next_pass(self):
+        world_id = self.make_world("Clockwork Harbor")
+        record = self.database._record_play_starts
+        attempts = []
+
+        def locked_once(starts):
+            attempts.append(len(starts))
+            if len(attempts) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            record(starts)
+
+        self.database.play_starts.apply_batch = locked_once
+        self.database.queue_world_play_start("session-1", world_id, None)
+        self.database.play_starts.flush()
+        self.assertEqual(self.database.play_starts.stats()["pending"], 1)
+        self.database.play_starts.flush()
+
+        self.assertEqual(attempts, [1, 1])
+        self.assertEqual(self.database.get_world_metrics(world_id)["play_count"], 1)
+
     def test_reward_is_once_per_distinct_world_and_capped_daily(self):
         world_ids = [self.make_world(f"World {index}") for index in range(4)]
         rewards = []
@@ -247,6 +310,91 @@ class CreditAndPopularityTests(unittest.TestCase):
             ],
         )
 
+    def stored_balance(self, user_id):
+        with self.database.get_connection() as conn:
+            row = conn.execute(
+                "SELECT promo, paid FROM credit_balances WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def test_materialized_balance_follows_every_ledger_write(self):
+        creator = self.database.create_user("creator", "Secret123!")
+        world_id = self.make_world("Balance World", owner_id=creator["id"])
+        user_id = self.user["id"]
+
+        self.database.grant_credits(user_id, 6, "promo", "grant:promo")
+        self.database.record_verified_store_purchase(
+            user_id, "apple", "txn-1", "credits_small", 8, "sandbox"
+        )
+        self.database.spend_credits(user_id, 10, "world_forge", "forge:one")
+        self.database.spend_credits(user_id, 1, "world_forge", "forge:two")
+        self.database.refund_credit_spend(user_id, "forge:one")
+        self.database.record_world_completion(
+            "balance-session", world_id, user_id, reward_amount=2,
+            daily_reward_cap=5, creator_milestones=((1, 3),),
+        )
+
+        self.assertEqual(self.stored_balance(user_id), (8, 7))
+        self.assertEqual(self.stored_balance(creator["id"]), (3, 0))
+        self.assertEqual(
+            self.database.get_credit_balance(user_id),
+            {"promo": 8, "paid": 7, "total": 15},
+        )
+        report = self.database.reconcile_credit_balances()
+        self.assertEqual((report["checked"], report["drift"]), (2, []))
+
+    def test_balance_row_is_derived_from_an_older_ledger(self):
+        user_id = self.user["id"]
+        with self.database.get_connection(database="accounts") as conn:
+            conn.execute("""
+                INSERT INTO credit_ledger (id, operation_key, user_id, bucket, amount, kind)
+                VALUES ('legacy', 'legacy:grant', ?, 'paid', 12, 'purchase')
+            """, (user_id,))
+            conn.commit()
+
+        self.assertIsNone(self.stored_balance(user_id))
+        self.assertEqual(self.database.get_credit_balance(user_id)["total"], 12)
+        self.assertEqual(
+            self.database.reconcile_credit_balances()["unmaterialized"], 1
+        )
+
+        self.database.grant_credits(user_id, 3, "welcome_grant", "grant:new")
+
+        self.assertEqual(self.stored_balance(user_id), (3, 12))
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        user_id = self.user["id"]
+        self.database.grant_credits(user_id, 5, "promo", "grant:promo")
+        with self.database.get_connection(database="accounts") as conn:
+            conn.execute(
+                "UPDATE credit_balances SET promo = 50 WHERE user_id = ?", (user_id,)
+            )
+            conn.commit()
+
+        report = self.database.reconcile_credit_balances()
+        self.assertEqual(report["drift"], [{
+            "user_id": user_id,
+            "stored": {"promo": 50, "paid": 0},
+            "ledger": {"promo": 5, "paid": 0},
+        }])
+        self.assertEqual(self.stored_balance(user_id), (50, 0))
+
+        fixed = self.database.reconcile_credit_balances(fix=True)
+        self.assertEqual(fixed["fixed"], 1)
+        self.assertEqual(self.stored_balance(user_id), (5, 0))
+        self.assertEqual(self.database.reconcile_credit_balances()["drift"], [])
+
+    def test_reconcile_takes_the_writer_only_to_fix(self):
+        self.database.grant_credits(self.user["id"], 5, "promo", "grant:promo")
+
+        with patch.object(self.database, "_execute", wraps=self.database._execute) as execute:
+            self.database.reconcile_credit_balances(fix=True)
+
+        self.assertEqual(
+            [call.kwargs.get("readonly", False) for call in execute.call_args_list], [True]
+        )
+
     def test_failed_art_reroll_restores_the_single_free_allowance(self):
         world_id = self.make_world("Reroll World", owner_id=self.user["id"])
 
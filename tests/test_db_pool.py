@@ -0,0 +1,255 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from db import DatabaseManager
+
+
+STORAGE_DISABLED = {
+    "DO_STORAGE_SERVER": "",
+    "DO_SPACES_ACCESS_KEY": "",
+    "DO_SPACES_SECRET_KEY": "",
+    "DO_STORAGE_CONTAINER": "",
+}
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = self.make_db()
+
+    def tearDown(self):
+        self.database.shutdown()
+        self.directory.cleanup()
+
+    def make_db(self, **environment):
+        with patch.dict(os.environ, {**STORAGE_DISABLED, **environment}):
+            manager = DatabaseManager()
+        manager.db_path = os.path.join(self.directory.name, "pool.db")
+        manager.init_db()
+        return manager
+
+    def test_database_runs_in_wal_mode(self):
+        with self.database.get_connection() as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+        self.assertEqual(mode, "wal")
+
+    def test_connections_are_reused_between_calls(self):
+        with self.database.get_connection() as conn:
+            first_writer = conn.connection
+        with self.database.get_connection() as conn:
+            second_writer = conn.connection
+        with self.database.get_connection(readonly=True) as conn:
+            first_reader = conn.connection
+        with self.database.get_connection(readonly=True) as conn:
+            second_reader = conn.connection
+
+        self.assertIs(first_writer, second_writer)
+        self.assertIs(first_reader, second_reader)
+        self.assertIsNot(first_writer, first_reader)
+
+    def test_readers_cannot_write(self):
+        with self.database.get_connection(readonly=True) as conn:
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute(
+                    "INSERT INTO users (id, username, password_hash) VALUES ('u', 'u', 'x')"
+                )
+
+    def test_uncommitted_work_is_rolled_back_on_return(self):
+        with self.database.get_connection(database="accounts") as conn:
+            conn.execute(
+                "INSERT INTO users (id, username, password_hash) VALUES ('u', 'u', 'x')"
+            )
+
+        with self.database.get_connection(database="accounts") as conn:
+            self.assertFalse(conn.in_transaction)
+            count = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_readers_are_not_blocked_by_an_open_write(self):
+        user = self.database.create_user("player", "Secret123!")
+
+        with self.database.get_connection(database="accounts") as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("UPDATE users SET username = 'renamed' WHERE id = ?", (user["id"],))
+
+            result = {}
+            reader = threading.Thread(
+                target=lambda: result.update(user=self.database.get_user_by_id(user["id"]))
+            )
+            reader.start()
+            reader.join(timeout=5)
+
+            self.assertFalse(reader.is_alive())
+            self.assertEqual(result["user"]["username"], "player")
+            conn.commit()
+
+        self.assertEqual(self.database.get_user_by_id(user["id"])["username"], "renamed")
+
+    def test_nested_write_on_the_same_thread_does_not_deadlock(self):
+        with self.database.get_connection() as conn:
+            conn.execute("SELECT 1").fetchone()
+            user = self.database.create_user("player", "Secret123!")
+
+        self.assertIsNotNone(self.database.get_user_by_username(user["username"]))
+
+    def test_a_replaced_database_file_is_reopened(self):
+        self.database.create_user("player", "Secret123!")
+        os.remove(self.database.db_path)
+
+        with self.database.get_connection() as conn:
+            tables = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            ).fetchall()
+
+        self.assertEqual(tables, [])
+
+    def test_pragmas_are_configurable(self):
+        self.database.shutdown()
+        self.database = self.make_db(
+            DB_SYNCHRONOUS="FULL",
+            DB_CACHE_SIZE_KIB="4096",
+            DB_MMAP_SIZE_BYTES="0",
+            DB_BUSY_TIMEOUT_MS="1500",
+        )
+
+        for readonly in (False, True):
+            with self.database.get_connection(readonly=readonly) as conn:
+                self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 2)
+                self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -4096)
+                self.assertEqual(conn.execute("PRAGMA mmap_size").fetchone()[0], 0)
+                self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 1500)
+
+    def test_invalid_synchronous_setting_is_rejected(self):
+        with patch.dict(os.environ, {**STORAGE_DISABLED, "DB_SYNCHRONOUS": "sometimes"}):
+            with self.assertRaises(ValueError):
+                DatabaseManager()
+
+
+
+class WriterQueueTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with patch.dict(os.environ, STORAGE_DISABLED):
+            self.database = DatabaseManager()
+        self.database.db_path = os.path.join(self.directory.name, "writes.db")
+        self.database.init_db()
+
+    def tearDown(self):
+        self.database.shutdown()
+        self.directory.cleanup()
+
+    def insert_user(self, name, fail=False):
+        def _insert(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO users (id, username, password_hash) VALUES (?, ?, 'x')",
+                (name, name),
+            )
+            if fail:
+                raise ValueError("rejected")
+            conn.commit()
+            return name
+        return _insert
+
+    def usernames(self):
+        with self.database.get_connection(readonly=True) as conn:
+            return sorted(row[0] for row in conn.execute("SELECT username FROM users"))
+
+    def run_while_the_writer_is_busy(self, *operations):
+        """Queue operations behind a group that cannot start yet, so they are
+        picked up together once it is released. Returns each result or error."""
+        writes = self.database.account_writes
+        outcomes = {}
+
+        def run(index, operation):
+            try:
+                outcomes[index] = writes.run(operation)
+            except Exception as e:
+                outcomes[index] = e
+
+        def wait_for_depth(depth):
+            while writes.stats()["depth"] != depth:
+                time.sleep(0.001)
+
+        threads = [threading.Thread(target=run, args=(None, self.insert_user("first")))]
+        with self.database.get_connection(database="accounts"):
+            threads[0].start()
+            wait_for_depth(0)
+            for index, operation in enumerate(operations):
+                threads.append(threading.Thread(target=run, args=(index, operation)))
+                threads[-1].start()
+            wait_for_depth(len(operations))
+        for thread in threads:
+            thread.join(timeout=5)
+        return [outcomes[index] for index in range(len(operations))]
+
+    def test_concurrent_writers_never_see_lock_errors(self):
+        errors = []
+
+        def create(index):
+            try:
+                self.database.create_user(f"player-{index}", "Secret123!")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=create, args=(index,)) for index in range(32)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.usernames()), 32)
+
+    def test_queued_writes_share_one_commit(self):
+        before = self.database.account_writes.stats()["groups"]
+
+        results = self.run_while_the_writer_is_busy(
+            self.insert_user("second"), self.insert_user("third")
+        )
+
+        self.assertEqual(results, ["second", "third"])
+        stats = self.database.account_writes.stats()
+        self.assertEqual(stats["groups"] - before, 2)
+        self.assertEqual(stats["max_group_size"], 2)
+
+    def test_a_failing_write_rolls_back_alone(self):
+        rejected, accepted = self.run_while_the_writer_is_busy(
+            self.insert_user("rejected", fail=True), self.insert_user("accepted")
+        )
+
+        self.assertIsInstance(rejected, ValueError)
+        self.assertEqual(accepted, "accepted")
+        self.assertEqual(self.usernames(), ["accepted", "first"])
+
+    def test_uncommitted_work_in_a_write_is_dropped(self):
+        def _insert_without_commit(conn):
+            conn.execute(
+                "INSERT INTO users (id, username, password_hash) VALUES ('u', 'u', 'x')"
+            )
+
+        self.database.account_writes.run(_insert_without_commit)
+
+        self.assertEqual(self.usernames(), [])
+
+    def test_a_write_issued_inside_a_write_joins_it(self):
+        def _outer(conn):
+            self.database.create_user("inner", "Secret123!")
+            conn.execute(
+                "INSERT INTO users (id, username, password_hash) VALUES ('o', 'outer', 'x')"
+            )
+            conn.commit()
+
+        self.database.account_writes.run(_outer)
+
+        self.assertEqual(self.usernames(), ["inner", "outer"])
+
+
+if __name__ == "__main__":
+    unittest.main()
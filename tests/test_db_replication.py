@@ -0,0 +1,224 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from db import DatabaseManager
+from db_replication import LocalObjectStore
+
+
+STORAGE_DISABLED = {
+    "DO_STORAGE_SERVER": "",
+    "DO_SPACES_ACCESS_KEY": "",
+    "DO_SPACES_SECRET_KEY": "",
+    "DO_STORAGE_CONTAINER": "",
+}
+
+
+class WalReplicationTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.bucket_dir = os.path.join(self.directory.name, "bucket")
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.shutdown()
+        self.directory.cleanup()
+
+    def make_db(self, name, **environment):
+        with patch.dict(os.environ, {
+            **STORAGE_DISABLED,
+            "DB_REPLICA_LOCAL_DIR": self.bucket_dir,
+            # Tests drive each pass by hand.
+            "DB_REPLICA_SYNC_SECONDS": "3600",
+            **environment,
+        }):
+            manager = DatabaseManager()
+        manager.db_path = os.path.join(self.directory.name, name, "game.db")
+        manager.init_db()
+        self.managers.append(manager)
+        return manager
+
+    def latest(self, prefix="replica"):
+        path = os.path.join(self.bucket_dir, "local", prefix, "latest.json")
+        with open(path) as handle:
+            return json.load(handle)
+
+    def segment_keys(self, generation, prefix="replica"):
+        store = LocalObjectStore(self.bucket_dir)
+        response = store.list_objects_v2(
+            Bucket="local", Prefix=f"{prefix}/generations/{generation}/wal/"
+        )
+        return [item["Key"] for item in response.get("Contents", [])]
+
+    @staticmethod
+    def make_world(manager, title):
+        return manager.save_generator(f"A {title}", title, "en", [], [], [], {})
+
+    def test_restore_replays_shipped_segments_over_the_snapshot(self):
+        primary = self.make_db("primary")
+        primary.replicator.sync()
+        generation = self.latest()["generation"]
+
+        world_id = self.make_world(primary, "Harbor")
+        self.assertGreater(primary.replicator.sync(), 0)
+        self.assertEqual(primary.replicator.sync(), 0)
+
+        replica = self.make_db("replica")
+
+        self.assertEqual(replica.get_generator(world_id)["theme_desc_better"], "Harbor")
+        self.assertEqual(self.latest()["generation"], generation)
+        self.assertTrue(self.segment_keys(generation))
+
+    def test_accounts_replicate_under_their_own_prefix(self):
+        primary = self.make_db("primary")
+        primary.replicator.sync()
+        primary.accounts_replicator.sync()
+        generation = self.latest("replica/accounts")["generation"]
+
+        user = primary.create_user("player", "Secret123!")
+        primary.grant_credits(user["id"], 5, "welcome_grant", "grant:welcome")
+        self.assertGreater(primary.accounts_replicator.sync(), 0)
+        self.assertEqual(primary.replicator.sync(), 0)
+
+        replica = self.make_db("replica")
+
+        self.assertEqual(replica.get_user_by_id(user["id"])["username"], "player")
+        self.assertEqual(replica.get_credit_balance(user["id"])["total"], 5)
+        self.assertTrue(self.segment_keys(generation, "replica/accounts"))
+
+    def test_checkpoints_start_a_new_index_and_keep_the_chain_restorable(self):
+        primary = self.make_db("primary", DB_REPLICA_CHECKPOINT_BYTES="1")
+        primary.replicator.sync()
+        generation = self.latest()["generation"]
+
+        world_ids = []
+        for index in range(3):
+            world_ids.append(self.make_world(primary, f"World {index}"))
+            primary.replicator.sync()
+            self.assertEqual(os.path.getsize(primary.db_path + "-wal"), 0)
+
+        indexes = {key.rsplit("/", 1)[1].split("-")[0] for key in self.segment_keys(generation)}
+        self.assertGreaterEqual(len(indexes), 3)
+
+        replica = self.make_db("replica")
+        for world_id in world_ids:
+            self.assertIsNotNone(replica.get_generator(world_id))
+
+    def test_only_the_replicator_checkpoints_while_replicating(self):
+        primary = self.make_db("primary")
+
+        with primary.get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0], 0)
+
+    def test_shutdown_ships_the_tail_of_the_wal(self):
+        primary = self.make_db("primary")
+        primary.replicator.sync()
+        world_id = self.make_world(primary, "Harbor")
+        user = primary.create_user("player", "Secret123!")
+
+        primary.shutdown()
+        self.managers.remove(primary)
+
+        replica = self.make_db("replica")
+        self.assertIsNotNone(replica.get_generator(world_id))
+        self.assertIsNotNone(replica.get_user_by_id(user["id"]))
+
+    def test_a_restored_database_continues_its_generation(self):
+        primary = self.make_db("primary")
+        primary.replicator.sync()
+        first = self.make_world(primary, "First")
+        primary.shutdown()
+        self.managers.remove(primary)
+        generation = self.latest()["generation"]
+
+        restored = self.make_db("primary")
+        second = self.make_world(restored, "Second")
+        restored.replicator.sync()
+        self.assertEqual(restored.replicator.generation, generation)
+
+        replica = self.make_db("replica")
+        self.assertIsNotNone(replica.get_generator(first))
+        self.assertIsNotNone(replica.get_generator(second))
+
+    def test_a_wal_reset_behind_the_replicator_starts_a_new_generation(self):
+        primary = self.make_db("primary")
+        primary.replicator.sync()
+        first = self.make_world(primary, "First")
+        primary.replicator.sync()
+        generation = self.latest()["generation"]
+
+        outside = sqlite3.connect(primary.db_path)
+        outside.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        outside.close()
+        second = self.make_world(primary, "Second")
+        primary.replicator.sync()
+
+        self.assertNotEqual(self.latest()["generation"], generation)
+        replica = self.make_db("replica")
+        self.assertIsNotNone(replica.get_generator(first))
+        self.assertIsNotNone(replica.get_generator(second))
+
+    def test_old_generations_are_pruned(self):
+        primary = self.make_db("primary", DB_REPLICA_RETAIN_GENERATIONS="1")
+        primary.replicator.sync()
+        primary.backup_db()
+        primary.backup_db()
+
+        generations = os.listdir(os.path.join(self.bucket_dir, "local", "replica", "generations"))
+        self.assertEqual(generations, [self.latest()["generation"]])
+
+    def test_snapshots_do_not_hold_writers_for_the_copy(self):
+        primary = self.make_db("primary")
+        copy = primary.replicator._backup
+        written = []
+
+        def backup_with_a_write(pool, copy_path):
+            # The writer is free while the pages are copied.
+            written.append(self.make_world(primary, "During Copy"))
+            return copy(pool, copy_path)
+
+        with patch.object(primary.replicator, "_backup", side_effect=backup_with_a_write):
+            primary.replicator.sync()
+        primary.replicator.sync()
+
+        replica = self.make_db("replica")
+        self.assertIsNotNone(replica.get_generator(written[0]))
+
+    def test_restore_rejects_a_snapshot_that_fails_its_checksum(self):
+        primary = self.make_db("primary")
+        primary.replicator.sync()
+        generation = self.latest()["generation"]
+        snapshot_path = os.path.join(
+            self.bucket_dir, "local", "replica", "generations", generation, "snapshot.db.gz"
+        )
+        with open(snapshot_path, "r+b") as handle:
+            handle.seek(-12, os.SEEK_END)
+            byte = handle.read(1)
+            handle.seek(-12, os.SEEK_END)
+            handle.write(bytes([byte[0] ^ 0xFF]))
+
+        target = os.path.join(self.directory.name, "restored.db")
+        with self.assertRaises(ValueError):
+            primary.replicator.restore(target)
+        self.assertFalse(os.path.exists(target))
+
+    def test_first_start_restores_the_legacy_single_file_copy(self):
+        legacy_path = os.path.join(self.bucket_dir, "local", "rllm_game_data.db")
+        os.makedirs(os.path.dirname(legacy_path))
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("CREATE TABLE users (id TEXT PRIMARY KEY, username TEXT, password_hash TEXT)")
+        conn.execute("INSERT INTO users VALUES ('legacy', 'old-player', 'x')")
+        conn.commit()
+        conn.close()
+
+        primary = self.make_db("primary")
+
+        self.assertEqual(primary.get_user_by_id("legacy")["username"], "old-player")
+
+
+if __name__ == "__main__":
+    unittest.main()
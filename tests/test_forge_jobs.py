@@ -0,0 +1,294 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+import main
+from db import DatabaseManager
+from forge_jobs import FORGE_FAILED_EVENT, ForgeSupervisor
+
+
+STORAGE_DISABLED = {
+    "DO_STORAGE_SERVER": "",
+    "DO_SPACES_ACCESS_KEY": "",
+    "DO_SPACES_SECRET_KEY": "",
+    "DO_STORAGE_CONTAINER": "",
+}
+VALID_TEST_PASSWORD = "Secret123!"
+
+
+async def passthrough_prerender(request, html_content):
+    return html_content
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for the forge")
+        time.sleep(0.01)
+
+
+class FakeGame:
+    def __init__(self, world_id):
+        self.state_manager = SimpleNamespace(
+            generator_id=world_id,
+            error_message=None,
+            state=SimpleNamespace(game_won=False),
+        )
+
+    def add_client(self, websocket):
+        pass
+
+    def remove_client(self, websocket):
+        pass
+
+    def get_connected_clients(self):
+        return set()
+
+    async def handle_message(self, message):
+        return {"type": "update"}
+
+
+class ForgeJobTests(unittest.TestCase):
+    """Credit-charged forges of new Worlds, with the forge itself faked."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with patch.dict(os.environ, STORAGE_DISABLED):
+            self.database = DatabaseManager()
+        self.database.db_path = os.path.join(self.directory.name, "forge.db")
+        self.database.init_db()
+        # Released by a test to let the fake forge finish.
+        self.gate = threading.Event()
+
+        async def fake_create(**kwargs):
+            await kwargs["on_progress"]({"stage": "theme", "title": "Credit World"})
+            while not self.gate.is_set():
+                await asyncio.sleep(0.01)
+            world_id = self.database.save_generator(
+                theme_desc=kwargs["theme_desc"],
+                theme_desc_better="Credit World",
+                language=kwargs["language"],
+                player_defs=[],
+                item_defs=[],
+                enemy_defs=[],
+                celltype_defs={},
+                owner_id=kwargs["owner_id"],
+                visibility=kwargs["visibility"],
+            )
+            return FakeGame(world_id)
+
+        patches = [
+            patch.dict(os.environ, {
+                "ENABLE_WORLD_CREDITS": "1",
+                "WELCOME_CREDITS": "30",
+                "WORLD_FORGE_CREDIT_COST": "10",
+            }),
+            patch("main.db", self.database),
+            patch("main.get_prerendered_content", passthrough_prerender),
+            patch("main.Game.create", side_effect=fake_create),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        main.game_session_manager.sessions.clear()
+        self.addCleanup(main.game_session_manager.sessions.clear)
+
+    def tearDown(self):
+        self.gate.set()
+        self.database.shutdown()
+        self.directory.cleanup()
+
+    def start_forge(self, client):
+        client.post("/api/signup", json={"username": "forger", "password": VALID_TEST_PASSWORD})
+        self.user_id = self.database.get_user_by_username("forger")["id"]
+        response = client.post("/api/create_game_session", json={
+            "theme": "A credit world",
+            "language": "en",
+        })
+        return response.json()["session_id"]
+
+    def balance(self):
+        return self.database.get_credit_balance(self.user_id)["total"]
+
+    def job_status(self, session_id):
+        record = self.database.get_forge_job(session_id)
+        return record and record["status"]
+
+    def test_the_forge_runs_without_a_socket(self):
+        with TestClient(main.app) as client:
+            session_id = self.start_forge(client)
+            wait_until(lambda: self.balance() == 20)
+            self.gate.set()
+            wait_until(lambda: self.job_status(session_id) == "succeeded")
+
+            self.assertEqual(main.game_session_manager.sessions[session_id]["status"], "ready")
+            # The first socket still sees the whole forge; later ones go
+            # straight to play.
+            for expected in (["creating", "creating", "theme", "ready"], []):
+                with client.websocket_connect(f"/ws/game/{session_id}") as websocket:
+                    replayed = []
+                    message = websocket.receive_json()
+                    while message["type"] != "connection_established":
+                        replayed.append(message.get("status") or message.get("stage"))
+                        message = websocket.receive_json()
+                self.assertEqual(replayed, expected)
+
+    def test_a_reconnecting_socket_replays_the_progress_so_far(self):
+        with TestClient(main.app) as client:
+            session_id = self.start_forge(client)
+            with client.websocket_connect(f"/ws/game/{session_id}") as websocket:
+                self.assertEqual(websocket.receive_json()["status"], "creating")
+                self.assertEqual(websocket.receive_json()["status"], "creating")
+                self.assertEqual(websocket.receive_json()["stage"], "theme")
+
+            self.assertTrue(main.forge_supervisor.has_job(session_id))
+            with client.websocket_connect(f"/ws/game/{session_id}") as websocket:
+                self.assertEqual(websocket.receive_json()["status"], "creating")
+                self.assertEqual(websocket.receive_json()["status"], "creating")
+                self.assertEqual(websocket.receive_json()["stage"], "theme")
+                self.gate.set()
+                self.assertEqual(websocket.receive_json()["status"], "ready")
+                self.assertEqual(websocket.receive_json()["type"], "connection_established")
+
+        self.assertEqual(self.balance(), 20)
+
+    def test_abandoning_a_session_cancels_its_forge_and_refunds_it(self):
+        with TestClient(main.app) as client:
+            session_id = self.start_forge(client)
+            wait_until(lambda: self.balance() == 20)
+
+            refused = TestClient(main.app).post(f"/api/session/{session_id}/abandon")
+            abandoned = client.post(f"/api/session/{session_id}/abandon")
+
+            self.assertEqual(refused.status_code, 403)
+            self.assertEqual(abandoned.status_code, 200)
+            self.assertTrue(abandoned.json()["forge_cancelled"])
+            self.assertFalse(main.forge_supervisor.has_job(session_id))
+            self.assertNotIn(session_id, main.game_session_manager.sessions)
+
+        self.assertEqual(self.balance(), 30)
+        record = self.database.get_forge_job(session_id)
+        self.assertEqual(record["status"], "cancelled")
+        self.assertEqual(record["events"][-1]["code"], "forge_cancelled")
+
+    def test_a_session_created_signed_out_is_abandoned_only_by_its_browser(self):
+        world_id = self.database.save_generator(
+            "A shared world", "Shared World", "en", [], [], [], {}, visibility="public",
+        )
+        with TestClient(main.app) as client:
+            session_id = client.post("/api/create_game_session", json={
+                "generator_id": world_id,
+            }).json()["session_id"]
+
+            refused = TestClient(main.app).post(f"/api/session/{session_id}/abandon")
+            abandoned = client.post(f"/api/session/{session_id}/abandon")
+
+        self.assertEqual(refused.status_code, 403)
+        self.assertEqual(abandoned.status_code, 200)
+        self.assertNotIn(session_id, main.game_session_manager.sessions)
+
+    def test_a_hibernated_session_without_a_forge_can_be_abandoned(self):
+        with TestClient(main.app) as client:
+            client.post("/api/signup", json={"username": "sleeper", "password": VALID_TEST_PASSWORD})
+            user_id = self.database.get_user_by_username("sleeper")["id"]
+            self.database.hibernate_game_sessions([{
+                "session_id": "saved",
+                "user_id": user_id,
+                "generator_id": None,
+                "state": {},
+                "created_at": time.time(),
+                "last_accessed": time.time(),
+            }])
+
+            refused = TestClient(main.app).post("/api/session/saved/abandon")
+            abandoned = client.post("/api/session/saved/abandon")
+            missing = client.post("/api/session/saved/abandon")
+
+        self.assertEqual(refused.status_code, 403)
+        self.assertEqual(abandoned.status_code, 200)
+        self.assertFalse(abandoned.json()["forge_cancelled"])
+        self.assertIsNone(self.database.load_game_session("saved"))
+        self.assertEqual(missing.status_code, 404)
+
+
+class ForgeSupervisorTests(unittest.TestCase):
+    """Two supervisors over one database, standing in for two workers."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with patch.dict(os.environ, STORAGE_DISABLED):
+            self.database = DatabaseManager()
+        self.database.db_path = os.path.join(self.directory.name, "workers.db")
+        self.database.init_db()
+        self.first = ForgeSupervisor(lambda: self.database)
+        self.first.start("first")
+        self.second = ForgeSupervisor(lambda: self.database)
+        self.second.start("second")
+        self.database.heartbeat_session_worker("first")
+
+    def tearDown(self):
+        self.database.shutdown()
+        self.directory.cleanup()
+
+    def test_a_forge_is_followed_from_another_worker(self):
+        async def forge(emit):
+            for stage in ("theme", "character", "building"):
+                await emit({"type": "forge_progress", "stage": stage})
+                await asyncio.sleep(0.2)
+            await emit({"type": "status", "status": "ready"})
+            return True
+
+        async def scenario():
+            await self.first.submit("run", None, forge)
+            self.assertTrue(await self.second.forging_elsewhere("run"))
+            return [event async for event in self.second.follow("run")]
+
+        events = asyncio.run(scenario())
+
+        self.assertEqual(
+            [event.get("stage") or event.get("status") for event in events],
+            ["theme", "character", "building", "ready"],
+        )
+        self.assertEqual(self.database.get_forge_job("run")["status"], "succeeded")
+
+    def test_a_forge_is_cancelled_through_its_record(self):
+        async def forge(emit):
+            while True:
+                await emit({"type": "forge_progress", "stage": "character"})
+                await asyncio.sleep(0.05)
+
+        async def scenario():
+            job = await self.first.submit("run", None, forge)
+            await asyncio.sleep(0.1)
+            self.assertTrue(await self.second.cancel("run"))
+            await asyncio.wait([job.task], timeout=5)
+            return job
+
+        job = asyncio.run(scenario())
+
+        self.assertTrue(job.task.cancelled())
+        self.assertEqual(self.database.get_forge_job("run")["status"], "cancelled")
+        self.assertEqual(self.first.outcomes["cancelled"], 1)
+
+    def test_a_forge_whose_worker_died_ends_in_failure(self):
+        self.database.create_forge_job("orphan", "crashed", None)
+        self.database.append_forge_job_event("orphan", {"type": "forge_progress", "stage": "theme"})
+
+        async def scenario():
+            return [event async for event in self.second.follow("orphan")]
+
+        events = asyncio.run(scenario())
+
+        self.assertEqual(events, [{"type": "forge_progress", "stage": "theme"}, FORGE_FAILED_EVENT])
+
+
+if __name__ == "__main__":
+    unittest.main()
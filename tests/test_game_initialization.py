@@ -3,7 +3,7 @@ import unittest
 from types import SimpleNamespace
 from unittest.mock import patch
 
-from game_state_manager import GameStateManager, WORLD_TRANSLATION_CACHE_VERSION
+from game_state_manager import GameStateManager, WORLD_SNAPSHOT_VERSION, WORLD_TRANSLATION_CACHE_VERSION
 
 
 class DummyDefinitions:
@@ -183,8 +183,12 @@ class GameInitializationTests(unittest.IsolatedAsyncioTestCase):
                 patch("game_state_manager.GenAI", FakeGenAI), \
                 patch("game_state_manager.GameDefinitionsManager", FakeDefinitionsManager), \
                 patch("game_state_manager.EntityPlacementManager"), \
-                patch("game_state_manager.db.get_generator", return_value=generator_data), \
-                patch("game_state_manager.db.get_generator_translation", return_value=None) as get_translation, \
+                patch("game_state_manager.db.load_world_bundle", return_value={
+                    "definitions": generator_data,
+                    "source_language": "it",
+                    "translated": False,
+                    "snapshot": None,
+                }) as load_bundle, \
                 patch("game_state_manager.db.save_generator_translation") as save_translation:
             manager = await GameStateManager.create(
                 seed=1,
@@ -199,9 +203,10 @@ class GameInitializationTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(manager.theme_desc, generator_data["theme_desc"])
         self.assertEqual(manager.theme_desc_better, "日本語の世界\n保存済みの説明。")
         self.assertEqual(manager.definitions.player_defs[0]["name"], "冒険者")
-        get_translation.assert_called_once_with(
+        load_bundle.assert_called_once_with(
             "italian-world",
             "ja",
+            WORLD_SNAPSHOT_VERSION,
             WORLD_TRANSLATION_CACHE_VERSION,
         )
         self.assertEqual(manager.gen_ai.translate_calls[0]["source_language"], "it")
@@ -244,8 +249,12 @@ class GameInitializationTests(unittest.IsolatedAsyncioTestCase):
                 patch("game_state_manager.GenAI", FakeGenAI), \
                 patch("game_state_manager.GameDefinitionsManager", FakeDefinitionsManager), \
                 patch("game_state_manager.EntityPlacementManager"), \
-                patch("game_state_manager.db.get_generator", return_value=generator_data), \
-                patch("game_state_manager.db.get_generator_translation", return_value=cached_translation) as get_translation, \
+                patch("game_state_manager.db.load_world_bundle", return_value={
+                    "definitions": {**generator_data, **cached_translation},
+                    "source_language": "it",
+                    "translated": True,
+                    "snapshot": None,
+                }) as load_bundle, \
                 patch("game_state_manager.db.save_generator_translation") as save_translation:
             manager = await GameStateManager.create(
                 seed=1,
@@ -257,9 +266,10 @@ class GameInitializationTests(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(manager.theme_desc_better, cached_translation["theme_desc_better"])
         self.assertEqual(manager.definitions.player_defs[0]["name"], "キャッシュ済み冒険者")
-        get_translation.assert_called_once_with(
+        load_bundle.assert_called_once_with(
             "italian-world",
             "ja",
+            WORLD_SNAPSHOT_VERSION,
             WORLD_TRANSLATION_CACHE_VERSION,
         )
         self.assertEqual(manager.gen_ai.translate_calls, [])
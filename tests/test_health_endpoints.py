@@ -64,6 +64,7 @@ class HealthEndpointTests(unittest.TestCase):
             self.assertEqual(payload["database"], "sqlite")
             self.assertFalse(payload["storage_enabled"])
             self.assertIn("latency_ms", payload)
+            self.assertEqual(payload["world_cache"]["hits"], 0)
 
     def test_database_health_endpoint_reports_failure(self):
         with patch("main.db", BrokenDatabase()):
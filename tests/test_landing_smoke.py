@@ -32,6 +32,18 @@ async def passthrough_prerender(request, html_content):
 
 
 class LandingSmokeTests(unittest.TestCase):
+    def setUp(self):
+        # The app's lifespan opens whichever database main.db is; tests that
+        # do not bring their own get a throwaway one instead of _data's.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        database = self.make_db(directory.name)
+        self.addCleanup(database.shutdown)
+        for target in ("main.db", "game_state_manager.db"):
+            patcher = patch(target, database)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     def make_db(self, directory):
         with patch.dict(os.environ, {
             "DO_STORAGE_SERVER": "",
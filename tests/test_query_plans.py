@@ -0,0 +1,150 @@
+"""Query-plan regression tests for the hot DatabaseManager queries.
+
+Each named hot path is called for real against a small database while every
+pooled connection traces the SQL it runs. Each traced statement is then put
+through EXPLAIN QUERY PLAN, and the test fails if any of them reads a whole
+table instead of going through an index, or builds a throwaway automatic
+index (which reads the whole table first). A plan that regresses to a scan
+after a schema or query change fails here instead of in production.
+"""
+
+import os
+import re
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import db as db_module
+from db import DatabaseManager
+
+
+STORAGE_DISABLED = {
+    "DO_STORAGE_SERVER": "",
+    "DO_SPACES_ACCESS_KEY": "",
+    "DO_SPACES_SECRET_KEY": "",
+    "DO_STORAGE_CONTAINER": "",
+}
+# A plan line reading a table without an index. Virtual tables (FTS5) and
+# subquery results are not tables and are not matched.
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?! USING)(?! VIRTUAL TABLE)\b(?!.*\bUSING\b)")
+AUTOMATIC_INDEX = re.compile(r"\bAUTOMATIC (COVERING |PARTIAL )*INDEX\b")
+CTE_NAME = re.compile(r"(?:\bWITH|,)\s+(\w+)\s+AS\s*\(", re.IGNORECASE)
+TRACED_STATEMENTS = ("SELECT", "WITH", "UPDATE", "DELETE")
+# FTS5 reads and writes its own shadow tables by quoted schema name.
+FTS_INTERNAL = "'main'."
+
+
+def _hot_queries(fixtures):
+    """Named hot paths, each a call into the public DatabaseManager API."""
+    owner_id, world_id = fixtures["owner_id"], fixtures["world_id"]
+    return {
+        "list_worlds public": lambda db: db.list_worlds(),
+        "list_worlds library": lambda db: db.list_worlds(local_dev=True),
+        "list_worlds owner": lambda db: db.list_worlds(owner_id=owner_id),
+        "list_worlds_page cursor": lambda db: db.list_worlds_page(
+            2, cursor=DatabaseManager.encode_world_cursor("9999", "z")
+        ),
+        "search_worlds_page": lambda db: db.search_worlds_page("lighthouse"),
+        "list_due_public_reviews": lambda db: db.list_due_public_reviews(),
+        "count_pending_public_reviews": lambda db: db.count_pending_public_reviews(),
+        "list_users_with_world_counts": lambda db: db.list_users_with_world_counts(),
+        "get_user_world_stats": lambda db: db.get_user_world_stats(owner_id),
+        "get_generator": lambda db: db.get_generator(world_id),
+        "load_world_bundle": lambda db: db.load_world_bundle(world_id, "it"),
+        "get_credit_balance": lambda db: db.get_credit_balance(owner_id),
+        "record_world_completion daily cap": lambda db: db.record_world_completion(
+            "session-1", world_id, owner_id, reward_amount=1, daily_reward_cap=3
+        ),
+        "reserve_free_world_art_reroll": lambda db: db.reserve_free_world_art_reroll(
+            world_id, owner_id
+        ),
+        "get_user_by_username": lambda db: db.get_user_by_username("Owner"),
+        "get_directory_session": lambda db: db.get_directory_session("session-1"),
+        "list_session_handoffs": lambda db: db.list_session_handoffs("worker-1", 0),
+        "list_rate_limit_attempts": lambda db: db.list_rate_limit_attempts("login:owner", 0),
+        "record_rate_limit_attempt": lambda db: db.record_rate_limit_attempt(
+            "login:owner", time.time(), time.time() - 60, max_attempts=5
+        ),
+        "get_forge_job": lambda db: db.get_forge_job("session-1"),
+        "append_forge_job_event": lambda db: db.append_forge_job_event(
+            "session-1", {"type": "forge_progress", "stage": "theme"}
+        ),
+    }
+
+
+class HotQueryPlanTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.statements = []
+        connect = db_module.ConnectionPool._connect
+
+        def traced_connect(pool, readonly=False, joined=False):
+            conn = connect(pool, readonly, joined)
+            conn.set_trace_callback(self.statements.append)
+            return conn
+
+        patcher = patch.object(db_module.ConnectionPool, "_connect", traced_connect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        with patch.dict(os.environ, STORAGE_DISABLED):
+            self.database = DatabaseManager()
+        self.database.db_path = os.path.join(self.directory.name, "plans.db")
+        self.database.init_db()
+        owner = self.database.create_user("owner", "Secret123!")
+        world_id = self.database.save_generator(
+            "A lighthouse", "Lighthouse", "en", [], [], [], {},
+            owner_id=owner["id"], visibility="public",
+        )
+        self.database.grant_credits(owner["id"], 5, "signup_bonus", "grant:owner")
+        self.fixtures = {"owner_id": owner["id"], "world_id": world_id}
+
+    def tearDown(self):
+        self.database.shutdown()
+        self.directory.cleanup()
+
+    def plan(self, sql):
+        conn = sqlite3.connect(self.database.db_path)
+        try:
+            conn.execute("ATTACH DATABASE ? AS accounts", (self.database.accounts_db_path,))
+            return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        finally:
+            conn.close()
+
+    def test_hot_queries_use_indexes(self):
+        for name, call in _hot_queries(self.fixtures).items():
+            with self.subTest(name):
+                self.statements.clear()
+                call(self.database)
+                traced = [
+                    sql for sql in self.statements
+                    if sql.lstrip().split(None, 1)[0].upper() in TRACED_STATEMENTS
+                    and FTS_INTERNAL not in sql
+                ]
+                self.assertTrue(traced, f"{name} ran no queries")
+                for sql in traced:
+                    self.assertEqual(self.table_scans(sql), [], f"{name} scans a table:\n{sql}")
+
+    def table_scans(self, sql):
+        ctes = set(CTE_NAME.findall(sql))
+        for cte in list(ctes):
+            ctes.update(re.findall(rf"\b(?:FROM|JOIN)\s+{cte}\s+(?:AS\s+)?(\w+)", sql, re.IGNORECASE))
+        scans = []
+        for line in self.plan(sql):
+            scan = FULL_SCAN.match(line)
+            if (scan and scan.group(1) not in ctes) or AUTOMATIC_INDEX.search(line):
+                scans.append(line)
+        return scans
+
+    def test_harness_flags_a_scan(self):
+        self.assertEqual(
+            self.table_scans("SELECT id FROM generators WHERE theme_desc = 'x'"),
+            ["SCAN generators"],
+        )
+        self.assertEqual(self.table_scans("SELECT id FROM generators WHERE id = 'x'"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from db import DatabaseManager
+
+
+STORAGE_DISABLED = {
+    "DO_STORAGE_SERVER": "",
+    "DO_SPACES_ACCESS_KEY": "",
+    "DO_SPACES_SECRET_KEY": "",
+    "DO_STORAGE_CONTAINER": "",
+}
+
+
+class QueryStatsTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with patch.dict(os.environ, dict(STORAGE_DISABLED, DB_SLOW_QUERY_MS="0")):
+            self.database = DatabaseManager()
+        self.database.db_path = os.path.join(self.directory.name, "stats.db")
+        self.database.init_db()
+        self.database.query_stats.reset()
+
+    def tearDown(self):
+        self.database.shutdown()
+        self.directory.cleanup()
+
+    def operations(self):
+        return {row["name"]: row for row in self.database.query_stats.snapshot()["operations"]}
+
+    def test_calls_are_recorded_under_their_method_name(self):
+        user = self.database.create_user("alice", "Secret123!")
+        for _ in range(3):
+            self.database.get_user_by_username("alice")
+        self.database.get_credit_balance(user["id"])
+
+        operations = self.operations()
+
+        self.assertEqual(operations["get_user_by_username"]["calls"], 3)
+        self.assertEqual(operations["create_user"]["calls"], 1)
+        self.assertIn("get_credit_balance", operations)
+        row = operations["get_user_by_username"]
+        self.assertEqual(sum(row["histogram"]), 3)
+        self.assertGreaterEqual(row["max_ms"], row["avg_ms"])
+        self.assertLessEqual(row["avg_wait_ms"], row["avg_ms"])
+        self.assertEqual(self.database.query_stats.snapshot()["slow"], [])
+
+    def test_failed_calls_count_as_errors(self):
+        def _broken(conn):
+            conn.execute("SELECT missing FROM users")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            self.database._execute(_broken, readonly=True)
+
+        self.assertEqual(self.operations()["test_failed_calls_count_as_errors"]["errors"], 1)
+
+    def test_slow_calls_are_logged_with_their_plans(self):
+        self.database.create_user("alice", "Secret123!")
+        self.database.query_stats.slow_ms = 0.000001
+
+        with self.assertLogs(level="WARNING") as logs:
+            self.database.get_user_by_username("alice")
+
+        slow = self.database.query_stats.snapshot()["slow"]
+        self.assertEqual([entry["name"] for entry in slow], ["get_user_by_username"])
+        statement, = slow[0]["statements"]
+        self.assertIn("WHERE username = ?", statement["sql"])
+        self.assertNotIn("alice", statement["sql"])
+        self.assertTrue(any("USING INDEX" in step for step in statement["plan"]))
+        self.assertIn("Slow database call get_user_by_username", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
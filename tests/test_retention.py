@@ -0,0 +1,146 @@
+import os
+import tempfile
+import time
+import unittest
+from threading import Event
+from unittest.mock import patch
+
+from db import DatabaseManager
+
+
+STORAGE_DISABLED = {
+    "DO_STORAGE_SERVER": "",
+    "DO_SPACES_ACCESS_KEY": "",
+    "DO_SPACES_SECRET_KEY": "",
+    "DO_STORAGE_CONTAINER": "",
+}
+
+
+class RetentionTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with patch.dict(os.environ, dict(STORAGE_DISABLED, DB_MAINTENANCE_PAUSE_MS="0")):
+            self.database = DatabaseManager()
+        self.database.db_path = os.path.join(self.directory.name, "retention.db")
+        self.database.init_db()
+        self.user = self.database.create_user("owner", "Secret123!")
+        self.world_id = self.database.save_generator(
+            "A harbor", "Harbor", "en", [], [], [], {},
+            owner_id=self.user["id"], visibility="unlisted",
+        )
+
+    def tearDown(self):
+        self.database.shutdown()
+        self.directory.cleanup()
+
+    def insert(self, sql, rows, database="accounts"):
+        with self.database.get_connection(database=database) as conn:
+            conn.executemany(sql, rows)
+            conn.commit()
+
+    def ids(self, sql):
+        with self.database.get_connection(readonly=True) as conn:
+            return sorted(row[0] for row in conn.execute(sql))
+
+    def test_old_play_sessions_are_pruned_in_batches(self):
+        self.insert("""
+            INSERT INTO world_play_sessions (session_id, generator_id, started_at)
+            VALUES (?, ?, DATETIME('now', ?))
+        """, [(f"old-{index}", self.world_id, "-100 days") for index in range(7)]
+            + [("recent", self.world_id, "-1 days")])
+
+        report = self.database.run_maintenance(batch_size=3)
+
+        self.assertEqual(report["pruned"]["world_play_sessions"], 7)
+        self.assertEqual(self.ids("SELECT session_id FROM world_play_sessions"), ["recent"])
+
+    def test_only_unusable_mobile_sessions_are_pruned(self):
+        now = int(time.time())
+        long_ago = now - 60 * 86400
+        self.insert("""
+            INSERT INTO mobile_auth_sessions (
+                id, user_id, access_token_hash, refresh_token_hash,
+                access_expires_at, refresh_expires_at, revoked_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            ("expired", self.user["id"], "a1", "r1", long_ago, long_ago, None),
+            ("revoked", self.user["id"], "a2", "r2", now, now + 86400, "2000-01-01 00:00:00"),
+            ("live", self.user["id"], "a3", "r3", now, now + 86400, None),
+            ("just-expired", self.user["id"], "a4", "r4", now - 60, now - 60, None),
+        ])
+
+        self.database.run_maintenance()
+
+        self.assertEqual(self.ids("SELECT id FROM mobile_auth_sessions"), ["just-expired", "live"])
+
+    def test_succeeded_rerolls_and_latest_reviews_are_kept(self):
+        self.insert("""
+            INSERT INTO world_art_reroll_attempts (id, generator_id, user_id, status, created_at)
+            VALUES (?, ?, ?, ?, '2000-01-01 00:00:00')
+        """, [
+            ("failed", self.world_id, self.user["id"], "failed"),
+            ("stale", self.world_id, self.user["id"], "reserved"),
+            ("used", self.world_id, self.user["id"], "succeeded"),
+        ])
+        self.insert("""
+            INSERT INTO world_moderation_reviews (id, generator_id, model_name, decision, created_at)
+            VALUES (?, ?, 'model', ?, ?)
+        """, [
+            ("first", self.world_id, "reject", "2000-01-01 00:00:00"),
+            ("second", self.world_id, "approve", "2000-02-01 00:00:00"),
+        ], database="worlds")
+
+        self.database.run_maintenance()
+
+        self.assertEqual(self.ids("SELECT id FROM world_art_reroll_attempts"), ["used"])
+        self.assertEqual(self.ids("SELECT id FROM world_moderation_reviews"), ["second"])
+        self.assertEqual(
+            self.database.get_free_world_art_rerolls_remaining(self.world_id, self.user["id"]), 0
+        )
+
+    def test_abandoned_game_sessions_are_pruned(self):
+        now = time.time()
+        self.database.hibernate_game_sessions([
+            {"session_id": session_id, "state": {}, "created_at": now, "last_accessed": accessed}
+            for session_id, accessed in (("abandoned", now - 2 * 86400), ("idle", now - 3600))
+        ])
+
+        report = self.database.run_maintenance()
+
+        self.assertEqual(report["pruned"]["game_sessions"], 1)
+        self.assertEqual(self.ids("SELECT session_id FROM game_sessions"), ["idle"])
+
+    def test_a_zero_day_policy_keeps_rows(self):
+        self.insert("""
+            INSERT INTO world_play_sessions (session_id, generator_id, started_at)
+            VALUES ('old', ?, '2000-01-01 00:00:00')
+        """, [(self.world_id,)])
+        self.database.retention_days["world_play_sessions"] = 0
+
+        report = self.database.run_maintenance()
+
+        self.assertNotIn("world_play_sessions", report["pruned"])
+        self.assertEqual(self.ids("SELECT session_id FROM world_play_sessions"), ["old"])
+
+    def test_pruned_pages_are_vacuumed_off_the_file(self):
+        self.insert("""
+            INSERT INTO world_play_sessions (session_id, generator_id, started_at)
+            VALUES (?, ?, '2000-01-01 00:00:00')
+        """, [(f"session-{index:06d}", self.world_id) for index in range(20000)])
+
+        report = self.database.run_maintenance()
+
+        self.assertEqual(report["auto_vacuum"], "incremental")
+        self.assertGreater(report["reclaimed_bytes"], 0)
+        self.assertEqual(report["free_bytes"], 0)
+        self.assertTrue(report["analyzed"])
+
+    def test_a_stopped_run_does_nothing(self):
+        stop = Event()
+        stop.set()
+
+        self.assertEqual(self.database.run_maintenance(stop=stop), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from db import DatabaseManager
+
+
+STORAGE_DISABLED = {
+    "DO_STORAGE_SERVER": "",
+    "DO_SPACES_ACCESS_KEY": "",
+    "DO_SPACES_SECRET_KEY": "",
+    "DO_STORAGE_CONTAINER": "",
+}
+
+
+class SchemaMigrationTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "migrations.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_db(self):
+        with patch.dict(os.environ, STORAGE_DISABLED):
+            database = DatabaseManager()
+        database.db_path = self.path
+        self.addCleanup(database.shutdown)
+        return database
+
+    def user_version(self, database):
+        with database.get_connection(readonly=True) as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def make_legacy_db(self, world_count):
+        """A database from before versioning: tables, but user_version 0."""
+        database = self.make_db()
+        with database.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE generators (
+                    id TEXT PRIMARY KEY,
+                    theme_desc TEXT,
+                    theme_desc_better TEXT,
+                    language TEXT,
+                    player_defs TEXT,
+                    item_defs TEXT,
+                    enemy_defs TEXT,
+                    celltype_defs TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.executemany("""
+                INSERT INTO generators
+                (id, theme_desc, theme_desc_better, language, player_defs, item_defs, enemy_defs, celltype_defs)
+                VALUES (?, 'Old theme', 'Old World', 'en', '[]', '[]', '[]', '{}')
+            """, [(f"world-{index}",) for index in range(world_count)])
+            conn.commit()
+        return database
+
+    def test_an_up_to_date_database_starts_without_migrating(self):
+        self.make_db().init_db()
+        self.assertEqual(self.user_version(self.make_db()), len(DatabaseManager.MIGRATIONS))
+
+        database = self.make_db()
+        with patch.object(database, "_migrate") as migrate, \
+                patch.object(database, "_ensure_column") as ensure_column:
+            database.init_db()
+
+        migrate.assert_not_called()
+        ensure_column.assert_not_called()
+
+    def test_accounts_steps_lost_with_their_file_are_run_again(self):
+        database = self.make_db()
+        database.init_db()
+        database.shutdown()
+        # A crash after the World file committed step 12 but before the
+        # accounts file did.
+        conn = sqlite3.connect(database.accounts_db_path)
+        conn.execute("DROP TABLE forge_jobs")
+        conn.execute("PRAGMA user_version = 11")
+        conn.commit()
+        conn.close()
+
+        restarted = self.make_db()
+        restarted.init_db()
+
+        self.assertEqual(self.user_version(restarted), len(DatabaseManager.MIGRATIONS))
+        self.assertIsNone(restarted.get_forge_job("missing"))
+        with restarted.get_connection(readonly=True, database="accounts") as conn:
+            self.assertEqual(
+                conn.execute("PRAGMA user_version").fetchone()[0], len(DatabaseManager.MIGRATIONS)
+            )
+
+    def test_a_fresh_database_schedules_no_backfills(self):
+        database = self.make_db()
+        database.init_db()
+
+        self.assertEqual(database.run_backfills(), {})
+
+    def test_backfills_run_in_batches_and_finish(self):
+        database = self.make_legacy_db(world_count=5)
+        with patch.object(database, "start_backfills"):
+            database.init_db()
+
+        batches = database.run_backfills(batch_size=2)
+
+        # Three batches of rows, then one that finds the end.
+        self.assertEqual(batches, {
+            "generator_ownership_shape": 4, "world_summaries": 4, "world_search": 4,
+        })
+        self.assertEqual(len(database.list_worlds(local_dev=True)), 5)
+        with database.get_connection(readonly=True) as conn:
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM schema_backfills WHERE completed_at IS NULL"
+            ).fetchone()[0]
+            missing = conn.execute(
+                "SELECT COUNT(*) FROM generators WHERE updated_at IS NULL"
+            ).fetchone()[0]
+        self.assertEqual(pending, 0)
+        self.assertEqual(missing, 0)
+
+    def test_an_interrupted_backfill_resumes_after_its_last_batch(self):
+        database = self.make_legacy_db(world_count=5)
+        with patch.object(database, "start_backfills"):
+            database.init_db()
+        database._execute(
+            database._run_backfill_batch,
+            "generator_ownership_shape", "_backfill_generator_ownership_shape", 0, 3,
+        )
+
+        restarted = self.make_db()
+        with patch.object(restarted, "start_backfills"):
+            restarted.init_db()
+        batches = restarted.run_backfills(batch_size=3)
+
+        self.assertEqual(batches["generator_ownership_shape"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,276 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+import zlib
+from unittest.mock import patch
+
+import main
+from db import DatabaseManager
+from game import Game
+from session_directory import SQLiteSessionDirectory
+from tools.ensure_dev_worlds import ensure_dev_worlds
+
+
+STORAGE_DISABLED = {
+    "DO_STORAGE_SERVER": "",
+    "DO_SPACES_ACCESS_KEY": "",
+    "DO_SPACES_SECRET_KEY": "",
+    "DO_STORAGE_CONTAINER": "",
+}
+TEST_PLACEMENTS = [
+    {"type": "item", "entity_id": "espresso", "x": 1, "y": 0},
+    {"type": "enemy", "entity_id": "street_punk", "x": 2, "y": 0},
+]
+
+
+class SessionDirectoryTests(unittest.TestCase):
+    """Two GameSessionManagers over one database, standing in for two workers."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with patch.dict(os.environ, STORAGE_DISABLED):
+            self.database = DatabaseManager()
+        self.database.db_path = os.path.join(self.directory.name, "workers.db")
+        self.database.init_db()
+        seeded = ensure_dev_worlds(self.database)
+        self.world_id = next(world for world in seeded if world["key"] == "piedone")["id"]
+
+        patches = [
+            patch.dict(os.environ, {
+                "LOW_SPEC_MODEL_API_KEY": "test-key",
+                "HIGH_SPEC_MODEL_API_KEY": "test-key",
+            }),
+            patch("main.db", self.database),
+            patch("game_state_manager.db", self.database),
+            patch("gen_ai.GenAI.gen_entity_placements", return_value=TEST_PLACEMENTS),
+            patch("gen_ai.GenAI.gen_room_description", return_value="A quiet test room."),
+            patch.object(main.GameSessionManager, "HANDOFF_WAIT_SECONDS", 1),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.first = main.GameSessionManager(SQLiteSessionDirectory(self.database, "first"))
+        self.second = main.GameSessionManager(SQLiteSessionDirectory(self.database, "second"))
+
+    def tearDown(self):
+        self.database.shutdown()
+        self.directory.cleanup()
+
+    def run_workers(self, scenario):
+        async def run():
+            await self.first.directory.start()
+            await self.second.directory.start()
+            return await scenario()
+
+        return asyncio.run(run())
+
+    async def start_run(self, manager):
+        game = await Game.create(seed=7, theme_desc="", generator_id=self.world_id)
+        return await manager.create_session(game), game
+
+    async def serve_handoffs(self, manager, until):
+        while not until.done():
+            await manager.hand_off_requested()
+            await asyncio.sleep(0.02)
+
+    async def resume_elsewhere(self, session_id):
+        """The second worker asks for a run while the first serves handoffs."""
+        resuming = asyncio.ensure_future(self.second.resume_session(session_id))
+        await self.serve_handoffs(self.first, resuming)
+        return await resuming
+
+    def test_a_run_moves_to_the_worker_that_asks_for_it(self):
+        async def scenario():
+            session_id, game = await self.start_run(self.first)
+            rng_state = game.state_manager.random.getstate()
+            resumed = await self.resume_elsewhere(session_id)
+            return session_id, rng_state, resumed
+
+        session_id, rng_state, resumed = self.run_workers(scenario)
+
+        self.assertIsNotNone(resumed)
+        self.assertNotIn(session_id, self.first.sessions)
+        self.assertIs(self.second.sessions[session_id], resumed)
+        self.assertEqual(resumed["game_instance"].state_manager.random.getstate(), rng_state)
+        self.assertEqual(self.database.get_directory_session(session_id)["worker_id"], "second")
+        self.assertEqual(self.first.evictions["handoff"], 1)
+        self.assertIsNone(self.database.load_game_session(session_id))
+
+    def test_a_new_session_is_forged_by_the_worker_its_socket_reaches(self):
+        request = main.GameCreationRequest(generator_id=self.world_id, language="it")
+
+        async def scenario():
+            await self.first.add_pending_session("pending", {
+                "created_at": time.time(),
+                "last_accessed": time.time(),
+                "game_instance": None,
+                "creation_request": request,
+                "status": "creating",
+                "generator_id": self.world_id,
+                "language": "it",
+                "debug_seed": None,
+                "spectator_mode": False,
+                "requester_user_id": "player",
+            })
+            return await self.second.resume_session("pending")
+
+        session = self.run_workers(scenario)
+
+        self.assertNotIn("pending", self.first.sessions)
+        self.assertEqual(session["status"], "creating")
+        self.assertEqual(session["creation_request"], request)
+        self.assertEqual(session["requester_user_id"], "player")
+        self.assertEqual(self.database.get_directory_session("pending")["worker_id"], "second")
+
+    def test_a_taken_over_session_is_forged_as_it_was_requested(self):
+        create = Game.create
+        seeds = []
+
+        async def recording_create(**kwargs):
+            seeds.append(kwargs["seed"])
+            return await create(**kwargs)
+
+        async def emit(event):
+            pass
+
+        async def scenario(session_id, request):
+            await self.first.add_pending_session(session_id, {
+                "created_at": time.time(),
+                "last_accessed": time.time(),
+                "game_instance": None,
+                "creation_request": request,
+                "status": "creating",
+                "generator_id": self.world_id,
+                "language": "en",
+                "debug_seed": request.debug_seed,
+                "spectator_mode": request.spectator_mode,
+                "requester_user_id": None,
+            })
+            session = await self.second.resume_session(session_id)
+            ready = await main.forge_world(session_id, session, None, emit)
+            return session, ready
+
+        requests = {
+            "seeded": main.GameCreationRequest(generator_id=self.world_id, debug_seed=42),
+            "review": main.GameCreationRequest(generator_id=self.world_id, spectator_mode=True),
+        }
+        with patch("main.Game.create", side_effect=recording_create), \
+                patch("main.game_session_manager", self.second):
+            for session_id, request in requests.items():
+                session, ready = self.run_workers(lambda: scenario(session_id, request))
+
+                self.assertTrue(ready)
+                self.assertEqual(session["status"], "ready")
+                self.assertEqual(session["creation_request"], request)
+
+        review_seed = zlib.crc32(f"{self.world_id}:en:auto-review-v1".encode("utf-8"))
+        self.assertEqual(seeds, [42, review_seed])
+
+    def test_a_run_with_a_client_connected_is_not_handed_over(self):
+        async def scenario():
+            session_id, game = await self.start_run(self.first)
+            game.add_client(object())
+            return session_id, await self.resume_elsewhere(session_id)
+
+        session_id, resumed = self.run_workers(scenario)
+
+        self.assertIsNone(resumed)
+        self.assertIn(session_id, self.first.sessions)
+        self.assertEqual(self.database.get_directory_session(session_id)["worker_id"], "first")
+
+    def test_a_run_held_by_a_worker_that_died_is_gone(self):
+        self.database.publish_directory_session("orphan", "crashed", "ready")
+
+        resumed = self.run_workers(lambda: self.second.resume_session("orphan"))
+
+        self.assertIsNone(resumed)
+        self.assertIsNone(self.database.get_directory_session("orphan"))
+
+    def test_a_stopping_worker_leaves_its_saved_runs_to_the_others(self):
+        async def scenario():
+            session_id, _ = await self.start_run(self.first)
+            await self.first.hibernate_all()
+            await self.first.directory.stop()
+            return session_id, await self.second.resume_session(session_id)
+
+        session_id, resumed = self.run_workers(scenario)
+
+        self.assertIsNotNone(resumed)
+        self.assertEqual(self.database.get_directory_session(session_id)["worker_id"], "second")
+
+    def test_one_worker_holds_a_lease_until_it_runs_out(self):
+        async def scenario():
+            return [
+                await self.first.directory.acquire_lease("db_maintenance", 60),
+                await self.second.directory.acquire_lease("db_maintenance", 60),
+                await self.first.directory.acquire_lease("db_maintenance", 0),
+                await self.second.directory.acquire_lease("db_maintenance", 60),
+            ]
+
+        self.assertEqual(self.run_workers(scenario), [True, False, True, True])
+
+    def test_rate_limits_count_attempts_from_every_worker(self):
+        first = main.SharedRateLimiter(max_attempts=2, window_seconds=60)
+        second = main.SharedRateLimiter(max_attempts=2, window_seconds=60)
+        key = "login:1.2.3.4:player"
+
+        async def scenario():
+            await first.record_failure(key)
+            await second.record_failure(key)
+            limited = [await first.is_limited(key), await second.retry_after_seconds(key)]
+            await second.clear(key)
+            return limited + [await first.is_limited(key)]
+
+        limited, retry_after, cleared = asyncio.run(scenario())
+
+        self.assertTrue(limited)
+        self.assertGreater(retry_after, 0)
+        self.assertFalse(cleared)
+
+    def test_workers_cannot_both_take_the_last_attempt(self):
+        limiters = [main.SharedRateLimiter(max_attempts=3, window_seconds=60) for _ in range(2)]
+        key = "create_world:1.2.3.4:anonymous"
+
+        async def scenario():
+            return await asyncio.gather(*(
+                limiter.consume(key) for limiter in limiters for _ in range(4)
+            ))
+
+        retry_afters = asyncio.run(scenario())
+
+        self.assertEqual(retry_afters.count(0), 3)
+        self.assertTrue(all(seconds > 0 for seconds in retry_afters if seconds))
+        self.assertEqual(len(self.database.list_rate_limit_attempts(key, 0)), 3)
+
+
+class PrimaryWorkerTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "game.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open_database(self):
+        with patch.dict(os.environ, STORAGE_DISABLED):
+            database = DatabaseManager()
+        database.db_path = self.path
+        database.init_db()
+        self.addCleanup(database.shutdown)
+        return database
+
+    def test_only_the_first_worker_to_start_is_the_primary(self):
+        first = self.open_database()
+        second = self.open_database()
+
+        self.assertTrue(first.is_primary)
+        self.assertFalse(second.is_primary)
+
+        first.shutdown()
+        self.assertTrue(self.open_database().is_primary)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+import main
+
+
+def session(status="ready", idle_seconds=0, **fields):
+    now = time.time()
+    return {
+        "created_at": now - idle_seconds,
+        "last_accessed": now - idle_seconds,
+        "game_instance": None,
+        "status": status,
+        **fields,
+    }
+
+
+class SessionExpiryTests(unittest.TestCase):
+    def setUp(self):
+        self.manager = main.GameSessionManager()
+        self.manager.ttls = {"creating": 60, "error": 10, "unconnected": 120, "active": 3600}
+
+    def test_each_state_has_its_own_ttl(self):
+        self.manager._add("forge-abandoned", session("creating", idle_seconds=61))
+        self.manager._add("forge-recent", session("creating", idle_seconds=30))
+        self.manager._add("failed", session("error", idle_seconds=11))
+        self.manager._add("never-played", session(idle_seconds=121))
+        self.manager._add("played", session(idle_seconds=121, connected_at=time.time() - 200))
+
+        expired = self.manager.expire_sessions()
+
+        self.assertEqual(set(expired), {"forge-abandoned", "failed", "never-played"})
+        self.assertEqual(set(self.manager.sessions), {"forge-recent", "played"})
+        self.assertEqual(
+            self.manager.expirations,
+            {"creating": 1, "error": 1, "unconnected": 1, "active": 0},
+        )
+
+    def test_only_sessions_due_are_looked_at(self):
+        for number in range(1000):
+            self.manager._add(f"fresh-{number}", session())
+        self.manager._add("stale", session("error", idle_seconds=11))
+
+        with patch.object(self.manager, "expiry_kind", wraps=self.manager.expiry_kind) as kind:
+            self.assertEqual(self.manager.expire_sessions(), ["stale"])
+
+        self.assertLessEqual(kind.call_count, 2)
+        self.assertEqual(len(self.manager._expiry_heap), 1000)
+
+    def test_a_session_used_since_it_was_scheduled_is_pushed_back(self):
+        self.manager._add("player", session("error"))
+        self.manager.sessions["player"]["last_accessed"] += 20
+
+        self.assertEqual(self.manager.expire_sessions(now=time.time() + 15), [])
+        self.assertEqual(self.manager.expire_sessions(now=time.time() + 31), ["player"])
+
+    def test_a_session_failing_expires_on_the_shorter_ttl(self):
+        self.manager._add("forge", session("creating"))
+        self.manager.sessions["forge"]["status"] = "error"
+        asyncio.run(self.manager.publish("forge"))
+
+        self.assertEqual(self.manager.expire_sessions(now=time.time() + 11), ["forge"])
+
+    def test_a_world_still_forging_is_kept(self):
+        self.manager._add("forge", session("creating", idle_seconds=61, forging=True))
+
+        self.assertEqual(self.manager.expire_sessions(), [])
+        self.assertIn("forge", self.manager.sessions)
+
+    def test_ttls_are_configured_in_minutes(self):
+        with patch.dict(os.environ, {
+            "GAME_SESSION_TTL_CREATING_MINUTES": "3",
+            "GAME_SESSION_TTL_ACTIVE_MINUTES": "90",
+        }):
+            ttls = main.get_game_session_ttls()
+
+        self.assertEqual(ttls, {
+            "creating": 180,
+            "error": main.GameSessionManager.DEFAULT_TTLS["error"],
+            "unconnected": main.GameSessionManager.DEFAULT_TTLS["unconnected"],
+            "active": 5400,
+        })
+
+    def test_expiry_counts_are_published_in_stats(self):
+        self.manager._add("failed", session("error", idle_seconds=11))
+        self.manager.expire_sessions()
+
+        with patch("main.game_session_manager", self.manager):
+            stats = json.loads(asyncio.run(main.get_server_stats()).body)
+
+        self.assertEqual(stats["session_expiry"]["expired"]["error"], 1)
+        self.assertEqual(stats["session_expiry"]["ttl_seconds"]["error"], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,269 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+import main
+from db import DatabaseManager
+from game import Game, deep_sizeof
+from tools.ensure_dev_worlds import ensure_dev_worlds
+
+
+STORAGE_DISABLED = {
+    "DO_STORAGE_SERVER": "",
+    "DO_SPACES_ACCESS_KEY": "",
+    "DO_SPACES_SECRET_KEY": "",
+    "DO_STORAGE_CONTAINER": "",
+}
+TEST_PLACEMENTS = [
+    {"type": "item", "entity_id": "espresso", "x": 1, "y": 0},
+    {"type": "enemy", "entity_id": "street_punk", "x": 2, "y": 0},
+]
+
+
+async def passthrough_prerender(request, html_content):
+    return html_content
+
+
+def receive_update(websocket):
+    """The next update, past any progress events."""
+    message = websocket.receive_json()
+    while message.get("type") in {"forge_progress", "status"}:
+        message = websocket.receive_json()
+    return message
+
+
+class GameSessionTestCase(unittest.TestCase):
+    """A seeded World behind the app, with model calls stubbed out."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with patch.dict(os.environ, STORAGE_DISABLED):
+            self.database = DatabaseManager()
+        self.database.db_path = os.path.join(self.directory.name, "hibernation.db")
+        self.database.init_db()
+        seeded = ensure_dev_worlds(self.database)
+        self.world_id = next(world for world in seeded if world["key"] == "piedone")["id"]
+
+        patches = [
+            patch.dict(os.environ, {
+                "LOW_SPEC_MODEL_API_KEY": "test-key",
+                "HIGH_SPEC_MODEL_API_KEY": "test-key",
+                "GAME_SESSION_HIBERNATE_MINUTES": "0",
+            }),
+            patch("main.db", self.database),
+            patch("game_state_manager.db", self.database),
+            patch("main.get_prerendered_content", passthrough_prerender),
+            patch("gen_ai.GenAI.gen_entity_placements", return_value=TEST_PLACEMENTS),
+            patch("gen_ai.GenAI.gen_adapt_sentence", side_effect=lambda state, events, text: text),
+            patch("gen_ai.GenAI.gen_room_description", return_value="A quiet test room."),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        main.game_session_manager.sessions.clear()
+        self.addCleanup(main.game_session_manager.sessions.clear)
+        patcher = patch.object(
+            main.game_session_manager, "evictions", dict.fromkeys(main.game_session_manager.evictions, 0)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.database.shutdown()
+        self.directory.cleanup()
+
+    def start_run(self, client):
+        session_id = client.post("/api/create_game_session", json={
+            "generator_id": self.world_id,
+            "language": "en",
+        }).json()["session_id"]
+        with client.websocket_connect(f"/ws/game/{session_id}") as websocket:
+            self.assertEqual(receive_update(websocket)["type"], "connection_established")
+            websocket.send_json({"action": "get_initial_state"})
+            receive_update(websocket)
+            websocket.send_json({"action": "move", "direction": "e"})
+            moved = receive_update(websocket)
+        return session_id, moved["state"]
+
+
+class SessionHibernationTests(GameSessionTestCase):
+    def test_an_idle_run_is_evicted_and_resumed_on_reconnect(self):
+        with TestClient(main.app) as client:
+            session_id, state = self.start_run(client)
+            game = main.game_session_manager.sessions[session_id]["game_instance"]
+            rng_state = game.state_manager.random.getstate()
+
+            hibernated = asyncio.run(main.game_session_manager.hibernate_idle_sessions(0))
+
+            self.assertEqual(hibernated, 1)
+            self.assertNotIn(session_id, main.game_session_manager.sessions)
+            self.assertIsNotNone(self.database.load_game_session(session_id))
+
+            with client.websocket_connect(f"/ws/game/{session_id}") as websocket:
+                self.assertEqual(receive_update(websocket)["type"], "connection_established")
+                websocket.send_json({"action": "get_initial_state"})
+                resumed = receive_update(websocket)
+
+            resumed_game = main.game_session_manager.sessions[session_id]["game_instance"]
+            self.assertIsNot(resumed_game, game)
+            self.assertEqual(resumed_game.state_manager.random.getstate(), rng_state)
+            self.assertEqual(resumed["state"]["player_pos"], state["player_pos"])
+            self.assertEqual(resumed["state"]["item_placements"], state["item_placements"])
+            self.assertEqual(resumed["state"]["inventory"], state["inventory"])
+            # The saved copy is dropped once the run is live again.
+            self.assertIsNone(self.database.load_game_session(session_id))
+
+    def test_shutdown_hibernates_every_run(self):
+        with TestClient(main.app) as client:
+            session_id, state = self.start_run(client)
+            game = main.game_session_manager.sessions[session_id]["game_instance"]
+
+        saved = self.database.load_game_session(session_id)
+        self.assertIsNotNone(saved)
+        restored = Game.rehydrate(json.loads(json.dumps(saved["state"]["game"])))
+        self.assertEqual(list(restored.state.player_pos), state["player_pos"])
+        self.assertEqual(restored.state.enemies, game.state.enemies)
+        self.assertEqual(
+            restored.state_manager.entity_manager.item_sequence_cnt,
+            game.state_manager.entity_manager.item_sequence_cnt,
+        )
+        self.assertEqual(
+            restored.state_manager.event_history,
+            json.loads(json.dumps(game.state_manager.event_history)),
+        )
+
+    def test_a_run_with_a_client_connected_stays_in_memory(self):
+        with TestClient(main.app) as client:
+            session_id, _ = self.start_run(client)
+            with client.websocket_connect(f"/ws/game/{session_id}") as websocket:
+                receive_update(websocket)
+
+                hibernated = asyncio.run(main.game_session_manager.hibernate_idle_sessions(0))
+
+            self.assertEqual(hibernated, 0)
+            self.assertIn(session_id, main.game_session_manager.sessions)
+
+    def test_a_run_saved_too_long_ago_is_not_resumed(self):
+        self.database.hibernate_game_sessions([{
+            "session_id": "stale",
+            "state": {},
+            "created_at": time.time() - 3 * 86400,
+            "last_accessed": time.time() - 2 * 86400,
+        }])
+
+        self.assertIsNone(asyncio.run(main.game_session_manager.resume_session("stale")))
+        self.assertIsNone(self.database.load_game_session("stale"))
+
+
+class SessionMemoryLimitTests(GameSessionTestCase):
+    def test_a_run_is_measured_by_part(self):
+        with TestClient(main.app) as client:
+            session_id, _ = self.start_run(client)
+            footprint = main.game_session_manager.sessions[session_id]["game_instance"].memory_footprint()
+            # Only the periodic sweep measures runs; the endpoint reports it.
+            with patch.object(Game, "memory_footprint") as measure:
+                unmeasured = client.get("/api/stats").json()["session_memory"]
+            measure.assert_not_called()
+            asyncio.run(main.game_session_manager.enforce_limits())
+
+            stats = client.get("/api/stats").json()["session_memory"]
+
+        for part in ("state", "event_history", "definitions", "tile_info"):
+            self.assertGreater(footprint[part], 0, part)
+        self.assertEqual(footprint["total"], sum(
+            footprint[part] for part in ("state", "event_history", "definitions", "tile_info")
+        ))
+        self.assertEqual(unmeasured["estimated_bytes"], 0)
+        self.assertIsNotNone(stats["measured_at"])
+        self.assertEqual(stats["sessions"], 1)
+        self.assertEqual(stats["estimated_bytes"], footprint["total"])
+        self.assertEqual(stats["by_part"]["event_history"], footprint["event_history"])
+        self.assertEqual(stats["budget_bytes"], main.GAME_SESSION_MEMORY_BUDGET_DEFAULT_MB * 1024 * 1024)
+
+    def test_shared_objects_are_counted_once(self):
+        shared = ["x" * 1000]
+        seen = set()
+
+        first = deep_sizeof({"a": shared}, seen)
+        second = deep_sizeof({"b": shared}, seen)
+
+        self.assertGreater(first, 1000)
+        self.assertLess(second, 1000)
+
+    def test_plain_objects_sets_and_tuples_are_walked(self):
+        class Holder:
+            def __init__(self):
+                self.payload = ("y" * 1000, {"z" * 1000})
+
+        self.assertGreater(deep_sizeof(Holder()), 2000)
+
+    def test_the_least_recently_used_runs_go_over_budget(self):
+        manager = main.game_session_manager
+        with TestClient(main.app) as client:
+            oldest, _ = self.start_run(client)
+            middle, _ = self.start_run(client)
+            newest, _ = self.start_run(client)
+            for age, session_id in enumerate((newest, middle, oldest), start=1):
+                manager.sessions[session_id]["last_accessed"] -= age * 60
+            sizes = {
+                session_id: manager.sessions[session_id]["game_instance"].memory_footprint()["total"]
+                for session_id in (oldest, middle, newest)
+            }
+
+            evicted = asyncio.run(manager.enforce_limits(memory_budget_bytes=sizes[newest] + 1))
+
+            self.assertEqual(evicted, 2)
+            self.assertEqual(set(manager.sessions), {newest})
+            self.assertIsNotNone(self.database.load_game_session(oldest))
+            self.assertIsNotNone(self.database.load_game_session(middle))
+            self.assertEqual(manager.evictions["memory_budget"], 2)
+
+    def test_a_user_keeps_only_their_most_recent_runs(self):
+        manager = main.game_session_manager
+        with TestClient(main.app) as client:
+            runs = [self.start_run(client)[0] for _ in range(3)]
+            for age, session_id in enumerate(reversed(runs), start=1):
+                manager.sessions[session_id]["requester_user_id"] = "player"
+                manager.sessions[session_id]["last_accessed"] -= age * 60
+            manager.sessions["forging"] = {
+                "created_at": time.time() - 3600,
+                "last_accessed": time.time() - 3600,
+                "game_instance": None,
+                "status": "creating",
+                "requester_user_id": "player",
+            }
+
+            evicted = asyncio.run(manager.enforce_limits(max_per_user=2))
+
+            self.assertEqual(evicted, 2)
+            # A World still forging is never evicted, so it counts but stays.
+            self.assertEqual(set(manager.sessions), {runs[-1], "forging"})
+            self.assertIsNotNone(self.database.load_game_session(runs[0]))
+
+    def test_a_failed_run_over_budget_is_dropped(self):
+        manager = main.game_session_manager
+        with TestClient(main.app) as client:
+            session_id, _ = self.start_run(client)
+            manager.sessions["failed"] = {
+                "created_at": time.time() - 60,
+                "last_accessed": time.time() - 60,
+                "game_instance": None,
+                "status": "error",
+            }
+
+            evicted = asyncio.run(manager.enforce_limits(memory_budget_bytes=1))
+
+            self.assertEqual(evicted, 2)
+            self.assertEqual(manager.sessions, {})
+            self.assertIsNone(self.database.load_game_session("failed"))
+            self.assertIsNotNone(self.database.load_game_session(session_id))
+
+
+if __name__ == "__main__":
+    unittest.main()
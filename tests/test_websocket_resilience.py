@@ -1,10 +1,14 @@
 import json
+import os
+import tempfile
 import time
 import unittest
+from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 
 import main
+from db import DatabaseManager
 
 
 class FakeStateManager:
@@ -40,6 +44,24 @@ class WebSocketResilienceTests(unittest.TestCase):
     The client reads that as code 1006 and redirects home, so one bad action
     ejected the player and lost the run."""
 
+    def setUp(self):
+        # Each socket queues a play start for its World.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with patch.dict(os.environ, {
+            "DO_STORAGE_SERVER": "",
+            "DO_SPACES_ACCESS_KEY": "",
+            "DO_SPACES_SECRET_KEY": "",
+            "DO_STORAGE_CONTAINER": "",
+        }):
+            database = DatabaseManager()
+        database.db_path = os.path.join(directory.name, "resilience.db")
+        database.init_db()
+        self.addCleanup(database.shutdown)
+        patcher = patch("main.db", database)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def drive(self, game, actions):
         session_id = "session-1"
         main.game_session_manager.sessions[session_id] = {
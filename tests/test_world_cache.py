@@ -0,0 +1,207 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from db import DatabaseManager, WorldCache, WORLD_SNAPSHOT_VERSION
+
+
+STORAGE_DISABLED = {
+    "DO_STORAGE_SERVER": "",
+    "DO_SPACES_ACCESS_KEY": "",
+    "DO_SPACES_SECRET_KEY": "",
+    "DO_STORAGE_CONTAINER": "",
+}
+
+
+class WorldCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with patch.dict(os.environ, STORAGE_DISABLED):
+            self.database = DatabaseManager()
+        self.database.db_path = os.path.join(self.directory.name, "cache.db")
+        self.database.init_db()
+        self.world_id = self.database.save_generator(
+            theme_desc="A wet city",
+            theme_desc_better="Wet City",
+            language="en",
+            player_defs=[{"name": "Runner"}],
+            item_defs=[{"id": "coffee"}],
+            enemy_defs=[{"enemy_id": "punk"}],
+            celltype_defs=[{"id": "street"}],
+            visibility="public",
+        )
+        self.database.save_generator_world(
+            generator_id=self.world_id,
+            language="en",
+            map_csv="street,street",
+            entity_placements=[],
+            tile_info_by_language={"en": [{"x": 0, "y": 0, "label": "Wet Street"}]},
+            snapshot_version=WORLD_SNAPSHOT_VERSION,
+        )
+        self.database.save_generator_translation(
+            self.world_id, "it", "Città bagnata",
+            [{"name": "Corridore"}], [{"id": "caffè"}], [{"enemy_id": "teppista"}], [{"id": "strada"}],
+        )
+
+    def tearDown(self):
+        self.database.shutdown()
+        self.directory.cleanup()
+
+    def replay_reads(self):
+        """The World reads one replay makes, from session creation to load."""
+        self.database.get_visible_generator(self.world_id)
+        self.database.get_visible_generator(self.world_id)
+        return self.database.load_world_bundle(self.world_id, "it", WORLD_SNAPSHOT_VERSION)
+
+    def test_a_warm_replay_touches_sqlite_once(self):
+        self.replay_reads()
+        queries = patch.object(
+            self.database, "_execute", wraps=self.database._execute
+        )
+
+        with queries as execute:
+            self.replay_reads()
+            self.database.record_world_play_start("session-1", self.world_id, None)
+
+        self.assertEqual(execute.call_count, 1)
+        stats = self.database.world_cache.stats()
+        # Only the cold replay's generator read and bundle missed.
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["hits"], 4)
+
+    def test_hits_hand_out_independent_copies(self):
+        first = self.database.get_generator_world(self.world_id, WORLD_SNAPSHOT_VERSION)
+        first["tile_info_by_language"]["en"][0]["label"] = "Dry Street"
+
+        second = self.database.get_generator_world(self.world_id, WORLD_SNAPSHOT_VERSION)
+
+        self.assertEqual(second["tile_info_by_language"]["en"][0]["label"], "Wet Street")
+
+    def test_writers_invalidate_the_world(self):
+        self.replay_reads()
+
+        self.database.update_generator_visibility(self.world_id, "private")
+        self.database.save_generator_translation(
+            self.world_id, "it", "Città asciutta", [], [], [], [],
+        )
+        self.database.save_generator_world(
+            generator_id=self.world_id,
+            language="en",
+            map_csv="street",
+            entity_placements=[],
+            tile_info_by_language={},
+            snapshot_version=WORLD_SNAPSHOT_VERSION,
+        )
+
+        self.assertEqual(self.database.get_generator(self.world_id)["visibility"], "private")
+        self.assertEqual(
+            self.database.get_generator_translation(self.world_id, "it")["theme_desc_better"],
+            "Città asciutta",
+        )
+        self.assertEqual(
+            self.database.get_generator_world(self.world_id, WORLD_SNAPSHOT_VERSION)["map_csv"],
+            "street",
+        )
+        bundle = self.replay_reads()
+        self.assertEqual(bundle["definitions"]["theme_desc_better"], "Città asciutta")
+        self.assertEqual(bundle["snapshot"]["map_csv"], "street")
+
+    def test_deleting_the_owner_drops_their_private_worlds(self):
+        user = self.database.create_user("owner", "Secret123!")
+        world_id = self.database.save_generator(
+            "Mine", "Mine", "en", [], [], [], [], owner_id=user["id"], visibility="private",
+        )
+        self.assertIsNotNone(self.database.get_generator(world_id))
+
+        self.database.delete_user_account(user["id"])
+
+        self.assertIsNone(self.database.get_generator(world_id))
+
+
+class WorldBundleTests(unittest.TestCase):
+    setUp = WorldCacheTests.setUp
+    tearDown = WorldCacheTests.tearDown
+
+    def test_bundle_merges_the_translation_over_the_world(self):
+        queries = patch.object(self.database, "_execute", wraps=self.database._execute)
+
+        with queries as execute:
+            bundle = self.database.load_world_bundle(self.world_id, "it", WORLD_SNAPSHOT_VERSION)
+
+        self.assertEqual(execute.call_count, 1)
+        self.assertTrue(bundle["translated"])
+        self.assertEqual(bundle["source_language"], "en")
+        definitions = bundle["definitions"]
+        self.assertEqual(definitions["language"], "it")
+        self.assertEqual(definitions["theme_desc"], "A wet city")
+        self.assertEqual(definitions["theme_desc_better"], "Città bagnata")
+        self.assertEqual(definitions["player_defs"], [{"name": "Corridore"}])
+        self.assertEqual(definitions["visibility"], "public")
+        self.assertEqual(
+            bundle["snapshot"],
+            self.database.get_generator_world(self.world_id, WORLD_SNAPSHOT_VERSION),
+        )
+
+    def test_bundle_without_a_translation_carries_the_source(self):
+        bundle = self.database.load_world_bundle(self.world_id, "ja", WORLD_SNAPSHOT_VERSION)
+
+        self.assertFalse(bundle["translated"])
+        self.assertEqual(bundle["definitions"], self.database.get_generator(self.world_id))
+
+    def test_bundle_in_the_source_language_ignores_translations(self):
+        self.database.save_generator_translation(
+            self.world_id, "en", "Stale", [], [], [], [],
+        )
+
+        bundle = self.database.load_world_bundle(self.world_id, "en", WORLD_SNAPSHOT_VERSION)
+
+        self.assertFalse(bundle["translated"])
+        self.assertEqual(bundle["definitions"]["theme_desc_better"], "Wet City")
+
+    def test_bundle_versions_must_match(self):
+        bundle = self.database.load_world_bundle(
+            self.world_id, "it", WORLD_SNAPSHOT_VERSION + 1, translation_version=2
+        )
+
+        self.assertFalse(bundle["translated"])
+        self.assertIsNone(bundle["snapshot"])
+        self.assertIsNone(self.database.load_world_bundle("absent", "it", WORLD_SNAPSHOT_VERSION))
+
+
+class WorldCacheBudgetTests(unittest.TestCase):
+    def test_least_recently_used_entries_are_evicted_over_budget(self):
+        cache = WorldCache(max_bytes=750)
+        for name in ("a", "b", "c"):
+            cache.read_through((name, None, None), lambda: {"text": "x" * 200})
+        cache.read_through(("a", None, None), lambda: None)
+        cache.read_through(("d", None, None), lambda: {"text": "x" * 200})
+
+        stats = cache.stats()
+        self.assertLessEqual(stats["bytes"], 750)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertEqual(cache.read_through(("a", None, None), lambda: None), {"text": "x" * 200})
+        self.assertIsNone(cache.read_through(("b", None, None), lambda: None))
+
+    def test_entries_larger_than_the_budget_are_not_cached(self):
+        cache = WorldCache(max_bytes=100)
+
+        cache.read_through(("a", None, None), lambda: {"text": "x" * 200})
+
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_a_fill_that_raced_a_write_is_not_cached(self):
+        cache = WorldCache(max_bytes=10_000)
+
+        def load_while_written():
+            cache.invalidate(["a"])
+            return {"visibility": "public"}
+
+        self.assertEqual(
+            cache.read_through(("a", None, None), load_while_written), {"visibility": "public"}
+        )
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -202,6 +202,196 @@ class WorldListingTests(unittest.TestCase):
         self.assertEqual(worlds[0]["id"], "oldworld")
         self.assertEqual(worlds[0]["created_at"], None)
 
+    def test_listing_queries_reuse_the_schema_read_at_init(self):
+        with tempfile.TemporaryDirectory() as directory:
+            manager = self.make_db(directory)
+            user = manager.create_user("owner", VALID_TEST_PASSWORD)
+
+            with patch("db.SchemaCapabilities.read") as read:
+                for _ in range(3):
+                    manager.list_worlds()
+                    manager.list_worlds(owner_id=user["id"])
+                    manager.get_user_world_stats(user["id"])
+                    manager.list_users_with_world_counts()
+
+            read.assert_not_called()
+            cached = manager._schema._sql_cache
+            self.assertIn(("world_summaries", "public", False), cached)
+            self.assertIn(("world_summaries", "owner", False), cached)
+            self.assertIn("user_world_stats", cached)
+            self.assertIn(("users_with_world_counts", True), cached)
+            manager.shutdown()
+
+    def test_world_summaries_follow_every_writer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            manager = self.make_db(directory)
+            owner = manager.create_user("owner", VALID_TEST_PASSWORD)
+            world_id = manager.save_generator(
+                theme_desc="A drowned observatory",
+                theme_desc_better="Drowned Observatory\nSecond line",
+                language="en",
+                player_defs=[{"name": "Diver"}],
+                item_defs=[{"name": "Lamp"}, {"name": "Rope"}],
+                enemy_defs=[],
+                celltype_defs={"floor": {}},
+                owner_id=owner["id"],
+                visibility="public",
+            )
+
+            manager.update_generator_definitions(
+                world_id,
+                player_defs=[{"name": "Diver"}, {"name": "Astronomer"}],
+            )
+            manager.save_generator_visual_manifest(
+                world_id,
+                {"style": "ink", "cover_url": "/assets/worlds/cover.webp"},
+            )
+            [listed] = manager.list_worlds(owner_id=owner["id"])
+
+            self.assertEqual(listed["title"], "Drowned Observatory")
+            self.assertEqual(listed["player_count"], 2)
+            self.assertEqual(listed["item_count"], 2)
+            self.assertEqual(listed["terrain_count"], 1)
+            self.assertEqual(listed["cover_url"], "/assets/worlds/cover.webp")
+
+            manager.set_generator_non_public_visibility(world_id, "private")
+            self.assertEqual(manager.list_worlds(), [])
+            self.assertEqual(
+                manager.list_worlds(owner_id=owner["id"])[0]["visibility"], "private"
+            )
+
+            manager.delete_user_account(owner["id"])
+            with manager.get_connection() as conn:
+                remaining = conn.execute("SELECT COUNT(*) FROM world_summaries").fetchone()[0]
+            self.assertEqual(remaining, 0)
+            manager.shutdown()
+
+    def test_listing_does_not_decode_world_definitions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            manager = self.make_db(directory)
+            manager.save_generator(
+                theme_desc="Glass dunes",
+                theme_desc_better="Glass Dunes",
+                language="en",
+                player_defs=[{"name": "Nomad"}],
+                item_defs=[],
+                enemy_defs=[],
+                celltype_defs={},
+                visibility="public",
+            )
+
+            with patch.object(DatabaseManager, "_json_list_size", side_effect=AssertionError), \
+                    patch.object(DatabaseManager, "_cover_url_from_manifest", side_effect=AssertionError):
+                worlds = manager.list_worlds()
+
+            self.assertEqual(worlds[0]["player_count"], 1)
+            manager.shutdown()
+
+    def test_rebuild_builds_summaries_for_worlds_written_outside_the_manager(self):
+        with tempfile.TemporaryDirectory() as directory:
+            manager = self.make_db(directory)
+            with manager.get_connection() as conn:
+                conn.execute("""
+                    INSERT INTO generators
+                    (id, theme_desc, theme_desc_better, language, player_defs,
+                     item_defs, enemy_defs, celltype_defs, visibility)
+                    VALUES ('rawworld', 'Raw', 'Raw World', 'en', '[]', '[]', '[]', '{}', 'public')
+                """)
+                conn.commit()
+            self.assertEqual(manager.list_worlds(), [])
+
+            manager.rebuild_world_summaries()
+
+            self.assertEqual([w["id"] for w in manager.list_worlds()], ["rawworld"])
+            manager.shutdown()
+
+    def test_public_gallery_reads_the_summary_index_in_order(self):
+        with tempfile.TemporaryDirectory() as directory:
+            manager = self.make_db(directory)
+            sql = manager._world_summaries_sql("public")
+            with manager.get_connection() as conn:
+                plan = " ".join(
+                    row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", (20,))
+                )
+            manager.shutdown()
+
+        self.assertIn("idx_world_summaries_visibility_sort", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_world_pages_walk_the_whole_gallery_without_overlap(self):
+        with tempfile.TemporaryDirectory() as directory:
+            manager = self.make_db(directory)
+            for index in range(7):
+                manager.save_generator(
+                    theme_desc=f"World {index}",
+                    theme_desc_better=f"World {index}",
+                    language="en",
+                    player_defs=[],
+                    item_defs=[],
+                    enemy_defs=[],
+                    celltype_defs={},
+                    visibility="public",
+                )
+
+            pages = []
+            cursor = None
+            while True:
+                page = manager.list_worlds_page(limit=3, cursor=cursor)
+                pages.append([world["id"] for world in page["worlds"]])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            everything = [world["id"] for world in manager.list_worlds(limit=50)]
+            manager.shutdown()
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([world_id for page in pages for world_id in page], everything)
+
+    def test_world_page_cursor_round_trips_and_rejects_tampering(self):
+        cursor = DatabaseManager.encode_world_cursor("2026-01-02 03:04:05", "abc123")
+
+        self.assertEqual(
+            DatabaseManager.decode_world_cursor(cursor),
+            ("2026-01-02 03:04:05", "abc123"),
+        )
+        for bad in ("not-a-cursor", "W10", cursor[:-3]):
+            with self.subTest(bad=bad), self.assertRaises(ValueError):
+                DatabaseManager.decode_world_cursor(bad)
+
+    def test_later_world_pages_use_an_index_range_scan(self):
+        with tempfile.TemporaryDirectory() as directory:
+            manager = self.make_db(directory)
+            plans = {}
+            with manager.get_connection() as conn:
+                for scope, params in (("public", ()), ("owner", ("owner",))):
+                    sql = manager._world_summaries_sql(scope, keyset=True)
+                    plans[scope] = " ".join(
+                        row[3]
+                        for row in conn.execute(
+                            f"EXPLAIN QUERY PLAN {sql}", params + ("x", "y", 20)
+                        )
+                    )
+            manager.shutdown()
+
+        self.assertIn("idx_world_summaries_visibility_sort", plans["public"])
+        self.assertIn("idx_world_summaries_owner_sort", plans["owner"])
+        for plan in plans.values():
+            self.assertIn("(sort_key,generator_id)<(?,?)", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_schema_is_read_again_after_the_database_is_replaced(self):
+        with tempfile.TemporaryDirectory() as directory:
+            manager = self.make_db(directory)
+            self.assertTrue(manager._schema.has_column("generators", "owner_id"))
+            os.remove(manager.db_path)
+            with manager.get_connection() as conn:
+                conn.execute("CREATE TABLE generators (id TEXT PRIMARY KEY, theme_desc TEXT)")
+                conn.commit()
+
+            self.assertEqual(manager.get_user_world_stats("anyone")["total_worlds"], 0)
+            self.assertFalse(manager._schema.has_column("generators", "owner_id"))
+            manager.shutdown()
+
     def test_init_db_backfills_world_ownership_columns_on_existing_generators(self):
         with tempfile.TemporaryDirectory() as directory:
             with patch.dict(os.environ, {
@@ -243,6 +433,7 @@ class WorldListingTests(unittest.TestCase):
                 conn.commit()
 
             manager.init_db()
+            manager.run_backfills()
 
             with manager.get_connection() as conn:
                 columns = {
@@ -715,6 +906,82 @@ class WorldApiTests(unittest.TestCase):
             self.assertFalse(worlds[0]["can_manage"])
             self.assertNotIn("owner_id", worlds[0])
 
+    def test_recent_worlds_pages_with_a_cursor(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = self.make_db(tmpdir)
+            world_ids = {
+                manager.save_generator(
+                    theme_desc=f"Arena {index}",
+                    theme_desc_better=f"Arena {index}",
+                    language="en",
+                    player_defs=[],
+                    item_defs=[],
+                    enemy_defs=[],
+                    celltype_defs={},
+                    owner_id=None,
+                    visibility="public"
+                )
+                for index in range(3)
+            }
+
+            with patch.dict(os.environ, {"ENABLE_WORLD_LIBRARY": ""}), \
+                    patch.object(main, 'db', manager):
+                client = TestClient(main.app)
+                first = client.get("/api/worlds/recent?limit=2").json()
+                second = client.get(
+                    "/api/worlds/recent",
+                    params={"limit": 2, "cursor": first["next_cursor"]},
+                ).json()
+                invalid = client.get("/api/worlds/recent?cursor=garbage")
+
+            self.assertEqual(len(first["worlds"]), 2)
+            self.assertEqual(len(second["worlds"]), 1)
+            self.assertIsNone(second["next_cursor"])
+            self.assertEqual(
+                {world["id"] for world in first["worlds"] + second["worlds"]},
+                world_ids,
+            )
+            self.assertEqual(invalid.status_code, 400)
+
+    def test_world_search_returns_public_matches(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = self.make_db(tmpdir)
+            public_id = manager.save_generator(
+                theme_desc="Floating islands",
+                theme_desc_better="Sky Archipelago",
+                language="en",
+                player_defs=[],
+                item_defs=[],
+                enemy_defs=[],
+                celltype_defs={},
+                owner_id=None,
+                visibility="public"
+            )
+            manager.save_generator(
+                theme_desc="Floating islands, unlisted",
+                theme_desc_better="Hidden Archipelago",
+                language="en",
+                player_defs=[],
+                item_defs=[],
+                enemy_defs=[],
+                celltype_defs={},
+                owner_id=None,
+                visibility="unlisted"
+            )
+
+            with patch.dict(os.environ, {"ENABLE_WORLD_LIBRARY": ""}), \
+                    patch.object(main, 'db', manager):
+                client = TestClient(main.app)
+                response = client.get("/api/worlds/search", params={"q": "archipelago"})
+                missing = client.get("/api/worlds/search?q=%20")
+
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertEqual([world["id"] for world in data["worlds"]], [public_id])
+            self.assertIsNone(data["next_cursor"])
+            self.assertNotIn("owner_id", data["worlds"][0])
+            self.assertEqual(missing.status_code, 400)
+
     def test_create_game_session_fails_for_private_world(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             manager = self.make_db(tmpdir)
@@ -1241,12 +1508,15 @@ class WorldApiTests(unittest.TestCase):
             "debug_seed": None,
         }
 
-        with patch.dict(os.environ, {"REQUIRE_LOGIN_TO_CREATE_WORLD": "1"}), \
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                patch.object(main, "db", self.make_db(tmpdir)), \
+                patch.dict(os.environ, {"REQUIRE_LOGIN_TO_CREATE_WORLD": "1"}), \
                 patch("main.Game.create", new_callable=AsyncMock) as create_game:
             client = TestClient(main.app)
             with client.websocket_connect(f"/ws/game/{session_id}") as websocket:
                 self.assertEqual(websocket.receive_json()["status"], "creating")
                 error = websocket.receive_json()
+            main.db.shutdown()
 
         self.assertEqual(error["type"], "error")
         self.assertEqual(error["message"], main.LOGIN_REQUIRED_TO_CREATE_WORLD_MESSAGE)
@@ -1819,6 +2089,56 @@ class AdminTests(unittest.TestCase):
         self.assertTrue(users["bob"]["password_reset_required"])
         self.assertIsNotNone(users["bob"]["password_reset_marked_at"])
 
+    def test_admin_can_read_database_query_timings(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = self.make_db(tmpdir)
+            manager.create_user("admin", VALID_TEST_PASSWORD)
+            manager.create_user("player", VALID_TEST_PASSWORD)
+
+            with patch.object(main, 'db', manager), patch.dict(os.environ, {
+                "ADMIN_USERNAMES": "admin",
+                "ADMIN_USERNAME": "",
+            }):
+                player = TestClient(main.app)
+                player.post("/api/login", json={
+                    "username": "player",
+                    "password": VALID_TEST_PASSWORD,
+                })
+                denied = player.get("/api/admin/db/queries")
+
+                client = TestClient(main.app)
+                client.post("/api/login", json={
+                    "username": "admin",
+                    "password": VALID_TEST_PASSWORD,
+                })
+                client.get("/api/admin/users")
+                response = client.get("/api/admin/db/queries")
+                after_read = client.get("/api/admin/db/queries")
+                denied_reset = player.post("/api/admin/db/queries/reset")
+                reset = client.post("/api/admin/db/queries/reset")
+                after_reset = client.get("/api/admin/db/queries")
+
+        self.assertEqual(denied.status_code, 404)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        operations = {row["name"]: row for row in data["operations"]}
+        self.assertGreaterEqual(operations["list_users_with_world_counts"]["calls"], 1)
+        self.assertIn("slow", data)
+        self.assertIn("jobs", data["writer"])
+        self.assertIn("jobs", data["accounts_writer"])
+        # Reading leaves the window alone; only the POST starts a new one.
+        self.assertIn("list_users_with_world_counts", {
+            row["name"] for row in after_read.json()["operations"]
+        })
+        self.assertEqual(denied_reset.status_code, 404)
+        self.assertEqual(reset.status_code, 200)
+        self.assertIn("list_users_with_world_counts", {
+            row["name"] for row in reset.json()["operations"]
+        })
+        self.assertNotIn("list_users_with_world_counts", {
+            row["name"] for row in after_reset.json()["operations"]
+        })
+
     def test_admin_can_toggle_password_reset_required(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             manager = self.make_db(tmpdir)
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from db import DatabaseManager
+
+
+STORAGE_DISABLED = {
+    "DO_STORAGE_SERVER": "",
+    "DO_SPACES_ACCESS_KEY": "",
+    "DO_SPACES_SECRET_KEY": "",
+    "DO_STORAGE_CONTAINER": "",
+}
+
+
+class WorldSearchTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with patch.dict(os.environ, STORAGE_DISABLED):
+            self.database = DatabaseManager()
+        self.database.db_path = os.path.join(self.directory.name, "search.db")
+        self.database.init_db()
+
+    def tearDown(self):
+        self.database.shutdown()
+        self.directory.cleanup()
+
+    def save(self, title, theme="", visibility="public", owner_id=None, language="en"):
+        return self.database.save_generator(
+            theme_desc=theme,
+            theme_desc_better=title,
+            language=language,
+            player_defs=[],
+            item_defs=[],
+            enemy_defs=[],
+            celltype_defs={},
+            owner_id=owner_id,
+            visibility=visibility,
+        )
+
+    def search(self, query, **kwargs):
+        return [world["id"] for world in self.database.search_worlds_page(query, **kwargs)["worlds"]]
+
+    def test_title_matches_rank_above_theme_matches(self):
+        in_theme = self.save("Harbor Town", theme="A lighthouse keeper's lonely harbor")
+        in_title = self.save("The Lighthouse", theme="Waves and fog")
+        self.save("Desert Road", theme="Sand")
+
+        self.assertEqual(self.search("lighthouse"), [in_title, in_theme])
+
+    def test_english_is_stemmed_and_the_last_word_is_a_prefix(self):
+        world_id = self.save("Haunted Libraries")
+
+        self.assertEqual(self.search("library"), [world_id])
+        self.assertEqual(self.search("haun"), [world_id])
+
+    def test_search_follows_listing_visibility(self):
+        public_id = self.save("Sunken Temple")
+        unlisted_id = self.save("Sunken Garden", visibility="unlisted")
+        self.save("Sunken Vault", visibility="private", owner_id="owner-1")
+
+        self.assertEqual(self.search("sunken"), [public_id])
+        self.assertEqual(set(self.search("sunken", local_dev=True)), {public_id, unlisted_id})
+
+        self.database.update_generator_visibility(public_id, "unlisted")
+
+        self.assertEqual(self.search("sunken"), [])
+
+    def test_translations_are_searchable_in_their_own_language(self):
+        world_id = self.save("Clockwork Library")
+        self.database.save_generator_translation(
+            world_id, "ja", "時計仕掛けの図書館", [], [], [], {},
+        )
+        self.database.save_generator_translation(
+            world_id, "it", "Biblioteca a orologeria", [], [], [], {},
+        )
+
+        self.assertEqual(self.search("図書館"), [world_id])
+        self.assertEqual(self.search("仕掛けの"), [world_id])
+        self.assertEqual(self.search("図書"), [])  # Shorter than a trigram.
+        self.assertEqual(self.search("biblioteca"), [world_id])
+
+    def test_pages_walk_every_match_without_overlap(self):
+        world_ids = {self.save(f"Crystal Cave {index}") for index in range(5)}
+
+        seen, cursor = [], None
+        while True:
+            page = self.database.search_worlds_page("crystal", limit=2, cursor=cursor)
+            seen.extend(world["id"] for world in page["worlds"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(set(seen), world_ids)
+
+    def test_query_syntax_is_not_interpreted(self):
+        world_id = self.save("Moon Base")
+
+        self.assertEqual(self.search('"moon" (base*'), [world_id])
+        self.assertEqual(self.search("!!!"), [])
+        with self.assertRaises(ValueError):
+            self.database.search_worlds_page("moon", cursor="garbage")
+
+    def test_deleted_worlds_leave_the_index(self):
+        user = self.database.create_user("owner", "Secret123!")
+        self.save("Private Observatory", visibility="private", owner_id=user["id"])
+
+        self.database.delete_user_account(user["id"])
+
+        with self.database.get_connection(readonly=True) as conn:
+            rows = conn.execute(
+                "SELECT COUNT(*) FROM world_search WHERE world_search MATCH 'observatory'"
+            ).fetchone()[0] + conn.execute(
+                "SELECT COUNT(*) FROM world_search_en WHERE world_search_en MATCH 'observatory'"
+            ).fetchone()[0]
+            docs = conn.execute("SELECT COUNT(*) FROM world_search_docs").fetchone()[0]
+        self.assertEqual((rows, docs), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import json
 import os
 import random
 import tempfile
@@ -5,7 +6,7 @@ import unittest
 from types import SimpleNamespace
 from unittest.mock import patch
 
-from db import DatabaseManager
+from db import COMPRESSED_JSON_MARKER, DatabaseManager
 from game_state_manager import GameStateManager, WORLD_SNAPSHOT_VERSION
 from world_moderation import build_world_review_payload, collect_baked_prose
 
@@ -197,6 +198,95 @@ class WorldSnapshotStorageTests(unittest.TestCase):
         self.assertIsNotNone(snapshot)
         self.assertEqual(snapshot["map_csv"], "street,market")
 
+    def long_tile_info(self, languages=("en", "it")):
+        return {
+            language: [
+                {"x": x, "y": 0, "label": f"Street {x}", "quick_desc": f"{language}: a wet street " * 8}
+                for x in range(10)
+            ]
+            for language in languages
+        }
+
+    def test_large_json_columns_are_stored_compressed(self):
+        tile_info = self.long_tile_info()
+        with tempfile.TemporaryDirectory() as directory:
+            db = self.make_db(directory)
+            db.save_generator_world(
+                generator_id="world-1",
+                language="en",
+                map_csv="street",
+                entity_placements=[{"type": "enemy", "entity_id": "punk", "x": 0, "y": 0}],
+                tile_info_by_language=tile_info,
+                snapshot_version=WORLD_SNAPSHOT_VERSION,
+            )
+            with db.get_connection() as conn:
+                stored_tiles, stored_placements = conn.execute(
+                    "SELECT tile_info, entity_placements FROM generator_worlds"
+                ).fetchone()
+
+            snapshot = db.get_generator_world("world-1", WORLD_SNAPSHOT_VERSION)
+
+        self.assertIsInstance(stored_tiles, bytes)
+        self.assertEqual(stored_tiles[:1], COMPRESSED_JSON_MARKER)
+        self.assertLess(len(stored_tiles), len(json.dumps(tile_info)))
+        # Small values stay readable text.
+        self.assertIsInstance(stored_placements, str)
+        self.assertEqual(snapshot["tile_info_by_language"], tile_info)
+        self.assertEqual(snapshot["entity_placements"][0]["entity_id"], "punk")
+
+    def test_plain_rows_written_before_compression_still_read(self):
+        tile_info = self.long_tile_info()
+        players = [{"name": "Runner", "description": "Fast " * 200}]
+        with tempfile.TemporaryDirectory() as directory:
+            db = self.make_db(directory)
+            with db.get_connection() as conn:
+                conn.execute("""
+                    INSERT INTO generators (id, theme_desc, theme_desc_better, language,
+                        player_defs, item_defs, enemy_defs, celltype_defs)
+                    VALUES ('world-1', 'A wet city', 'Wet City', 'en', ?, '[]', '[]', '[]')
+                """, (json.dumps(players),))
+                conn.execute("""
+                    INSERT INTO generator_worlds (generator_id, snapshot_version, language,
+                        map_csv, entity_placements, tile_info, regions)
+                    VALUES ('world-1', ?, 'en', 'street', '[]', ?, '{}')
+                """, (WORLD_SNAPSHOT_VERSION, json.dumps(tile_info)))
+                conn.commit()
+
+            generator = db.get_generator("world-1")
+            snapshot = db.get_generator_world("world-1", WORLD_SNAPSHOT_VERSION)
+
+        self.assertEqual(generator["player_defs"], players)
+        self.assertEqual(snapshot["tile_info_by_language"], tile_info)
+
+    def test_sweep_compresses_old_rows_without_touching_updated_at(self):
+        tile_info = self.long_tile_info()
+        with tempfile.TemporaryDirectory() as directory:
+            db = self.make_db(directory)
+            with db.get_connection() as conn:
+                for index in range(3):
+                    conn.execute("""
+                        INSERT INTO generator_worlds (generator_id, snapshot_version, language,
+                            map_csv, entity_placements, tile_info, regions, updated_at)
+                        VALUES (?, ?, 'en', 'street', '[]', ?, '{}', '2020-01-01 00:00:00')
+                    """, (f"world-{index}", WORLD_SNAPSHOT_VERSION, json.dumps(tile_info)))
+                conn.commit()
+
+            counts = db.compress_json_columns(batch_size=2)
+            again = db.compress_json_columns(batch_size=2)
+            with db.get_connection() as conn:
+                rows = conn.execute(
+                    "SELECT typeof(tile_info), typeof(entity_placements), updated_at "
+                    "FROM generator_worlds"
+                ).fetchall()
+            snapshot = db.get_generator_world("world-2", WORLD_SNAPSHOT_VERSION)
+
+        self.assertEqual(counts["generator_worlds"], 3)
+        self.assertEqual(again["generator_worlds"], 0)
+        self.assertEqual(
+            rows, [("blob", "text", "2020-01-01 00:00:00")] * 3
+        )
+        self.assertEqual(snapshot["tile_info_by_language"], tile_info)
+
 
 class MapSerializationTests(unittest.TestCase):
     def test_map_csv_round_trips_through_cell_ids(self):
@@ -305,7 +395,7 @@ class SnapshotReuseTests(unittest.IsolatedAsyncioTestCase):
 
             manager = make_manager(language="ja")
             with patch("game_state_manager.db", database):
-                snapshot = manager._load_world_snapshot()
+                snapshot = await manager._load_world_snapshot()
 
         self.assertIsNotNone(snapshot)
         # Map and placements are language-independent and reused.
@@ -316,6 +406,24 @@ class SnapshotReuseTests(unittest.IsolatedAsyncioTestCase):
         # The English prose is retained so saving Japanese will not clobber it.
         self.assertIn("en", manager._snapshot_tile_info_by_language)
 
+    async def test_snapshot_from_the_world_bundle_is_not_read_again(self):
+        manager = make_manager()
+        manager._preloaded_snapshot = ({
+            "language": "en",
+            "map_csv": "street,market,street\nmarket,street,market",
+            "entity_placements": [],
+            "tile_info_by_language": {"en": [{"x": 0, "y": 0, "label": "Wet Street"}]},
+            "regions_by_language": {},
+        },)
+
+        with patch("game_state_manager.db.get_generator_world") as get_world:
+            snapshot = await manager._load_world_snapshot()
+            await manager._load_world_snapshot()
+
+        self.assertEqual(snapshot["tile_info"][0]["label"], "Wet Street")
+        # Only a later load, after the run may have saved, goes to the database.
+        get_world.assert_called_once_with("world-1", WORLD_SNAPSHOT_VERSION)
+
 
 class OpeningLineTests(unittest.TestCase):
     """The opening line was the last per-run model call: initialize_game
@@ -0,0 +1,147 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from db import DatabaseManager
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+TRANSFER_SCRIPT = REPO_ROOT / "tools" / "world_transfer.py"
+STORAGE_DISABLED = {
+    "DO_STORAGE_SERVER": "",
+    "DO_SPACES_ACCESS_KEY": "",
+    "DO_SPACES_SECRET_KEY": "",
+    "DO_STORAGE_CONTAINER": "",
+}
+LARGE_DEFS = [{"id": f"hero-{index}", "name": "Wanderer " * 20} for index in range(10)]
+
+
+class WorldTransferTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+        self.source = self.make_db("source.db")
+        self.owner = self.source.create_user("owner", "Secret123!")
+
+    def tearDown(self):
+        self.source.shutdown()
+        self.directory.cleanup()
+
+    def make_db(self, name):
+        with patch.dict(os.environ, STORAGE_DISABLED):
+            database = DatabaseManager()
+        database.db_path = str(self.root / name)
+        database.init_db()
+        return database
+
+    def save(self, title, visibility="public"):
+        world_id = self.source.save_generator(
+            f"A theme for {title}", title, "en", LARGE_DEFS, [], [], {},
+            owner_id=self.owner["id"], visibility=visibility,
+        )
+        return world_id
+
+    def run_tool(self, database, *args):
+        self.source.shutdown()
+        result = subprocess.run(
+            [sys.executable, str(TRANSFER_SCRIPT), "--db-path", database, *map(str, args)],
+            check=False,
+            capture_output=True,
+            text=True,
+            env={**os.environ, **STORAGE_DISABLED, "WORLD_ASSETS_DIR": str(self.root / "assets")},
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result
+
+    def test_records_round_trip_with_everything_a_world_needs(self):
+        world_id = self.save("Lighthouse")
+        self.source.save_generator_translation(world_id, "ja", "灯台の町", LARGE_DEFS, [], [], {})
+        self.source.save_generator_world(world_id, "en", "1,1", [{"entity": "hero"}],
+                                         {"en": [{"text": "Fog " * 200}]})
+        self.source.record_world_play_start("session-1", world_id, None)
+        self.save("Hidden", visibility="private")
+
+        records = list(self.source.export_worlds(["public", "unlisted"], batch_size=1))
+        target = self.make_db("target.db")
+        try:
+            self.assertEqual(target.import_worlds(json.loads(json.dumps(records))), 1)
+
+            self.assertEqual([record["id"] for record in records], [world_id])
+            imported = target.get_generator(world_id)
+            original = self.source.get_generator(world_id)
+            self.assertIsNone(imported.pop("owner_id"))
+            original.pop("owner_id")
+            self.assertEqual(imported, original)
+            self.assertEqual(target.get_generator_world(world_id),
+                             self.source.get_generator_world(world_id))
+            self.assertEqual(target.get_generator_translation(world_id, "ja"),
+                             self.source.get_generator_translation(world_id, "ja"))
+            self.assertEqual(target.get_world_metrics(world_id)["play_count"], 1)
+            self.assertEqual([world["id"] for world in target.list_worlds()], [world_id])
+            self.assertEqual(
+                [world["id"] for world in target.search_worlds_page("lighthouse")["worlds"]],
+                [world_id],
+            )
+        finally:
+            target.shutdown()
+
+    def test_reimporting_updates_in_place(self):
+        world_id = self.save("Harbor")
+        records = list(self.source.export_worlds())
+        target = self.make_db("target.db")
+        try:
+            target.import_worlds(records)
+            records[0]["generators"]["visibility"] = "unlisted"
+            target.import_worlds(records)
+
+            self.assertEqual(target.get_generator(world_id)["visibility"], "unlisted")
+            self.assertEqual(target.list_worlds(), [])
+        finally:
+            target.shutdown()
+
+    def test_tool_resumes_an_interrupted_export_and_import(self):
+        world_ids = sorted(self.save(f"World {index}") for index in range(5))
+        asset = self.root / "assets" / world_ids[-1] / "cover.webp"
+        asset.parent.mkdir(parents=True)
+        asset.write_bytes(b"RIFF-cover")
+        export_path = self.root / "worlds.ndjson"
+
+        self.run_tool(self.source.db_path, "export", export_path, "--with-assets")
+        lines = export_path.read_bytes().splitlines(keepends=True)
+        # Cut off mid-way through the fourth World.
+        export_path.write_bytes(b"".join(lines[:4]) + lines[4][:20])
+        self.run_tool(self.source.db_path, "export", export_path, "--with-assets", "--resume")
+
+        exported = [json.loads(line) for line in export_path.read_text().splitlines()]
+        self.assertEqual(exported[0]["count"], 5)
+        self.assertEqual([line["id"] for line in exported[1:]], world_ids)
+        self.assertEqual(exported[-1]["assets"][0]["path"], f"{world_ids[-1]}/cover.webp")
+        self.assertEqual(exported[1]["assets"], [])
+
+        # Pretend an import committed the first three Worlds before stopping.
+        Path(str(export_path) + ".progress").write_text(json.dumps({"imported": 3}))
+        target_path = self.root / "target.db"
+        source_assets = self.root / "source-assets"
+        (self.root / "assets").rename(source_assets)
+        self.run_tool(target_path, "import", export_path, "--resume", "--batch-size", "1",
+                      "--assets-from", source_assets)
+
+        target = self.make_db("target.db")
+        try:
+            self.assertEqual(
+                sorted(world["id"] for world in target.list_worlds(limit=10)), world_ids[3:]
+            )
+        finally:
+            target.shutdown()
+        self.assertFalse(Path(str(export_path) + ".progress").exists())
+        self.assertEqual((self.root / "assets" / world_ids[-1] / "cover.webp").read_bytes(),
+                         b"RIFF-cover")
+
+
+if __name__ == "__main__":
+    unittest.main()
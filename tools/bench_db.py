@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""Measure DatabaseManager throughput under concurrent load.
+
+Seeds a throwaway database with Worlds and funded users, then hammers the
+hot paths from several threads at once:
+
+  list_worlds     the gallery query behind /api/worlds/recent
+  get_generator   the per-run World load
+  spend_credits   a BEGIN IMMEDIATE write on the credit ledger
+  mixed           readers and a spender running side by side, which is where
+                  readers used to queue behind the write lock
+  starts:sync     spenders alongside --play-starts connects per second, each
+                  recording its play start in its own transaction
+  starts:queued   the same, with play starts going through the write-behind
+                  queue that batches them into one transaction per pass
+  replay          the World reads that start a run in Italian on an English
+                  World with a saved snapshot: `separate` is get_generator,
+                  get_generator_translation and get_generator_world in turn,
+                  `bundle` is load_world_bundle; both with the World cache
+                  off, as on a cold World
+
+Each phase runs for a fixed wall-clock duration and reports ops/s and
+per-call latency percentiles, so numbers from two checkouts can be compared
+directly.
+
+Usage:
+    python tools/bench_db.py
+    python tools/bench_db.py --worlds 5000 --threads 16 --seconds 5
+"""
+
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import DatabaseManager, WORLD_SNAPSHOT_VERSION  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+
+
+def make_database(directory):
+    # Never touch the configured object storage from a benchmark.
+    with patch.dict(os.environ, {
+        "DO_STORAGE_SERVER": "",
+        "DO_SPACES_ACCESS_KEY": "",
+        "DO_SPACES_SECRET_KEY": "",
+        "DO_STORAGE_CONTAINER": "",
+    }):
+        database = DatabaseManager()
+    database.db_path = os.path.join(directory, "bench.db")
+    database.init_db()
+    return database
+
+
+def seed(database, world_count, user_count):
+    players = '[{"name": "Hero", "class": "Knight"}, {"name": "Rogue"}]'
+    items = '[{"name": "Sword"}, {"name": "Potion"}, {"name": "Key"}]'
+    enemies = '[{"name": "Goblin"}, {"name": "Wraith"}]'
+    celltypes = '{"floor": {}, "wall": {}, "water": {}}'
+    world_ids = [uuid.uuid4().hex[:8] for _ in range(world_count)]
+    user_ids = [str(uuid.uuid4()) for _ in range(user_count)]
+
+    with database.get_connection() as conn:
+        conn.executemany("""
+            INSERT INTO generators (
+                id, theme_desc, theme_desc_better, language, player_defs,
+                item_defs, enemy_defs, celltype_defs, owner_id, visibility,
+                updated_at
+            ) VALUES (?, ?, ?, 'en', ?, ?, ?, ?, ?, ?, datetime('now', ?))
+        """, [
+            (
+                world_id, f"World {index}", f"World {index}\nA generated place.",
+                players, items, enemies, celltypes,
+                user_ids[index % user_count],
+                "public" if index % 3 else "unlisted",
+                f"-{index} seconds",
+            )
+            for index, world_id in enumerate(world_ids)
+        ])
+        conn.commit()
+    with database.get_connection(database="accounts") as conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, password_hash) VALUES (?, ?, 'x')",
+            [(user_id, f"bench-{user_id[:8]}") for user_id in user_ids],
+        )
+        conn.executemany("""
+            INSERT INTO credit_ledger (id, operation_key, user_id, bucket, amount, kind)
+            VALUES (?, ?, ?, 'promo', 1000000, 'bench_grant')
+        """, [(str(uuid.uuid4()), f"bench:{user_id}", user_id) for user_id in user_ids])
+        conn.commit()
+
+    # Every World is replayable in Italian from a saved snapshot.
+    map_csv = "\n".join(",".join(random.choice(("floor", "wall", "water")) for _ in range(24))
+                         for _ in range(24))
+    placements = '[' + ", ".join(
+        f'{{"type": "enemy", "entity_id": "goblin", "x": {x}, "y": {x}}}' for x in range(24)
+    ) + ']'
+    tile_info = '{"en": [' + ", ".join(
+        f'{{"x": {x}, "y": 0, "label": "Hall {x}", "quick_desc": "A damp hall."}}' for x in range(24)
+    ) + ']}'
+    with database.get_connection() as conn:
+        conn.executemany("""
+            INSERT INTO generator_translations (
+                generator_id, language, theme_desc_better, player_defs,
+                item_defs, enemy_defs, celltype_defs, translation_version
+            ) VALUES (?, 'it', 'Mondo\nUn luogo generato.', ?, ?, ?, ?, 1)
+        """, [(world_id, players, items, enemies, celltypes) for world_id in world_ids])
+        conn.executemany("""
+            INSERT INTO generator_worlds (
+                generator_id, snapshot_version, language, map_csv,
+                entity_placements, tile_info
+            ) VALUES (?, ?, 'en', ?, ?, ?)
+        """, [(world_id, WORLD_SNAPSHOT_VERSION, map_csv, placements, tile_info)
+              for world_id in world_ids])
+        conn.commit()
+
+    # Rows inserted directly bypass the writers that maintain derived tables;
+    # rebuild them for anything out of date.
+    database.rebuild_world_summaries()
+    return world_ids, user_ids
+
+
+def run_phase(name, workers, seconds):
+    """Run each worker callable in a loop on its own thread for `seconds`.
+
+    A worker given as (label, operation, rate) is paced to `rate` calls per
+    second instead of running flat out; the wait is not counted as latency.
+    """
+    stop = threading.Event()
+    latencies = {}
+    errors = {}
+    lock = threading.Lock()
+
+    def loop(label, operation, rate=None):
+        samples = []
+        failures = 0
+        next_call = time.perf_counter()
+        while not stop.is_set():
+            if rate:
+                next_call += 1 / rate
+                delay = next_call - time.perf_counter()
+                if delay > 0:
+                    stop.wait(delay)
+            started = time.perf_counter()
+            try:
+                operation()
+            except Exception:
+                failures += 1
+                continue
+            samples.append(time.perf_counter() - started)
+        with lock:
+            latencies.setdefault(label, []).extend(samples)
+            errors[label] = errors.get(label, 0) + failures
+
+    threads = [
+        threading.Thread(target=loop, args=worker, daemon=True)
+        for worker in workers
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    for label, samples in sorted(latencies.items()):
+        report(f"{name}:{label}" if name != label else name, samples, errors[label], elapsed)
+
+
+def report(label, samples, failures, elapsed):
+    if not samples:
+        print(f"  {label:<28} no successful calls, {failures} errors")
+        return
+    samples.sort()
+    p50 = statistics.median(samples) * 1000
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+    print(
+        f"  {label:<28} {len(samples) / elapsed:>9.0f} ops/s"
+        f"   p50 {p50:>7.2f} ms   p95 {p95:>7.2f} ms   p99 {p99:>7.2f} ms"
+        f"   errors {failures}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--worlds", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--play-starts", type=float, default=2000,
+                        help="Offered play starts per second in the starts phases.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = make_database(directory)
+        world_ids, user_ids = seed(database, args.worlds, args.users)
+
+        def list_worlds():
+            database.list_worlds(limit=20)
+
+        def get_generator():
+            database.get_generator(random.choice(world_ids))
+
+        def replay_separate():
+            world_id = random.choice(world_ids)
+            database.get_generator(world_id)
+            database.get_generator_translation(world_id, "it")
+            database.get_generator_world(world_id, WORLD_SNAPSHOT_VERSION)
+
+        def replay_bundle():
+            database.load_world_bundle(random.choice(world_ids), "it", WORLD_SNAPSHOT_VERSION)
+
+        def spend_credits():
+            database.spend_credits(
+                random.choice(user_ids), 1, "bench_spend", str(uuid.uuid4())
+            )
+
+        def record_play_start():
+            database.record_world_play_start(
+                uuid.uuid4().hex, random.choice(world_ids), random.choice(user_ids)
+            )
+
+        def queue_play_start():
+            database.queue_world_play_start(
+                uuid.uuid4().hex, random.choice(world_ids), random.choice(user_ids)
+            )
+
+        print(
+            f"{args.worlds} worlds, {args.users} users, {args.threads} threads, "
+            f"{args.seconds:g}s per phase, SQLite {sqlite3.sqlite_version}"
+        )
+        for label, operation in (
+                ("list_worlds", list_worlds),
+                ("get_generator", get_generator),
+                ("spend_credits", spend_credits),
+        ):
+            run_phase(label, [(label, operation)] * args.threads, args.seconds)
+
+        readers = max(1, args.threads - 1)
+        run_phase("mixed", [
+            *[("list_worlds", list_worlds)] * (readers // 2 or 1),
+            *[("get_generator", get_generator)] * (readers - readers // 2 or 1),
+            ("spend_credits", spend_credits),
+        ], args.seconds)
+
+        spenders = max(1, args.threads // 2)
+        starters = max(1, args.threads - spenders)
+        for label, play_start in (("sync", record_play_start), ("queued", queue_play_start)):
+            run_phase(f"starts:{label}", [
+                *[("spend_credits", spend_credits)] * spenders,
+                *[("play_start", play_start, args.play_starts / starters)] * starters,
+            ], args.seconds)
+        cache_bytes, database.world_cache.max_bytes = database.world_cache.max_bytes, 0
+        database.world_cache.clear()
+        for label, replay in (("separate", replay_separate), ("bundle", replay_bundle)):
+            run_phase("replay", [(label, replay)] * args.threads, args.seconds)
+        database.world_cache.max_bytes = cache_bytes
+
+        database.play_starts.flush()
+        stats = database.play_starts.stats()
+        print(
+            f"  write-behind: {stats['batches']} batches, avg {stats['avg_batch_size']} "
+            f"starts (max {stats['max_batch_size']}), flush avg {stats['avg_flush_ms']} ms "
+            f"max {stats['max_flush_ms']} ms"
+        )
+
+        database.shutdown()
+
+
+if __name__ == "__main__":
+    main()
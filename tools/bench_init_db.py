@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Measure how long init_db holds up startup on a large database.
+
+Seeds a throwaway database with --worlds generators, their snapshots and
+gallery rows, then times:
+
+  upgrade   the first start after versioned migrations shipped: the schema
+            is current but PRAGMA user_version is still 0, so every migration
+            runs and the backfills are scheduled
+  backfill  the scheduled backfills, run to completion (in production these
+            run in the background after startup)
+  boot      a start on the up-to-date database, best of --repeat
+
+Usage:
+    python tools/bench_init_db.py
+    python tools/bench_init_db.py --worlds 20000 --repeat 10
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import DatabaseManager  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+
+
+def make_database(path):
+    with patch.dict(os.environ, {
+        "DO_STORAGE_SERVER": "",
+        "DO_SPACES_ACCESS_KEY": "",
+        "DO_SPACES_SECRET_KEY": "",
+        "DO_STORAGE_CONTAINER": "",
+    }):
+        database = DatabaseManager()
+    database.db_path = path
+    return database
+
+
+def seed(path, world_count):
+    database = make_database(path)
+    database.init_db()
+    defs = json.dumps([{"id": f"thing_{index}", "name": "Thing"} for index in range(8)])
+    with database.get_connection() as conn:
+        conn.execute("BEGIN")
+        for start in range(0, world_count, 10_000):
+            ids = [uuid.uuid4().hex[:8] + str(index) for index in range(start, min(start + 10_000, world_count))]
+            conn.executemany("""
+                INSERT INTO generators (
+                    id, theme_desc, theme_desc_better, language,
+                    player_defs, item_defs, enemy_defs, celltype_defs, visibility
+                ) VALUES (?, 'Bench theme', 'Bench World', 'en', ?, ?, ?, '{}', 'public')
+            """, [(world_id, defs, defs, defs) for world_id in ids])
+            conn.executemany("""
+                INSERT INTO generator_worlds (generator_id, language, map_csv, entity_placements, tile_info)
+                VALUES (?, 'en', 't0,t0', '[]', '{}')
+            """, [(world_id,) for world_id in ids])
+        conn.commit()
+    database.rebuild_world_summaries()
+    database.shutdown()
+
+
+def timed_init(path):
+    database = make_database(path)
+    # Timed on its own below; stop init_db from starting it in the background.
+    with patch.object(database, "start_backfills"):
+        started = time.perf_counter()
+        database.init_db()
+        elapsed = time.perf_counter() - started
+    return database, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--worlds", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5, help="Up-to-date starts to time.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        started = time.perf_counter()
+        seed(path, args.worlds)
+        print(f"Seeded {args.worlds} worlds in {time.perf_counter() - started:.1f}s")
+
+        database = make_database(path)
+        with database.get_connection() as conn:
+            conn.execute("PRAGMA user_version = 0")
+            conn.commit()
+        database.shutdown()
+
+        database, upgrade = timed_init(path)
+        started = time.perf_counter()
+        batches = database.run_backfills()
+        backfill = time.perf_counter() - started
+        database.shutdown()
+
+        boots = []
+        for _ in range(args.repeat):
+            database, elapsed = timed_init(path)
+            boots.append(elapsed)
+            database.shutdown()
+
+    print(f"  upgrade   {upgrade * 1000:9.1f} ms")
+    print(f"  backfill  {backfill * 1000:9.1f} ms   {sum(batches.values())} batches")
+    print(f"  boot      {min(boots) * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
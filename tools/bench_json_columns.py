@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Measure what compressing the large JSON columns saves and costs.
+
+Seeds two throwaway databases with --worlds multi-language Worlds: one stored
+as plain JSON text, the way rows were written before compression, and one with
+the marker byte plus zlib encoding. Each World has the default 10x8 map with
+per-tile prose in --languages languages, regions per language, a handful of
+placements, and definitions the size the forge produces.
+
+Reports the stored bytes per column, the database file size, and the median
+time to read a World back through get_generator_world / get_generator.
+
+Usage:
+    python tools/bench_json_columns.py
+    python tools/bench_json_columns.py --worlds 500 --languages 8
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db as db_module  # noqa: E402
+from db import DatabaseManager  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+
+LANGUAGES = ("en", "it", "ja", "es", "fr", "de", "pt", "ko")
+WIDTH, HEIGHT = 10, 8
+SYLLABLES = ("ka", "ri", "mo", "ten", "sa", "lu", "dor", "vi", "ne", "sho", "ra", "el", "ban", "qu", "zi")
+COLUMNS = (
+    ("generators", "player_defs"),
+    ("generators", "item_defs"),
+    ("generators", "enemy_defs"),
+    ("generators", "celltype_defs"),
+    ("generator_worlds", "entity_placements"),
+    ("generator_worlds", "tile_info"),
+    ("generator_worlds", "regions"),
+)
+
+
+def make_database(directory, name):
+    with patch.dict(os.environ, {
+        "DO_STORAGE_SERVER": "",
+        "DO_SPACES_ACCESS_KEY": "",
+        "DO_SPACES_SECRET_KEY": "",
+        "DO_STORAGE_CONTAINER": "",
+    }):
+        database = DatabaseManager()
+    database.db_path = os.path.join(directory, name)
+    database.init_db()
+    return database
+
+
+class Prose:
+    """Deterministic filler with the word spread of generated descriptions."""
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.words = [
+            "".join(self.random.choice(SYLLABLES) for _ in range(self.random.randint(1, 4)))
+            for _ in range(600)
+        ]
+
+    def sentence(self, words=12):
+        text = " ".join(self.random.choice(self.words) for _ in range(words))
+        return text.capitalize() + "."
+
+    def paragraph(self, sentences=3):
+        return " ".join(self.sentence(self.random.randint(8, 16)) for _ in range(sentences))
+
+
+def make_world(prose, language_count):
+    def entity(kind, index):
+        return {
+            "id": f"{kind}_{index}",
+            "name": prose.sentence(2)[:-1],
+            "description": prose.paragraph(2),
+            "font_awesome_icon": "fa-solid fa-star",
+            "art_url": f"/assets/worlds/{uuid.uuid4().hex}/{kind}_{index}.webp",
+        }
+
+    players = [{**entity("player", i), "base_hp": 100, "base_attack": 12} for i in range(10)]
+    items = [{**entity("item", i), "type": "weapon", "effect": {"attack": 3}} for i in range(30)]
+    enemies = [{**entity("enemy", i), "hp": 40, "attack": 8, "defense": 2} for i in range(20)]
+    celltypes = [{**entity("terrain", i), "walkable": True} for i in range(6)]
+
+    languages = LANGUAGES[:language_count]
+    tile_info = {
+        language: [
+            {
+                "x": x,
+                "y": y,
+                "label": prose.sentence(2)[:-1],
+                "quick_desc": prose.sentence(10),
+                "inspect_desc": prose.paragraph(3),
+            }
+            for y in range(HEIGHT)
+            for x in range(WIDTH)
+        ]
+        for language in languages
+    }
+    regions = {
+        language: [
+            {
+                "id": f"region-{index}",
+                "name": prose.sentence(3)[:-1],
+                "description": prose.paragraph(2),
+                "tiles": [[x, index] for x in range(WIDTH)],
+                "borders": {f"region-{index + 1}": prose.sentence(10)},
+            }
+            for index in range(HEIGHT)
+        ]
+        for language in languages
+    }
+    placements = [
+        {"type": kind, "entity_id": f"{kind}_{index}", "x": index % WIDTH, "y": index % HEIGHT}
+        for kind, count in (("item", 12), ("enemy", 10))
+        for index in range(count)
+    ]
+    return players, items, enemies, celltypes, placements, tile_info, regions
+
+
+def seed(database, worlds):
+    ids = []
+    for players, items, enemies, celltypes, placements, tile_info, regions in worlds:
+        generator_id = database.save_generator(
+            "Bench world", "Bench world", "en", players, items, enemies, celltypes,
+            visibility="public",
+        )
+        database.save_generator_world(
+            generator_id, "en", "\n".join([",".join(["t0"] * WIDTH)] * HEIGHT),
+            placements, tile_info, regions_by_language=regions,
+        )
+        ids.append(generator_id)
+    return ids
+
+
+def column_bytes(database):
+    sizes = {}
+    with database.get_connection() as conn:
+        for table, column in COLUMNS:
+            sizes[f"{table}.{column}"] = conn.execute(
+                f"SELECT COALESCE(SUM(length(CAST({column} AS BLOB))), 0) FROM {table}"
+            ).fetchone()[0]
+    return sizes
+
+
+def median_ms(read, ids, repeat):
+    samples = []
+    for _ in range(repeat):
+        for generator_id in ids:
+            started = time.perf_counter()
+            read(generator_id)
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def file_size(database):
+    database.checkpoint()
+    return os.path.getsize(database.db_path)
+
+
+def run(world_count, language_count, repeat):
+    prose = Prose(7)
+    worlds = [make_world(prose, language_count) for _ in range(world_count)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for label, min_bytes in (("plain", sys.maxsize), ("zlib", db_module.COMPRESSED_JSON_MIN_BYTES)):
+            with patch.object(db_module, "COMPRESSED_JSON_MIN_BYTES", min_bytes):
+                database = make_database(directory, f"{label}.db")
+                try:
+                    ids = seed(database, worlds)
+                    results[label] = {
+                        "columns": column_bytes(database),
+                        "file": file_size(database),
+                        "world_ms": median_ms(database.get_generator_world, ids, repeat),
+                        "generator_ms": median_ms(database.get_generator, ids, repeat),
+                    }
+                finally:
+                    database.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--worlds", type=int, default=200)
+    parser.add_argument("--languages", type=int, default=5, choices=range(1, len(LANGUAGES) + 1))
+    parser.add_argument("--repeat", type=int, default=3, help="Reads per World when timing.")
+    args = parser.parse_args()
+
+    results = run(args.worlds, args.languages, args.repeat)
+    plain, packed = results["plain"], results["zlib"]
+
+    print(f"{args.worlds} Worlds, {args.languages} languages, {WIDTH}x{HEIGHT} map")
+    print(f"{'column':34} {'plain':>12} {'zlib':>12} {'ratio':>7}")
+    for name in plain["columns"]:
+        before, after = plain["columns"][name], packed["columns"][name]
+        ratio = before / after if after else 0
+        print(f"{name:34} {before:>12,} {after:>12,} {ratio:>6.1f}x")
+    print(f"{'database file':34} {plain['file']:>12,} {packed['file']:>12,} "
+          f"{plain['file'] / packed['file']:>6.1f}x")
+    print()
+    print(f"{'median read (ms)':34} {'plain':>12} {'zlib':>12}")
+    print(f"{'get_generator_world':34} {plain['world_ms']:>12.3f} {packed['world_ms']:>12.3f}")
+    print(f"{'get_generator':34} {plain['generator_ms']:>12.3f} {packed['generator_ms']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
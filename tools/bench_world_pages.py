@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Compare gallery page cost by depth: keyset cursor vs. OFFSET.
+
+Seeds a throwaway database with --worlds Worlds (100k by default), a share of
+them owned by one prolific creator, and times fetching page 1, 10, 100 and
+1000 of both the public gallery and that creator's "my worlds" list.
+
+  cursor   DatabaseManager.list_worlds_page, as the API serves it
+  offset   the same summary query paged with LIMIT/OFFSET, for contrast
+  legacy   page 1 of the pre-summary query over the generators table
+
+A keyset page should cost the same at any depth; an OFFSET page has to step
+over every row before it.
+
+Usage:
+    python tools/bench_world_pages.py
+    python tools/bench_world_pages.py --worlds 20000 --page-size 20
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import DatabaseManager, SchemaCapabilities  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+
+PAGES = (1, 10, 100, 1000)
+
+
+def make_database(directory):
+    with patch.dict(os.environ, {
+        "DO_STORAGE_SERVER": "",
+        "DO_SPACES_ACCESS_KEY": "",
+        "DO_SPACES_SECRET_KEY": "",
+        "DO_STORAGE_CONTAINER": "",
+    }):
+        database = DatabaseManager()
+    database.db_path = os.path.join(directory, "pages.db")
+    database.init_db()
+    return database
+
+
+def seed(database, world_count, creator_share):
+    creator_id = str(uuid.uuid4())
+    players = '[{"name": "Hero"}, {"name": "Rogue"}]'
+    items = '[{"name": "Sword"}, {"name": "Potion"}]'
+    enemies = '[{"name": "Goblin"}]'
+    celltypes = '{"floor": {}, "wall": {}}'
+    creator_every = max(1, round(1 / creator_share)) if creator_share else 0
+
+    with database.get_connection(database="accounts") as conn:
+        conn.execute(
+            "INSERT INTO users (id, username, password_hash) VALUES (?, 'creator', 'x')",
+            (creator_id,),
+        )
+        conn.commit()
+    with database.get_connection() as conn:
+        conn.executemany("""
+            INSERT INTO generators (
+                id, theme_desc, theme_desc_better, language, player_defs,
+                item_defs, enemy_defs, celltype_defs, owner_id, visibility,
+                updated_at
+            ) VALUES (?, ?, ?, 'en', ?, ?, ?, ?, ?, ?, datetime('now', ?))
+        """, (
+            (
+                uuid.uuid4().hex, f"World {index}", f"World {index}",
+                players, items, enemies, celltypes,
+                creator_id if creator_every and index % creator_every == 0 else None,
+                "public" if index % 4 else "unlisted",
+                # Coarse timestamps, so many rows share a sort key and the id
+                # tiebreak is exercised.
+                f"-{index // 7} seconds",
+            )
+            for index in range(world_count)
+        ))
+        conn.commit()
+
+    started = time.perf_counter()
+    database.rebuild_world_summaries()
+    print(f"Built summaries for {world_count} worlds in {time.perf_counter() - started:.1f}s")
+    return creator_id
+
+
+def time_call(operation, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def cursor_before_page(conn, where, params, page, page_size):
+    """The cursor a client would hold when asking for `page`."""
+    if page == 1:
+        return None
+    row = conn.execute(f"""
+        SELECT sort_key, generator_id
+        FROM world_summaries s
+        WHERE {where}
+        ORDER BY sort_key DESC, generator_id DESC
+        LIMIT 1 OFFSET ?
+    """, params + ((page - 1) * page_size - 1,)).fetchone()
+    return DatabaseManager.encode_world_cursor(row[0], row[1]) if row else None
+
+
+def bench_feed(database, label, where, params, page_size, repeats, list_kwargs, scope):
+    offset_sql = DatabaseManager._world_summaries_sql(scope).replace(
+        "LIMIT ?", "LIMIT ? OFFSET ?"
+    )
+    with database.get_connection(readonly=True) as conn:
+        total = conn.execute(
+            f"SELECT COUNT(*) FROM world_summaries s WHERE {where}", params
+        ).fetchone()[0]
+        cursors = {
+            page: cursor_before_page(conn, where, params, page, page_size)
+            for page in PAGES
+            if (page - 1) * page_size < total
+        }
+
+    print(f"\n{label}: {total} worlds, {page_size} per page (median of {repeats})")
+    for page, cursor in cursors.items():
+        keyset_ms = time_call(
+            lambda: database.list_worlds_page(page_size, cursor=cursor, **list_kwargs),
+            repeats,
+        )
+        with database.get_connection(readonly=True) as conn:
+            offset_ms = time_call(
+                lambda: conn.execute(
+                    offset_sql, params + (page_size, (page - 1) * page_size)
+                ).fetchall(),
+                repeats,
+            )
+        print(f"  page {page:>5}   cursor {keyset_ms:>7.2f} ms   offset {offset_ms:>8.2f} ms")
+
+
+def bench_legacy(database, page_size, repeats):
+    with database.get_connection(readonly=True) as conn:
+        schema = SchemaCapabilities.read(conn)
+        sql = DatabaseManager._list_worlds_sql(schema, "public")
+        legacy_ms = time_call(lambda: conn.execute(sql, (page_size,)).fetchall(), repeats)
+    print(f"\nlegacy public page 1 over generators: {legacy_ms:.2f} ms (query only, before JSON decoding)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--worlds", type=int, default=100_000)
+    parser.add_argument("--creator-share", type=float, default=0.05,
+                        help="Fraction of worlds owned by the one prolific creator")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = make_database(directory)
+        creator_id = seed(database, args.worlds, args.creator_share)
+
+        bench_feed(database, "public gallery", "s.visibility = 'public'", (),
+                   args.page_size, args.repeats, {}, "public")
+        bench_feed(database, "creator's worlds", "s.owner_id = ?", (creator_id,),
+                   args.page_size, args.repeats, {"owner_id": creator_id}, "owner")
+        bench_legacy(database, args.page_size, args.repeats)
+
+        database.shutdown()
+
+
+if __name__ == "__main__":
+    main()
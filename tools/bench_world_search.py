@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Time World search at gallery scale.
+
+Seeds a throwaway database with --worlds Worlds (100k by default) whose titles
+and themes are drawn from a fixed vocabulary, so some words are rare and some
+appear in a large share of Worlds. A tenth also get a Japanese translation.
+Then times DatabaseManager.search_worlds_page for queries of each kind, on the
+first page and on the page after it.
+
+Usage:
+    python tools/bench_world_search.py
+    python tools/bench_world_search.py --worlds 20000 --repeats 50
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import DatabaseManager  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+
+# Zipf-ish: the first words are picked far more often than the last.
+WORDS = (
+    "dark forest city ancient lost tower castle sunken neon desert frozen haunted "
+    "crystal iron shadow golden storm island temple ruins garden harbor library "
+    "clockwork observatory volcano glacier monastery lighthouse catacomb bazaar "
+    "archipelago citadel labyrinth orchard quarry reliquary scriptorium ziggurat"
+).split()
+JAPANESE = ("森", "街", "塔", "城", "海", "砂漠", "図書館", "灯台", "迷宮", "神殿")
+QUERIES = (
+    ("common word", "dark"),
+    ("prefix", "cast"),
+    ("two words", "haunted castle"),
+    ("rare word", "ziggurat"),
+    ("no match", "spaceship"),
+    ("japanese", "図書館"),
+)
+
+
+def make_database(directory):
+    with patch.dict(os.environ, {
+        "DO_STORAGE_SERVER": "",
+        "DO_SPACES_ACCESS_KEY": "",
+        "DO_SPACES_SECRET_KEY": "",
+        "DO_STORAGE_CONTAINER": "",
+    }):
+        database = DatabaseManager()
+    database.db_path = os.path.join(directory, "search.db")
+    database.init_db()
+    return database
+
+
+def seed(database, world_count):
+    rng = random.Random(7)
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+
+    def phrase(count):
+        return " ".join(rng.choices(WORDS, weights, k=count)).capitalize()
+
+    world_ids = [uuid.uuid4().hex for _ in range(world_count)]
+    with database.get_connection() as conn:
+        conn.executemany("""
+            INSERT INTO generators (
+                id, theme_desc, theme_desc_better, language, player_defs,
+                item_defs, enemy_defs, celltype_defs, visibility
+            ) VALUES (?, ?, ?, 'en', '[]', '[]', '[]', '{}', ?)
+        """, (
+            (world_id, phrase(12), phrase(3), "public" if index % 4 else "unlisted")
+            for index, world_id in enumerate(world_ids)
+        ))
+        conn.executemany("""
+            INSERT INTO generator_translations (generator_id, language, theme_desc_better)
+            VALUES (?, 'ja', ?)
+        """, (
+            (world_id, "".join(rng.choices(JAPANESE, k=3)))
+            for world_id in world_ids[::10]
+        ))
+        conn.commit()
+
+    started = time.perf_counter()
+    database.rebuild_world_summaries()
+    print(f"Indexed {world_count} worlds in {time.perf_counter() - started:.1f}s")
+
+
+def time_call(operation, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--worlds", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=12)
+    parser.add_argument("--repeats", type=int, default=25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = make_database(directory)
+        seed(database, args.worlds)
+
+        print(f"\n{'query':28} {'page 1 p50/p95 (ms)':>22} {'page 2 p50/p95 (ms)':>22}")
+        for label, query in QUERIES:
+            first = database.search_worlds_page(query, args.page_size)
+            cursor = first["next_cursor"]
+            page_1 = time_call(lambda: database.search_worlds_page(query, args.page_size), args.repeats)
+            line = f"{label + ' (' + query + ')':28} {page_1[0]:>12.2f} / {page_1[1]:>7.2f}"
+            if cursor:
+                page_2 = time_call(
+                    lambda: database.search_worlds_page(query, args.page_size, cursor=cursor),
+                    args.repeats,
+                )
+                line += f" {page_2[0]:>12.2f} / {page_2[1]:>7.2f}"
+            print(line)
+
+        database.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Compress large JSON columns written before compression existed.
+
+Definitions, tile prose, regions and placements over DB_COMPRESS_JSON_MIN_BYTES
+are stored as a marker byte plus zlib-compressed JSON. Old plain-text rows read
+back fine and are compressed on their next write; this sweeps the rest in
+small batches so the server can keep running. Safe to re-run.
+
+Run `VACUUM` afterwards (with the server stopped) to hand the freed pages back
+to the filesystem.
+
+Usage:
+    python tools/compress_json_columns.py
+    python tools/compress_json_columns.py --db-path _data/rllm_game_data.db
+    python tools/compress_json_columns.py --batch-size 50
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from db import db  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-path", help="Database file to sweep instead of the configured one.")
+    parser.add_argument("--batch-size", type=int, default=200,
+                        help="Rows rewritten per transaction.")
+    args = parser.parse_args()
+
+    if args.db_path:
+        db.db_path = args.db_path
+    try:
+        db.init_db()
+        counts = db.compress_json_columns(batch_size=args.batch_size)
+    finally:
+        db.shutdown()
+
+    print(json.dumps(counts, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Check materialized credit balances against the credit ledger.
+
+credit_balances holds a running promo/paid total per user, moved in the same
+transaction as each credit_ledger entry. The ledger is the source of truth;
+this re-derives every stored balance from it and reports any user whose row
+has drifted. Users without a row yet are counted but are not drift: their row
+is derived from the ledger on their next credit write.
+
+Exits with status 1 when drift is found and left unfixed, so it can run from
+cron or CI.
+
+Usage:
+    python tools/reconcile_credit_balances.py
+    python tools/reconcile_credit_balances.py --db-path _data/rllm_game_data.db
+    python tools/reconcile_credit_balances.py --fix
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from db import db  # noqa: E402
+
+
+def reconcile(db_manager=db, fix=False):
+    db_manager.init_db()
+    return db_manager.reconcile_credit_balances(fix=fix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-path", help="Database file to check instead of the configured one.")
+    parser.add_argument("--fix", action="store_true",
+                        help="Rewrite drifted balances from the ledger.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    if args.db_path:
+        db.db_path = args.db_path
+    try:
+        report = reconcile(fix=args.fix)
+    finally:
+        db.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(
+            f"Checked {report['checked']} balances "
+            f"({report['unmaterialized']} users not materialized yet)"
+        )
+        for entry in report["drift"]:
+            stored, ledger = entry["stored"], entry["ledger"]
+            print(
+                f"- {entry['user_id']}: stored promo={stored['promo']} paid={stored['paid']}, "
+                f"ledger promo={ledger['promo']} paid={ledger['paid']}"
+            )
+        if report["drift"]:
+            action = "fixed" if args.fix else "found"
+            print(f"{len(report['drift'])} drifted balances {action}")
+        else:
+            print("No drift")
+
+    if report["drift"] and not args.fix:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Rebuild a SQLite database from its WAL replica in object storage.
+
+Downloads the newest generation's base snapshot and replays every shipped WAL
+segment over it, the same way the server does on startup. The output file is
+written only after the rebuilt copy passes `PRAGMA quick_check`.
+
+Accounts, credits and sessions live in a second file with its own replica
+under `<prefix>/accounts`; `--accounts-output` rebuilds that one too. Restore
+both together: the World file expects the accounts file next to it.
+
+Storage comes from the usual DO_STORAGE_* / DO_SPACES_* settings, or from
+DB_REPLICA_LOCAL_DIR. Use --local-dir to read a directory replica directly.
+
+Usage:
+    python tools/restore_db.py --output restored.db
+    python tools/restore_db.py --output restored.db --generation 20260101T000000000000Z-1a2b3c4d
+    python tools/restore_db.py --output restored.db --local-dir _data/replica-bucket
+    python tools/restore_db.py --output restored.db --accounts-output restored-accounts.db
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from db_replication import LocalObjectStore, ReplicaNotFound, WalReplicator  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+
+def make_replicator(local_dir=None, accounts=False):
+    prefix = os.getenv("DB_REPLICA_PREFIX", "replica")
+    if accounts:
+        prefix = f"{prefix}/accounts"
+    if local_dir:
+        return WalReplicator(None, LocalObjectStore(local_dir), "local", prefix=prefix)
+
+    from db import db
+    if db.replicator is None:
+        return None
+    return WalReplicator(None, db.s3, db.bucket, prefix=prefix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", required=True, help="Path of the database file to write.")
+    parser.add_argument("--generation", help="Restore this generation instead of the latest.")
+    parser.add_argument("--local-dir", help="Directory replica to read instead of the bucket.")
+    parser.add_argument("--accounts-output",
+                        help="Also rebuild the accounts file, from its latest generation, here.")
+    args = parser.parse_args()
+
+    targets = [(make_replicator(args.local_dir), args.output, args.generation)]
+    if args.accounts_output:
+        targets.append((make_replicator(args.local_dir, accounts=True), args.accounts_output, None))
+    if targets[0][0] is None:
+        print("Storage is not configured", file=sys.stderr)
+        sys.exit(2)
+
+    results = []
+    for replicator, output, generation in targets:
+        try:
+            results.append(replicator.restore(output, generation=generation))
+        except ReplicaNotFound as e:
+            print(str(e), file=sys.stderr)
+            sys.exit(1)
+
+    print(json.dumps(results[0] if len(results) == 1 else results, indent=2))
+    if not all(result["complete"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
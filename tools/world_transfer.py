@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Move Worlds between deployments as NDJSON, without the rest of the database.
+
+`export` streams the selected Worlds, one JSON line each: the generator row,
+its translations, its playable snapshot and its metrics. Users, credits and
+sessions stay behind. `import` upserts those lines into another database in
+large batched transactions, refreshing listings and search as it goes.
+
+Both hold one batch in memory at a time, print progress to stderr, and take
+`--resume` to pick up after an interruption: export continues after the last
+complete line of its output file, import skips what a progress file next to
+its input says was already committed. Re-importing is harmless either way.
+
+Files ending in .gz are read and written gzip-compressed; `-` is stdout or
+stdin. `--with-assets` lists each World's art files (path, size, sha256) in
+its line, and `import --assets-from` copies them from a copy of the source's
+assets directory into this deployment's, checking each against its hash.
+
+Usage:
+    python tools/world_transfer.py export worlds.ndjson.gz
+    python tools/world_transfer.py export worlds.ndjson --visibility public --resume
+    python tools/world_transfer.py export - --ids-file ids.txt --with-assets > worlds.ndjson
+    python tools/world_transfer.py import worlds.ndjson.gz --db-path _data/staging.db
+    python tools/world_transfer.py import worlds.ndjson --resume --assets-from /mnt/prod/assets
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from db import db  # noqa: E402
+from gen_image import get_world_assets_dir, safe_asset_name  # noqa: E402
+
+FORMAT = "roguellm-worlds"
+FORMAT_VERSION = 1
+
+
+class Progress:
+    """A single self-overwriting status line on stderr."""
+
+    def __init__(self, verb: str, total: int = 0, done: int = 0):
+        self.verb = verb
+        self.total = total
+        self.done = done
+        self._started = self._shown = time.monotonic()
+        self._first = done
+
+    def advance(self, count: int, force: bool = False):
+        self.done += count
+        now = time.monotonic()
+        if not force and now - self._shown < 0.5:
+            return
+        self._shown = now
+        rate = (self.done - self._first) / max(now - self._started, 1e-6)
+        line = f"{self.verb} {self.done:,}"
+        if self.total:
+            line += f"/{self.total:,}"
+        line += f" worlds  {rate:,.0f}/s"
+        if self.total and rate > 0 and self.done < self.total:
+            line += f"  eta {int((self.total - self.done) / rate)}s"
+        sys.stderr.write(f"\r{line}   ")
+        sys.stderr.flush()
+
+    def finish(self):
+        self.advance(0, force=True)
+        sys.stderr.write("\n")
+
+
+def open_text(path: str, mode: str):
+    if path == "-":
+        return sys.stdout if "w" in mode or "a" in mode else sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def asset_references(world_id: str):
+    world_dir = Path(get_world_assets_dir()) / safe_asset_name(world_id, "world")
+    if not world_dir.is_dir():
+        return []
+    references = []
+    for path in sorted(world_dir.rglob("*")):
+        if path.is_file():
+            digest = hashlib.sha256()
+            with open(path, "rb") as handle:
+                for chunk in iter(lambda: handle.read(1 << 20), b""):
+                    digest.update(chunk)
+            references.append({
+                "path": path.relative_to(world_dir.parent).as_posix(),
+                "bytes": path.stat().st_size,
+                "sha256": digest.hexdigest(),
+            })
+    return references
+
+
+def find_resume_point(path: str):
+    """Cut a partial last line off `path`.
+
+    Returns the last World id written, how many Worlds were written, and
+    whether anything complete (at least the header) is left.
+    """
+    last_id, written, good_end = None, 0, 0
+    with open(path, "rb") as handle:
+        offset = 0
+        for raw in handle:
+            offset += len(raw)
+            if not raw.endswith(b"\n"):
+                break
+            try:
+                line = json.loads(raw)
+            except ValueError:
+                break
+            good_end = offset
+            if line.get("type") == "world":
+                last_id, written = line["id"], written + 1
+    with open(path, "r+b") as handle:
+        handle.truncate(good_end)
+    return last_id, written, good_end > 0
+
+
+def export_command(args):
+    visibilities = None if "all" in args.visibility else args.visibility
+    world_ids = None
+    if args.ids_file:
+        with open(args.ids_file, encoding="utf-8") as handle:
+            world_ids = [line.strip() for line in handle if line.strip()]
+
+    after_id, written, has_header = "", 0, False
+    if args.resume and args.output != "-" and os.path.exists(args.output):
+        if args.output.endswith(".gz"):
+            sys.exit("--resume needs an uncompressed output file")
+        last_id, written, has_header = find_resume_point(args.output)
+        after_id = last_id or ""
+
+    total = db.count_world_exports(visibilities, world_ids)
+    progress = Progress("exported", total, written)
+    output = open_text(args.output, "a" if has_header else "w")
+    try:
+        if not has_header:
+            output.write(json.dumps({
+                "type": "header",
+                "format": FORMAT,
+                "version": FORMAT_VERSION,
+                "exported_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "count": total,
+            }) + "\n")
+        for record in db.export_worlds(visibilities, world_ids, after_id, args.batch_size):
+            line = {"type": "world", **record}
+            if args.with_assets:
+                line["assets"] = asset_references(record["id"])
+            output.write(json.dumps(line, ensure_ascii=False) + "\n")
+            progress.advance(1)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        else:
+            output.flush()
+    progress.finish()
+
+
+def copy_assets(references, source_dir: str) -> int:
+    target_root = Path(get_world_assets_dir())
+    copied = 0
+    for reference in references:
+        relative = Path(reference["path"])
+        if relative.is_absolute() or ".." in relative.parts:
+            raise ValueError(f"Refusing asset path outside the assets directory: {reference['path']!r}")
+        source, target = Path(source_dir) / relative, target_root / relative
+        if target.is_file() and target.stat().st_size == reference["bytes"]:
+            continue
+        if not source.is_file():
+            print(f"\nMissing asset {relative}", file=sys.stderr)
+            continue
+        with open(source, "rb") as handle:
+            if hashlib.sha256(handle.read()).hexdigest() != reference["sha256"]:
+                raise ValueError(f"Asset {relative} does not match its exported hash")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temporary = target.with_name(f".{target.name}.tmp")
+        shutil.copyfile(source, temporary)
+        os.replace(temporary, target)
+        copied += 1
+    return copied
+
+
+def import_command(args):
+    progress_path = None if args.input == "-" else args.input + ".progress"
+    skip = 0
+    if args.resume and progress_path and os.path.exists(progress_path):
+        with open(progress_path, encoding="utf-8") as handle:
+            skip = json.load(handle)["imported"]
+
+    source = open_text(args.input, "r")
+    progress = None
+    imported, copied, batch, assets = 0, 0, [], []
+
+    def commit():
+        nonlocal imported, copied
+        db.import_worlds(batch)
+        imported += len(batch)
+        if args.assets_from:
+            copied += copy_assets(assets, args.assets_from)
+        if progress_path:
+            # Only after the batch has committed, so a crash re-imports it.
+            temporary = progress_path + ".tmp"
+            with open(temporary, "w", encoding="utf-8") as handle:
+                json.dump({"imported": imported}, handle)
+            os.replace(temporary, progress_path)
+        progress.advance(len(batch))
+        batch.clear()
+        assets.clear()
+
+    try:
+        for raw in source:
+            if not raw.strip():
+                continue
+            line = json.loads(raw)
+            if line.get("type") == "header":
+                if line.get("format") != FORMAT or line.get("version") != FORMAT_VERSION:
+                    sys.exit(f"{args.input} is not a {FORMAT} v{FORMAT_VERSION} export")
+                progress = Progress("imported", line.get("count") or 0, skip)
+                continue
+            if progress is None:
+                sys.exit(f"{args.input} has no {FORMAT} header")
+            if line.get("type") != "world":
+                continue
+            if imported < skip:
+                imported += 1
+                continue
+            batch.append(line)
+            assets.extend(line.get("assets") or ())
+            if len(batch) >= args.batch_size:
+                commit()
+        if batch:
+            commit()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    if progress is not None:
+        progress.finish()
+    if progress_path and os.path.exists(progress_path):
+        os.remove(progress_path)
+    if args.assets_from:
+        print(f"Copied {copied} asset files", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-path", help="Database file to use instead of the configured one.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write Worlds to an NDJSON file.")
+    export_parser.add_argument("output", help="File to write, or - for stdout.")
+    export_parser.add_argument("--visibility", action="append",
+                               choices=("public", "unlisted", "private", "all"),
+                               help="Visibility to include; repeatable. Default: public and unlisted.")
+    export_parser.add_argument("--ids-file", help="Only these World ids, one per line.")
+    export_parser.add_argument("--with-assets", action="store_true",
+                               help="List each World's art files with their hashes.")
+    export_parser.add_argument("--batch-size", type=int, default=200,
+                               help="Worlds read per query.")
+    export_parser.add_argument("--resume", action="store_true",
+                               help="Continue after the last complete line of the output.")
+
+    import_parser = commands.add_parser("import", help="Upsert Worlds from an NDJSON file.")
+    import_parser.add_argument("input", help="File to read, or - for stdin.")
+    import_parser.add_argument("--batch-size", type=int, default=500,
+                               help="Worlds written per transaction.")
+    import_parser.add_argument("--resume", action="store_true",
+                               help="Skip the Worlds an interrupted import already committed.")
+    import_parser.add_argument("--assets-from",
+                               help="Copy of the source assets directory to copy listed art from.")
+    args = parser.parse_args()
+    if args.command == "export" and not args.visibility:
+        args.visibility = ["public", "unlisted"]
+
+    if args.db_path:
+        db.db_path = args.db_path
+    try:
+        db.init_db()
+        if args.command == "export":
+            export_command(args)
+        else:
+            import_command(args)
+    finally:
+        db.shutdown()
+
+
+if __name__ == "__main__":
+    main()